@@ -24,6 +24,7 @@ from apps.users.models.user_models import User, UserProfile
 
 # Импорт всех моделей для автогенерации
 from core.base.models import BaseModel
+from core.base.repo.outbox import OutboxEvent
 from core.config import get_settings
 
 # add your model's MetaData object here
@@ -0,0 +1,55 @@
+"""Create outbox events table
+
+Revision ID: 7a1d2e9c4b50
+Revises: 5c6680c6b417
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1d2e9c4b50'
+down_revision: Union[str, None] = '5c6680c6b417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Создаем таблицу outbox_events
+    op.create_table(
+        'outbox_events',
+        sa.Column('seq', sa.BigInteger(), sa.Identity(always=False), primary_key=True, nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, comment='ID события (ключ идемпотентности)'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+
+        # Событие
+        sa.Column('event_type', sa.String(length=100), nullable=False, comment='Тип события'),
+        sa.Column('aggregate_type', sa.String(length=100), nullable=False, comment='Тип сущности'),
+        sa.Column('aggregate_id', sa.String(length=64), nullable=False, comment='ID сущности'),
+        sa.Column('destination', sa.String(length=32), nullable=False, comment='Назначение (messaging, realtime)'),
+        sa.Column('routing_key', sa.String(length=255), nullable=True, comment='Routing key или канал'),
+        sa.Column('payload', postgresql.JSONB(), nullable=False, comment='Данные события'),
+
+        # Состояние доставки
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=True, comment='Время отправки'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default=sa.text('0'), comment='Неудачных попыток'),
+        sa.Column('last_error', sa.Text(), nullable=True, comment='Последняя ошибка отправки'),
+
+        sa.UniqueConstraint('id', name='uq_outbox_events_id'),
+    )
+
+    # Частичный индекс неотправленных событий для relay
+    op.create_index(
+        'ix_outbox_events_pending', 'outbox_events', ['seq'], postgresql_where=sa.text('published_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from apps.auth.models.auth_models import OrbitalToken
 from apps.auth.schemas.token_schemas import OrbitalTokenType
 from core.base.repo.repository import BaseRepository
+from core.base.repo.uow import commit_or_flush, rollback_unless_in_unit_of_work
 
 
 class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
@@ -46,23 +47,23 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: Объект токена или None
         """
         filters = [
-            self.model.token_hash == token_hash,
-            self.model.is_used == False,  # noqa: E712
-            self.model.expires_at > datetime.utcnow(),
-            self.model.is_deleted == False,  # noqa: E712
+            self._model.token_hash == token_hash,
+            self._model.is_used == False,  # noqa: E712
+            self._model.expires_at > datetime.utcnow(),
+            self._model.is_deleted == False,  # noqa: E712
         ]
 
         if token_type:
-            filters.append(self.model.token_type == token_type.value)
+            filters.append(self._model.token_type == token_type.value)
 
         if purpose:
-            filters.append(self.model.purpose == purpose)
+            filters.append(self._model.purpose == purpose)
 
         if user_id:
-            filters.append(self.model.user_id == user_id)
+            filters.append(self._model.user_id == user_id)
 
-        stmt = select(self.model).where(and_(*filters))
-        result = await self.db.execute(stmt)
+        stmt = select(self._model).where(and_(*filters))
+        result = await self._db.execute(stmt)
         return result.scalar_one_or_none()
 
     async def consume_token(self, token_id: uuid.UUID) -> bool:
@@ -73,19 +74,23 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: True если токен был помечен как использованный
         """
         stmt = (
-            update(self.model)
+            update(self._model)
             .where(
                 and_(
-                    self.model.id == token_id,
-                    self.model.is_used == False,  # noqa: E712
-                    self.model.is_deleted == False,  # noqa: E712
+                    self._model.id == token_id,
+                    self._model.is_used == False,  # noqa: E712
+                    self._model.is_deleted == False,  # noqa: E712
                 )
             )
             .values(is_used=True, used_at=datetime.utcnow())
         )
 
-        result = await self.db.execute(stmt)
-        await self.db.commit()
+        try:
+            result = await self._db.execute(stmt)
+            await commit_or_flush(self._db)
+        except Exception:
+            await rollback_unless_in_unit_of_work(self._db)
+            raise
         return result.rowcount > 0
 
     async def revoke_user_tokens(
@@ -100,21 +105,25 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: Количество отозванных токенов
         """
         filters = [
-            self.model.user_id == user_id,
-            self.model.is_used == False,  # noqa: E712
-            self.model.is_deleted == False,  # noqa: E712
+            self._model.user_id == user_id,
+            self._model.is_used == False,  # noqa: E712
+            self._model.is_deleted == False,  # noqa: E712
         ]
 
         if token_type:
-            filters.append(self.model.token_type == token_type.value)
+            filters.append(self._model.token_type == token_type.value)
 
         if purpose:
-            filters.append(self.model.purpose == purpose)
+            filters.append(self._model.purpose == purpose)
 
-        stmt = update(self.model).where(and_(*filters)).values(is_used=True, used_at=datetime.utcnow())
+        stmt = update(self._model).where(and_(*filters)).values(is_used=True, used_at=datetime.utcnow())
 
-        result = await self.db.execute(stmt)
-        await self.db.commit()
+        try:
+            result = await self._db.execute(stmt)
+            await commit_or_flush(self._db)
+        except Exception:
+            await rollback_unless_in_unit_of_work(self._db)
+            raise
         return result.rowcount
 
     async def cleanup_expired_tokens(self) -> int:
@@ -123,11 +132,10 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
 
         :return: Количество удаленных токенов
         """
-        stmt = delete(self.model).where(self.model.expires_at <= datetime.utcnow())
-
-        result = await self.db.execute(stmt)
-        await self.db.commit()
-        return result.rowcount
+        return await self.bulk_delete(
+            filters={"expires_at__lte": datetime.utcnow()},
+            soft_delete=False,  # Жесткое удаление для очистки
+        )
 
     async def list_active_tokens(
         self, user_id: uuid.UUID, token_type: OrbitalTokenType | None = None, limit: int = 100
@@ -141,18 +149,18 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: Список активных токенов
         """
         filters = [
-            self.model.user_id == user_id,
-            self.model.is_used == False,  # noqa: E712
-            self.model.expires_at > datetime.utcnow(),
-            self.model.is_deleted == False,  # noqa: E712
+            self._model.user_id == user_id,
+            self._model.is_used == False,  # noqa: E712
+            self._model.expires_at > datetime.utcnow(),
+            self._model.is_deleted == False,  # noqa: E712
         ]
 
         if token_type:
-            filters.append(self.model.token_type == token_type.value)
+            filters.append(self._model.token_type == token_type.value)
 
-        stmt = select(self.model).where(and_(*filters)).order_by(self.model.created_at.desc()).limit(limit)
+        stmt = select(self._model).where(and_(*filters)).order_by(self._model.created_at.desc()).limit(limit)
 
-        result = await self.db.execute(stmt)
+        result = await self._db.execute(stmt)
         return list(result.scalars().all())
 
     async def count_active_tokens(self, user_id: uuid.UUID, token_type: OrbitalTokenType | None = None) -> int:
@@ -164,18 +172,18 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: Количество активных токенов
         """
         filters = [
-            self.model.user_id == user_id,
-            self.model.is_used == False,  # noqa: E712
-            self.model.expires_at > datetime.utcnow(),
-            self.model.is_deleted == False,  # noqa: E712
+            self._model.user_id == user_id,
+            self._model.is_used == False,  # noqa: E712
+            self._model.expires_at > datetime.utcnow(),
+            self._model.is_deleted == False,  # noqa: E712
         ]
 
         if token_type:
-            filters.append(self.model.token_type == token_type.value)
+            filters.append(self._model.token_type == token_type.value)
 
-        stmt = select(func.count(self.model.id)).where(and_(*filters))
+        stmt = select(func.count(self._model.id)).where(and_(*filters))
 
-        result = await self.db.execute(stmt)
+        result = await self._db.execute(stmt)
         return result.scalar() or 0
 
     async def get_user_tokens_stats(self, user_id: uuid.UUID) -> dict[str, Any]:
@@ -186,64 +194,64 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: Статистика токенов
         """
         # Общая статистика
-        total_stmt = select(func.count(self.model.id)).where(
+        total_stmt = select(func.count(self._model.id)).where(
             and_(
-                self.model.user_id == user_id,
-                self.model.is_deleted == False,  # noqa: E712
+                self._model.user_id == user_id,
+                self._model.is_deleted == False,  # noqa: E712
             )
         )
 
         # Активные токены
-        active_stmt = select(func.count(self.model.id)).where(
+        active_stmt = select(func.count(self._model.id)).where(
             and_(
-                self.model.user_id == user_id,
-                self.model.is_used == False,  # noqa: E712
-                self.model.expires_at > datetime.utcnow(),
-                self.model.is_deleted == False,  # noqa: E712
+                self._model.user_id == user_id,
+                self._model.is_used == False,  # noqa: E712
+                self._model.expires_at > datetime.utcnow(),
+                self._model.is_deleted == False,  # noqa: E712
             )
         )
 
         # Использованные токены
-        used_stmt = select(func.count(self.model.id)).where(
+        used_stmt = select(func.count(self._model.id)).where(
             and_(
-                self.model.user_id == user_id,
-                self.model.is_used == True,  # noqa: E712
-                self.model.is_deleted == False,  # noqa: E712
+                self._model.user_id == user_id,
+                self._model.is_used == True,  # noqa: E712
+                self._model.is_deleted == False,  # noqa: E712
             )
         )
 
         # Истекшие токены
-        expired_stmt = select(func.count(self.model.id)).where(
+        expired_stmt = select(func.count(self._model.id)).where(
             and_(
-                self.model.user_id == user_id,
-                self.model.is_used == False,  # noqa: E712
-                self.model.expires_at <= datetime.utcnow(),
-                self.model.is_deleted == False,  # noqa: E712
+                self._model.user_id == user_id,
+                self._model.is_used == False,  # noqa: E712
+                self._model.expires_at <= datetime.utcnow(),
+                self._model.is_deleted == False,  # noqa: E712
             )
         )
 
         # Статистика по типам
         type_stats_stmt = (
             select(
-                self.model.token_type,
-                func.count(self.model.id).label("count"),
-                func.sum(func.cast(self.model.is_used, int)).label("used_count"),
+                self._model.token_type,
+                func.count(self._model.id).label("count"),
+                func.sum(func.cast(self._model.is_used, int)).label("used_count"),
             )
             .where(
                 and_(
-                    self.model.user_id == user_id,
-                    self.model.is_deleted == False,  # noqa: E712
+                    self._model.user_id == user_id,
+                    self._model.is_deleted == False,  # noqa: E712
                 )
             )
-            .group_by(self.model.token_type)
+            .group_by(self._model.token_type)
         )
 
         # Выполняем запросы
-        total_result = await self.db.execute(total_stmt)
-        active_result = await self.db.execute(active_stmt)
-        used_result = await self.db.execute(used_stmt)
-        expired_result = await self.db.execute(expired_stmt)
-        type_stats_result = await self.db.execute(type_stats_stmt)
+        total_result = await self._db.execute(total_stmt)
+        active_result = await self._db.execute(active_stmt)
+        used_result = await self._db.execute(used_stmt)
+        expired_result = await self._db.execute(expired_stmt)
+        type_stats_result = await self._db.execute(type_stats_stmt)
 
         total_count = total_result.scalar() or 0
         active_count = active_result.scalar() or 0
@@ -279,24 +287,24 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: Список токенов
         """
         filters = [
-            self.model.purpose == purpose,
-            self.model.is_deleted == False,  # noqa: E712
+            self._model.purpose == purpose,
+            self._model.is_deleted == False,  # noqa: E712
         ]
 
         if user_id:
-            filters.append(self.model.user_id == user_id)
+            filters.append(self._model.user_id == user_id)
 
         if active_only:
             filters.extend(
                 [
-                    self.model.is_used == False,  # noqa: E712
-                    self.model.expires_at > datetime.utcnow(),
+                    self._model.is_used == False,  # noqa: E712
+                    self._model.expires_at > datetime.utcnow(),
                 ]
             )
 
-        stmt = select(self.model).where(and_(*filters)).order_by(self.model.created_at.desc()).limit(limit)
+        stmt = select(self._model).where(and_(*filters)).order_by(self._model.created_at.desc()).limit(limit)
 
-        result = await self.db.execute(stmt)
+        result = await self._db.execute(stmt)
         return list(result.scalars().all())
 
     async def cleanup_old_used_tokens(self, days_old: int = 30) -> int:
@@ -310,15 +318,19 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
 
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
 
-        stmt = delete(self.model).where(
+        stmt = delete(self._model).where(
             and_(
-                self.model.is_used == True,  # noqa: E712
-                self.model.used_at <= cutoff_date,
+                self._model.is_used == True,  # noqa: E712
+                self._model.used_at <= cutoff_date,
             )
         )
 
-        result = await self.db.execute(stmt)
-        await self.db.commit()
+        try:
+            result = await self._db.execute(stmt)
+            await commit_or_flush(self._db)
+        except Exception:
+            await rollback_unless_in_unit_of_work(self._db)
+            raise
         return result.rowcount
 
     async def find_duplicate_tokens(
@@ -333,19 +345,19 @@ class OrbitalTokenRepository(BaseRepository[OrbitalToken, Any, Any]):
         :return: Список дублирующихся токенов
         """
         filters = [
-            self.model.user_id == user_id,
-            self.model.token_type == token_type.value,
-            self.model.purpose == purpose,
-            self.model.is_used == False,  # noqa: E712
-            self.model.expires_at > datetime.utcnow(),
-            self.model.is_deleted == False,  # noqa: E712
+            self._model.user_id == user_id,
+            self._model.token_type == token_type.value,
+            self._model.purpose == purpose,
+            self._model.is_used == False,  # noqa: E712
+            self._model.expires_at > datetime.utcnow(),
+            self._model.is_deleted == False,  # noqa: E712
         ]
 
         stmt = (
-            select(self.model).where(and_(*filters)).order_by(self.model.created_at.asc())  # Сначала старые
+            select(self._model).where(and_(*filters)).order_by(self._model.created_at.asc())  # Сначала старые
         )
 
-        result = await self.db.execute(stmt)
+        result = await self._db.execute(stmt)
         tokens = list(result.scalars().all())
 
         # Возвращаем все кроме последнего (самого нового)
@@ -86,34 +86,36 @@ class SessionService:
         """
         logger.info(f"Creating session for user {user.id}")
 
-        # Проверяем лимит сессий
-        await self._cleanup_excess_sessions(user.id)
-
-        # Определяем время жизни сессии
-        lifetime_minutes = self._default_session_lifetime
-        if remember_me:
-            lifetime_minutes *= 4  # Увеличиваем в 4 раза для "запомнить меня"
-
-        # Создаем новую сессию
-        session_data = {
-            "user_id": user.id,
-            "session_id": self._generate_session_id(),
-            "expires_at": self._get_session_expiry(lifetime_minutes),
-            "data": initial_data or {},
-            "ip_address": ip_address,
-            "user_agent": user_agent,
-            "csrf_token": self._generate_csrf_token(),
-            "is_active": True,
-            "last_activity_at": datetime.utcnow(),
-        }
+        # Деактивация лишних сессий и создание новой - одним коммитом
+        async with self._session_repo.unit_of_work():
+            # Проверяем лимит сессий
+            await self._cleanup_excess_sessions(user.id)
+
+            # Определяем время жизни сессии
+            lifetime_minutes = self._default_session_lifetime
+            if remember_me:
+                lifetime_minutes *= 4  # Увеличиваем в 4 раза для "запомнить меня"
+
+            # Создаем новую сессию
+            session_data = {
+                "user_id": user.id,
+                "session_id": self._generate_session_id(),
+                "expires_at": self._get_session_expiry(lifetime_minutes),
+                "data": initial_data or {},
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "csrf_token": self._generate_csrf_token(),
+                "is_active": True,
+                "last_activity_at": datetime.utcnow(),
+            }
 
-        try:
-            session = await self._session_repo.create(session_data)
-            logger.debug(f"Session created for user {user.id}: {session.session_id}")
-            return session
-        except Exception as e:
-            logger.error(f"Failed to create session for user {user.id}: {e}")
-            raise
+            try:
+                session = await self._session_repo.create(session_data)
+                logger.debug(f"Session created for user {user.id}: {session.session_id}")
+                return session
+            except Exception as e:
+                logger.error(f"Failed to create session for user {user.id}: {e}")
+                raise
 
     async def get_session(self, session_id: str) -> UserSession | None:
         """
@@ -404,20 +406,24 @@ class SessionService:
         :param user_id: ID пользователя
         """
         try:
-            current_count = await self._session_repo.count_active_sessions(user_id)
+            # Savepoint: ошибка очистки откатывает только ее, а не транзакцию создания сессии
+            async with self._session_repo.unit_of_work() as uow, uow.savepoint():
+                current_count = await self._session_repo.count_active_sessions(user_id)
 
-            if current_count >= self._max_sessions_per_user:
-                # Получаем все активные сессии пользователя
-                sessions = await self._session_repo.list_by_user(user_id=user_id, active_only=True, limit=current_count)
+                if current_count >= self._max_sessions_per_user:
+                    # Получаем все активные сессии пользователя
+                    sessions = await self._session_repo.list_by_user(
+                        user_id=user_id, active_only=True, limit=current_count
+                    )
 
-                # Сортируем по времени активности (старые сначала)
-                sessions_sorted = sorted(sessions, key=lambda s: s.last_activity_at)
+                    # Сортируем по времени активности (старые сначала)
+                    sessions_sorted = sorted(sessions, key=lambda s: s.last_activity_at)
 
-                # Деактивируем самые старые сессии
-                excess_count = current_count - self._max_sessions_per_user + 1
-                for session in sessions_sorted[:excess_count]:
-                    await self._session_repo.invalidate_session(session.session_id)
+                    # Деактивируем самые старые сессии
+                    excess_count = current_count - self._max_sessions_per_user + 1
+                    for session in sessions_sorted[:excess_count]:
+                        await self._session_repo.invalidate_session(session.session_id)
 
-                logger.info(f"Cleaned up {excess_count} excess sessions for user {user_id}")
+                    logger.info(f"Cleaned up {excess_count} excess sessions for user {user_id}")
         except Exception as e:
             logger.error(f"Error cleaning up excess sessions: {e}")
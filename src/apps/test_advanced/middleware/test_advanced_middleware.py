@@ -9,16 +9,16 @@ Generated at: 2025-06-22T16:30:22.531632
 
 import time
 import uuid
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 
 logger = logging.getLogger("middleware.test_advanced")
 
 
-class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
+class TestAdvancedLoggingMiddleware:
     """
     Advanced logging middleware for TestAdvanced operations.
     
@@ -36,6 +36,7 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
     - Structured logging with context
     - Error correlation and tracking
     - Configurable log levels per endpoint
+    - Pure ASGI: streaming responses are passed through unchanged
     
     Example:
         >>> from fastapi import FastAPI
@@ -47,7 +48,7 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         log_requests: bool = True,
         log_responses: bool = False,
         log_body: bool = False,
@@ -63,23 +64,27 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
             log_body: Whether to log request/response bodies
             performance_threshold_ms: Threshold for slow request warnings
         """
-        super().__init__(app)
+        self.app = app
         self.log_requests = log_requests
         self.log_responses = log_responses
         self.log_body = log_body
         self.performance_threshold_ms = performance_threshold_ms
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request through logging middleware.
         
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or endpoint handler
-            
-        Returns:
-            HTTP response with logging metadata
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+
         # Generate unique request ID for tracing
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
@@ -89,40 +94,30 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
         
         # Log incoming request
         if self.log_requests:
-            await self._log_request(request, request_id)
+            receive = await self._log_request(request, request_id, receive)
         
+        response_time_ms = 0.0
+        response_start: Message | None = None
+        response_body = bytearray()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_time_ms, response_start
+            if message["type"] == "http.response.start":
+                # Calculate response time
+                response_time_ms = (time.time() - start_time) * 1000
+                response_start = message
+
+                # Add response headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Response-Time"] = f"{response_time_ms:.2f}ms"
+            elif message["type"] == "http.response.body" and self.log_body and len(response_body) < 1000:
+                response_body.extend(message.get("body", b"")[: 1000 - len(response_body)])
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
-            
-            # Calculate response time
-            process_time = time.time() - start_time
-            response_time_ms = process_time * 1000
-            
-            # Add response headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Response-Time"] = f"{response_time_ms:.2f}ms"
-            
-            # Log response
-            if self.log_responses:
-                await self._log_response(request, response, request_id, response_time_ms)
-            
-            # Log performance warning if slow
-            if response_time_ms > self.performance_threshold_ms:
-                logger.warning(
-                    f"Slow request detected",
-                    extra={
-                        "request_id": request_id,
-                        "method": request.method,
-                        "url": str(request.url),
-                        "response_time_ms": response_time_ms,
-                        "status_code": response.status_code,
-                        "app": "test_advanced",
-                        "model": "TestAdvanced"
-                    }
-                )
-            
-            return response
+            await self.app(scope, receive, send_wrapper)
             
         except Exception as e:
             # Calculate response time for errors
@@ -148,13 +143,41 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
             # Re-raise the exception
             raise
 
-    async def _log_request(self, request: Request, request_id: str) -> None:
+        if response_start is None:
+            return
+
+        status_code = response_start["status"]
+
+        # Log response
+        if self.log_responses:
+            await self._log_response(request, response_start, bytes(response_body), request_id, response_time_ms)
+        
+        # Log performance warning if slow
+        if response_time_ms > self.performance_threshold_ms:
+            logger.warning(
+                f"Slow request detected",
+                extra={
+                    "request_id": request_id,
+                    "method": request.method,
+                    "url": str(request.url),
+                    "response_time_ms": response_time_ms,
+                    "status_code": status_code,
+                    "app": "test_advanced",
+                    "model": "TestAdvanced"
+                }
+            )
+
+    async def _log_request(self, request: Request, request_id: str, receive: Receive) -> Receive:
         """
         Log incoming request details.
         
         Args:
             request: HTTP request object
             request_id: Unique request identifier
+            receive: ASGI receive channel
+            
+        Returns:
+            Receive channel for the application (replays the body if it was read)
         """
         # Get client information
         client_ip = self._get_client_ip(request)
@@ -167,6 +190,7 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
                 body = await request.body()
                 if body:
                     request_body = body.decode("utf-8")[:1000]  # Limit body size
+                receive = self._replay_body(body, receive)
             except Exception:
                 request_body = "<unable to read body>"
         
@@ -188,11 +212,36 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
                 "event_type": "request_start"
             }
         )
+        return receive
+
+    @staticmethod
+    def _replay_body(body: bytes, receive: Receive) -> Receive:
+        """
+        Build a receive channel that returns an already read body once.
+        
+        Args:
+            body: Request body read by the middleware
+            receive: Original ASGI receive channel
+            
+        Returns:
+            Receive channel for the application
+        """
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
 
     async def _log_response(
         self, 
         request: Request, 
-        response: Response, 
+        response_start: Message, 
+        body: bytes, 
         request_id: str, 
         response_time_ms: float
     ) -> None:
@@ -201,38 +250,40 @@ class TestAdvancedLoggingMiddleware(BaseHTTPMiddleware):
         
         Args:
             request: HTTP request object
-            response: HTTP response object
+            response_start: ASGI ``http.response.start`` message
+            body: First bytes of the response body (when body logging is enabled)
             request_id: Unique request identifier
             response_time_ms: Response time in milliseconds
         """
+        status_code = response_start["status"]
+
         # Get response body if enabled
         response_body = None
-        if self.log_body and hasattr(response, 'body'):
+        if self.log_body and body:
             try:
-                if response.body:
-                    response_body = response.body.decode("utf-8")[:1000]  # Limit body size
+                response_body = body.decode("utf-8")[:1000]  # Limit body size
             except Exception:
                 response_body = "<unable to read body>"
         
         # Determine log level based on status code
         log_level = "info"
-        if response.status_code >= 400:
+        if status_code >= 400:
             log_level = "warning"
-        if response.status_code >= 500:
+        if status_code >= 500:
             log_level = "error"
         
         # Log response
         log_method = getattr(logger, log_level)
         log_method(
-            f"Response: {response.status_code} for {request.method} {request.url.path}",
+            f"Response: {status_code} for {request.method} {request.url.path}",
             extra={
                 "request_id": request_id,
                 "method": request.method,
                 "url": str(request.url),
                 "path": request.url.path,
-                "status_code": response.status_code,
+                "status_code": status_code,
                 "response_time_ms": response_time_ms,
-                "response_headers": dict(response.headers),
+                "response_headers": dict(MutableHeaders(scope=response_start)),
                 "response_body": response_body,
                 "app": "test_advanced",
                 "model": "TestAdvanced",
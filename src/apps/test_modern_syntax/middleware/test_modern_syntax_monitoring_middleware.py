@@ -7,53 +7,56 @@ Features: Basic monitoring, Performance tracking, Request correlation
 
 import time
 import uuid
-from typing import Callable
 import logging
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-# Basic metrics (no external dependencies for Advanced level)
+# Basic metrics (core metrics registry, served at /metrics)
 try:
-    from prometheus_client import Counter, Histogram, Gauge
+    from core.metrics import REGISTRY, Counter, Histogram, Gauge
     METRICS_AVAILABLE = True
 except ImportError:
     METRICS_AVAILABLE = False
-    logging.warning("Prometheus client not available - basic monitoring only")
+    logging.warning("Core metrics registry not available - basic monitoring only")
 
 logger = logging.getLogger("monitoring.test_modern_syntax")
 
-# Basic metrics if prometheus available
+# Request metrics are shared by all generated apps (label "app")
 if METRICS_AVAILABLE:
-    REQUEST_COUNT = Counter(
+    REQUEST_COUNT = REGISTRY.get('fastapi_requests_total') or Counter(
         'fastapi_requests_total',
         'Total number of requests',
-        ['app', 'method', 'endpoint', 'status_code']
+        ['app', 'method', 'endpoint', 'status_code'],
+        registry=REGISTRY
     )
     
-    REQUEST_DURATION = Histogram(
+    REQUEST_DURATION = REGISTRY.get('fastapi_request_duration_seconds') or Histogram(
         'fastapi_request_duration_seconds',
         'Request duration in seconds',
-        ['app', 'method', 'endpoint']
+        ['app', 'method', 'endpoint'],
+        registry=REGISTRY
     )
     
-    ACTIVE_REQUESTS = Gauge(
+    ACTIVE_REQUESTS = REGISTRY.get('fastapi_active_requests') or Gauge(
         'fastapi_active_requests',
         'Number of active requests',
-        ['app', 'method', 'endpoint']
+        ['app', 'method', 'endpoint'],
+        registry=REGISTRY
     )
 
 
-class TestModernSyntaxMonitoringMiddleware(BaseHTTPMiddleware):
+class TestModernSyntaxMonitoringMiddleware:
     """
     Advanced monitoring middleware for TestModernSyntax operations.
     
     Features:
     - Request correlation with unique IDs
     - Performance monitoring and timing
-    - Basic metrics collection (if prometheus available)
+    - Request metrics in the core registry (exposed at /metrics)
     - Structured logging
     - Slow request detection
+    - Pure ASGI: streaming responses are passed through unchanged
     
     Example:
         >>> from fastapi import FastAPI
@@ -65,7 +68,7 @@ class TestModernSyntaxMonitoringMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         app_name: str = "test_modern_syntax",
         slow_request_threshold: float = 1.0,
         enable_metrics: bool = True
@@ -77,22 +80,26 @@ class TestModernSyntaxMonitoringMiddleware(BaseHTTPMiddleware):
             app: FastAPI application instance
             app_name: Application name for logging
             slow_request_threshold: Threshold for slow request warnings (seconds)
-            enable_metrics: Enable prometheus metrics collection
+            enable_metrics: Enable metrics collection
         """
-        super().__init__(app)
+        self.app = app
         self.app_name = app_name
         self.slow_request_threshold = slow_request_threshold
         self.enable_metrics = enable_metrics and METRICS_AVAILABLE
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request through monitoring middleware."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate correlation ID
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
         
         # Extract request info
-        method = request.method
-        path = request.url.path
+        method = scope["method"]
+        path = scope["path"]
         endpoint = self._normalize_endpoint(path)
         
         # Start timing
@@ -106,30 +113,26 @@ class TestModernSyntaxMonitoringMiddleware(BaseHTTPMiddleware):
                 endpoint=endpoint
             ).inc()
         
+        response_time = 0.0
+        status_code: int | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_time, status_code
+            if message["type"] == "http.response.start":
+                # Calculate response time
+                response_time = time.time() - start_time
+                status_code = message["status"]
+
+                # Add headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Response-Time"] = f"{response_time:.3f}s"
+                headers["X-App-Name"] = self.app_name
+            await send(message)
+
         try:
             # Process request
-            response = await call_next(request)
-            
-            # Calculate response time
-            response_time = time.time() - start_time
-            
-            # Add headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Response-Time"] = f"{response_time:.3f}s"
-            response.headers["X-App-Name"] = self.app_name
-            
-            # Record metrics
-            if self.enable_metrics:
-                self._record_metrics(method, endpoint, response.status_code, response_time)
-            
-            # Check for slow requests
-            if response_time > self.slow_request_threshold:
-                self._log_slow_request(request_id, method, endpoint, response_time)
-            
-            # Log successful request
-            self._log_request(request_id, method, endpoint, response.status_code, response_time)
-            
-            return response
+            await self.app(scope, receive, send_wrapper)
             
         except Exception as e:
             # Calculate error response time
@@ -160,6 +163,20 @@ class TestModernSyntaxMonitoringMiddleware(BaseHTTPMiddleware):
                     endpoint=endpoint
                 ).dec()
 
+        if status_code is None:
+            return
+
+        # Record metrics
+        if self.enable_metrics:
+            self._record_metrics(method, endpoint, status_code, response_time)
+        
+        # Check for slow requests
+        if response_time > self.slow_request_threshold:
+            self._log_slow_request(request_id, method, endpoint, response_time)
+        
+        # Log successful request
+        self._log_request(request_id, method, endpoint, status_code, response_time)
+
     def _normalize_endpoint(self, path: str) -> str:
         """Normalize endpoint path for metrics."""
         import re
@@ -172,7 +189,7 @@ class TestModernSyntaxMonitoringMiddleware(BaseHTTPMiddleware):
         return endpoint
 
     def _record_metrics(self, method: str, endpoint: str, status_code: int, response_time: float):
-        """Record prometheus metrics."""
+        """Record request metrics."""
         try:
             REQUEST_COUNT.labels(
                 app=self.app_name,
@@ -14,7 +14,7 @@ import logging
 
 # Enterprise monitoring dependencies
 try:
-    from prometheus_client import CollectorRegistry, Counter, Histogram, Gauge, generate_latest
+    from core.metrics import Counter, Gauge, Histogram, MetricsRegistry
     from opentelemetry import trace
     from opentelemetry.trace import Status, StatusCode
     MONITORING_AVAILABLE = True
@@ -83,9 +83,9 @@ class TestModernSyntaxMonitoringService:
             "disk_usage_max": 0.90         # 90% disk usage
         }
         
-        # Prometheus metrics registry
+        # Service metrics registry (Prometheus text format)
         if MONITORING_AVAILABLE:
-            self.registry = CollectorRegistry()
+            self.registry = MetricsRegistry()
             self._setup_metrics()
             
         # Tracing setup
@@ -234,9 +234,9 @@ class TestModernSyntaxMonitoringService:
         try:
             # Get current metric values
             return {
-                "registry_metrics": generate_latest(self.registry).decode('utf-8'),
-                "active_connections": self.active_connections._value._value,
-                "cache_hit_rate": self.cache_hit_rate._value._value,
+                "registry_metrics": self.registry.render(),
+                "active_connections": self.active_connections.value,
+                "cache_hit_rate": self.cache_hit_rate.value,
             }
         except Exception as e:
             logger.error(f"Failed to get Prometheus metrics: {e}")
@@ -5,118 +5,151 @@ Template Version: v1.0.0 (Complete)
 Features: Performance tracking, Resource monitoring, Optimization hints
 """
 
+import random
 import time
-import psutil
-from typing import Callable
+from typing import Any
 import logging
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.performance import LatencyHistogram, get_memory_sampler
 
 logger = logging.getLogger("performance.test_static_schemas")
 
 
-class TestStaticSchemaPerformanceMiddleware(BaseHTTPMiddleware):
+class TestStaticSchemaPerformanceMiddleware:
     """
     Enterprise performance monitoring middleware.
-    
+
     Features:
-    - Request performance tracking
-    - Memory usage monitoring
-    - CPU utilization tracking
+    - Request latency recorded into fixed-bucket histograms per route
+    - Memory usage sampled in the background, not per request
+    - Detailed logs only for sampled and slow requests
     - Resource optimization alerts
     """
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         app_name: str = "test_static_schemas",
         memory_threshold: float = 0.85,  # 85% memory usage alert
-        response_time_threshold: float = 5.0  # 5 seconds slow request
+        response_time_threshold: float = 5.0,  # 5 seconds slow request
+        sample_rate: float = 0.01,  # 1% of requests logged in detail
+        memory_sample_interval: float = 10.0  # Seconds between memory samples
     ):
         """Initialize performance middleware."""
-        super().__init__(app)
+        self.app = app
         self.app_name = app_name
         self.memory_threshold = memory_threshold
         self.response_time_threshold = response_time_threshold
+        self.sample_rate = sample_rate
+        self.memory_sampler = get_memory_sampler(memory_sample_interval, memory_threshold)
+        self.histograms: dict[str, LatencyHistogram] = {}
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request with performance monitoring."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.memory_sampler.ensure_started()
+
         # Start performance tracking
-        start_time = time.time()
-        start_memory = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-        
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+                # Add performance headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Performance-Time"] = f"{time.perf_counter() - start_time:.3f}s"
+                headers["X-Memory-Usage"] = f"{self.memory_sampler.rss_mb:.1f}MB"
+            await send(message)
+
         try:
             # Process request
-            response = await call_next(request)
-            
-            # Calculate performance metrics
-            response_time = time.time() - start_time
-            end_memory = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-            memory_diff = end_memory - start_memory
-            
-            # Add performance headers
-            response.headers["X-Performance-Time"] = f"{response_time:.3f}s"
-            response.headers["X-Memory-Usage"] = f"{end_memory:.1f}MB"
-            response.headers["X-Memory-Delta"] = f"{memory_diff:+.1f}MB"
-            
-            # Log performance metrics
-            self._log_performance(request, response_time, end_memory, memory_diff)
-            
-            # Check for performance issues
-            self._check_performance_alerts(request, response_time, end_memory)
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
+
         except Exception as e:
             # Log performance on error
-            error_time = time.time() - start_time
+            error_time = time.perf_counter() - start_time
+            self._observe(scope, error_time)
             logger.error(
                 f"Request error with performance impact: {error_time:.3f}s",
                 extra={
-                    "path": request.url.path,
-                    "method": request.method,
+                    "path": scope["path"],
+                    "method": scope["method"],
                     "error": str(e),
                     "response_time": error_time
                 }
             )
             raise
 
-    def _log_performance(self, request: Request, response_time: float, memory_mb: float, memory_delta: float):
-        """Log performance metrics."""
+        response_time = time.perf_counter() - start_time
+        route = self._observe(scope, response_time)
+
+        # Detailed logs only for slow and sampled requests
+        if response_time > self.response_time_threshold:
+            self._log_slow_request(scope, route, status_code, response_time)
+        elif self.sample_rate and random.random() < self.sample_rate:
+            self._log_performance(scope, route, status_code, response_time)
+
+    def _observe(self, scope: Scope, response_time: float) -> str:
+        """Record request latency into the histogram of its route."""
+        # Route template is set by the router: one histogram per route, not per URL
+        route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+        key = f"{scope['method']} {route}"
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.observe(response_time)
+        return route
+
+    def _log_performance(self, scope: Scope, route: str, status_code: int, response_time: float):
+        """Log performance metrics of a sampled request."""
         logger.info(
-            f"Performance: {request.method} {request.url.path}",
+            f"Performance: {scope['method']} {scope['path']}",
             extra={
-                "method": request.method,
-                "path": request.url.path,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route,
+                "status_code": status_code,
                 "response_time": response_time,
-                "memory_usage": memory_mb,
-                "memory_delta": memory_delta,
+                "memory_usage": self.memory_sampler.rss_mb,
+                "sampled": True,
                 "app": self.app_name
             }
         )
 
-    def _check_performance_alerts(self, request: Request, response_time: float, memory_mb: float):
-        """Check for performance alerts."""
-        # Slow request alert
-        if response_time > self.response_time_threshold:
-            logger.warning(
-                f"Slow request detected: {request.method} {request.url.path}",
-                extra={
-                    "response_time": response_time,
-                    "threshold": self.response_time_threshold,
-                    "alert_type": "slow_request"
-                }
-            )
-        
-        # Memory usage alert
-        memory_percent = psutil.virtual_memory().percent / 100
-        if memory_percent > self.memory_threshold:
-            logger.warning(
-                f"High memory usage: {memory_percent:.1%}",
-                extra={
-                    "memory_percent": memory_percent,
-                    "threshold": self.memory_threshold,
-                    "alert_type": "high_memory"
-                }
-            ) 
\ No newline at end of file
+    def _log_slow_request(self, scope: Scope, route: str, status_code: int, response_time: float):
+        """Log slow request alert."""
+        logger.warning(
+            f"Slow request detected: {scope['method']} {scope['path']}",
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route,
+                "status_code": status_code,
+                "response_time": response_time,
+                "threshold": self.response_time_threshold,
+                "memory_usage": self.memory_sampler.rss_mb,
+                "alert_type": "slow_request",
+                "app": self.app_name
+            }
+        )
+
+    def get_performance_stats(self) -> dict[str, Any]:
+        """Latency histograms per route and the latest memory sample."""
+        return {
+            "app": self.app_name,
+            "routes": {key: histogram.snapshot() for key, histogram in self.histograms.items()},
+            "memory": {
+                "rss_mb": self.memory_sampler.rss_mb,
+                "memory_percent": self.memory_sampler.memory_percent,
+                "samples": self.memory_sampler.samples,
+            },
+        }
\ No newline at end of file
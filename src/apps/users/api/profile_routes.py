@@ -15,7 +15,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Query, status
 
 from apps.auth.depends.base import CurrentActiveUserDep, get_current_active_user
-from apps.users.depends import ProfileFromPathDep, ProfileServiceDep, UserFromPathDep
+from apps.users.depends import ProfileFromPathDep, ProfileReadServiceDep, ProfileServiceDep, UserFromPathDep
 from apps.users.exceptions import (
     ProfileAccessDeniedAPIException,
     ProfileNotFoundAPIException,
@@ -31,7 +31,7 @@ router = APIRouter(prefix="/profiles", tags=["User Profiles"])
 
 @router.get("/", response_model=ProfilesListResponse)
 async def get_public_profiles(
-    profile_service: ProfileServiceDep,
+    profile_service: ProfileReadServiceDep,
     # Pagination
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=20, ge=1, le=100, description="Page size"),
@@ -87,8 +87,13 @@ async def get_public_profiles(
     # Вычисляем offset для пагинации
     offset = (page - 1) * size
 
-    # Получаем список публичных профилей
-    profiles = await profile_service.search_public_profiles(query=search, location=location, limit=size, offset=offset)
+    # Получаем список публичных профилей; без поиска - проекция колонок без ORM объектов
+    if search is None and location is None:
+        profiles = await profile_service.list_public_profiles(limit=size, offset=offset)
+    else:
+        profiles = await profile_service.search_public_profiles(
+            query=search, location=location, limit=size, offset=offset
+        )
 
     # Формируем ответ с правильными полями
     total = len(profiles)  # Упрощенно - реальный count нужен из repo
@@ -452,7 +457,7 @@ async def make_profile_private(
 
 @router.get("/search", response_model=ProfilesListResponse)
 async def search_profiles(
-    profile_service: ProfileServiceDep,
+    profile_service: ProfileReadServiceDep,
     # Search parameters
     q: str = Query(..., min_length=2, description="Search query"),
     # Pagination
@@ -22,7 +22,7 @@ from apps.auth.depends.base import (
     get_current_active_user,
     require_role,
 )
-from apps.users.depends import RequireVerifiedDep, UserFromPathDep, UserServiceDep
+from apps.users.depends import RequireVerifiedDep, UserFromPathDep, UserReadServiceDep, UserServiceDep
 from apps.users.exceptions import (
     UserCreationAPIException,
     UserNotFoundAPIException,
@@ -49,7 +49,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 @router.get("/", response_model=UsersListResponse)
 async def get_users_list(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    user_service: UserServiceDep,
+    user_service: UserReadServiceDep,
     # Pagination
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=20, ge=1, le=100, description="Page size"),
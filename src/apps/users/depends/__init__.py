@@ -2,8 +2,26 @@
 Dependencies для пользователей.
 """
 
-from .repositories import ProfileRepoDep, UserRepoDep, get_profile_repo, get_user_repo
-from .services import ProfileServiceDep, UserServiceDep, get_profile_service, get_user_service
+from .repositories import (
+    ProfileReadRepoDep,
+    ProfileRepoDep,
+    UserReadRepoDep,
+    UserRepoDep,
+    get_profile_read_repo,
+    get_profile_repo,
+    get_user_read_repo,
+    get_user_repo,
+)
+from .services import (
+    ProfileReadServiceDep,
+    ProfileServiceDep,
+    UserReadServiceDep,
+    UserServiceDep,
+    get_profile_read_service,
+    get_profile_service,
+    get_user_read_service,
+    get_user_service,
+)
 from .users import (  # Type aliases
     ProfileFromPath,
     ProfileFromPathDep,
@@ -26,6 +44,10 @@ __all__ = [
     "get_profile_service",
     "UserServiceDep",
     "ProfileServiceDep",
+    "get_user_read_service",
+    "get_profile_read_service",
+    "UserReadServiceDep",
+    "ProfileReadServiceDep",
     "get_user_by_id",
     "get_profile_by_user_id",
     "verify_user_access",
@@ -8,10 +8,11 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.users.repo import ProfileRepository, UserRepository
-from core.database import get_db
+from core.database import get_db, get_read_db
 
 # Type alias
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+ReadDbSession = Annotated[AsyncSession, Depends(get_read_db)]
 
 
 async def get_user_repo(db: DbSession) -> UserRepository:
@@ -34,6 +35,28 @@ async def get_profile_repo(db: DbSession) -> ProfileRepository:
     return ProfileRepository(db)
 
 
+async def get_user_read_repo(db: ReadDbSession) -> UserRepository:
+    """
+    Получить репозиторий пользователей для чтения с реплик.
+
+    :param db: Сессия с маршрутизацией SELECT на реплики
+    :return: Экземпляр UserRepository
+    """
+    return UserRepository(db)
+
+
+async def get_profile_read_repo(db: ReadDbSession) -> ProfileRepository:
+    """
+    Получить репозиторий профилей для чтения с реплик.
+
+    :param db: Сессия с маршрутизацией SELECT на реплики
+    :return: Экземпляр ProfileRepository
+    """
+    return ProfileRepository(db)
+
+
 # Type aliases для использования в зависимостях
 UserRepoDep = Annotated[UserRepository, Depends(get_user_repo)]
 ProfileRepoDep = Annotated[ProfileRepository, Depends(get_profile_repo)]
+UserReadRepoDep = Annotated[UserRepository, Depends(get_user_read_repo)]
+ProfileReadRepoDep = Annotated[ProfileRepository, Depends(get_profile_read_repo)]
@@ -6,7 +6,7 @@ from typing import Annotated
 
 from fastapi import Depends
 
-from apps.users.depends.repositories import ProfileRepoDep, UserRepoDep
+from apps.users.depends.repositories import ProfileReadRepoDep, ProfileRepoDep, UserReadRepoDep, UserRepoDep
 from apps.users.services.profile_service import ProfileService
 from apps.users.services.user_service import UserService
 
@@ -37,6 +37,34 @@ async def get_profile_service(
     return ProfileService(profile_repo)
 
 
+async def get_user_read_service(
+    user_repo: UserReadRepoDep,
+    profile_repo: ProfileReadRepoDep,
+) -> UserService:
+    """
+    Получить сервис пользователей для тяжелых чтений (списки, поиск, статистика) с реплик.
+
+    :param user_repo: Репозиторий пользователей на сессии чтения
+    :param profile_repo: Репозиторий профилей на сессии чтения
+    :return: Экземпляр UserService
+    """
+    return UserService(user_repo, profile_repo)
+
+
+async def get_profile_read_service(
+    profile_repo: ProfileReadRepoDep,
+) -> ProfileService:
+    """
+    Получить сервис профилей для тяжелых чтений с реплик.
+
+    :param profile_repo: Репозиторий профилей на сессии чтения
+    :return: Экземпляр ProfileService
+    """
+    return ProfileService(profile_repo)
+
+
 # Type aliases для использования в роутах
 UserServiceDep = Annotated[UserService, Depends(get_user_service)]
 ProfileServiceDep = Annotated[ProfileService, Depends(get_profile_service)]
+UserReadServiceDep = Annotated[UserService, Depends(get_user_read_service)]
+ProfileReadServiceDep = Annotated[ProfileService, Depends(get_profile_read_service)]
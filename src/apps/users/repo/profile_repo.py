@@ -6,12 +6,12 @@ import uuid
 from collections.abc import Sequence
 from typing import Any
 
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
 from apps.users.models.enums import NotificationLevel, UserLanguage, UserTheme
 from apps.users.models.user_models import UserProfile
+from core.base.repo import LoadProfile
 from core.base.repo.repository import BaseRepository
 
 
@@ -23,6 +23,8 @@ class ProfileRepository(BaseRepository[UserProfile, Any, Any]):
     для работы с профилями: поиск по пользователю, настройки уведомлений.
     """
 
+    load_profiles = {"with_user": LoadProfile("user")}
+
     def __init__(self, db: AsyncSession):
         super().__init__(UserProfile, db)
 
@@ -42,14 +44,7 @@ class ProfileRepository(BaseRepository[UserProfile, Any, Any]):
         :param user_id: ID пользователя
         :return: Профиль с загруженным пользователем или None
         """
-        query = (
-            select(UserProfile)
-            .options(joinedload(UserProfile.user))
-            .where(and_(UserProfile.user_id == user_id, UserProfile.deleted_at.is_(None)))
-        )
-
-        result = await self._db.execute(query)
-        return result.scalar_one_or_none()
+        return await self.get_by(user_id=user_id, load_profile="with_user")
 
     async def profile_exists(self, user_id: uuid.UUID) -> bool:
         """
@@ -7,13 +7,12 @@ from collections.abc import Sequence
 from datetime import datetime, timedelta
 from typing import Any
 
-from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
 
 from apps.users.models.enums import UserRole, UserStatus
 from apps.users.models.user_models import User
 from apps.users.schemas.user_schemas import UserCreate, UserUpdate
+from core.base.repo import LoadProfile
 from core.base.repo.repository import BaseRepository
 
 
@@ -26,6 +25,11 @@ class UserRepository(BaseRepository[User, Any, Any]):
     статистика, управление ролями и статусами.
     """
 
+    load_profiles = {
+        "with_profile": LoadProfile("profile"),
+        "with_tokens_and_sessions": LoadProfile("refresh_tokens", "sessions"),
+    }
+
     def __init__(self, db: AsyncSession):
         super().__init__(User, db)
 
@@ -102,12 +106,7 @@ class UserRepository(BaseRepository[User, Any, Any]):
         :param user_id: ID пользователя
         :return: Пользователь с загруженным профилем или None
         """
-        query = (
-            select(User).options(joinedload(User.profile)).where(and_(User.id == user_id, User.deleted_at.is_(None)))
-        )
-
-        result = await self._db.execute(query)
-        return result.scalar_one_or_none()
+        return await self.get(user_id, load_profile="with_profile")
 
     async def get_with_tokens_and_sessions(self, user_id: uuid.UUID) -> User | None:
         """
@@ -116,14 +115,7 @@ class UserRepository(BaseRepository[User, Any, Any]):
         :param user_id: ID пользователя
         :return: Пользователь с загруженными токенами и сессиями или None
         """
-        query = (
-            select(User)
-            .options(selectinload(User.refresh_tokens), selectinload(User.sessions))
-            .where(and_(User.id == user_id, User.deleted_at.is_(None)))
-        )
-
-        result = await self._db.execute(query)
-        return result.scalar_one_or_none()
+        return await self.get(user_id, load_profile="with_tokens_and_sessions")
 
     async def list_by_role(
         self, role: UserRole, *, offset: int | None = None, limit: int | None = None, include_deleted: bool = False
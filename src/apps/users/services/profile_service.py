@@ -4,6 +4,7 @@
 
 import logging
 import uuid
+from collections.abc import Sequence
 from datetime import date
 from typing import Any
 
@@ -13,7 +14,7 @@ from apps.users.exceptions import ProfileAlreadyExistsError
 from apps.users.models.enums import NotificationLevel, UserLanguage, UserTheme
 from apps.users.models.user_models import UserProfile
 from apps.users.repo.profile_repo import ProfileRepository
-from apps.users.schemas.profile_schemas import ProfileCreate, ProfileUpdate
+from apps.users.schemas.profile_schemas import ProfileCreate, ProfileResponse, ProfileUpdate
 
 logger = logging.getLogger("users.profile_service")
 
@@ -285,6 +286,22 @@ class ProfileService:
             logger.error(f"Error searching public profiles: {e}")
             return []
 
+    async def list_public_profiles(self, limit: int = 50, offset: int = 0) -> Sequence[Any]:
+        """
+        Список публичных профилей: только колонки ProfileResponse, без ORM объектов.
+
+        :param limit: Лимит результатов
+        :param offset: Смещение
+        :return: Строки, валидируемые в ProfileResponse
+        """
+        try:
+            return await self._profile_repo.list_columns(
+                ProfileResponse, {"public_profile": True}, limit=limit, offset=offset
+            )
+        except Exception as e:
+            logger.error(f"Error listing public profiles: {e}")
+            return []
+
     async def get_profile_stats(self) -> dict[str, Any]:
         """
         Получить статистику профилей.
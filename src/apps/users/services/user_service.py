@@ -126,12 +126,13 @@ class UserService:
         }
 
         try:
-            # Создаем пользователя
-            user = await self._user_repo.create(create_data)
+            # Пользователь и профиль - одной транзакцией, один коммит
+            async with self._user_repo.unit_of_work():
+                user = await self._user_repo.create(create_data)
 
-            # Создаем профиль если нужно
-            if create_profile:
-                await self._create_default_profile(user)
+                # Создаем профиль если нужно
+                if create_profile:
+                    await self._create_default_profile(user)
 
             logger.info(f"User created successfully: {user.id}")
 
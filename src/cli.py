@@ -6,7 +6,7 @@ running tests, and getting configuration information.
 
 Commands available:
     - worker: Start TaskIQ workers for processing background tasks
-    - scheduler: Future functionality for scheduled tasks
+    - scheduler: Send periodic jobs to the broker on schedule
     - test: Test TaskIQ broker connection and available tasks
     - info: Display current TaskIQ configuration
 
@@ -15,6 +15,10 @@ Example:
 
         python -m cli worker --workers 4 --reload
 
+    Start the periodic scheduler::
+
+        python -m cli scheduler
+
     Test connection::
 
         python -m cli test
@@ -162,22 +166,49 @@ def worker(
 
 
 @cli.command()
-def scheduler() -> None:
-    """Start task scheduler (future functionality).
+@click.option(
+    "--list",
+    "list_jobs",
+    is_flag=True,
+    help="Show periodic jobs and exit",
+    default=False,
+)
+def scheduler(list_jobs: bool) -> None:
+    """Start the periodic task scheduler.
 
-    This command will start a task scheduler for running tasks on schedule.
-    Currently not implemented but reserved for future use.
+    Sends periodic jobs declared with ``core.scheduler.periodic`` to the
+    broker on their cron or interval schedule. Jobs are executed by the
+    regular workers. Several scheduler nodes may run at once: a leader lock
+    lets only one of them send each run.
+
+    Args:
+        list_jobs (bool): Only print the registered jobs
 
     Example:
-        When implemented::
+        Start the scheduler::
 
             python -m cli scheduler
 
-    Note:
-        This functionality is planned for future releases.
-        For now, use cron jobs or similar for scheduled tasks.
+        Show jobs::
+
+            python -m cli scheduler --list
     """
-    click.echo("🕐 Task scheduler not yet implemented")
+    from taskiq.api import run_scheduler_task
+
+    from core.scheduler import create_scheduler, periodic_jobs
+
+    click.echo("🕐 Periodic jobs:")
+    for job in periodic_jobs.values():
+        schedule = f"cron '{job.cron}'" if job.cron else f"every {job.interval}s"
+        click.echo(f"  - {job.task_name}: {schedule}, jitter {job.jitter}s")
+
+    if list_jobs:
+        return
+
+    try:
+        asyncio.run(run_scheduler_task(create_scheduler(broker), run_startup=True))
+    except KeyboardInterrupt:
+        click.echo("\n🛑 Scheduler stopped by user")
 
 
 @cli.command()
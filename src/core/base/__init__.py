@@ -8,6 +8,7 @@ __all__ = [
     "BaseEvent",
     "BaseModel",
     "BaseRepository",
+    "BulkEvent",
     "CreateEvent",
     "DeleteEvent",
     "UpdateEvent",
@@ -15,4 +16,4 @@ __all__ = [
 
 from .repo import BaseRepository
 
-from .repo.events import BaseEvent, CreateEvent, DeleteEvent, UpdateEvent
+from .repo.events import BaseEvent, BulkEvent, CreateEvent, DeleteEvent, UpdateEvent
@@ -2,8 +2,17 @@
 Core repository system with modular mixins.
 """
 
-from .cache import CacheManager, cache_result, get_default_cache_manager, set_default_cache_manager
-from .events import CreateEvent, DeleteEvent, UpdateEvent
+from .cache import (
+    CacheManager,
+    cache_result,
+    entity_cache_key,
+    get_default_cache_manager,
+    set_default_cache_manager,
+)
+from .emitter import EventEmissionQueue, get_event_queue
+from .events import BulkEvent, CreateEvent, DeleteEvent, UpdateEvent
+from .load_profiles import LoadProfile
+from .outbox import MessagingOutboxSink, OutboxEvent, OutboxRelay, RealtimeOutboxSink, stage_event
 
 # Миксины
 from .mixins import AdvancedMixin, BaseCrudMixin, EnterpriseMixin, EventMixin
@@ -21,6 +30,7 @@ from .repository import (
     SimpleRepository,
 )
 from .types import AggregationResult, BulkOperationResult, CacheConfig, CacheStats, CursorPaginationResult
+from .uow import UnitOfWork, get_unit_of_work
 
 # Алиасы для удобства
 Repository = SimpleRepository  # для простых случаев
@@ -33,12 +43,26 @@ __all__ = [
     "BASIC_FILTER_OPERATORS",
     "CacheManager",
     "cache_result",
+    "entity_cache_key",
     "get_default_cache_manager",
     "set_default_cache_manager",
+    "LoadProfile",
     # События
     "CreateEvent",
     "UpdateEvent",
     "DeleteEvent",
+    "BulkEvent",
+    "EventEmissionQueue",
+    "get_event_queue",
+    # Outbox
+    "OutboxEvent",
+    "OutboxRelay",
+    "MessagingOutboxSink",
+    "RealtimeOutboxSink",
+    "stage_event",
+    # Unit of work
+    "UnitOfWork",
+    "get_unit_of_work",
     # Типы
     "AggregationResult",
     "CursorPaginationResult",
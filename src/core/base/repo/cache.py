@@ -8,8 +8,12 @@ import hashlib
 import json
 import logging
 import time
+import uuid
+from collections.abc import Iterable
 from functools import wraps
-from typing import Any
+from typing import Any, Literal
+
+from core.metrics import CACHE_HITS, CACHE_MISSES
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +73,13 @@ class SimpleMemoryCache:
 # Global memory cache instance
 _memory_cache = SimpleMemoryCache()
 
+# Query result generations per namespace for the memory layer (Redis uses INCR)
+_memory_generations: dict[str, int] = {}
+
+# Hit counters per cache layer
+_redis_hits = CACHE_HITS.labels("redis")
+_memory_hits = CACHE_HITS.labels("memory")
+
 
 class CacheManager:
     """Manages both Redis and memory caching."""
@@ -86,6 +97,8 @@ class CacheManager:
         self.use_memory = use_memory
         self.default_ttl = default_ttl
         self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
 
     async def get(self, key: str) -> Any | None:
         """Get value from cache (Redis first, then memory)."""
@@ -96,6 +109,8 @@ class CacheManager:
             try:
                 cached_data = await self.redis_client.get(full_key)
                 if cached_data:
+                    _redis_hits.inc()
+                    self.hits += 1
                     return json.loads(cached_data)
             except Exception as e:
                 logger.warning(f"Redis cache get error: {e}")
@@ -103,10 +118,16 @@ class CacheManager:
         # Fallback to memory cache
         if self.use_memory:
             try:
-                return await _memory_cache.get(full_key)
+                value = await _memory_cache.get(full_key)
+                if value is not None:
+                    _memory_hits.inc()
+                    self.hits += 1
+                    return value
             except Exception as e:
                 logger.warning(f"Memory cache get error: {e}")
 
+        CACHE_MISSES.inc()
+        self.misses += 1
         return None
 
     async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
@@ -146,6 +167,76 @@ class CacheManager:
             except Exception as e:
                 logger.warning(f"Memory cache delete error: {e}")
 
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        """Delete several keys (a single round trip to Redis)."""
+        full_keys = [f"{self.key_prefix}{key}" for key in keys]
+        if not full_keys:
+            return
+
+        if self.use_redis and self.redis_client:
+            try:
+                await self.redis_client.delete(*full_keys)
+            except Exception as e:
+                logger.warning(f"Redis cache delete error: {e}")
+
+        if self.use_memory:
+            for full_key in full_keys:
+                await _memory_cache.delete(full_key)
+
+    async def get_generation(self, namespace: str) -> int:
+        """Get current generation of query results (list/count) for namespace."""
+        generation_key = f"{self.key_prefix}{namespace}:generation"
+
+        if self.use_redis and self.redis_client:
+            try:
+                return int(await self.redis_client.get(generation_key) or 0)
+            except Exception as e:
+                logger.warning(f"Redis cache generation error: {e}")
+
+        return _memory_generations.get(generation_key, 0)
+
+    async def bump_generation(self, namespace: str) -> None:
+        """Invalidate all query results of namespace: their keys embed the generation."""
+        generation_key = f"{self.key_prefix}{namespace}:generation"
+
+        if self.use_redis and self.redis_client:
+            try:
+                await self.redis_client.incr(generation_key)
+            except Exception as e:
+                logger.warning(f"Redis cache generation error: {e}")
+
+        _memory_generations[generation_key] = _memory_generations.get(generation_key, 0) + 1
+
+    async def get_token(self, key: str, ttl: int | None = None) -> str:
+        """Get the version token stored under key, creating a random one if absent.
+
+        Cache keys that embed the token are invalidated by deleting the token
+        key (``delete``/``delete_many``), without a key scan. Tokens are random,
+        so an expired token only causes misses, never a stale hit.
+        """
+        full_key = f"{self.key_prefix}{key}"
+        token_ttl = ttl or self.default_ttl
+
+        if self.use_redis and self.redis_client:
+            try:
+                token = uuid.uuid4().hex
+                if await self.redis_client.set(full_key, token, ex=token_ttl, nx=True):
+                    return token
+                current = await self.redis_client.get(full_key)
+                if current:
+                    return current.decode() if isinstance(current, bytes) else current
+            except Exception as e:
+                logger.warning(f"Redis cache token error: {e}")
+
+        if self.use_memory:
+            token = await _memory_cache.get(full_key)
+            if token is None:
+                token = uuid.uuid4().hex
+                await _memory_cache.set(full_key, token, token_ttl)
+            return token
+
+        return uuid.uuid4().hex
+
     async def clear_pattern(self, pattern: str) -> None:
         """Clear cache by pattern."""
         full_pattern = f"{self.key_prefix}{pattern}"
@@ -170,9 +261,13 @@ class CacheManager:
 
     async def get_stats(self) -> dict[str, Any]:
         """Get cache statistics."""
+        lookups = self.hits + self.misses
         stats = {
             "redis_enabled": self.use_redis,
             "memory_enabled": self.use_memory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
         }
 
         # Redis stats
@@ -193,11 +288,34 @@ class CacheManager:
         return stats
 
 
-def cache_result(ttl: int = 300):
+def entity_cache_key(namespace: str, entity_id: Any) -> str:
+    """Key of the version token of a single entity (see ``CacheManager.get_token``)."""
+    return f"{namespace}:entity:{entity_id}"
+
+
+def _args_digest(args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    cache_data = {
+        "args": args,
+        "kwargs": {
+            k: v for k, v in kwargs.items() if isinstance(v, (str, int, float, bool, type(None), dict, list, tuple))
+        },
+    }
+    return hashlib.md5(json.dumps(cache_data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def cache_result(ttl: int = 300, *, scope: Literal["query", "entity"] = "query"):
     """
     Decorator for caching query results.
 
+    ``scope="query"`` (list/count style results) embeds the model generation
+    into the key, so ``bump_generation`` drops all of them without a key scan.
+    ``scope="entity"`` caches a result about one entity (id is the first
+    argument). The key embeds the entity's version token, so deleting
+    ``entity_cache_key(model, id)`` drops the results of every method for
+    that entity.
+
     :param ttl: Time-to-live for cache entry in seconds
+    :param scope: Cache key scope - "query" or "entity"
     """
 
     def decorator(func):
@@ -210,13 +328,20 @@ def cache_result(ttl: int = 300):
             func_name = func.__name__
             model_name = self._model.__name__ if hasattr(self, "_model") else "unknown"
 
-            # Create a cache key from arguments
-            cache_data = {
-                "args": args,
-                "kwargs": {k: v for k, v in kwargs.items() if isinstance(v, (str, int, float, bool, type(None)))},
-            }
-
-            cache_key = f"{model_name}:{func_name}:{hashlib.md5(json.dumps(cache_data, sort_keys=True, default=str).encode()).hexdigest()}"
+            if scope == "entity":
+                if args:
+                    entity_id, rest_args, rest_kwargs = args[0], args[1:], kwargs
+                else:
+                    entity_id, rest_args = kwargs.get("id"), ()
+                    rest_kwargs = {k: v for k, v in kwargs.items() if k != "id"}
+                entity_key = entity_cache_key(model_name, entity_id)
+                token = await self._cache_manager.get_token(entity_key, ttl)
+                cache_key = f"{entity_key}:{token}:{func_name}:{_args_digest(rest_args, rest_kwargs)}"
+            else:
+                # Create a cache key from arguments
+                digest = _args_digest(args, kwargs)
+                generation = await self._cache_manager.get_generation(model_name)
+                cache_key = f"{model_name}:{func_name}:g{generation}:{digest}"
 
             # Try to get from cache
             cached_result = await self._cache_manager.get(cache_key)
@@ -0,0 +1,107 @@
+"""
+Асинхронная очередь эмиссии событий.
+
+Эмиссия события (span трассировки + лог) выполняется фоновой задачей, а не на
+пути запроса: репозиторий только кладет событие в очередь. Если очередь
+переполнена, событие эмитится сразу - события не теряются, а нагрузка
+переносится на вызывающего (backpressure).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from .events import BaseEvent
+
+logger = logging.getLogger(__name__)
+
+
+class EventEmissionQueue:
+    """
+    Очередь событий с фоновым обработчиком.
+
+    Обработчик запускается лениво при первом событии в текущем event loop.
+
+    :param maxsize: Максимальный размер очереди
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self.emitted = 0
+        self.inline = 0
+        self._queue: asyncio.Queue[BaseEvent] | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def pending(self) -> int:
+        """Событий в очереди."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, event: BaseEvent) -> None:
+        """
+        Поставить событие в очередь эмиссии.
+
+        Вне event loop событие эмитится сразу.
+
+        :param event: Событие
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._emit(event)
+            return
+
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(self.maxsize)
+            self._worker = loop.create_task(self._run(self._queue))
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.inline += 1
+            self._emit(event)
+
+    def _emit(self, event: BaseEvent) -> None:
+        try:
+            event.emit()
+            self.emitted += 1
+        except Exception as e:
+            logger.error(f"Failed to emit {event.event_type} event {event.id}: {e}")
+
+    async def _run(self, queue: asyncio.Queue[BaseEvent]) -> None:
+        while True:
+            event = await queue.get()
+            self._emit(event)
+            queue.task_done()
+
+    async def flush(self) -> None:
+        """Дождаться эмиссии всех событий в очереди."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Эмитить остаток очереди и остановить обработчик."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+
+# Глобальная очередь эмиссии
+_event_queue: EventEmissionQueue | None = None
+
+
+def get_event_queue() -> EventEmissionQueue:
+    """
+    Получить глобальную очередь эмиссии событий.
+
+    :return: Очередь эмиссии
+    """
+    global _event_queue
+    if _event_queue is None:
+        _event_queue = EventEmissionQueue()
+    return _event_queue
@@ -4,8 +4,10 @@
 
 from __future__ import annotations
 
+import logging
 import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
 from datetime import datetime
 from typing import Any, Generic, TypeVar
 
@@ -15,6 +17,10 @@ from pytz import utc
 
 # Получаем tracer для отслеживания событий
 tracer = trace.get_tracer(__name__)
+logger = logging.getLogger(__name__)
+
+# Поля, которые не попадают в компактный payload массовых событий
+BULK_EXCLUDED_FIELDS = frozenset({"created_at", "updated_at", "deleted_at"})
 
 T = TypeVar("T")
 
@@ -46,10 +52,13 @@ class BaseEvent(BaseModel, ABC, Generic[T]):
             span.set_attribute("event.type", self.event_type)
             span.set_attribute("event.entity_id", self.get_entity_id())
             span.set_attribute("event.source", self.source)
+            self._annotate_span(span)
+
+            # Доставка в брокер - через transactional outbox (см. outbox.py)
+            logger.debug(f"Event emitted: {self.event_type} for entity {self.get_entity_id()}")
 
-            # Здесь можно добавить логику отправки события в очередь/брокер
-            # Пока просто логируем
-            print(f"Event emitted: {self.event_type} for entity {self.get_entity_id()}")
+    def _annotate_span(self, span: Any) -> None:
+        """Дополнительные атрибуты span события (для переопределения)."""
 
 
 class CreateEvent(BaseEvent[T]):
@@ -60,6 +69,8 @@ class CreateEvent(BaseEvent[T]):
 
     def get_entity_id(self) -> str:
         """Получить ID созданной сущности."""
+        if isinstance(self.entity_data, dict) and "id" in self.entity_data:
+            return str(self.entity_data["id"])
         if hasattr(self.entity_data, "id"):
             return str(getattr(self.entity_data, "id"))
         return "unknown"
@@ -102,3 +113,83 @@ class DeleteEvent(BaseEvent[T]):
     def get_payload(self) -> T:
         """Получить данные об удалении."""
         return {"entity_data": self.entity_data, "soft_delete": self.soft_delete}  # type: ignore[return-value]
+
+
+class BulkEvent(BaseEvent[list[dict[str, Any]]]):
+    """Событие массовой операции: один конверт на пачку сущностей.
+
+    Вместо события с полной ORM моделью на каждую строку содержит ID сущностей
+    и компактные payload (только колонки, без служебных timestamp полей).
+    Большие операции разбиваются на чанки ``chunk_index`` из ``chunk_count``.
+    """
+
+    event_type: str = Field(default="entity.bulk_created")
+    entity_type: str = Field(...)
+    entity_ids: list[str] = Field(default_factory=list)
+    items: list[dict[str, Any]] = Field(default_factory=list)
+    chunk_index: int = Field(default=0)
+    chunk_count: int = Field(default=1)
+
+    def get_entity_id(self) -> str:
+        """ID сущности для одиночной пачки, иначе "<тип>[<количество>]"."""
+        if len(self.entity_ids) == 1:
+            return self.entity_ids[0]
+        return f"{self.entity_type}[{len(self.entity_ids)}]"
+
+    def get_payload(self) -> list[dict[str, Any]]:
+        """Получить компактные данные сущностей пачки."""
+        return self.items
+
+    def _annotate_span(self, span: Any) -> None:
+        span.set_attribute("event.batch_size", len(self.entity_ids))
+        span.set_attribute("event.chunk", f"{self.chunk_index + 1}/{self.chunk_count}")
+
+    @classmethod
+    def from_objects(
+        cls,
+        objects: Sequence[Any],
+        *,
+        entity_type: str,
+        fields: Iterable[str] | None = None,
+        chunk_size: int = 500,
+        **kwargs: Any,
+    ) -> list[BulkEvent]:
+        """
+        Собрать события по чанкам из созданных объектов или словарей.
+
+        :param objects: ORM объекты или словари с данными сущностей
+        :param entity_type: Тип сущности (имя модели)
+        :param fields: Поля payload; по умолчанию все колонки, кроме timestamp полей
+        :param chunk_size: Максимум сущностей в одном событии
+        :param kwargs: Остальные поля события (event_type, source, metadata, ...)
+        :return: Список событий, по одному на чанк
+        """
+        if not objects:
+            return []
+
+        from sqlalchemy.inspection import inspect
+
+        selected = tuple(fields) if fields is not None else None
+
+        def compact(obj: Any) -> dict[str, Any]:
+            if isinstance(obj, dict):
+                data = obj
+            else:
+                data = {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+            if selected is not None:
+                return {key: data.get(key) for key in ("id", *selected)}
+            return {key: value for key, value in data.items() if key not in BULK_EXCLUDED_FIELDS}
+
+        items = [compact(obj) for obj in objects]
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+        return [
+            cls(
+                entity_type=entity_type,
+                entity_ids=[str(item.get("id")) for item in chunk],
+                items=chunk,
+                chunk_index=index,
+                chunk_count=len(chunks),
+                **kwargs,
+            )
+            for index, chunk in enumerate(chunks)
+        ]
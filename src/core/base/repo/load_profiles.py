@@ -0,0 +1,135 @@
+"""
+Профили загрузки связей - заранее скомпилированные loader options для запросов репозитория.
+
+Профиль перечисляет связи, которые нужны конкретному сценарию (карточка в
+списке, детальная страница), и компилируется в loader options один раз на
+модель. Стратегия выбирается по направлению связи:
+
+- many-to-one и one-to-one (скалярная связь) - ``joinedload``: одна строка
+  на объект, JOIN не размножает результат;
+- коллекции (one-to-many, many-to-many) - ``selectinload``: один
+  ``SELECT ... WHERE fk IN (...)`` на всю выборку вместо декартова произведения.
+
+Все неперечисленные связи (и на корне, и на загруженных связях) получают
+``raiseload("*", sql_only=True)``: случайная ленивая загрузка бросает
+исключение вместо молчаливого запроса на каждый объект (N+1). Связь, уже
+находящаяся в identity map, отдается без запроса и без ошибки.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Literal
+
+from sqlalchemy.orm import RelationshipProperty, joinedload, raiseload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+
+from core.exceptions import CoreRepositoryValueError
+
+LoadStrategy = Literal["auto", "joined", "selectin"]
+
+LOAD_STRATEGIES = {"joined": joinedload, "selectin": selectinload}
+
+
+class LoadProfile:
+    """
+    Набор связей для загрузки вместе с объектом.
+
+    :param relations: Пути связей через ``__`` (``"profile"``, ``"sessions__device"``)
+    :param raise_unlisted: Запретить ленивую загрузку неперечисленных связей
+    :param strategies: Явная стратегия для отдельных путей (``"joined"`` или ``"selectin"``)
+    :raises CoreRepositoryValueError: Неизвестная стратегия
+
+    Example:
+        ```python
+        class UserRepository(BaseRepository[User, Any, Any]):
+            load_profiles = {
+                "list_card": LoadProfile("profile"),
+                "detail": LoadProfile("profile", "sessions", strategies={"profile": "selectin"}),
+            }
+
+        users = await user_repo.list(limit=20, load_profile="list_card")
+        ```
+    """
+
+    __slots__ = ("relations", "raise_unlisted", "strategies", "_compiled", "_joined_collections")
+
+    def __init__(
+        self,
+        *relations: str,
+        raise_unlisted: bool = True,
+        strategies: Mapping[str, LoadStrategy] | None = None,
+    ) -> None:
+        self.relations = relations
+        self.raise_unlisted = raise_unlisted
+        self.strategies = dict(strategies or {})
+        for path, strategy in self.strategies.items():
+            if strategy != "auto" and strategy not in LOAD_STRATEGIES:
+                raise CoreRepositoryValueError("load_profile", path, strategy)
+        self._compiled: dict[type, tuple[ORMOption, ...]] = {}
+        self._joined_collections: set[type] = set()
+
+    def options(self, model: type) -> tuple[ORMOption, ...]:
+        """
+        Loader options профиля для модели (компилируются при первом вызове).
+
+        :param model: SQLAlchemy модель корня запроса
+        :return: Кортеж options для ``select(...).options(*options)``
+        :raises CoreRepositoryValueError: Путь не является связью модели
+        """
+        compiled = self._compiled.get(model)
+        if compiled is None:
+            tree: dict[str, Any] = {}
+            for path in (*self.relations, *self.strategies):
+                node = tree
+                for part in path.split("__"):
+                    node = node.setdefault(part, {})
+            compiled = tuple(self._compile(model, model, tree, ""))
+            if self.raise_unlisted:
+                compiled += (raiseload("*", sql_only=True),)
+            self._compiled[model] = compiled
+        return compiled
+
+    def requires_unique(self, model: type) -> bool:
+        """
+        Нужен ли ``Result.unique()``: ``joinedload`` коллекции повторяет строку корня на каждый элемент.
+
+        :param model: SQLAlchemy модель корня запроса
+        :return: True, если профиль загружает коллекцию через JOIN
+        """
+        self.options(model)
+        return model in self._joined_collections
+
+    def _compile(self, root: type, model: type, tree: dict[str, Any], prefix: str) -> list[ORMOption]:
+        loaders: list[ORMOption] = []
+        for name, children in tree.items():
+            path = f"{prefix}{name}"
+            attr = getattr(model, name, None)
+            prop = getattr(attr, "property", None)
+            if not isinstance(prop, RelationshipProperty):
+                raise CoreRepositoryValueError("load_profile", path, f"not a relationship of {model.__name__}")
+
+            strategy = self.strategies.get(path, "auto")
+            if strategy == "auto":
+                strategy = "selectin" if prop.uselist else "joined"
+            elif strategy == "joined" and prop.uselist:
+                self._joined_collections.add(root)
+            loader = LOAD_STRATEGIES[strategy](attr)
+
+            nested = self._compile(root, prop.mapper.class_, children, f"{path}__")
+            if self.raise_unlisted:
+                nested.append(raiseload("*", sql_only=True))
+            loaders.append(loader.options(*nested) if nested else loader)
+        return loaders
+
+
+def as_load_profile(profile: LoadProfile | Sequence[str]) -> LoadProfile:
+    """
+    Привести объявление профиля к ``LoadProfile``.
+
+    :param profile: ``LoadProfile`` или последовательность путей связей
+    :return: ``LoadProfile``
+    """
+    if isinstance(profile, LoadProfile):
+        return profile
+    return LoadProfile(*profile)
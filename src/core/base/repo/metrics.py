@@ -0,0 +1,47 @@
+"""
+Метрики репозиториев: длительность вызовов по модели и методу.
+"""
+
+from __future__ import annotations
+
+import inspect
+import time
+from functools import wraps
+from typing import Any, TypeVar
+
+from core.metrics import REPOSITORY_CALL_SECONDS, HistogramValue
+
+ClassType = TypeVar("ClassType", bound=type)
+
+
+def _timed(method_name: str, func: Any) -> Any:
+    # Гистограмма на модель кэшируется в замыкании: на вызов - поиск по классу модели
+    histograms: dict[type, HistogramValue] = {}
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            histogram = histograms.get(self._model)
+            if histogram is None:
+                histogram = histograms[self._model] = REPOSITORY_CALL_SECONDS.labels(self._model.__name__, method_name)
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def instrument_repository(cls: ClassType) -> ClassType:
+    """
+    Записывать длительность публичных async методов класса в ``repository_call_duration_seconds``.
+
+    Оборачиваются только методы, объявленные в самом классе.
+
+    :param cls: Класс репозитория или миксина
+    :return: Тот же класс
+    """
+    for name, attr in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(attr):
+            setattr(cls, name, _timed(name, attr))
+    return cls
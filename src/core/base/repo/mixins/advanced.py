@@ -16,6 +16,7 @@ from core.base.models import BaseModel as SQLAlchemyBaseModel
 from core.exceptions import CoreRepositoryValueError
 from tools.pydantic import BaseModel as PydanticBaseModel
 
+from ..metrics import instrument_repository
 from ..query_builder import QueryBuilder
 from ..types import AggregationResult, CursorPaginationResult
 
@@ -26,6 +27,7 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=PydanticBaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=PydanticBaseModel)
 
 
+@instrument_repository
 class AdvancedMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Продвинутый миксин для расширенных возможностей репозитория.
@@ -6,17 +6,21 @@ from __future__ import annotations
 
 import logging
 import uuid
-from collections.abc import Sequence
-from typing import Any, Generic, TypeVar
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, ClassVar, Generic, TypeVar
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import desc, func, insert, select, update
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.base.models import BaseModel as SQLAlchemyBaseModel
-from core.exceptions import CoreRepositoryValueError
+from core.exceptions import CoreRepositoryQueryError, CoreRepositoryValueError
 from tools.pydantic import BaseModel as PydanticBaseModel
 
+from ..load_profiles import LoadProfile, as_load_profile
+from ..metrics import instrument_repository
 from ..query_builder import QueryBuilder
+from ..uow import UnitOfWork, commit_or_flush, get_unit_of_work, rollback_unless_in_unit_of_work
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +42,7 @@ def model_to_dict(obj: Any) -> dict[str, Any]:
     return {c.key: getattr(obj, c.key) for c in inspect(obj).mapper.column_attrs}
 
 
+@instrument_repository
 class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Базовый миксин для CRUD операций с SQLAlchemy моделями.
@@ -46,8 +51,14 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     - Создание, чтение, обновление, удаление объектов
     - Простые фильтры (только базовые операторы)
     - Простая пагинация с offset/limit
+    - Потоковое чтение больших выборок (server-side курсор)
+    - Проекции (``list_columns``, ``get_columns``): только нужные колонки без ORM объектов
     - Подсчет записей
     - Проверка существования
+    - Unit of work: внутри ``async with repository.unit_of_work()`` методы
+      делают flush, коммит - один раз в конце блока
+    - Профили загрузки связей (``load_profiles``): ``get``, ``get_by``,
+      ``list`` и ``stream`` принимают ``load_profile="<имя>"``
 
     Поддерживает только базовые операторы фильтрации:
     - eq, ne, lt, lte, gt, gte (сравнение)
@@ -61,6 +72,14 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     _db: AsyncSession
     _qb: QueryBuilder
 
+    # Профили загрузки связей: имя -> LoadProfile или последовательность путей связей
+    load_profiles: ClassVar[dict[str, LoadProfile]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "load_profiles" in vars(cls):
+            cls.load_profiles = {name: as_load_profile(profile) for name, profile in cls.load_profiles.items()}
+
     def __init__(self, model: type[ModelType], db: AsyncSession):
         """
         Initialize BaseCrudMixin.
@@ -72,6 +91,75 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self._db = db
         self._qb = QueryBuilder(model)
 
+    def unit_of_work(self, *, returning: bool = True) -> UnitOfWork:
+        """
+        Unit of work на сессии репозитория (общей для репозиториев запроса).
+
+        :param returning: Получать server default через RETURNING вместо refresh
+        :return: UnitOfWork для ``async with``
+
+        Example:
+            ```python
+            async with user_repo.unit_of_work():
+                user = await user_repo.create(user_data)
+                await profile_repo.create({"user_id": user.id})
+            ```
+        """
+        return UnitOfWork(self._db, returning=returning)
+
+    def _load_options(self, load_profile: str | None) -> tuple[tuple[Any, ...], bool]:
+        """
+        Скомпилированные loader options профиля загрузки.
+
+        :param load_profile: Имя профиля из ``load_profiles`` или None
+        :return: Loader options (пустой кортеж без профиля) и нужен ли ``Result.unique()``
+        :raises CoreRepositoryValueError: Неизвестный профиль
+        """
+        if load_profile is None:
+            return (), False
+        profile = self.load_profiles.get(load_profile)
+        if profile is None:
+            raise CoreRepositoryValueError("load_profile", "load_profile", load_profile)
+        return profile.options(self._model), profile.requires_unique(self._model)
+
+    async def _persist(self, db_obj: ModelType) -> None:
+        """
+        Сохранить изменения объекта (commit или flush в unit of work) и перечитать его из базы.
+
+        :param db_obj: Объект сессии
+        """
+        await commit_or_flush(self._db)
+        await self._db.refresh(db_obj)
+
+    async def _apply_changes(self, db_obj: ModelType, values: dict[str, Any]) -> ModelType:
+        """
+        Применить изменения к объекту и сохранить их.
+
+        В unit of work с ``returning`` изменения колонок отправляются одним
+        ``UPDATE ... RETURNING``, который обновляет объект в сессии (включая
+        onupdate колонки) без отдельного SELECT.
+
+        :param db_obj: Объект сессии
+        :param values: Новые значения атрибутов
+        :return: Обновленный объект
+        """
+        uow = get_unit_of_work(self._db)
+        columns = sa_inspect(self._model).column_attrs.keys()
+        if uow is not None and uow.returning and values and all(field in columns for field in values):
+            query = (
+                update(self._model)
+                .where(self._model.id == db_obj.id)
+                .values(**values)
+                .returning(self._model)
+                .execution_options(populate_existing=True, synchronize_session=False)
+            )
+            return await self._db.scalar(query)
+
+        for field, value in values.items():
+            setattr(db_obj, field, value)
+        await self._persist(db_obj)
+        return db_obj
+
     async def create(self, data: CreateSchemaType | dict[str, Any]) -> ModelType:
         """
         Создать новый объект в базе данных.
@@ -92,26 +180,35 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             else:
                 obj_in_data = data.model_dump(exclude_unset=True)
 
-            # Создаем объект
-            db_obj = self._model(**obj_in_data)
-            self._db.add(db_obj)
-            await self._db.commit()
-            await self._db.refresh(db_obj)
+            uow = get_unit_of_work(self._db)
+            columns = sa_inspect(self._model).column_attrs.keys()
+            if uow is not None and uow.returning and all(field in columns for field in obj_in_data):
+                # INSERT ... RETURNING сразу возвращает server default, без refresh;
+                # relationship и прочие не-колоночные атрибуты - через конструктор модели
+                db_obj = await self._db.scalar(insert(self._model).values(**obj_in_data).returning(self._model))
+            else:
+                # Создаем объект
+                db_obj = self._model(**obj_in_data)
+                self._db.add(db_obj)
+                await self._persist(db_obj)
 
             logger.debug(f"Created {self._model.__name__} with ID: {db_obj.id}")
             return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error creating {self._model.__name__}: {e}")
-            raise CoreRepositoryValueError(f"Failed to create {self._model.__name__}") from e
+            raise CoreRepositoryValueError("create", "data", self._model.__name__) from e
 
-    async def get(self, id: uuid.UUID, include_deleted: bool = False) -> ModelType | None:
+    async def get(
+        self, id: uuid.UUID, include_deleted: bool = False, *, load_profile: str | None = None
+    ) -> ModelType | None:
         """
         Получить объект по ID.
 
         :param id: UUID объекта
         :param include_deleted: Включать ли soft-deleted объекты
+        :param load_profile: Профиль загрузки связей из ``load_profiles``
         :return: Найденный объект или None
 
         Example:
@@ -121,15 +218,16 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 print(f"Found user: {user.name}")
             ```
         """
+        options, unique = self._load_options(load_profile)
         try:
-            query = self._qb.get_object_query(id, include_deleted)
+            query = self._qb.get_object_query(id, include_deleted).options(*options)
             result = await self._db.execute(query)
-            return result.scalar_one_or_none()
+            return (result.unique() if unique else result).scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error getting {self._model.__name__} with ID {id}: {e}")
             return None
 
-    async def get_by(self, **filters) -> ModelType | None:
+    async def get_by(self, *, load_profile: str | None = None, **filters) -> ModelType | None:
         """
         Получить объект по фильтрам (возвращает первый найденный).
 
@@ -139,6 +237,7 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         - lt, lte, gt, gte: field__gt=10
         - isnull, isnotnull: field__isnull=True
 
+        :param load_profile: Профиль загрузки связей из ``load_profiles``
         :param filters: Фильтры для поиска
         :return: Найденный объект или None
 
@@ -148,12 +247,13 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             active_user = await repository.get_by(status="active", deleted_at__isnull=True)
             ```
         """
+        options, unique = self._load_options(load_profile)
         try:
-            query = self._qb.get_list_query(filters.get("include_deleted", False))
+            query = self._qb.get_list_query(filters.get("include_deleted", False)).options(*options)
             query = self._qb.apply_filters(query, filters, use_advanced_operators=False)
 
             result = await self._db.execute(query)
-            return result.scalar_one_or_none()
+            return (result.unique() if unique else result).scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error getting {self._model.__name__} with filters {filters}: {e}")
             return None
@@ -165,6 +265,7 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         limit: int | None = None,
         include_deleted: bool = False,
         order_by: str = "created_at",
+        load_profile: str | None = None,
         **filters,
     ) -> Sequence[ModelType]:
         """
@@ -176,6 +277,7 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         :param limit: Лимит записей
         :param include_deleted: Включать ли soft-deleted объекты
         :param order_by: Поле для сортировки (по умолчанию "created_at")
+        :param load_profile: Профиль загрузки связей из ``load_profiles``
         :param filters: Фильтры для поиска
         :return: Список объектов
 
@@ -190,8 +292,9 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             )
             ```
         """
+        options, unique = self._load_options(load_profile)
         try:
-            query = self._qb.get_list_query(include_deleted)
+            query = self._qb.get_list_query(include_deleted).options(*options)
             query = self._qb.apply_filters(query, filters, use_advanced_operators=False)
 
             # Применяем сортировку
@@ -206,12 +309,168 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 query = query.limit(limit)
 
             result = await self._db.execute(query)
-            return result.scalars().all()
+            scalars = result.scalars()
+            return (scalars.unique() if unique else scalars).all()
 
         except Exception as e:
             logger.error(f"Error listing {self._model.__name__}: {e}")
             return []
 
+    def _projection(self, fields: Sequence[str] | type[PydanticBaseModel]) -> list[Any]:
+        """
+        Колонки модели для проекции.
+
+        :param fields: Имена колонок или Pydantic схема (берутся ее поля, являющиеся колонками модели)
+        :return: Список колонок для ``select()``
+        :raises CoreRepositoryValueError: Имя не является колонкой модели или колонок нет
+        """
+        columns = {attr.key: attr for attr in sa_inspect(self._model).column_attrs}
+        if isinstance(fields, type):
+            names = [name for name in fields.model_fields if name in columns]
+        else:
+            names = list(fields)
+            for name in names:
+                if name not in columns:
+                    raise CoreRepositoryValueError("list_columns", name, f"not a column of {self._model.__name__}")
+        if not names:
+            raise CoreRepositoryValueError("list_columns", "fields", "no columns selected")
+        return [getattr(self._model, name) for name in names]
+
+    async def list_columns(
+        self,
+        fields: Sequence[str] | type[PydanticBaseModel],
+        filters: dict[str, Any] | None = None,
+        *,
+        offset: int | None = None,
+        limit: int | None = None,
+        include_deleted: bool = False,
+        order_by: str = "created_at",
+        as_dict: bool = False,
+    ) -> Sequence[Any]:
+        """
+        Получить только нужные колонки без создания ORM объектов.
+
+        ``SELECT`` перечисляет только запрошенные колонки, строки не попадают
+        в identity map и не отслеживаются сессией. Строки (``Row``) доступны
+        по атрибутам и валидируются схемой с ``from_attributes`` напрямую.
+
+        :param fields: Имена колонок или Pydantic схема ответа
+        :param filters: Фильтры (базовые операторы, как в ``list``)
+        :param offset: Смещение для пагинации
+        :param limit: Лимит записей
+        :param include_deleted: Включать ли soft-deleted объекты
+        :param order_by: Поле для сортировки (по убыванию)
+        :param as_dict: Вернуть словари вместо ``Row``
+        :return: Список ``Row`` (именованных кортежей) или словарей
+        :raises CoreRepositoryValueError: Неизвестная колонка
+        :raises CoreRepositoryQueryError: При ошибке запроса
+
+        Example:
+            ```python
+            rows = await repository.list_columns(UserListItem, {"is_active": True}, limit=100)
+            items = [UserListItem.model_validate(row) for row in rows]
+
+            emails = await repository.list_columns(["id", "email"], as_dict=True)
+            ```
+        """
+        query = self._qb.get_list_query(include_deleted).with_only_columns(*self._projection(fields))
+        query = self._qb.apply_filters(query, filters or {}, use_advanced_operators=False)
+        if hasattr(self._model, order_by):
+            query = query.order_by(desc(getattr(self._model, order_by)))
+        if offset is not None:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+
+        try:
+            result = await self._db.execute(query)
+        except Exception as e:
+            logger.error(f"Error listing columns of {self._model.__name__}: {e}")
+            raise CoreRepositoryQueryError("list_columns", "select") from e
+        return [dict(row) for row in result.mappings()] if as_dict else result.all()
+
+    async def get_columns(
+        self,
+        id: uuid.UUID,
+        fields: Sequence[str] | type[PydanticBaseModel],
+        *,
+        include_deleted: bool = False,
+        as_dict: bool = False,
+    ) -> Any | None:
+        """
+        Получить только нужные колонки объекта по ID без создания ORM объекта.
+
+        :param id: UUID объекта
+        :param fields: Имена колонок или Pydantic схема ответа
+        :param include_deleted: Включать ли soft-deleted объекты
+        :param as_dict: Вернуть словарь вместо ``Row``
+        :return: ``Row``, словарь или None
+        :raises CoreRepositoryValueError: Неизвестная колонка
+        :raises CoreRepositoryQueryError: При ошибке запроса
+        """
+        query = self._qb.get_object_query(id, include_deleted).with_only_columns(*self._projection(fields))
+        try:
+            result = await self._db.execute(query)
+        except Exception as e:
+            logger.error(f"Error getting columns of {self._model.__name__} with ID {id}: {e}")
+            raise CoreRepositoryQueryError("get_columns", "select") from e
+        row = result.one_or_none()
+        if row is None or not as_dict:
+            return row
+        return dict(row._mapping)
+
+    async def stream(
+        self,
+        filters: dict[str, Any] | None = None,
+        *,
+        order_by: str = "created_at",
+        chunk_size: int = 1000,
+        include_deleted: bool = False,
+        load_profile: str | None = None,
+    ) -> AsyncIterator[ModelType]:
+        """
+        Потоково получить объекты по фильтрам без загрузки всей выборки в память.
+
+        Запрос выполняется через ``AsyncSession.stream()`` с ``yield_per``: на
+        asyncpg это server-side курсор, из базы за раз читается ``chunk_size``
+        строк. Прочитанные объекты не удерживаются сессией (identity map
+        хранит слабые ссылки), поэтому память не растет с размером выборки.
+        Пока итерация не завершена, соединение сессии занято курсором.
+
+        :param filters: Фильтры (базовые операторы, как в ``list``)
+        :param order_by: Поле для сортировки (по убыванию)
+        :param chunk_size: Количество строк, читаемых из курсора за раз
+        :param include_deleted: Включать ли soft-deleted объекты
+        :param load_profile: Профиль загрузки связей; связи загружаются на каждый chunk
+            (``selectinload``), ``joinedload`` коллекций несовместим с потоковым чтением
+        :return: Асинхронный итератор объектов
+        :raises CoreRepositoryQueryError: При ошибке запроса
+
+        Example:
+            ```python
+            async for user in repository.stream({"is_active": True}, chunk_size=5000):
+                writer.writerow([user.id, user.email])
+            ```
+        """
+        options, _ = self._load_options(load_profile)
+        query = self._qb.get_list_query(include_deleted).options(*options)
+        query = self._qb.apply_filters(query, filters or {}, use_advanced_operators=False)
+        if hasattr(self._model, order_by):
+            query = query.order_by(desc(getattr(self._model, order_by)))
+
+        try:
+            result = await self._db.stream_scalars(query.execution_options(yield_per=chunk_size))
+        except Exception as e:
+            logger.error(f"Error streaming {self._model.__name__}: {e}")
+            raise CoreRepositoryQueryError("stream", "select") from e
+
+        try:
+            async for partition in result.partitions():
+                for obj in partition:
+                    yield obj
+        finally:
+            await result.close()
+
     async def count(self, *, include_deleted: bool = False, **filters) -> int:
         """
         Подсчитать количество записей с фильтрами.
@@ -285,22 +544,18 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             else:
                 update_data = data.model_dump(exclude_unset=True)
 
-            # Обновляем поля объекта
-            for field, value in update_data.items():
-                if hasattr(db_obj, field):
-                    setattr(db_obj, field, value)
-
-            # Сохраняем изменения
-            await self._db.commit()
-            await self._db.refresh(db_obj)
+            # Обновляем поля объекта и сохраняем изменения
+            db_obj = await self._apply_changes(
+                db_obj, {field: value for field, value in update_data.items() if hasattr(db_obj, field)}
+            )
 
             logger.debug(f"Updated {self._model.__name__} with ID: {db_obj.id}")
             return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error updating {self._model.__name__}: {e}")
-            raise CoreRepositoryValueError(f"Failed to update {self._model.__name__}") from e
+            raise CoreRepositoryValueError("update", "data", self._model.__name__) from e
 
     async def remove(self, id: uuid.UUID, *, soft_delete: bool = True) -> ModelType | None:
         """
@@ -327,22 +582,20 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 # Soft delete - устанавливаем deleted_at
                 from datetime import datetime
 
-                db_obj.deleted_at = datetime.utcnow()
-                await self._db.commit()
-                await self._db.refresh(db_obj)
+                db_obj = await self._apply_changes(db_obj, {"deleted_at": datetime.utcnow()})
                 logger.debug(f"Soft deleted {self._model.__name__} with ID: {id}")
             else:
                 # Hard delete - физическое удаление
                 await self._db.delete(db_obj)
-                await self._db.commit()
+                await commit_or_flush(self._db)
                 logger.debug(f"Hard deleted {self._model.__name__} with ID: {id}")
 
             return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error removing {self._model.__name__} with ID {id}: {e}")
-            raise CoreRepositoryValueError(f"Failed to remove {self._model.__name__}") from e
+            raise CoreRepositoryValueError("remove", "id", id) from e
 
     async def restore(self, id: uuid.UUID) -> ModelType | None:
         """
@@ -366,9 +619,7 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 return None
 
             if hasattr(db_obj, "deleted_at"):
-                db_obj.deleted_at = None
-                await self._db.commit()
-                await self._db.refresh(db_obj)
+                db_obj = await self._apply_changes(db_obj, {"deleted_at": None})
                 logger.debug(f"Restored {self._model.__name__} with ID: {id}")
                 return db_obj
             else:
@@ -376,6 +627,6 @@ class BaseCrudMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error restoring {self._model.__name__} with ID {id}: {e}")
-            raise CoreRepositoryValueError(f"Failed to restore {self._model.__name__}") from e
+            raise CoreRepositoryValueError("restore", "id", id) from e
@@ -5,17 +5,37 @@ EnterpriseMixin - корпоративные функции для репози
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable, Sequence
+from datetime import datetime
 from typing import Any, Generic, TypeVar
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    Delete,
+    Update,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.base.models import BaseModel as SQLAlchemyBaseModel
-from core.exceptions import CoreRepositoryValueError
+from core.exceptions import CoreRepositoryQueryError, CoreRepositoryValueError
 from tools.pydantic import BaseModel as PydanticBaseModel
 
-from ..cache import CacheManager, cache_result
+from ..cache import CacheManager, cache_result, entity_cache_key
+from ..emitter import get_event_queue
+from ..events import BulkEvent
+from ..metrics import instrument_repository
 from ..query_builder import QueryBuilder
+from ..uow import commit_or_flush, rollback_unless_in_unit_of_work, run_after_commit
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +43,13 @@ ModelType = TypeVar("ModelType", bound=SQLAlchemyBaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=PydanticBaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=PydanticBaseModel)
 
+# INSERT ... ON CONFLICT по диалекту и лимит bind параметров на запрос
+# (asyncpg - 32767, SQLite - SQLITE_MAX_VARIABLE_NUMBER старых сборок)
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_MAX_BIND_PARAMS = {"postgresql": 32767, "sqlite": 999}
 
+
+@instrument_repository
 class EnterpriseMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Корпоративный миксин для масштабируемых приложений.
@@ -36,12 +62,15 @@ class EnterpriseMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     - Enterprise Security
 
     Включает методы:
-    - bulk_create() - массовое создание с батчингом
-    - bulk_update() - массовое обновление
-    - bulk_delete() - массовое удаление
+    - bulk_create() - массовое создание (INSERT ... RETURNING или COPY)
+    - bulk_upsert() - массовая вставка или обновление (INSERT ... ON CONFLICT)
+    - bulk_update() - массовое обновление (UPDATE ... RETURNING id)
+    - bulk_delete() - массовое удаление (soft delete через UPDATE, RETURNING id)
+    - bulk_restore() - массовое восстановление soft-deleted объектов
     - get_cache_stats() - статистика кэша
     - warm_cache() - прогрев кэша
     - invalidate_cache() - инвалидация кэша
+    - invalidate_entities() - инвалидация кэша конкретных сущностей и запросов модели
 
     Требует наличие BaseCrudMixin для базовых операций.
     """
@@ -92,6 +121,29 @@ class EnterpriseMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             except Exception as e:
                 logger.error(f"Error invalidating cache: {e}")
 
+    async def invalidate_entities(self, ids: Sequence[Any]) -> None:
+        """
+        Инвалидировать кэш изменившихся сущностей.
+
+        Удаляются токены версий сущностей с этими ID - результаты всех методов
+        ``cache_result(scope="entity")`` для них становятся недостижимы; результаты
+        запросов модели (``cache_result(scope="query")``: list, count) сбрасываются
+        сменой поколения.
+        Кэш остальных сущностей и других моделей не затрагивается.
+
+        :param ids: ID изменившихся сущностей
+        """
+        if not self._cache_manager or not ids:
+            return
+
+        namespace = self._model.__name__
+        try:
+            await self._cache_manager.delete_many(entity_cache_key(namespace, id) for id in ids)
+            await self._cache_manager.bump_generation(namespace)
+            logger.debug(f"Cache invalidated for {len(ids)} {namespace} entities")
+        except Exception as e:
+            logger.error(f"Error invalidating cache: {e}")
+
     @cache_result(ttl=300)
     async def get_cache_stats(self) -> dict[str, Any]:
         """
@@ -163,13 +215,30 @@ class EnterpriseMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         data_list: list[CreateSchemaType | dict[str, Any]],
         *,
         batch_size: int = 1000,
-    ) -> list[ModelType]:
+        return_objects: bool = True,
+        use_copy: bool = False,
+    ) -> list[ModelType] | int:
         """
         Массовое создание объектов с батчингом.
 
+        Каждый батч - один ``INSERT ... RETURNING`` (многострочная вставка) и
+        один коммит; созданные объекты приходят из RETURNING, без SELECT на
+        каждый объект. С ``return_objects=False`` RETURNING не запрашивается и
+        объекты не создаются.
+
+        ``use_copy=True`` на PostgreSQL (asyncpg) загружает батч через
+        ``COPY`` (``copy_records_to_table``) - самый быстрый путь для больших
+        загрузок. Python default без контекста (например, ``id``) заполняются
+        заранее, server default - базой для колонок, которых нет в данных.
+        Объекты при ``return_objects=True`` читаются одним SELECT на батч.
+        Батчи, которым нужны SQL выражения или контекстные default, а также
+        ``id`` от базы при ``return_objects=True``, и другие СУБД используют INSERT.
+
         :param data_list: Список данных для создания
         :param batch_size: Размер батча для обработки
-        :return: Список созданных объектов
+        :param return_objects: Возвращать созданные объекты
+        :param use_copy: Загружать через COPY (PostgreSQL)
+        :return: Список созданных объектов или количество созданных записей при ``return_objects=False``
         :raises CoreRepositoryValueError: При ошибке создания
 
         Example:
@@ -185,64 +254,316 @@ class EnterpriseMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 batch_size=500
             )
             print(f"Created {len(created_users)} users")
+
+            # Импорт без объектов в ответе
+            count = await repository.bulk_create(rows, return_objects=False, use_copy=True)
             ```
         """
         if not data_list:
-            return []
+            return [] if return_objects else 0
+
+        if use_copy and self._db.bind.dialect.driver != "asyncpg":
+            logger.warning(f"COPY requires PostgreSQL with asyncpg, using INSERT for {self._model.__name__}")
+            use_copy = False
 
         try:
-            created_objects = []
+            created_objects: list[ModelType] = []
+            created_count = 0
 
             # Обрабатываем данные батчами
             for i in range(0, len(data_list), batch_size):
-                batch = data_list[i : i + batch_size]
-                batch_objects = []
+                rows = [
+                    data if isinstance(data, dict) else data.model_dump(exclude_unset=True)
+                    for data in data_list[i : i + batch_size]
+                ]
+
+                # None - батч нельзя загрузить через COPY, вставляем обычным INSERT
+                ids = await self._copy_batch(rows, with_ids=return_objects) if use_copy else None
+                if ids is not None:
+                    if return_objects:
+                        result = await self._db.scalars(select(self._model).where(self._model.id.in_(ids)))
+                        by_id = {obj.id: obj for obj in result}
+                        created_objects.extend(by_id[id_] for id_ in ids)
+                elif return_objects:
+                    # Объекты гидрируются из RETURNING в порядке входных данных
+                    result = await self._db.scalars(
+                        insert(self._model).returning(self._model, sort_by_parameter_order=True), rows
+                    )
+                    created_objects.extend(result.all())
+                else:
+                    await self._db.execute(insert(self._model), rows)
+
+                await commit_or_flush(self._db)
+                created_count += len(rows)
+                logger.debug(f"Created batch of {len(rows)} {self._model.__name__} objects")
+
+            # Инвалидируем кэш после коммита массового создания
+            if self._cache_manager:
+                await run_after_commit(self._db, self.invalidate_cache)
 
-                for data in batch:
-                    # Преобразуем данные в словарь
-                    if isinstance(data, dict):
-                        obj_in_data = data
-                    else:
-                        obj_in_data = data.model_dump(exclude_unset=True)
+            logger.info(f"Bulk created {created_count} {self._model.__name__} objects")
+            return created_objects if return_objects else created_count
 
-                    # Создаем объект
-                    db_obj = self._model(**obj_in_data)
-                    batch_objects.append(db_obj)
+        except Exception as e:
+            await rollback_unless_in_unit_of_work(self._db)
+            logger.error(f"Error in bulk create for {self._model.__name__}: {e}")
+            raise CoreRepositoryValueError("bulk_create", "data_list", f"{len(data_list)} rows") from e
 
-                # Добавляем весь батч в сессию
-                self._db.add_all(batch_objects)
-                await self._db.commit()
+    async def _copy_batch(self, rows: list[dict[str, Any]], *, with_ids: bool = True) -> list[Any] | None:
+        """
+        Загрузить батч через COPY (asyncpg ``copy_records_to_table``).
 
-                # Обновляем объекты для получения ID
-                for obj in batch_objects:
-                    await self._db.refresh(obj)
+        COPY не возвращает строки и не вычисляет default, которым нужен контекст
+        выполнения (SQL выражения, Sequence, функции с параметром ``context``).
+        Если такой default нужен строкам батча или ``id`` генерирует база, а ID
+        нужны вызывающему, батч не загружается.
 
-                created_objects.extend(batch_objects)
-                logger.debug(f"Created batch of {len(batch_objects)} {self._model.__name__} objects")
+        :param rows: Данные батча (ключи - атрибуты модели)
+        :param with_ids: Вернуть ID загруженных записей
+        :return: ID записей в порядке данных (пустой список при ``with_ids=False``)
+            или None, если батч нужно вставить через INSERT
+        """
+        table = self._model.__table__
+        columns = self._table_columns()
+        keys = {key for row in rows for key in row}
+        missing = {key for key in columns if any(key not in row for row in rows)}
+
+        # Python default отсутствующих колонок заполняем сами, колонки без default - default базы
+        defaults: dict[str, Any] = {}
+        for key in missing:
+            default = columns[key].default
+            if default is None:
+                continue
+            # Функции без аргументов SQLAlchemy оборачивает в lambda ctx (с __wrapped__)
+            if not (default.is_scalar or (default.is_callable and hasattr(default.arg, "__wrapped__"))):
+                return None
+            defaults[key] = default
+            keys.add(key)
+        if with_ids and "id" in missing and "id" not in defaults:
+            return None
+        ordered_keys = [key for key in columns if key in keys]
+
+        records = []
+        ids = []
+        for row in rows:
+            values = {
+                key: default.arg if default.is_scalar else default.arg(None)
+                for key, default in defaults.items()
+                if key not in row
+            }
+            values.update(row)
+            records.append(tuple(values.get(key) for key in ordered_keys))
+            if with_ids:
+                ids.append(values["id"])
+
+        connection = await self._db.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        async def copy() -> None:
+            await driver_connection.copy_records_to_table(
+                table.name,
+                records=records,
+                columns=[columns[key].name for key in ordered_keys],
+                schema_name=table.schema,
+            )
+
+        if driver_connection.is_in_transaction():
+            await copy()
+        else:
+            # Транзакция сессии еще не начата на соединении - COPY батча в своей транзакции
+            async with driver_connection.transaction():
+                await copy()
+        return ids
+
+    def _table_columns(self) -> dict[str, Any]:
+        """
+        Колонки таблицы модели по именам атрибутов.
+
+        :return: Словарь ``{атрибут: Column}`` в порядке объявления
+        """
+        table = self._model.__table__
+        return {
+            attr.key: attr.columns[0]
+            for attr in sa_inspect(self._model).column_attrs
+            if table.c.contains_column(attr.columns[0])
+        }
+
+    async def bulk_upsert(
+        self,
+        rows: list[CreateSchemaType | dict[str, Any]],
+        conflict_columns: list[str],
+        update_columns: list[str] | None = None,
+        *,
+        where: ColumnElement[bool] | Callable[[Any], ColumnElement[bool]] | None = None,
+    ) -> dict[str, int]:
+        """
+        Массовая вставка или обновление через ``INSERT ... ON CONFLICT``.
+
+        Один запрос на батч вместо ``get_by`` + ``create``/``update`` на строку,
+        без гонок между конкурентными синхронизациями. Размер батча
+        вычисляется из лимита bind параметров драйвера (32767 для asyncpg, 999
+        для SQLite). Объекты ORM не создаются: PostgreSQL отличает вставку от
+        обновления по ``xmax`` в RETURNING, SQLite - по одному SELECT
+        существующих ключей на батч. Повторы ключа во входных данных
+        схлопываются, побеждает последняя строка.
+
+        :param rows: Данные для вставки или обновления
+        :param conflict_columns: Колонки уникального ограничения (ключ конфликта)
+        :param update_columns: Колонки для обновления при конфликте; по умолчанию - все
+            переданные, кроме ключа и первичного ключа; пустой список - ``DO NOTHING``
+        :param where: Условие обновления; выражение или функция от ``excluded``
+        :return: Словарь ``{"inserted": ..., "updated": ...}``
+        :raises CoreRepositoryQueryError: При ошибке или неподдерживаемой СУБД
+
+        Example:
+            ```python
+            stats = await repository.bulk_upsert(
+                profiles,
+                conflict_columns=["external_id"],
+                update_columns=["name", "email", "synced_at"],
+                where=lambda excluded: Profile.synced_at < excluded.synced_at,
+            )
+            print(f"Inserted {stats['inserted']}, updated {stats['updated']}")
+            ```
+        """
+        dialect = self._db.bind.dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            raise CoreRepositoryQueryError("bulk_upsert", f"on conflict ({dialect})")
+
+        stats = {"inserted": 0, "updated": 0}
+        if not rows:
+            return stats
+
+        try:
+            columns = self._table_columns()
+            table = self._model.__table__
+
+            unique_rows: dict[tuple[Any, ...], dict[str, Any]] = {}
+            for data in rows:
+                row = data if isinstance(data, dict) else data.model_dump(exclude_unset=True)
+                unique_rows[tuple(row[key] for key in conflict_columns)] = {
+                    columns[key].name: value for key, value in row.items()
+                }
+
+            keys = {key for row in unique_rows.values() for key in row}
+            if update_columns is None:
+                update_columns = [
+                    key
+                    for key, column in columns.items()
+                    if column.name in keys and key not in conflict_columns and not column.primary_key
+                ]
+            conflict_keys = [columns[key] for key in conflict_columns]
+
+            # ON CONFLICT DO UPDATE не применяет onupdate колонок - добавляем явно
+            onupdate = {
+                column.name: column.onupdate.arg if not column.onupdate.is_callable else column.onupdate.arg(None)
+                for key, column in columns.items()
+                if update_columns and column.onupdate is not None and key not in update_columns
+            }
+
+            def build(batch: list[dict[str, Any]]) -> Any:
+                stmt = _UPSERT_INSERTS[dialect](table).values(batch)
+                if not update_columns:
+                    return stmt.on_conflict_do_nothing(index_elements=conflict_keys)
+                set_ = {columns[key].name: stmt.excluded[columns[key].name] for key in update_columns}
+                set_.update(onupdate)
+                return stmt.on_conflict_do_update(
+                    index_elements=conflict_keys,
+                    set_=set_,
+                    where=where(stmt.excluded) if callable(where) else where,
+                )
+
+            # Многострочный VALUES берет колонки из первой строки - батчи строятся по набору ключей
+            groups: dict[frozenset[str], list[dict[str, Any]]] = {}
+            for row in unique_rows.values():
+                groups.setdefault(frozenset(row), []).append(row)
+
+            dialect_impl = self._db.bind.dialect
+            for group in groups.values():
+                # Параметров на строку и на запрос (SET, WHERE) - по компиляции одной и двух строк
+                single = len(build(group[:1]).compile(dialect=dialect_impl).params)
+                per_row = len(build(group[:1] * 2).compile(dialect=dialect_impl).params) - single
+                batch_size = max(1, (_MAX_BIND_PARAMS[dialect] - (single - per_row)) // per_row)
+
+                for i in range(0, len(group), batch_size):
+                    batch = group[i : i + batch_size]
+                    stmt = build(batch)
+
+                    if dialect == "postgresql":
+                        # xmax = 0 только у строк, вставленных этим запросом
+                        result = await self._db.execute(stmt.returning(literal_column("xmax = 0", Boolean)))
+                        flags = result.scalars().all()
+                        inserted = sum(flags)
+                        updated = len(flags) - inserted
+                    else:
+                        batch_keys = [tuple(row[column.name] for column in conflict_keys) for row in batch]
+                        found = select(*conflict_keys).where(tuple_(*conflict_keys).in_(batch_keys))
+                        existing = set((await self._db.execute(found)).tuples().all())
+                        returned = (await self._db.execute(stmt.returning(*conflict_keys))).tuples().all()
+                        updated = sum(1 for key in returned if key in existing)
+                        inserted = len(returned) - updated
+
+                    await commit_or_flush(self._db)
+                    stats["inserted"] += inserted
+                    stats["updated"] += updated
+                    logger.debug(f"Upserted batch of {len(batch)} {self._model.__name__} rows")
 
-            # Инвалидируем кэш после массового создания
             if self._cache_manager:
-                await self.invalidate_cache("*")
+                await run_after_commit(self._db, self.invalidate_cache)
 
-            logger.info(f"Bulk created {len(created_objects)} {self._model.__name__} objects")
-            return created_objects
+            logger.info(
+                f"Bulk upserted {self._model.__name__}: {stats['inserted']} inserted, {stats['updated']} updated"
+            )
+            return stats
 
         except Exception as e:
-            await self._db.rollback()
-            logger.error(f"Error in bulk create for {self._model.__name__}: {e}")
-            raise CoreRepositoryValueError(f"Failed to bulk create {self._model.__name__}") from e
+            await rollback_unless_in_unit_of_work(self._db)
+            logger.error(f"Error in bulk upsert for {self._model.__name__}: {e}")
+            raise CoreRepositoryQueryError("bulk_upsert", "on conflict") from e
+
+    def _filtered(self, stmt: Update | Delete, filters: dict[str, Any], include_deleted: bool = False) -> Any:
+        """
+        Применить фильтры списка к UPDATE/DELETE.
+
+        :param stmt: Запрос изменения
+        :param filters: Фильтры (расширенные операторы, как в ``list``)
+        :param include_deleted: Не добавлять условие ``deleted_at IS NULL``
+        :return: Запрос с условием WHERE
+        """
+        if filters:
+            temp_query = self._qb.get_list_query(include_deleted)
+            temp_query = self._qb.apply_filters(temp_query, filters, use_advanced_operators=True)
+            if temp_query.whereclause is not None:
+                stmt = stmt.where(temp_query.whereclause)
+        return stmt
+
+    def _supports_returning(self, stmt: Update | Delete) -> bool:
+        """Поддерживает ли диалект сессии RETURNING для этого запроса."""
+        dialect = self._db.bind.dialect
+        return dialect.delete_returning if isinstance(stmt, Delete) else dialect.update_returning
 
     async def bulk_update(
         self,
         filters: dict[str, Any],
         update_data: dict[str, Any],
-    ) -> int:
+        *,
+        return_ids: bool = False,
+        emit_events: bool = True,
+    ) -> int | list[Any]:
         """
         Массовое обновление объектов по фильтрам.
 
+        Затронутые строки возвращает ``RETURNING id``: кэш инвалидируется только
+        для них (и для list/count модели), изменение публикуется одним событием
+        ``entity.bulk_updated``.
+
         :param filters: Фильтры для выбора объектов
         :param update_data: Данные для обновления
-        :return: Количество обновленных записей
+        :param return_ids: Вернуть ID обновленных записей вместо количества
+        :param emit_events: Публиковать ли событие массового изменения
+        :return: Количество обновленных записей или их ID
+        :raises CoreRepositoryQueryError: ``return_ids`` без поддержки RETURNING в диалекте
         :raises CoreRepositoryValueError: При ошибке обновления
 
         Example:
@@ -255,93 +576,184 @@ class EnterpriseMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             print(f"Updated {updated_count} users")
             ```
         """
-        try:
-            # Строим запрос обновления
-            query = update(self._model)
-
-            # Применяем фильтры
-            if filters:
-                temp_query = self._qb.get_list_query()
-                temp_query = self._qb.apply_filters(temp_query, filters, use_advanced_operators=True)
-                if temp_query.whereclause is not None:
-                    query = query.where(temp_query.whereclause)
-
-            # Применяем данные для обновления
-            query = query.values(**update_data)
-
-            # Выполняем обновление
-            result = await self._db.execute(query)
-            await self._db.commit()
-
-            affected_count = result.rowcount or 0
-
-            # Инвалидируем кэш после массового обновления
-            if self._cache_manager:
-                await self.invalidate_cache("*")
-
-            logger.info(f"Bulk updated {affected_count} {self._model.__name__} objects")
-            return affected_count
-
-        except Exception as e:
-            await self._db.rollback()
-            logger.error(f"Error in bulk update for {self._model.__name__}: {e}")
-            raise CoreRepositoryValueError(f"Failed to bulk update {self._model.__name__}") from e
+        query = self._filtered(update(self._model), filters).values(**update_data)
+        return await self._bulk_write(
+            "bulk_update",
+            query,
+            "entity.bulk_updated",
+            filters=filters,
+            return_ids=return_ids,
+            emit_events=emit_events,
+            fields=sorted(update_data),
+        )
 
     async def bulk_delete(
         self,
         filters: dict[str, Any],
         *,
         soft_delete: bool = True,
-    ) -> int:
+        return_ids: bool = False,
+        emit_events: bool = True,
+    ) -> int | list[Any]:
         """
         Массовое удаление объектов по фильтрам.
 
+        Soft delete помечает только еще не удаленные записи, поэтому
+        возвращаемые ID - ровно те, что удалены этим вызовом.
+
         :param filters: Фильтры для выбора объектов
         :param soft_delete: Использовать soft delete (если поддерживается)
-        :return: Количество удаленных записей
+        :param return_ids: Вернуть ID удаленных записей вместо количества
+        :param emit_events: Публиковать ли событие ``entity.bulk_deleted``
+        :return: Количество удаленных записей или их ID
+        :raises CoreRepositoryQueryError: ``return_ids`` без поддержки RETURNING в диалекте
         :raises CoreRepositoryValueError: При ошибке удаления
 
         Example:
             ```python
             # Soft delete всех пользователей старше 90 дней
-            deleted_count = await repository.bulk_delete(
+            deleted_ids = await repository.bulk_delete(
                 filters={"created_at__lt": cutoff_date},
-                soft_delete=True
+                soft_delete=True,
+                return_ids=True,
             )
-            print(f"Deleted {deleted_count} old users")
+            print(f"Deleted {len(deleted_ids)} old users")
             ```
         """
-        try:
-            if soft_delete and hasattr(self._model, "deleted_at"):
-                # Soft delete через обновление
-                from datetime import datetime
+        soft_delete = soft_delete and hasattr(self._model, "deleted_at")
+        if soft_delete:
+            query = self._filtered(update(self._model), filters).where(self._model.deleted_at.is_(None))
+            query = query.values(deleted_at=datetime.utcnow())
+        else:
+            query = self._filtered(delete(self._model), filters)
+
+        return await self._bulk_write(
+            "bulk_delete",
+            query,
+            "entity.bulk_deleted",
+            filters=filters,
+            return_ids=return_ids,
+            emit_events=emit_events,
+            soft_delete=soft_delete,
+        )
+
+    async def bulk_restore(
+        self,
+        filters: dict[str, Any],
+        *,
+        return_ids: bool = False,
+        emit_events: bool = True,
+    ) -> int | list[Any]:
+        """
+        Массовое восстановление soft-deleted объектов по фильтрам.
 
-                return await self.bulk_update(filters=filters, update_data={"deleted_at": datetime.utcnow()})
-            else:
-                # Hard delete
-                query = delete(self._model)
+        :param filters: Фильтры для выбора объектов (среди удаленных)
+        :param return_ids: Вернуть ID восстановленных записей вместо количества
+        :param emit_events: Публиковать ли событие ``entity.bulk_restored``
+        :return: Количество восстановленных записей или их ID
+        :raises CoreRepositoryQueryError: Модель без soft delete или ``return_ids`` без поддержки RETURNING
+        :raises CoreRepositoryValueError: При ошибке восстановления
 
-                # Применяем фильтры
-                if filters:
-                    temp_query = self._qb.get_list_query()
-                    temp_query = self._qb.apply_filters(temp_query, filters, use_advanced_operators=True)
-                    if temp_query.whereclause is not None:
-                        query = query.where(temp_query.whereclause)
+        Example:
+            ```python
+            restored_ids = await repository.bulk_restore({"id__in": deleted_ids}, return_ids=True)
+            ```
+        """
+        if not hasattr(self._model, "deleted_at"):
+            raise CoreRepositoryQueryError("bulk_restore", f"soft delete ({self._model.__name__})")
+
+        query = self._filtered(update(self._model), filters, include_deleted=True)
+        query = query.where(self._model.deleted_at.is_not(None)).values(deleted_at=None)
+        return await self._bulk_write(
+            "bulk_restore",
+            query,
+            "entity.bulk_restored",
+            filters=filters,
+            return_ids=return_ids,
+            emit_events=emit_events,
+        )
+
+    async def _bulk_write(
+        self,
+        operation: str,
+        query: Update | Delete,
+        event_type: str,
+        *,
+        filters: dict[str, Any],
+        return_ids: bool,
+        emit_events: bool,
+        **metadata: Any,
+    ) -> int | list[Any]:
+        """
+        Выполнить массовое изменение и инвалидировать кэш по затронутым строкам.
+
+        С ``RETURNING id`` известны точные ID строк: из кэша удаляются только
+        их ключи, а изменение публикуется одним ``BulkEvent`` со списком ID (с
+        ``_event_outbox`` - в транзакции изменения). Без поддержки RETURNING в
+        диалекте - прежний сброс всего кэша модели и без события.
+
+        :param operation: Имя операции для ошибок и логов
+        :param query: UPDATE или DELETE с условием
+        :param event_type: Тип события массового изменения
+        :param filters: Фильтры операции (для текста ошибки)
+        :param return_ids: Вернуть ID затронутых строк вместо количества
+        :param emit_events: Публиковать ли событие
+        :param metadata: Дополнительные метаданные события
+        :return: Количество затронутых строк или их ID
+        """
+        returning = self._supports_returning(query)
+        if return_ids and not returning:
+            raise CoreRepositoryQueryError(operation, f"returning ({self._db.bind.dialect.name})")
 
-                # Выполняем удаление
+        try:
+            if returning:
+                result = await self._db.execute(query.returning(self._model.id))
+                ids: list[Any] | None = list(result.scalars().all())
+                affected_count = len(ids)
+            else:
                 result = await self._db.execute(query)
-                await self._db.commit()
-
+                ids = None
                 affected_count = result.rowcount or 0
 
-                # Инвалидируем кэш после массового удаления
+            event = None
+            staged = False
+            if ids and emit_events:
+                event = BulkEvent(
+                    event_type=event_type,
+                    entity_type=self._model.__name__,
+                    entity_ids=[str(id) for id in ids],
+                    source=getattr(self, "_event_source", "repository"),
+                    metadata={
+                        "model": self._model.__name__,
+                        "repository": self.__class__.__name__,
+                        "bulk_operation": True,
+                        "batch_size": len(ids),
+                        **metadata,
+                    },
+                )
+                staged = getattr(self, "_event_outbox", False)
+                if staged:
+                    self._stage_outbox_event(event)  # type: ignore[attr-defined]
+
+            await commit_or_flush(self._db)
+
+        except Exception as e:
+            await rollback_unless_in_unit_of_work(self._db)
+            logger.error(f"Error in {operation} for {self._model.__name__}: {e}")
+            raise CoreRepositoryValueError(operation, "filters", filters) from e
+
+        async def after_commit() -> None:
+            # Кэш и события - только после настоящего коммита: внутри unit of work выше был лишь flush
+            if ids is None:
                 if self._cache_manager:
                     await self.invalidate_cache("*")
+            else:
+                await self.invalidate_entities(ids)
 
-                logger.info(f"Bulk deleted {affected_count} {self._model.__name__} objects")
-                return affected_count
+            if event is not None and not staged:
+                get_event_queue().submit(event)
 
-        except Exception as e:
-            await self._db.rollback()
-            logger.error(f"Error in bulk delete for {self._model.__name__}: {e}")
-            raise CoreRepositoryValueError(f"Failed to bulk delete {self._model.__name__}") from e
+        await run_after_commit(self._db, after_commit)
+
+        logger.info(f"{operation}: {affected_count} {self._model.__name__} objects")
+        return ids if return_ids else affected_count
@@ -14,8 +14,12 @@ from core.base.models import BaseModel as SQLAlchemyBaseModel
 from core.exceptions import CoreRepositoryValueError
 from tools.pydantic import BaseModel as PydanticBaseModel
 
-from ..events import CreateEvent, DeleteEvent, UpdateEvent
+from ..emitter import get_event_queue
+from ..events import BaseEvent, BulkEvent, CreateEvent, DeleteEvent, UpdateEvent
+from ..metrics import instrument_repository
+from ..outbox import stage_event
 from ..query_builder import QueryBuilder
+from ..uow import commit_or_flush, rollback_unless_in_unit_of_work, run_after_commit
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,7 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=PydanticBaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=PydanticBaseModel)
 
 
+@instrument_repository
 class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Миксин для интеграции системы событий в репозитории.
@@ -39,9 +44,13 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     - update_with_event() - обновление с событием
     - remove_with_event() - удаление с событием
     - restore_with_event() - восстановление с событием
-    - bulk_*_with_events() - массовые операции с событиями
+    - bulk_*_with_events() - массовые операции с событиями (BulkEvent на чанк)
 
     Требует наличие BaseCrudMixin для базовых операций.
+
+    При ``_event_outbox = True`` события не эмитятся после записи, а
+    добавляются в таблицу outbox в той же транзакции, что и изменение
+    сущности; в брокер их доставляет ``OutboxRelay``.
     """
 
     # Эти атрибуты должны быть определены в BaseCrudMixin
@@ -53,6 +62,14 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     _event_source: str = "repository"
     _event_version: str = "1.0"
 
+    # Transactional outbox
+    _event_outbox: bool = False
+    _event_destination: str = "messaging"
+
+    # Массовые события: сущностей в одном событии и поля компактного payload
+    _bulk_event_chunk_size: int = 500
+    _bulk_event_fields: tuple[str, ...] | None = None
+
     def _get_event_metadata(self) -> dict[str, Any]:
         """
         Получить метаданные для событий.
@@ -75,6 +92,52 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         return emit_event
 
+    def _get_event_routing_key(self, event: BaseEvent) -> str:
+        """
+        Routing key события в outbox (для realtime - канал).
+
+        :param event: Событие
+        :return: Routing key, по умолчанию "<таблица>.<тип события>"
+        """
+        return f"{self._model.__tablename__}.{event.event_type}"
+
+    def _build_bulk_events(self, objects: list[Any], event_type: str = "entity.bulk_created") -> list[BulkEvent]:
+        """
+        Собрать события массовой операции по чанкам ``_bulk_event_chunk_size``.
+
+        :param objects: Созданные объекты или словари с данными
+        :param event_type: Тип события
+        :return: События, по одному на чанк
+        """
+        return BulkEvent.from_objects(
+            objects,
+            entity_type=self._model.__name__,
+            fields=self._bulk_event_fields,
+            chunk_size=self._bulk_event_chunk_size,
+            event_type=event_type,
+            source=self._event_source,
+            version=self._event_version,
+            metadata={**self._get_event_metadata(), "bulk_operation": True, "batch_size": len(objects)},
+        )
+
+    def _stage_outbox_event(self, event: BaseEvent) -> None:
+        """
+        Добавить событие в outbox текущей транзакции.
+
+        Вызывается до коммита базовой операции, поэтому запись outbox
+        сохраняется или откатывается вместе с сущностью.
+
+        :param event: Событие
+        """
+        stage_event(
+            self._db,
+            event,
+            aggregate_type=self._model.__name__,
+            destination=self._event_destination,
+            routing_key=self._get_event_routing_key(event),
+        )
+        logger.debug(f"Staged {event.__class__.__name__} for {self._model.__name__} in outbox")
+
     async def _before_create_event(self, data: dict[str, Any]) -> dict[str, Any]:
         """
         Хук перед созданием объекта (для переопределения в наследниках).
@@ -164,6 +227,21 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             # Хук перед созданием
             obj_in_data = await self._before_create_event(obj_in_data)
 
+            staged = self._event_outbox and self._should_emit_event(emit_event)
+            if staged:
+                # ID назначаем заранее, чтобы событие попало в ту же транзакцию
+                obj_in_data = {**obj_in_data}
+                obj_in_data.setdefault("id", uuid.uuid4())
+                data = obj_in_data
+                self._stage_outbox_event(
+                    CreateEvent(
+                        entity_data=obj_in_data,
+                        source=self._event_source,
+                        version=self._event_version,
+                        metadata=self._get_event_metadata(),
+                    )
+                )
+
             # Создаем объект (используем базовый метод)
             if hasattr(self, "create"):
                 db_obj = await self.create(data)  # type: ignore
@@ -171,14 +249,14 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 # Fallback если BaseCrudMixin не используется
                 db_obj = self._model(**obj_in_data)
                 self._db.add(db_obj)
-                await self._db.commit()
+                await commit_or_flush(self._db)
                 await self._db.refresh(db_obj)
 
             # Хук после создания
             await self._after_create_event(db_obj, obj_in_data)
 
             # Эмитим событие
-            if self._should_emit_event(emit_event):
+            if self._should_emit_event(emit_event) and not staged:
                 event = CreateEvent(
                     entity_data=db_obj,
                     source=self._event_source,
@@ -191,7 +269,7 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error creating {self._model.__name__} with event: {e}")
             raise CoreRepositoryValueError(f"Failed to create {self._model.__name__} with event") from e
 
@@ -232,6 +310,22 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             # Хук перед обновлением
             update_data = await self._before_update_event(db_obj, update_data)
 
+            if self._event_outbox and self._should_emit_event(emit_event):
+                expected_data = {**old_data, **{k: v for k, v in update_data.items() if k in old_data}}
+                changed_fields = [field for field in update_data if old_data.get(field) != expected_data.get(field)]
+                if changed_fields:
+                    self._stage_outbox_event(
+                        UpdateEvent(
+                            entity_id=str(db_obj.id),
+                            old_data=old_data,
+                            new_data=expected_data,
+                            changed_fields=changed_fields,
+                            source=self._event_source,
+                            version=self._event_version,
+                            metadata=self._get_event_metadata(),
+                        )
+                    )
+
             # Обновляем объект (используем базовый метод)
             if hasattr(self, "update"):
                 db_obj = await self.update(db_obj, update_data)  # type: ignore
@@ -240,7 +334,7 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 for field, value in update_data.items():
                     if hasattr(db_obj, field):
                         setattr(db_obj, field, value)
-                await self._db.commit()
+                await commit_or_flush(self._db)
                 await self._db.refresh(db_obj)
 
             # Получаем новые данные
@@ -253,7 +347,7 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             changed_fields = [field for field in update_data.keys() if old_data.get(field) != new_data.get(field)]
 
             # Эмитим событие
-            if self._should_emit_event(emit_event) and changed_fields:
+            if self._should_emit_event(emit_event) and changed_fields and not self._event_outbox:
                 event = UpdateEvent(
                     entity_id=str(db_obj.id),
                     old_data=old_data,
@@ -269,7 +363,7 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error updating {self._model.__name__} with event: {e}")
             raise CoreRepositoryValueError(f"Failed to update {self._model.__name__} with event") from e
 
@@ -314,6 +408,19 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             # Хук перед удалением
             await self._before_delete_event(db_obj)
 
+            staged = self._event_outbox and self._should_emit_event(emit_event)
+            if staged:
+                self._stage_outbox_event(
+                    DeleteEvent(
+                        entity_id=str(id),
+                        entity_data=entity_data,
+                        soft_delete=soft_delete,
+                        source=self._event_source,
+                        version=self._event_version,
+                        metadata=self._get_event_metadata(),
+                    )
+                )
+
             # Удаляем объект (используем базовый метод)
             if hasattr(self, "remove"):
                 db_obj = await self.remove(id, soft_delete=soft_delete)  # type: ignore
@@ -323,17 +430,17 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                     from datetime import datetime
 
                     db_obj.deleted_at = datetime.utcnow()
-                    await self._db.commit()
+                    await commit_or_flush(self._db)
                     await self._db.refresh(db_obj)
                 else:
                     await self._db.delete(db_obj)
-                    await self._db.commit()
+                    await commit_or_flush(self._db)
 
             # Хук после удаления
             await self._after_delete_event(db_obj, soft_delete)
 
             # Эмитим событие
-            if self._should_emit_event(emit_event):
+            if self._should_emit_event(emit_event) and not staged:
                 event = DeleteEvent(
                     entity_id=str(id),
                     entity_data=entity_data,
@@ -348,7 +455,7 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error removing {self._model.__name__} with event: {e}")
             raise CoreRepositoryValueError(f"Failed to remove {self._model.__name__} with event") from e
 
@@ -367,6 +474,23 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             ```
         """
         try:
+            restore_metadata = {**self._get_event_metadata(), "restored": True, "original_event_type": "restore"}
+            staged = self._event_outbox and self._should_emit_event(emit_event)
+            if staged:
+                from .base_crud import model_to_dict
+
+                deleted_obj = await self.get(id, include_deleted=True)  # type: ignore
+                if not deleted_obj:
+                    return None
+                self._stage_outbox_event(
+                    CreateEvent(
+                        entity_data={**model_to_dict(deleted_obj), "deleted_at": None},
+                        source=self._event_source,
+                        version=self._event_version,
+                        metadata=restore_metadata,
+                    )
+                )
+
             # Восстанавливаем объект (используем базовый метод)
             if hasattr(self, "restore"):
                 db_obj = await self.restore(id)  # type: ignore
@@ -375,19 +499,19 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 db_obj = await self.get(id, include_deleted=True)  # type: ignore
                 if db_obj and hasattr(db_obj, "deleted_at"):
                     db_obj.deleted_at = None
-                    await self._db.commit()
+                    await commit_or_flush(self._db)
                     await self._db.refresh(db_obj)
 
             if not db_obj:
                 return None
 
             # Эмитим событие восстановления (как создание)
-            if self._should_emit_event(emit_event):
+            if self._should_emit_event(emit_event) and not staged:
                 event = CreateEvent(
                     entity_data=db_obj,
                     source=self._event_source,
                     version=self._event_version,
-                    metadata={**self._get_event_metadata(), "restored": True, "original_event_type": "restore"},
+                    metadata=restore_metadata,
                 )
                 event.emit()
                 logger.debug(f"Emitted RestoreEvent for {self._model.__name__} with ID: {id}")
@@ -395,7 +519,7 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return db_obj
 
         except Exception as e:
-            await self._db.rollback()
+            await rollback_unless_in_unit_of_work(self._db)
             logger.error(f"Error restoring {self._model.__name__} with event: {e}")
             raise CoreRepositoryValueError(f"Failed to restore {self._model.__name__} with event") from e
 
@@ -428,28 +552,42 @@ class EventMixin(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if not data_list:
             return []
 
+        rows = [data if isinstance(data, dict) else data.model_dump(exclude_unset=True) for data in data_list]
+        staged = self._event_outbox and self._should_emit_event(emit_events)
+        if staged:
+            # ID назначаем заранее, события попадают в транзакцию создания
+            rows = [{**row, "id": row.get("id") or uuid.uuid4()} for row in rows]
+            for event in self._build_bulk_events(rows):
+                self._stage_outbox_event(event)
+
         # Используем базовый метод bulk_create если доступен
         if hasattr(self, "bulk_create"):
-            created_objects = await self.bulk_create(data_list)  # type: ignore
+            # С outbox - одной транзакцией, чтобы события не опережали данные
+            options = {"batch_size": len(rows)} if staged else {}
+            created_objects = await self.bulk_create(rows, **options)  # type: ignore
         else:
-            # Fallback - создаем по одному
-            created_objects = []
-            for data in data_list:
-                obj = await self.create_with_event(data, emit_event=emit_events)
-                created_objects.append(obj)
-            return created_objects
-
-        # Эмитим события для всех созданных объектов
-        if self._should_emit_event(emit_events):
-            for db_obj in created_objects:
-                event = CreateEvent(
-                    entity_data=db_obj,
-                    source=self._event_source,
-                    version=self._event_version,
-                    metadata={**self._get_event_metadata(), "bulk_operation": True, "batch_size": len(created_objects)},
+            # Fallback - одна вставка всех объектов
+            try:
+                created_objects = [self._model(**row) for row in rows]
+                self._db.add_all(created_objects)
+                await commit_or_flush(self._db)
+            except Exception as e:
+                await rollback_unless_in_unit_of_work(self._db)
+                logger.error(f"Error bulk creating {self._model.__name__} with events: {e}")
+                raise CoreRepositoryValueError("bulk_create_with_events", "data_list", f"{len(rows)} rows") from e
+
+        # Эмитим события пачками через фоновую очередь после коммита создания
+        if self._should_emit_event(emit_events) and not staged:
+            events = self._build_bulk_events(created_objects)
+
+            async def submit_events() -> None:
+                queue = get_event_queue()
+                for event in events:
+                    queue.submit(event)
+                logger.info(
+                    f"Queued {len(events)} BulkEvents for {len(created_objects)} {self._model.__name__} objects"
                 )
-                event.emit()
 
-            logger.info(f"Emitted {len(created_objects)} CreateEvents for bulk operation")
+            await run_after_commit(self._db, submit_events)
 
         return created_objects
@@ -0,0 +1,346 @@
+"""
+Transactional outbox - доставка событий репозиториев в брокер.
+
+Событие записывается в таблицу ``outbox_events`` в той же транзакции, что и
+изменение сущности, поэтому событие не теряется при сбое после коммита и не
+появляется, если транзакция откатилась. Запрос не ждет брокер: фоновый
+:class:`OutboxRelay` читает неотправленные события пачками в порядке ``seq``,
+передает их в sink назначения (``MessageClient`` или realtime каналы) и
+отмечает ``published_at``.
+
+Доставка at-least-once: при сбое между публикацией и отметкой пачка уйдет
+повторно, поэтому получатели дедуплицируют сообщения по ``id`` события
+(ключ идемпотентности, он же ``message_id`` в RabbitMQ).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import TYPE_CHECKING, Any, Protocol
+
+from opentelemetry import trace
+from pytz import utc
+from sqlalchemy import (
+    JSON,
+    UUID,
+    BigInteger,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    delete,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.base.models import BaseModel as SQLAlchemyBaseModel
+
+from .events import BaseEvent
+
+if TYPE_CHECKING:
+    from core.messaging.core import MessageClient
+    from core.realtime.connection_manager import ConnectionManager
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# Ключ pg_advisory_xact_lock: события читает один relay, порядок сохраняется
+OUTBOX_LOCK_KEY = 0x6F7574626F78
+
+
+class OutboxEvent(SQLAlchemyBaseModel):
+    """Событие, ожидающее отправки.
+
+    ``seq`` задает порядок доставки, ``id`` совпадает с id события и служит
+    ключом идемпотентности.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        UniqueConstraint("id", name="uq_outbox_events_id"),
+        Index("ix_outbox_events_pending", "seq", postgresql_where=text("published_at IS NULL")),
+    )
+
+    seq: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
+    event_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    aggregate_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    aggregate_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    destination: Mapped[str] = mapped_column(String(32), nullable=False, default="messaging")
+    routing_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, default=None)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    def to_message(self) -> dict[str, Any]:
+        """Сообщение для брокера (формат ``MessageModel``)."""
+        return {
+            "id": str(self.id),
+            "type": self.event_type,
+            "source": "outbox",
+            "timestamp": self.payload.get("timestamp"),
+            "correlation_id": self.aggregate_id,
+            "payload": self.payload,
+        }
+
+
+def stage_event(
+    session: AsyncSession,
+    event: BaseEvent,
+    *,
+    aggregate_type: str,
+    destination: str = "messaging",
+    routing_key: str | None = None,
+) -> OutboxEvent:
+    """Добавить событие в outbox текущей транзакции сессии.
+
+    Запись попадет в БД вместе с ближайшим flush/commit сессии.
+
+    :param session: Сессия, в которой изменяется сущность
+    :param event: Событие
+    :param aggregate_type: Тип сущности (имя модели)
+    :param destination: Sink назначения ("messaging", "realtime")
+    :param routing_key: Routing key (или канал для realtime)
+    :return: Добавленная запись outbox
+    """
+    row = OutboxEvent(
+        id=uuid.UUID(event.id),
+        event_type=event.event_type,
+        aggregate_type=aggregate_type,
+        aggregate_id=event.get_entity_id(),
+        destination=destination,
+        routing_key=routing_key,
+        payload=event.model_dump(mode="json"),
+    )
+    session.add(row)
+    return row
+
+
+class OutboxSink(Protocol):
+    """Назначение событий outbox; ``send`` завершается после подтверждения доставки."""
+
+    async def send(self, events: list[OutboxEvent]) -> None: ...
+
+
+class MessagingOutboxSink:
+    """Отправка событий в RabbitMQ через ``MessageClient.publish_many``.
+
+    Подряд идущие события с одинаковым routing key публикуются одной пачкой,
+    порядок событий сохраняется.
+
+    :param client: Клиент сообщений
+    :param exchange_name: Exchange для событий
+    """
+
+    def __init__(self, client: MessageClient, exchange_name: str = "system") -> None:
+        self.client = client
+        self.exchange_name = exchange_name
+
+    async def send(self, events: list[OutboxEvent]) -> None:
+        for routing_key, group in groupby(events, key=lambda event: event.routing_key):
+            await self.client.publish_many(
+                [event.to_message() for event in group], exchange_name=self.exchange_name, routing_key=routing_key
+            )
+
+
+class RealtimeOutboxSink:
+    """Рассылка событий в realtime каналы (канал = routing key события).
+
+    :param manager: Менеджер realtime соединений
+    """
+
+    def __init__(self, manager: ConnectionManager) -> None:
+        self.manager = manager
+
+    async def send(self, events: list[OutboxEvent]) -> None:
+        from core.realtime.models import MessageType, WSMessage
+
+        for event in events:
+            channel = event.routing_key or event.aggregate_type
+            message = WSMessage(id=str(event.id), type=MessageType.CHANNEL, channel=channel, data=event.to_message())
+            await self.manager.broadcast_to_channel(channel, message)
+
+
+@dataclass
+class OutboxRelayStats:
+    """Метрики relay.
+
+    :param batches: Отправленных пачек
+    :param published: Отправленных событий
+    :param failed: Неудачных попыток отправки событий
+    :param last_batch_size: Размер последней пачки
+    :param lag_seconds: Возраст самого старого события последней пачки
+    :param last_run_at: Время последнего прохода (unix time)
+    """
+
+    batches: int = 0
+    published: int = 0
+    failed: int = 0
+    last_batch_size: int = 0
+    lag_seconds: float = 0.0
+    last_run_at: float = 0.0
+
+
+class OutboxRelay:
+    """Фоновая доставка событий outbox.
+
+    :param session_factory: Фабрика сессий (например, ``AsyncSessionLocal``)
+    :param sinks: Sink по имени назначения
+    :param batch_size: Максимальный размер пачки
+    :param poll_interval: Пауза между проходами, когда очередь пуста, сек
+    :param max_attempts: После стольких неудач событие пропускается (остается в таблице)
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        sinks: dict[str, OutboxSink],
+        *,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        max_attempts: int = 10,
+    ) -> None:
+        self.session_factory = session_factory
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.stats = OutboxRelayStats()
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    async def relay_once(self) -> int:
+        """Отправить одну пачку событий.
+
+        :return: Количество отправленных событий
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                if session.bind.dialect.name == "postgresql":
+                    locked = await session.scalar(select(text(f"pg_try_advisory_xact_lock({OUTBOX_LOCK_KEY})")))
+                    if not locked:
+                        return 0
+
+                query = (
+                    select(OutboxEvent)
+                    .where(OutboxEvent.published_at.is_(None), OutboxEvent.attempts < self.max_attempts)
+                    .order_by(OutboxEvent.seq)
+                    .limit(self.batch_size)
+                    .with_for_update()
+                )
+                events = list((await session.execute(query)).scalars())
+                if not events:
+                    self.stats.last_batch_size = 0
+                    self.stats.lag_seconds = 0.0
+                    return 0
+
+                with tracer.start_as_current_span("outbox.relay") as span:
+                    published = await self._deliver(session, events)
+                    span.set_attribute("outbox.batch_size", len(events))
+                    span.set_attribute("outbox.published", published)
+                    span.set_attribute("outbox.lag_ms", int(self.stats.lag_seconds * 1000))
+                return published
+
+    async def _deliver(self, session: AsyncSession, events: list[OutboxEvent]) -> int:
+        now = datetime.now(tz=utc)
+        oldest = events[0].created_at
+        if oldest is not None:
+            if oldest.tzinfo is None:
+                oldest = oldest.replace(tzinfo=utc)
+            self.stats.lag_seconds = max((now - oldest).total_seconds(), 0.0)
+
+        delivered: list[uuid.UUID] = []
+        # Подряд идущие события одного назначения - одна отправка; после сбоя
+        # остаток пачки не отправляется, чтобы не нарушать порядок
+        for destination, group in groupby(events, key=lambda event: event.destination):
+            chunk = list(group)
+            sink = self.sinks.get(destination)
+            try:
+                if sink is None:
+                    raise LookupError(f"No outbox sink for destination '{destination}'")
+                await sink.send(chunk)
+            except Exception as e:
+                logger.error(f"Outbox relay failed to deliver {len(chunk)} events to {destination}: {e}")
+                self.stats.failed += len(chunk)
+                await session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.seq.in_([event.seq for event in chunk]))
+                    .values(attempts=OutboxEvent.attempts + 1, last_error=str(e)[:1000])
+                )
+                break
+            delivered.extend(event.seq for event in chunk)
+
+        if delivered:
+            await session.execute(
+                update(OutboxEvent).where(OutboxEvent.seq.in_(delivered)).values(published_at=now)
+            )
+
+        self.stats.batches += 1
+        self.stats.published += len(delivered)
+        self.stats.last_batch_size = len(events)
+        self.stats.last_run_at = time.time()
+        return len(delivered)
+
+    async def run(self) -> None:
+        """Отправлять события, пока не вызван ``stop``."""
+        self._stopping.clear()
+        while not self._stopping.is_set():
+            try:
+                published = await self.relay_once()
+            except Exception as e:
+                logger.error(f"Outbox relay error: {e}")
+                published = 0
+
+            if published < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        """Запустить relay в фоновой задаче."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Остановить relay после текущей пачки."""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def purge(self, older_than: timedelta) -> int:
+        """Удалить отправленные события старше ``older_than``.
+
+        :return: Количество удаленных записей
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(OutboxEvent).where(
+                        OutboxEvent.published_at.is_not(None),
+                        OutboxEvent.published_at < datetime.now(tz=utc) - older_than,
+                    )
+                )
+        return result.rowcount or 0
+
+    def get_stats(self) -> dict[str, Any]:
+        """Метрики relay в виде словаря."""
+        return asdict(self.stats)
+
@@ -0,0 +1,170 @@
+"""
+Unit of work - один коммит на несколько операций репозиториев.
+
+По умолчанию каждый метод репозитория коммитит свою операцию. Внутри
+``async with UnitOfWork(session)`` методы репозиториев этой сессии только
+отправляют изменения в базу (``flush``), а коммит выполняется один раз при
+выходе из блока; при исключении вся работа откатывается.
+
+Вложенный ``UnitOfWork`` на той же сессии присоединяется к внешнему.
+
+Побочные эффекты, видимые вне транзакции (инвалидация кэша, отправка
+событий), регистрируются через ``run_after_commit`` и выполняются только
+после настоящего COMMIT; при откате они отбрасываются.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+logger = logging.getLogger(__name__)
+
+# Ключ Session.info с активным unit of work
+UOW_KEY = "unit_of_work"
+
+# Действие после коммита: инвалидация кэша, отправка событий
+AfterCommitCallback = Callable[[], Awaitable[None]]
+
+
+class UnitOfWork:
+    """
+    Транзакция запроса поверх сессии, общей для нескольких репозиториев.
+
+    :param session: async SQLAlchemy сессия репозиториев
+    :param returning: Получать server default через ``RETURNING`` в самом
+        INSERT/UPDATE вместо отдельного ``refresh()`` (SELECT) после flush
+
+    Example:
+        ```python
+        async with UnitOfWork(db):
+            user = await user_repo.create(user_data)
+            await profile_repo.create({"user_id": user.id})
+        # Один COMMIT; при ошибке не сохранится ни пользователь, ни профиль
+        ```
+    """
+
+    def __init__(self, session: AsyncSession, *, returning: bool = True) -> None:
+        self.session = session
+        self.returning = returning
+        self._joined = False
+        self._after_commit: list[AfterCommitCallback] = []
+
+    async def __aenter__(self) -> UnitOfWork:
+        active = get_unit_of_work(self.session)
+        if active is not None:
+            self._joined = True
+            return active
+
+        self.session.info[UOW_KEY] = self
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        if self._joined:
+            return False
+
+        self.session.info.pop(UOW_KEY, None)
+        callbacks, self._after_commit = self._after_commit, []
+        if exc_type is not None:
+            await self.session.rollback()
+            return False
+
+        try:
+            await self.session.commit()
+        except Exception as e:
+            logger.error(f"Unit of work commit failed: {e}")
+            await self.session.rollback()
+            raise
+
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                # Данные уже закоммичены - ошибка побочного эффекта не отменяет их
+                logger.error(f"Unit of work after-commit callback failed: {e}")
+        return False
+
+    def after_commit(self, callback: AfterCommitCallback) -> None:
+        """
+        Выполнить действие после успешного коммита unit of work.
+
+        :param callback: Корутинная функция без аргументов
+        """
+        self._after_commit.append(callback)
+
+    def savepoint(self) -> AsyncSessionTransaction:
+        """
+        Savepoint внутри unit of work для необязательного шага.
+
+        Ошибка внутри ``async with uow.savepoint()`` откатывает только изменения
+        этого шага, и сессия остается пригодной для остальных операций.
+
+        :return: Вложенная транзакция сессии для ``async with``
+
+        Example:
+            ```python
+            async with repo.unit_of_work() as uow:
+                try:
+                    async with uow.savepoint():
+                        await audit_repo.create(audit_data)
+                except CoreRepositoryException:
+                    logger.warning("Audit skipped")
+                await repo.create(data)
+            ```
+        """
+        return self.session.begin_nested()
+
+
+def get_unit_of_work(session: AsyncSession) -> UnitOfWork | None:
+    """
+    Получить активный unit of work сессии.
+
+    :param session: async SQLAlchemy сессия
+    :return: UnitOfWork или None, если сессия в режиме автокоммита
+    """
+    return session.info.get(UOW_KEY)
+
+
+async def commit_or_flush(session: AsyncSession) -> None:
+    """
+    Закоммитить изменения или, внутри unit of work, только отправить их в базу.
+
+    :param session: async SQLAlchemy сессия
+    """
+    if get_unit_of_work(session) is None:
+        await session.commit()
+    else:
+        await session.flush()
+
+
+async def run_after_commit(session: AsyncSession, callback: AfterCommitCallback) -> None:
+    """
+    Выполнить действие после коммита изменений сессии.
+
+    Без unit of work репозиторий уже закоммитил свою операцию, и действие
+    выполняется сразу; внутри unit of work - после его COMMIT.
+
+    :param session: async SQLAlchemy сессия
+    :param callback: Корутинная функция без аргументов
+    """
+    uow = get_unit_of_work(session)
+    if uow is None:
+        await callback()
+    else:
+        uow.after_commit(callback)
+
+
+async def rollback_unless_in_unit_of_work(session: AsyncSession) -> None:
+    """
+    Откатить транзакцию, если ею не управляет unit of work.
+
+    Внутри unit of work откат выполняет сам unit of work при выходе с
+    исключением, иначе частичный откат привел бы к коммиту остальных операций.
+
+    :param session: async SQLAlchemy сессия
+    """
+    if get_unit_of_work(session) is None:
+        await session.rollback()
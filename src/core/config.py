@@ -44,13 +44,14 @@ Note:
 
 from __future__ import annotations
 
+import json
 from datetime import tzinfo
 from functools import lru_cache
-from typing import Any, Self
+from typing import Annotated, Any, Literal, Self
 
 import pytz
 from pydantic import field_validator, model_validator
-from pydantic_settings import SettingsConfigDict
+from pydantic_settings import NoDecode, SettingsConfigDict
 
 from constants import ENV_FILE
 from core.exceptions import CoreConfigValueError
@@ -155,6 +156,22 @@ class Settings(BaseSettings):
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 1800
     DB_ECHO: bool = False
+    # direct: app-side pool straight to PostgreSQL; pgbouncer_transaction: behind PgBouncer in
+    # transaction mode (no prepared statement reuse); nullpool: a new connection per checkout
+    DB_POOL_MODE: Literal["direct", "pgbouncer_transaction", "nullpool"] = "direct"
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection, direct mode
+
+    # Read replicas: get_read_db sends SELECTs to replicas until the session's first write
+    DB_REPLICA_URIS: Annotated[list[str], NoDecode] = []  # parsed by assemble_replica_uris, not as JSON
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_connections"] = "round_robin"
+    DB_REPLICA_MAX_LAG: float = 5.0  # seconds; lagging replicas fall back to the primary
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 5.0
+
+    # SQL profiler: slow query log and per-request N+1 detection
+    QUERY_PROFILER_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 10  # same statement fingerprint more than N times per request
+    N_PLUS_ONE_RAISE: bool = False  # raise instead of logging a warning (useful in tests)
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -169,6 +186,21 @@ class Settings(BaseSettings):
     RABBITMQ_PASSWORD: str = "guest"
     RABBITMQ_VHOST: str = "/"
     RABBITMQ_URL: str | None = None
+    RABBITMQ_PUBLISH_BATCH_SIZE: int = 100
+    RABBITMQ_PUBLISH_LINGER_MS: int = 5
+    RABBITMQ_MAX_UNCONFIRMED: int = 1000  # publish_many blocks above this many unconfirmed messages
+    RABBITMQ_PREFETCH_COUNT: int = 20
+    RABBITMQ_CONSUMER_CONCURRENCY: int = 10
+    RABBITMQ_ACK_BATCH_SIZE: int = 10
+    RABBITMQ_MAX_RETRIES: int = 5
+    RABBITMQ_RETRY_BASE_DELAY_MS: int = 1000
+    RABBITMQ_RETRY_MAX_DELAY_MS: int = 300_000
+
+    # Transactional outbox
+    OUTBOX_RELAY_ENABLED: bool = False
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
 
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
@@ -208,6 +240,35 @@ class Settings(BaseSettings):
             config_key="CORS_ORIGINS", value=v, reason="Must be a comma-separated string or list of URLs"
         )
 
+    @field_validator("DB_REPLICA_URIS", mode="before")
+    @classmethod
+    def assemble_replica_uris(cls, v: str | list[str]) -> list[str]:
+        """Assemble read replica URIs list.
+
+        Args:
+            v (str | list[str]): Comma-separated string, JSON array or list of database URIs
+
+        Returns:
+            list[str]: List of replica URIs (empty string means no replicas)
+
+        Example:
+            Environment variable::
+
+                DB_REPLICA_URIS=postgresql+asyncpg://replica-1/app,postgresql+asyncpg://replica-2/app
+        """
+        if isinstance(v, str) and v.strip().startswith("["):
+            try:
+                v = json.loads(v)
+            except ValueError:
+                pass
+        if isinstance(v, str):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        elif isinstance(v, list) and all(isinstance(i, str) for i in v):
+            return v
+        raise CoreConfigValueError(
+            config_key="DB_REPLICA_URIS", value="[hidden]", reason="Must be a comma-separated string or list of URIs"
+        )
+
     COOKIE_SECURE: bool = True
     COOKIE_SAMESITE: str = "Lax"
     COOKIE_MAX_AGE: int = 3600
@@ -227,6 +288,11 @@ class Settings(BaseSettings):
     ENABLE_ALERTS: bool = False
     ALERT_EMAIL: str | None = None
     ALERT_SLACK_WEBHOOK: str | None = None
+    NOTIFICATION_QUEUE_SIZE: int = 1000
+    NOTIFICATION_DIGEST_WINDOW: float = 300.0
+    NOTIFICATION_MAX_TRACKED_ERRORS: int = 1000
+    NOTIFICATION_HTTP_TIMEOUT: float = 10.0
+    NOTIFICATION_HTTP_MAX_CONNECTIONS: int = 10
 
     ENABLE_BACKGROUND_TASKS: bool = True
     MAX_BACKGROUND_WORKERS: int = 4
@@ -237,11 +303,32 @@ class Settings(BaseSettings):
     TASKIQ_MAX_RETRIES: int = 3
     TASKIQ_RETRY_DELAY: int = 5
     TASKIQ_TASK_TIMEOUT: int = 300
+    TASKIQ_BROKER_TYPE: Literal["list", "stream"] = "list"
+    TASKIQ_QUEUE_NAME: str = "taskiq"
+    TASKIQ_MAX_CONNECTIONS: int = 50
+    TASKIQ_RESULT_TTL: int = 3600
+    TASKIQ_RESULT_MAX_SIZE: int = 1_048_576
+    TASKIQ_KIQ_MANY_CHUNK_SIZE: int = 500
+    TASKIQ_STREAM_MAXLEN: int | None = 1_000_000
+    TASKIQ_STREAM_IDLE_TIMEOUT_MS: int = 600_000
+
+    # Periodic scheduler settings
+    SCHEDULER_LOCK_URL: str | None = None
+    SCHEDULER_LOCK_PREFIX: str = "scheduler:lock"
+    SCHEDULER_DEFAULT_JITTER: float = 10.0
+    SCHEDULER_LAG_WARNING: float = 60.0
 
     TRACING_ENABLED: bool = False
     OTEL_EXPORTER_OTLP_ENDPOINT: str = "localhost:4317"
     OTEL_EXPORTER_OTLP_INSECURE: bool = True
 
+    # Prometheus metrics endpoint (unauthenticated unless METRICS_TOKEN is set)
+    METRICS_ENABLED: bool = False
+    METRICS_PATH: str = "/metrics"
+    METRICS_TOKEN: str | None = None  # Bearer token required from the scraper
+    METRICS_MULTIPROC_DIR: str | None = None  # shared by uvicorn workers, cleared on deploy
+    METRICS_FLUSH_INTERVAL: float = 5.0
+
     # Telegram Bots settings (can be overridden in TelegramBotsConfig)
     TELEGRAM_BOTS_ENABLED: bool = False
     TELEGRAM_DEBUG: bool = False
@@ -257,6 +344,8 @@ class Settings(BaseSettings):
     WEBSOCKET_MAX_CONNECTIONS: int = 1000
     WEBSOCKET_MESSAGE_QUEUE_SIZE: int = 100
     WEBSOCKET_DISCONNECT_TIMEOUT: int = 60
+    WEBSOCKET_COMPRESSION_THRESHOLD: int = 1024  # bytes, msgpack frames above it are zlib-compressed
+    WEBSOCKET_COMPRESSION_LEVEL: int = 6
 
     # SSE settings
     SSE_HEARTBEAT_INTERVAL: int = 30  # seconds
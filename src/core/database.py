@@ -5,8 +5,10 @@ for both PostgreSQL and SQLite databases with OpenTelemetry tracing integration.
 
 Features:
     - Async SQLAlchemy engine configuration
-    - Connection pooling for PostgreSQL
+    - Connection pooling for PostgreSQL, directly or behind PgBouncer (``DB_POOL_MODE``)
     - Session management with dependency injection
+    - Optional read replica routing with read-your-writes pinning
+    - Slow query log and N+1 detection (``core.query_profiler``)
     - OpenTelemetry tracing integration
     - Automatic rollback on errors
 
@@ -32,6 +34,16 @@ Example:
             result = await db.execute(text("SELECT * FROM users"))
             return result.fetchall()
 
+    Read-heavy routes opt in to replicas (``DB_REPLICA_URIS``)::
+
+        from core.database import get_read_db
+
+        @app.get("/users/stats")
+        async def users_stats(db: AsyncSession = Depends(get_read_db)):
+            # SELECTs go to a replica; after the first write the session stays on the primary
+            result = await db.execute(text("SELECT count(*) FROM users"))
+            return result.scalar()
+
     Manual session management::
 
         from core.database import AsyncSessionLocal
@@ -52,35 +64,246 @@ Note:
 
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import asyncio
+import itertools
+import logging
+import math
+import uuid
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any
 
 from opentelemetry import trace
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import NullPool
 
 from .config import get_settings
+from .exceptions import CoreConfigValueError
+from .query_profiler import get_query_profiler
 
+logger = logging.getLogger(__name__)
 tracer = trace.get_tracer(__name__)
 settings = get_settings()
 
+DB_POOL_MODES = ("direct", "pgbouncer_transaction", "nullpool")
+REPLICA_STRATEGIES = ("round_robin", "least_connections")
+
+# Replication lag in seconds per dialect; dialects without a query are treated as not lagging.
+# A replica that has replayed everything it received is not lagging even if the primary is idle.
+REPLICA_LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+# Session.info key set once the session has written to the primary
+PRIMARY_PINNED = "primary_pinned"
+
+
+def _unique_statement_name() -> str:
+    # PgBouncer hands each transaction to any server connection: names must never repeat
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def engine_options(uri: str, pool_mode: str = "direct") -> dict[str, Any]:
+    """Build ``create_async_engine`` keyword arguments for a database and pool mode.
+
+    Modes:
+        - ``direct``: pooled connections straight to PostgreSQL, asyncpg keeps
+          ``DB_PREPARED_STATEMENT_CACHE_SIZE`` prepared statements per connection.
+        - ``pgbouncer_transaction``: pooled connections to PgBouncer in transaction
+          mode. A transaction may run on any server connection, so prepared
+          statements are never cached and get unique names. Connections are
+          pinged on checkout because PgBouncer closes idle client connections.
+        - ``nullpool``: a new connection per checkout (an external pooler owns
+          pooling); nothing outlives the connection, so no statement caching.
+
+    Args:
+        uri: Database URI
+        pool_mode: One of ``DB_POOL_MODES``
+
+    Returns:
+        dict[str, Any]: Engine options; SQLite always uses NullPool
+
+    Raises:
+        CoreConfigValueError: Unknown pool mode
+    """
+    if pool_mode not in DB_POOL_MODES:
+        raise CoreConfigValueError(config_key="DB_POOL_MODE", value=pool_mode, reason=f"Must be one of {DB_POOL_MODES}")
+
+    if uri.startswith("sqlite"):
+        # For SQLite use simplified configuration
+        return {"echo": settings.DB_ECHO, "poolclass": NullPool}
+
+    options: dict[str, Any] = {"echo": settings.DB_ECHO}
+    if pool_mode == "nullpool":
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=pool_mode == "pgbouncer_transaction",
+        )
+
+    if make_url(uri).get_driver_name() == "asyncpg":
+        if pool_mode == "direct":
+            options["connect_args"] = {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+        else:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _unique_statement_name,
+            }
+    return options
+
+
+def create_engine_for(uri: str, pool_mode: str | None = None) -> AsyncEngine:
+    """Create an async engine with the pool configuration for its database.
+
+    Args:
+        uri: Database URI
+        pool_mode: Pool mode, ``DB_POOL_MODE`` by default
+
+    Returns:
+        AsyncEngine: Engine configured by :func:`engine_options`
+    """
+    return create_async_engine(uri, **engine_options(uri, pool_mode or settings.DB_POOL_MODE))
+
+
+class ReplicaRouter:
+    """Chooses a read replica for SELECT statements.
+
+    Replicas whose last measured lag exceeds ``max_lag`` (or that failed the
+    lag check) are skipped; when none is left, reads go to the primary.
+
+    Args:
+        replicas: Replica engines
+        strategy: ``"round_robin"`` or ``"least_connections"`` (fewest checked-out connections)
+        max_lag: Maximum replication lag in seconds
+        lag_check_interval: Interval of the background lag check in seconds
+
+    Raises:
+        CoreConfigValueError: Unknown strategy
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[AsyncEngine],
+        strategy: str = "round_robin",
+        max_lag: float = 5.0,
+        lag_check_interval: float = 5.0,
+    ) -> None:
+        if strategy not in REPLICA_STRATEGIES:
+            raise CoreConfigValueError(
+                config_key="DB_REPLICA_STRATEGY", value=strategy, reason=f"Must be one of {REPLICA_STRATEGIES}"
+            )
+
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.lag = [0.0] * len(self.replicas)
+        self.in_use = [0] * len(self.replicas)
+        self._counter = itertools.count()
+        self._task: asyncio.Task | None = None
+
+        for index, replica in enumerate(self.replicas):
+            event.listen(replica.sync_engine, "checkout", self._tracker(index, 1))
+            event.listen(replica.sync_engine, "checkin", self._tracker(index, -1))
+
+    def _tracker(self, index: int, delta: int) -> Any:
+        def track(*args: Any) -> None:
+            self.in_use[index] += delta
+
+        return track
+
+    def choose(self) -> AsyncEngine | None:
+        """Pick a replica for the next read.
+
+        Returns:
+            AsyncEngine | None: Replica engine, or None to use the primary
+        """
+        healthy = [index for index, lag in enumerate(self.lag) if lag <= self.max_lag]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            index = min(healthy, key=self.in_use.__getitem__)
+        else:
+            index = healthy[next(self._counter) % len(healthy)]
+        return self.replicas[index]
+
+    async def check_lag(self) -> None:
+        """Measure replication lag of every replica; unreachable replicas get infinite lag."""
+        for index, replica in enumerate(self.replicas):
+            query = REPLICA_LAG_QUERIES.get(replica.dialect.name)
+            if query is None:
+                self.lag[index] = 0.0
+                continue
+            try:
+                async with replica.connect() as connection:
+                    self.lag[index] = float(await connection.scalar(text(query)) or 0.0)
+            except Exception as e:
+                logger.warning(f"Replica lag check failed for {replica.url.host}: {e}")
+                self.lag[index] = math.inf
+
+    def start(self) -> None:
+        """Start the background lag check in the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.lag_check_interval)
+
+    async def stop(self) -> None:
+        """Stop the background lag check."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica chosen by ``router``.
+
+    Flushes, DML, ``SELECT ... FOR UPDATE`` and connections requested without a
+    statement go to the primary and pin the session there, so the rest of the
+    request reads its own writes.
+
+    Args:
+        router: Replica router; without it every statement goes to the primary
+    """
+
+    def __init__(self, *args: Any, router: ReplicaRouter | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        if self.router is not None and not self.info.get(PRIMARY_PINNED):
+            if isinstance(clause, Select) and clause._for_update_arg is None and not self._flushing:
+                replica = self.router.choose()
+                if replica is not None:
+                    return replica.sync_engine
+            else:
+                self.info[PRIMARY_PINNED] = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+# Slow query log and N+1 detection for every engine
+if settings.QUERY_PROFILER_ENABLED:
+    get_query_profiler().install()
+
 # Create async engine
-if settings.SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
-    # For SQLite use simplified configuration
-    engine = create_async_engine(
-        settings.SQLALCHEMY_DATABASE_URI,
-        echo=settings.DB_ECHO,
-        poolclass=NullPool,
-    )
-else:
-    # For PostgreSQL use full pool configuration
-    engine = create_async_engine(
-        settings.SQLALCHEMY_DATABASE_URI,
-        echo=settings.DB_ECHO,
-        pool_size=settings.DB_POOL_SIZE,
-        max_overflow=settings.DB_MAX_OVERFLOW,
-        pool_timeout=settings.DB_POOL_TIMEOUT,
-        pool_recycle=settings.DB_POOL_RECYCLE,
-    )
+engine = create_engine_for(settings.SQLALCHEMY_DATABASE_URI)
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -89,6 +312,27 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read replicas (optional)
+replica_engines = [create_engine_for(uri) for uri in settings.DB_REPLICA_URIS]
+replica_router = (
+    ReplicaRouter(
+        replica_engines,
+        strategy=settings.DB_REPLICA_STRATEGY,
+        max_lag=settings.DB_REPLICA_MAX_LAG,
+        lag_check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+    )
+    if replica_engines
+    else None
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    router=replica_router,
+    expire_on_commit=False,
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession]:
     """Get database session with tracing and error handling.
@@ -150,3 +394,35 @@ async def get_db() -> AsyncGenerator[AsyncSession]:
                 raise
             finally:
                 await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession]:
+    """Get database session that reads from replicas.
+
+    Plain SELECTs are routed to a replica (``DB_REPLICA_URIS``) by the configured
+    strategy. After the first write the session is pinned to the primary, so the
+    request reads its own writes. Without replicas, or when every replica lags
+    more than ``DB_REPLICA_MAX_LAG`` seconds, all statements go to the primary.
+
+    Yields:
+        AsyncSession: Routing database session instance
+
+    Example:
+        FastAPI dependency injection::
+
+            @app.get("/profiles")
+            async def list_profiles(db: AsyncSession = Depends(get_read_db)):
+                result = await db.execute(select(Profile).limit(20))
+                return result.scalars().all()
+    """
+    with tracer.start_as_current_span("database.get_read_db") as span:
+        async with AsyncReadSessionLocal() as session:
+            try:
+                span.set_attribute("db.replicas", len(replica_engines))
+                yield session
+            except Exception as e:
+                span.set_attribute("error", str(e))
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
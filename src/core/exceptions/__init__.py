@@ -39,6 +39,7 @@ from .core_base import (  # Core infrastructure exceptions
     CoreRealtimeException,
     CoreRealtimeMessageError,
     CoreRepositoryException,
+    CoreRepositoryNPlusOneError,
     CoreRepositoryQueryError,
     CoreRepositoryValueError,
     CoreStreamingAPIException,
@@ -47,6 +48,7 @@ from .core_base import (  # Core infrastructure exceptions
     CoreStreamingValueError,
     CoreTaskiqBrokerError,
     CoreTaskiqException,
+    CoreTaskiqResultSizeError,
     CoreTaskiqValidationError,
     CoreTaskiqWorkerError,
     CoreTelegramConfigError,
@@ -59,7 +61,14 @@ from .core_base import (  # Core infrastructure exceptions
 )
 from .handlers import ExceptionContext, format_error_response, setup_exception_handlers
 from .middleware import ExceptionHandlingMiddleware, ExceptionLoggingMiddleware
-from .notifications import EmailNotifier, NotificationManager, SlackNotifier, TelegramNotifier
+from .notifications import (
+    EmailNotifier,
+    NotificationManager,
+    SlackNotifier,
+    TelegramNotifier,
+    close_notification_manager,
+    get_notification_manager,
+)
 
 __all__ = [
     # Base layer exceptions
@@ -88,12 +97,14 @@ __all__ = [
     "CoreTaskiqWorkerError",
     "CoreTaskiqBrokerError",
     "CoreTaskiqValidationError",
+    "CoreTaskiqResultSizeError",
     "CoreTelegramException",
     "CoreTelegramConfigError",
     "CoreTelegramValueError",
     "CoreRepositoryException",
     "CoreRepositoryValueError",
     "CoreRepositoryQueryError",
+    "CoreRepositoryNPlusOneError",
     "CoreToolsException",
     "CoreToolsTypeError",
     "CoreToolsValidationError",
@@ -112,4 +123,6 @@ __all__ = [
     "TelegramNotifier",
     "EmailNotifier",
     "SlackNotifier",
+    "get_notification_manager",
+    "close_notification_manager",
 ]
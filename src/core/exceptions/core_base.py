@@ -292,6 +292,14 @@ class CoreTaskiqValidationError(CoreTaskiqException):
         super().__init__(message=message, task_name=task_name, context={"validation_error": validation_error})
 
 
+class CoreTaskiqResultSizeError(CoreTaskiqException):
+    """TaskIQ task result exceeds the size limit."""
+
+    def __init__(self, task_name: str, size: int, limit: int):
+        message = f"Result of task '{task_name}' is {size} bytes, limit is {limit} bytes"
+        super().__init__(message=message, task_name=task_name, context={"size": size, "limit": limit})
+
+
 # ============================================================================
 # REPOSITORY COMPONENT EXCEPTIONS
 # ============================================================================
@@ -315,6 +323,20 @@ class CoreRepositoryQueryError(CoreRepositoryException):
         super().__init__(message=message, operation=operation, context={"query_type": query_type})
 
 
+class CoreRepositoryNPlusOneError(CoreRepositoryException):
+    """The same SQL statement was repeated too many times within one request (N+1 queries)."""
+
+    def __init__(self, fingerprint: str, count: int, scope: str | None = None):
+        message = f"N+1 queries: statement executed {count} times"
+        if scope:
+            message += f" in {scope}"
+        super().__init__(
+            message=message,
+            operation="n_plus_one",
+            context={"fingerprint": fingerprint, "count": count, "scope": scope},
+        )
+
+
 # ============================================================================
 # TOOLS COMPONENT EXCEPTIONS
 # ============================================================================
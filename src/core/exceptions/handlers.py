@@ -12,10 +12,9 @@ from typing import Any
 import structlog
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 
 from .base import BaseAPIException, BaseDependsException, BaseRepoException, BaseServiceException
-from .notifications import NotificationManager
+from .notifications import get_notification_manager
 
 logger = structlog.get_logger(__name__)
 
@@ -212,7 +211,7 @@ async def handle_repo_exception(request: Request, exc: BaseRepoException) -> JSO
     )
 
     # Notify developers about critical database issues
-    notification_manager = NotificationManager()
+    notification_manager = get_notification_manager()
     await notification_manager.notify_critical_error(
         title="Database Error",
         message=f"Repository exception in {exc.table or 'unknown table'}: {exc.message}",
@@ -296,7 +295,7 @@ async def handle_generic_exception(request: Request, exc: Exception) -> JSONResp
     )
 
     # Notify developers about unhandled exceptions
-    notification_manager = NotificationManager()
+    notification_manager = get_notification_manager()
     await notification_manager.notify_critical_error(
         title="Unhandled Exception",
         message=f"Unexpected error: {exc.__class__.__name__}: {str(exc)}",
@@ -3,23 +3,28 @@ Exception handling and logging middleware.
 
 This module provides middleware components for centralized exception handling,
 request/response logging, and performance monitoring.
+
+The middlewares are plain ASGI applications: unlike ``BaseHTTPMiddleware``
+they do not run the endpoint in a separate task or re-wrap the response
+body, so streaming responses (SSE) pass through unchanged. Response headers
+are added to the ``http.response.start`` message.
 """
 
 import logging
 import time
 import uuid
-from typing import Any, Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .handlers import ExceptionContext
-from .notifications import NotificationManager
+from .notifications import get_notification_manager
 
 logger = logging.getLogger(__name__)
 
 
-class ExceptionHandlingMiddleware(BaseHTTPMiddleware):
+class ExceptionHandlingMiddleware:
     """
     Middleware for centralized exception handling.
 
@@ -27,30 +32,33 @@ class ExceptionHandlingMiddleware(BaseHTTPMiddleware):
     properly logged and processed through the notification system.
     """
 
-    def __init__(self, app, enable_notifications: bool = True):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, enable_notifications: bool = True):
+        self.app = app
         self.enable_notifications = enable_notifications
-        self.notification_manager = NotificationManager() if enable_notifications else None
+        self.notification_manager = get_notification_manager() if enable_notifications else None
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and handle any exceptions.
 
         Args:
-            request: FastAPI request object
-            call_next: Next middleware or route handler
-
-        Returns:
-            Response object
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        try:
-            # Add trace_id to request state for tracking
-            if not hasattr(request.state, "trace_id"):
-                request.state.trace_id = str(uuid.uuid4())
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
+        # Add trace_id to request state for tracking
+        if not hasattr(request.state, "trace_id"):
+            request.state.trace_id = str(uuid.uuid4())
 
+        try:
             # Process request
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
 
         except Exception as exc:
             # Create exception context
@@ -74,7 +82,7 @@ class ExceptionHandlingMiddleware(BaseHTTPMiddleware):
                 },
             )
 
-            # Send notification for critical errors
+            # Send notification for critical errors (queued, does not block)
             if self.notification_manager:
                 await self.notification_manager.notify_critical_error(
                     title="Middleware Exception",
@@ -90,7 +98,7 @@ class ExceptionHandlingMiddleware(BaseHTTPMiddleware):
             raise exc
 
 
-class ExceptionLoggingMiddleware(BaseHTTPMiddleware):
+class ExceptionLoggingMiddleware:
     """
     Middleware for request/response logging and performance monitoring.
 
@@ -100,31 +108,37 @@ class ExceptionLoggingMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         log_requests: bool = True,
         log_responses: bool = True,
         log_performance: bool = True,
         slow_request_threshold: float = 1.0,
     ):
-        super().__init__(app)
+        self.app = app
         self.log_requests = log_requests
         self.log_responses = log_responses
         self.log_performance = log_performance
         self.slow_request_threshold = slow_request_threshold
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request with logging and performance monitoring.
 
-        Args:
-            request: FastAPI request object
-            call_next: Next middleware or route handler
+        Adds ``X-Process-Time`` (time until the response headers are sent)
+        and ``X-Trace-ID`` headers to the response.
 
-        Returns:
-            Response object with added performance headers
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Start timing
         start_time = time.time()
+        request = Request(scope)
 
         # Generate trace_id if not present
         if not hasattr(request.state, "trace_id"):
@@ -134,26 +148,25 @@ class ExceptionLoggingMiddleware(BaseHTTPMiddleware):
         if self.log_requests:
             await self._log_request(request)
 
-        try:
-            # Process request
-            response = await call_next(request)
-
-            # Calculate processing time
-            process_time = time.time() - start_time
-
-            # Add performance headers
-            response.headers["X-Process-Time"] = str(process_time)
-            response.headers["X-Trace-ID"] = request.state.trace_id
+        process_time = 0.0
+        response_start: Message | None = None
 
-            # Log response
-            if self.log_responses:
-                await self._log_response(request, response, process_time)
+        async def send_wrapper(message: Message) -> None:
+            nonlocal process_time, response_start
+            if message["type"] == "http.response.start":
+                # Calculate processing time
+                process_time = time.time() - start_time
+                response_start = message
 
-            # Log slow requests
-            if self.log_performance and process_time > self.slow_request_threshold:
-                await self._log_slow_request(request, process_time)
+                # Add performance headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(process_time)
+                headers["X-Trace-ID"] = request.state.trace_id
+            await send(message)
 
-            return response
+        try:
+            # Process request
+            await self.app(scope, receive, send_wrapper)
 
         except Exception as exc:
             # Calculate processing time even for exceptions
@@ -175,6 +188,17 @@ class ExceptionLoggingMiddleware(BaseHTTPMiddleware):
             # Re-raise the exception
             raise exc
 
+        if response_start is None:
+            return
+
+        # Log response
+        if self.log_responses:
+            await self._log_response(request, response_start, process_time)
+
+        # Log slow requests
+        if self.log_performance and process_time > self.slow_request_threshold:
+            await self._log_slow_request(request, process_time)
+
     async def _log_request(self, request: Request) -> None:
         """Log incoming request details."""
         # Get client IP
@@ -201,17 +225,18 @@ class ExceptionLoggingMiddleware(BaseHTTPMiddleware):
             },
         )
 
-    async def _log_response(self, request: Request, response: Response, process_time: float) -> None:
+    async def _log_response(self, request: Request, response_start: Message, process_time: float) -> None:
         """Log response details."""
+        headers = MutableHeaders(scope=response_start)
         logger.info(
             "Request completed",
             extra={
                 "trace_id": request.state.trace_id,
                 "method": request.method,
                 "url": str(request.url),
-                "status_code": response.status_code,
+                "status_code": response_start["status"],
                 "process_time": process_time,
-                "response_size": response.headers.get("Content-Length"),
+                "response_size": headers.get("Content-Length"),
             },
         )
 
@@ -229,7 +254,7 @@ class ExceptionLoggingMiddleware(BaseHTTPMiddleware):
         )
 
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
+class RequestContextMiddleware:
     """
     Middleware for managing request context.
 
@@ -237,20 +262,24 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
     throughout the application for logging, monitoring, and debugging.
     """
 
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Add context information to request state.
 
         Args:
-            request: FastAPI request object
-            call_next: Next middleware or route handler
-
-        Returns:
-            Response object
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # Generate unique trace ID for request tracking
         request.state.trace_id = str(uuid.uuid4())
 
@@ -264,9 +293,7 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
         request.state.client_ip = self._get_client_ip(request)
 
         # Process request
-        response = await call_next(request)
-
-        return response
+        await self.app(scope, receive, send)
 
     async def _extract_user_id(self, request: Request) -> str | None:
         """
@@ -3,12 +3,19 @@ Notification system for critical errors.
 
 This module provides various notification channels for alerting developers
 about critical application errors and system failures.
+
+Notifications never block the request path: ``NotificationManager`` puts
+them into a bounded queue, and a background worker sends them through a
+shared keep-alive HTTP client. Repeats of the same error within the digest
+window are counted and sent as one digest message when the window ends.
 """
 
 import asyncio
-import json
 import logging
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
@@ -16,6 +23,39 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP client for all notifiers (connection reuse, keep-alive)
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for notification providers.
+
+    Returns:
+        Pooled ``httpx.AsyncClient`` with keep-alive connections
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        from core.config import get_settings
+
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            timeout=settings.NOTIFICATION_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.NOTIFICATION_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.NOTIFICATION_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class BaseNotifier(ABC):
     """
@@ -25,8 +65,14 @@ class BaseNotifier(ABC):
     the send_notification method.
     """
 
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, client: httpx.AsyncClient | None = None):
         self.enabled = enabled
+        self._client = client
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """HTTP client of the notifier (the shared pooled client by default)."""
+        return self._client or get_http_client()
 
     @abstractmethod
     async def send_notification(
@@ -62,8 +108,14 @@ class TelegramNotifier(BaseNotifier):
     Sends notifications to a Telegram chat using bot API.
     """
 
-    def __init__(self, bot_token: str | None = None, chat_id: str | None = None, enabled: bool = True):
-        super().__init__(enabled)
+    def __init__(
+        self,
+        bot_token: str | None = None,
+        chat_id: str | None = None,
+        enabled: bool = True,
+        client: httpx.AsyncClient | None = None,
+    ):
+        super().__init__(enabled, client)
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage" if bot_token else None
@@ -91,9 +143,8 @@ class TelegramNotifier(BaseNotifier):
                 "disable_web_page_preview": True,
             }
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(self.api_url, json=payload)
-                response.raise_for_status()
+            response = await self.http_client.post(self.api_url, json=payload)
+            response.raise_for_status()
 
             logger.info("Telegram notification sent successfully")
             return True
@@ -186,8 +237,14 @@ class SlackNotifier(BaseNotifier):
     Sends notifications to Slack channel using webhook.
     """
 
-    def __init__(self, webhook_url: str | None = None, channel: str | None = None, enabled: bool = True):
-        super().__init__(enabled)
+    def __init__(
+        self,
+        webhook_url: str | None = None,
+        channel: str | None = None,
+        enabled: bool = True,
+        client: httpx.AsyncClient | None = None,
+    ):
+        super().__init__(enabled, client)
         self.webhook_url = webhook_url
         self.channel = channel
 
@@ -207,9 +264,8 @@ class SlackNotifier(BaseNotifier):
             # Format message for Slack
             payload = self._format_slack_payload(title, message, context, severity)
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(self.webhook_url, json=payload)
-                response.raise_for_status()
+            response = await self.http_client.post(self.webhook_url, json=payload)
+            response.raise_for_status()
 
             logger.info("Slack notification sent successfully")
             return True
@@ -267,22 +323,70 @@ class SlackNotifier(BaseNotifier):
         return payload
 
 
+@dataclass
+class _Notification:
+    """Queued notification."""
+
+    key: str
+    title: str
+    message: str
+    context: dict[str, Any]
+
+
+@dataclass
+class _ErrorDigest:
+    """Repeats of one error within the current digest window."""
+
+    notification: _Notification
+    window_started: float
+    suppressed: int = 0
+    last_seen: datetime = field(default_factory=datetime.utcnow)
+
+
 class NotificationManager:
     """
     Notification manager that handles multiple notification providers.
 
     Manages sending notifications through various channels and handles
-    rate limiting to prevent notification spam.
+    rate limiting to prevent notification spam: the first occurrence of an
+    error is sent immediately, repeats within ``digest_window`` seconds are
+    counted and sent as one digest when the window ends.
+
+    Args:
+        notifiers: Notification providers (configured from settings by default)
+        digest_window: Digest window in seconds
+        max_tracked_errors: Maximum number of distinct errors tracked for rate limiting
+        queue_size: Maximum number of queued notifications
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        notifiers: list[BaseNotifier] | None = None,
+        digest_window: float | None = None,
+        max_tracked_errors: int | None = None,
+        queue_size: int | None = None,
+    ):
         from core.config import get_settings
 
         self.settings = get_settings()
         self.notifiers: list[BaseNotifier] = []
-        self._setup_notifiers()
-        self._notification_cache: dict[str, datetime] = {}
-        self._rate_limit_window = 300  # 5 minutes
+        if notifiers is None:
+            self._setup_notifiers()
+        else:
+            self.notifiers = notifiers
+
+        self._rate_limit_window = digest_window or self.settings.NOTIFICATION_DIGEST_WINDOW
+        self._max_tracked_errors = max_tracked_errors or self.settings.NOTIFICATION_MAX_TRACKED_ERRORS
+        self._queue_size = queue_size or self.settings.NOTIFICATION_QUEUE_SIZE
+        self._notification_cache: OrderedDict[str, _ErrorDigest] = OrderedDict()
+
+        self._queue: asyncio.Queue[_Notification] | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self.sent = 0
+        self.suppressed = 0
+        self.dropped = 0
 
     def _setup_notifiers(self):
         """Setup notification providers based on configuration."""
@@ -317,6 +421,11 @@ class NotificationManager:
             )
             self.notifiers.append(slack_notifier)
 
+    @property
+    def pending(self) -> int:
+        """Number of queued notifications."""
+        return self._queue.qsize() if self._queue is not None else 0
+
     async def notify_critical_error(
         self,
         title: str,
@@ -325,7 +434,10 @@ class NotificationManager:
         exception_data: dict[str, Any] | None = None,
     ) -> None:
         """
-        Send critical error notification through all configured channels.
+        Queue critical error notification for all configured channels.
+
+        Returns immediately: notifications are sent by a background worker.
+        If the queue is full the notification is dropped.
 
         Args:
             title: Error title
@@ -333,50 +445,169 @@ class NotificationManager:
             context: Request context
             exception_data: Exception details
         """
-        # Create notification key for rate limiting
-        notification_key = f"{title}:{message[:50]}"
+        if not any(notifier.is_enabled() for notifier in self.notifiers):
+            return
 
-        # Check rate limiting
-        if self._is_rate_limited(notification_key):
-            logger.debug(f"Notification rate limited: {notification_key}")
+        # Create notification key for rate limiting
+        notification = _Notification(
+            key=f"{title}:{message[:50]}",
+            title=title,
+            message=message,
+            context={**(context or {}), **(exception_data or {})},
+        )
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.debug(f"Notification queue is full, dropped: {notification.key}")
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(self._queue_size)
+            self._worker = loop.create_task(self._run(self._queue))
+
+    async def _run(self, queue: asyncio.Queue[_Notification]) -> None:
+        while True:
+            timeout = self._next_digest_in()
+            try:
+                notification = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except TimeoutError:
+                notification = None
+
+            try:
+                if notification is not None:
+                    await self._process(notification)
+                await self._send_due_digests()
+            except Exception as e:
+                logger.error(f"Notification worker error: {e}")
+            finally:
+                if notification is not None:
+                    queue.task_done()
+
+    def _next_digest_in(self) -> float | None:
+        """Seconds until the earliest digest window ends."""
+        if not self._notification_cache:
+            return None
+        oldest = min(digest.window_started for digest in self._notification_cache.values())
+        return max(oldest + self._rate_limit_window - time.monotonic(), 0.0)
+
+    async def _process(self, notification: _Notification) -> None:
+        digest = self._notification_cache.get(notification.key)
+        if digest is not None and self._is_rate_limited(notification.key):
+            digest.suppressed += 1
+            digest.last_seen = datetime.utcnow()
+            self.suppressed += 1
+            logger.debug(f"Notification rate limited: {notification.key}")
             return
 
-        # Mark notification as sent
-        self._notification_cache[notification_key] = datetime.utcnow()
-
-        # Combine context and exception data
-        full_context = {**(context or {}), **(exception_data or {})}
-
-        # Send notifications through all enabled channels
-        tasks = []
-        for notifier in self.notifiers:
-            if notifier.is_enabled():
-                task = notifier.send_notification(
-                    title=title,
-                    message=message,
-                    context=full_context,
-                    severity="critical",
-                )
-                tasks.append(task)
-
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            successful = sum(1 for result in results if result is True)
-            logger.info(f"Sent critical error notification through {successful}/{len(tasks)} channels")
-        else:
+        await self._track(notification)
+        await self._send(notification.title, notification.message, notification.context)
+
+    async def _track(self, notification: _Notification) -> None:
+        """Start a digest window for the error, evicting the least recent errors."""
+        self._notification_cache[notification.key] = _ErrorDigest(notification, time.monotonic())
+        self._notification_cache.move_to_end(notification.key)
+        while len(self._notification_cache) > self._max_tracked_errors:
+            _, evicted = self._notification_cache.popitem(last=False)
+            if evicted.suppressed:
+                await self._send_digest(evicted)
+
+    async def _send_due_digests(self) -> None:
+        now = time.monotonic()
+        for key, digest in list(self._notification_cache.items()):
+            if now - digest.window_started < self._rate_limit_window:
+                continue
+            if digest.suppressed:
+                await self._send_digest(digest)
+                # Next window: further repeats are digested again
+                digest.window_started = now
+                digest.suppressed = 0
+            else:
+                del self._notification_cache[key]
+
+    async def _send_digest(self, digest: _ErrorDigest) -> None:
+        notification = digest.notification
+        minutes = self._rate_limit_window / 60
+        await self._send(
+            f"{notification.title} (repeated)",
+            f"{notification.message}\n\nRepeated {digest.suppressed} more times in the last {minutes:g} min, "
+            f"last at {digest.last_seen.isoformat(timespec='seconds')} UTC",
+            notification.context,
+        )
+
+    async def _send(self, title: str, message: str, context: dict[str, Any]) -> None:
+        """Send notification through all enabled channels."""
+        tasks = [
+            notifier.send_notification(title=title, message=message, context=context, severity="critical")
+            for notifier in self.notifiers
+            if notifier.is_enabled()
+        ]
+        if not tasks:
             logger.warning("No notification channels configured or enabled")
+            return
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        successful = sum(1 for result in results if result is True)
+        self.sent += 1
+        logger.info(f"Sent critical error notification through {successful}/{len(tasks)} channels")
 
     def _is_rate_limited(self, notification_key: str) -> bool:
         """Check if notification is rate limited."""
-        if notification_key not in self._notification_cache:
+        digest = self._notification_cache.get(notification_key)
+        if digest is None:
             return False
 
-        last_sent = self._notification_cache[notification_key]
-        time_since_last = (datetime.utcnow() - last_sent).total_seconds()
+        return time.monotonic() - digest.window_started < self._rate_limit_window
+
+    async def flush(self) -> None:
+        """Wait until all queued notifications are processed."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
 
-        return time_since_last < self._rate_limit_window
+    async def close(self) -> None:
+        """Process the queue, send pending digests and stop the worker."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        for digest in self._notification_cache.values():
+            if digest.suppressed:
+                await self._send_digest(digest)
+        self._notification_cache.clear()
 
     def clear_rate_limit_cache(self) -> None:
         """Clear the rate limit cache."""
         self._notification_cache.clear()
         logger.info("Notification rate limit cache cleared")
+
+
+# Global notification manager
+_notification_manager: NotificationManager | None = None
+
+
+def get_notification_manager() -> NotificationManager:
+    """
+    Get the global notification manager.
+
+    Returns:
+        Shared ``NotificationManager`` (one queue and rate limit cache per process)
+    """
+    global _notification_manager
+    if _notification_manager is None:
+        _notification_manager = NotificationManager()
+    return _notification_manager
+
+
+async def close_notification_manager() -> None:
+    """Send pending notifications and close the shared HTTP client."""
+    global _notification_manager
+    if _notification_manager is not None:
+        await _notification_manager.close()
+        _notification_manager = None
+    await close_http_client()
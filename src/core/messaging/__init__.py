@@ -8,12 +8,16 @@ from .models import (
     SystemEventMessage,
     UserNotificationMessage,
 )
+from .publisher import BatchPublisher, InMemoryTransport, RabbitConfirmTransport
 
 __all__ = [
     "AdminNotificationMessage",
+    "BatchPublisher",
+    "InMemoryTransport",
     "MessageClient",
     "MessageModel",
     "OrderProcessingMessage",
+    "RabbitConfirmTransport",
     "SystemEventMessage",
     "UserNotificationMessage",
     "create_faststream_app",
@@ -0,0 +1,424 @@
+"""Среда выполнения потребителей RabbitMQ.
+
+Каждая очередь регистрируется как :class:`ConsumerSpec` со своими настройками:
+
+- ``prefetch`` - сколько неподтвержденных сообщений брокер держит у потребителя;
+- ``concurrency`` - сколько сообщений (или пачек) обрабатывается одновременно;
+- ``batch_size`` - обработчик получает список сообщений (для массовой записи в БД);
+- ``ack_batch_size`` - подтверждения отправляются одним ``basic.ack(multiple=True)``.
+
+Сообщение, на котором обработчик упал, не возвращается в очередь
+(``nack(requeue=True)`` зацикливает «ядовитые» сообщения), а публикуется в
+очередь задержки ``<queue>.retry.<ms>`` с TTL, откуда по истечении TTL
+dead-letter возвращает его в исходную очередь. Задержка растет экспоненциально
+с каждой попыткой. После ``max_retries`` попыток, а также для сообщений, не
+прошедших валидацию, сообщение уходит в ``<queue>.dlq``.
+
+Example:
+    Регистрация обработчиков::
+
+        runtime = ConsumerRuntime(get_broker())
+
+        @runtime.consumer(user_notifications_queue, UserNotificationMessage, concurrency=20)
+        async def handle(notification: UserNotificationMessage) -> None: ...
+
+        @runtime.consumer(system_events_queue, SystemEventMessage, batch_size=100)
+        async def handle_many(events: list[SystemEventMessage]) -> None: ...
+
+        await runtime.start()
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from faststream.rabbit import RabbitBroker, RabbitQueue
+from pydantic import BaseModel, ValidationError
+
+from core.config import get_settings
+from core.exceptions.core_base import CoreMessagingConnectionError
+
+logger = logging.getLogger(__name__)
+
+RETRY_HEADER = "x-retry-count"
+ERROR_HEADER = "x-last-error"
+ORIGIN_HEADER = "x-original-queue"
+
+Handler = Callable[[Any], Awaitable[None]]
+Republish = Callable[[str, bytes, dict[str, Any]], Awaitable[None]]
+
+
+class IncomingMessage(Protocol):
+    """Входящее сообщение брокера (совместимо с ``aio_pika.IncomingMessage``)."""
+
+    body: bytes
+    headers: dict[str, Any]
+    delivery_tag: int
+
+    async def ack(self, multiple: bool = False) -> None: ...
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None: ...
+
+
+@dataclass
+class ConsumerSpec:
+    """Настройки потребителя очереди.
+
+    Attributes:
+        queue: Очередь
+        handler: Обработчик сообщения (или списка сообщений при ``batch_size > 1``)
+        model: Pydantic модель сообщения; ``None`` - обработчик получает dict
+        prefetch: Prefetch count канала
+        concurrency: Одновременно обрабатываемых сообщений или пачек
+        batch_size: Размер пачки для обработчика списком (1 - по одному)
+        batch_linger: Сколько ждать добора пачки, сек
+        ack_batch_size: Сколько подтверждений копить перед ``basic.ack(multiple=True)``
+        ack_interval: Максимальная задержка подтверждения, сек
+        max_retries: Попыток повторной обработки до отправки в DLQ
+        retry_base_delay: Задержка перед первой повторной попыткой, мс
+        retry_max_delay: Максимальная задержка повтора, мс
+    """
+
+    queue: RabbitQueue
+    handler: Handler
+    model: type[BaseModel] | None = None
+    prefetch: int = 10
+    concurrency: int = 10
+    batch_size: int = 1
+    batch_linger: float = 0.05
+    ack_batch_size: int = 10
+    ack_interval: float = 0.05
+    max_retries: int = 5
+    retry_base_delay: int = 1000
+    retry_max_delay: int = 300_000
+
+    @property
+    def name(self) -> str:
+        return self.queue.name
+
+    @property
+    def dlq_name(self) -> str:
+        return f"{self.name}.dlq"
+
+    def retry_delays(self) -> list[int]:
+        """Задержки повторных попыток в мс: ``base * 2**n``, не больше ``retry_max_delay``."""
+        return [min(self.retry_base_delay * 2**attempt, self.retry_max_delay) for attempt in range(self.max_retries)]
+
+    def retry_queue_name(self, delay: int) -> str:
+        return f"{self.name}.retry.{delay}"
+
+
+class AckBatcher:
+    """Пакетное подтверждение сообщений одного канала.
+
+    Сообщения обрабатываются конкурентно и завершаются не по порядку, а
+    ``basic.ack(multiple=True)`` подтверждает все сообщения до delivery tag
+    включительно. Поэтому подтверждается только непрерывный префикс
+    завершенных сообщений. Подтверждения копятся до ``batch_size`` штук или
+    ``interval`` секунд (один переиспользуемый таймер).
+
+    ``batch_size`` ограничен половиной prefetch: иначе брокер перестанет
+    присылать сообщения раньше, чем накопится пачка подтверждений.
+    Сообщения, уже возвращенные брокеру через ``nack``, отмечаются
+    ``done(message, settled=True)``: они освобождают префикс, но сами
+    подтверждением не становятся.
+    """
+
+    __slots__ = ("_acked", "_done", "_flushing", "_inflight", "_last", "_timer", "batch_size", "interval")
+
+    def __init__(self, batch_size: int, interval: float, prefetch: int) -> None:
+        self.batch_size = max(1, min(batch_size, prefetch // 2))
+        self.interval = interval
+        self._inflight: deque[IncomingMessage] = deque()
+        self._done: dict[int, bool] = {}
+        self._last: IncomingMessage | None = None
+        self._acked = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushing: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Завершенные, но еще не подтвержденные сообщения из префикса."""
+        return self._acked
+
+    def track(self, message: IncomingMessage) -> None:
+        """Запомнить полученное сообщение (в порядке delivery tag)."""
+        self._inflight.append(message)
+
+    def done(self, message: IncomingMessage, settled: bool = False) -> None:
+        """Отметить сообщение обработанным и подтвердить префикс, если пачка набрана."""
+        self._done[message.delivery_tag] = settled
+        while self._inflight and self._inflight[0].delivery_tag in self._done:
+            head = self._inflight.popleft()
+            if not self._done.pop(head.delivery_tag):
+                self._last = head
+                self._acked += 1
+
+        if self._acked >= self.batch_size:
+            self._schedule_flush()
+        elif self._acked and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.ensure_future(self.flush())
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def flush(self) -> None:
+        """Подтвердить все завершенные сообщения префикса."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._last is None:
+            return
+
+        last, self._last, self._acked = self._last, None, 0
+        try:
+            await last.ack(multiple=True)
+        except Exception as e:
+            logger.error(f"Не удалось подтвердить сообщения до {last.delivery_tag}: {e}")
+
+    async def close(self) -> None:
+        """Подтвердить остаток и дождаться отправленных подтверждений."""
+        await self.flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+
+class QueueConsumer:
+    """Потребитель одной очереди: буфер prefetch, воркеры, повторы и DLQ.
+
+    Args:
+        spec: Настройки очереди
+        republish: Публикация в очередь по имени через default exchange
+    """
+
+    def __init__(self, spec: ConsumerSpec, republish: Republish) -> None:
+        self.spec = spec
+        self.republish = republish
+        self.acks = AckBatcher(spec.ack_batch_size, spec.ack_interval, spec.prefetch)
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+        self._delays = spec.retry_delays()
+        self._inbox: asyncio.Queue[IncomingMessage] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.spec.concurrency)]
+
+    async def stop(self) -> None:
+        """Дообработать принятые сообщения, остановить воркеры и подтвердить остаток."""
+        await self._inbox.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.acks.close()
+
+    async def on_message(self, message: IncomingMessage) -> None:
+        """Callback брокера: поставить сообщение в очередь воркеров."""
+        self.acks.track(message)
+        self._inbox.put_nowait(message)
+
+    async def _work(self) -> None:
+        while True:
+            batch = [await self._inbox.get()]
+            if self.spec.batch_size > 1:
+                await self._fill(batch)
+            try:
+                await self._process(batch)
+            finally:
+                for _ in batch:
+                    self._inbox.task_done()
+
+    async def _fill(self, batch: list[IncomingMessage]) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.spec.batch_linger
+        while len(batch) < self.spec.batch_size:
+            if not self._inbox.empty():
+                batch.append(self._inbox.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                return
+            try:
+                batch.append(await asyncio.wait_for(self._inbox.get(), timeout))
+            except TimeoutError:
+                return
+
+    def _decode(self, message: IncomingMessage) -> Any:
+        if self.spec.model is None:
+            return json.loads(message.body)
+        # model_validate_json не вызывает __init__ SafeModel и не завершает процесс
+        return self.spec.model.model_validate_json(message.body)
+
+    async def _process(self, batch: list[IncomingMessage]) -> None:
+        valid: list[tuple[IncomingMessage, Any]] = []
+        for message in batch:
+            try:
+                valid.append((message, self._decode(message)))
+            except (ValidationError, ValueError) as e:
+                await self._dead_letter(message, f"validation: {e}")
+
+        if not valid:
+            return
+
+        try:
+            if self.spec.batch_size > 1:
+                await self.spec.handler([item for _, item in valid])
+            else:
+                await self.spec.handler(valid[0][1])
+        except Exception as e:
+            logger.error(f"Ошибка обработки {len(valid)} сообщений из {self.spec.name}: {e}")
+            for message, _ in valid:
+                await self._retry(message, e)
+            return
+
+        self.processed += len(valid)
+        for message, _ in valid:
+            self.acks.done(message)
+
+    async def _retry(self, message: IncomingMessage, error: Exception) -> None:
+        attempt = int((message.headers or {}).get(RETRY_HEADER, 0))
+        if attempt >= len(self._delays):
+            await self._dead_letter(message, repr(error))
+            return
+
+        headers = {**(message.headers or {}), RETRY_HEADER: attempt + 1, ERROR_HEADER: repr(error)[:512]}
+        if await self._republish(self.spec.retry_queue_name(self._delays[attempt]), message, headers):
+            self.retried += 1
+
+    async def _dead_letter(self, message: IncomingMessage, reason: str) -> None:
+        logger.warning(f"Сообщение из {self.spec.name} отправлено в {self.spec.dlq_name}: {reason}")
+        headers = {**(message.headers or {}), ERROR_HEADER: reason[:512], ORIGIN_HEADER: self.spec.name}
+        if await self._republish(self.spec.dlq_name, message, headers):
+            self.dead_lettered += 1
+
+    async def _republish(self, queue_name: str, message: IncomingMessage, headers: dict[str, Any]) -> bool:
+        try:
+            await self.republish(queue_name, message.body, headers)
+        except Exception as e:
+            # Не удалось переложить - возвращаем брокеру, сообщение не теряется
+            logger.error(f"Не удалось опубликовать сообщение в {queue_name}: {e}")
+            await message.nack(requeue=True)
+            self.acks.done(message, settled=True)
+            return False
+        self.acks.done(message)
+        return True
+
+
+class ConsumerRuntime:
+    """Запуск потребителей на соединении брокера FastStream.
+
+    Для каждой очереди открывается свой канал aio-pika с собственным prefetch,
+    объявляются очереди повторов и DLQ.
+
+    Args:
+        broker: Брокер FastStream
+    """
+
+    def __init__(self, broker: RabbitBroker) -> None:
+        self.broker = broker
+        self.specs: list[ConsumerSpec] = []
+        self.consumers: dict[str, QueueConsumer] = {}
+        self._channels: list[Any] = []
+        self._tags: list[tuple[Any, str]] = []
+
+    def register(self, spec: ConsumerSpec) -> ConsumerSpec:
+        self.specs.append(spec)
+        return spec
+
+    def consumer(
+        self, queue: RabbitQueue, model: type[BaseModel] | None = None, **options: Any
+    ) -> Callable[[Handler], Handler]:
+        """Декоратор регистрации обработчика очереди.
+
+        Значения по умолчанию берутся из настроек ``RABBITMQ_*``.
+        """
+
+        def decorator(handler: Handler) -> Handler:
+            settings = get_settings()
+            defaults = {
+                "prefetch": settings.RABBITMQ_PREFETCH_COUNT,
+                "concurrency": settings.RABBITMQ_CONSUMER_CONCURRENCY,
+                "ack_batch_size": settings.RABBITMQ_ACK_BATCH_SIZE,
+                "max_retries": settings.RABBITMQ_MAX_RETRIES,
+                "retry_base_delay": settings.RABBITMQ_RETRY_BASE_DELAY_MS,
+                "retry_max_delay": settings.RABBITMQ_RETRY_MAX_DELAY_MS,
+            }
+            self.register(ConsumerSpec(queue=queue, handler=handler, model=model, **(defaults | options)))
+            return handler
+
+        return decorator
+
+    async def start(self) -> None:
+        """Объявить топологию и начать потребление всех зарегистрированных очередей."""
+        import aio_pika
+
+        connection = getattr(self.broker, "_connection", None)
+        if connection is None:
+            await self.broker.connect()
+            connection = getattr(self.broker, "_connection", None)
+        if connection is None:
+            raise CoreMessagingConnectionError("rabbitmq")
+
+        for spec in self.specs:
+            channel = await connection.channel()
+            await channel.set_qos(prefetch_count=spec.prefetch)
+            self._channels.append(channel)
+
+            queue = await channel.declare_queue(spec.name, durable=spec.queue.durable)
+            await channel.declare_queue(spec.dlq_name, durable=True)
+            for delay in set(spec.retry_delays()):
+                await channel.declare_queue(
+                    spec.retry_queue_name(delay),
+                    durable=True,
+                    arguments={
+                        "x-message-ttl": delay,
+                        "x-dead-letter-exchange": "",
+                        "x-dead-letter-routing-key": spec.name,
+                    },
+                )
+
+            async def republish(routing_key: str, body: bytes, headers: dict[str, Any], _channel=channel) -> None:
+                await _channel.default_exchange.publish(
+                    aio_pika.Message(
+                        body,
+                        headers=headers,
+                        content_type="application/json",
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    ),
+                    routing_key=routing_key,
+                )
+
+            consumer = QueueConsumer(spec, republish)
+            consumer.start()
+            self.consumers[spec.name] = consumer
+            self._tags.append((queue, await queue.consume(consumer.on_message)))
+            logger.info(
+                f"Потребитель {spec.name}: prefetch={spec.prefetch}, concurrency={spec.concurrency}, "
+                f"batch={spec.batch_size}, retries={spec.max_retries}"
+            )
+
+    async def stop(self) -> None:
+        """Остановить прием, дообработать принятые сообщения и закрыть каналы."""
+        for queue, tag in self._tags:
+            try:
+                await queue.cancel(tag)
+            except Exception as e:
+                logger.error(f"Ошибка отмены потребителя {queue.name}: {e}")
+        self._tags.clear()
+
+        await asyncio.gather(*(consumer.stop() for consumer in self.consumers.values()))
+        self.consumers.clear()
+
+        for channel in self._channels:
+            if not channel.is_closed:
+                await channel.close()
+        self._channels.clear()
@@ -77,8 +77,9 @@ Note:
     Use the session context manager for automatic connection handling.
 """
 
+import asyncio
 import logging
-from collections.abc import AsyncGenerator, Callable
+from collections.abc import AsyncGenerator, Callable, Iterable
 from contextlib import asynccontextmanager
 from functools import lru_cache
 from typing import Any
@@ -98,6 +99,7 @@ from .models import (
     UserNotificationMessage,
     UserNotificationPayload,
 )
+from .publisher import BatchPublisher, PublishTransport, RabbitConfirmTransport
 
 logger = logging.getLogger(__name__)
 
@@ -109,6 +111,12 @@ notifications_exchange = RabbitExchange("notifications", type=ExchangeType.TOPIC
 orders_exchange = RabbitExchange("orders", type=ExchangeType.DIRECT, durable=True)
 system_exchange = RabbitExchange("system", type=ExchangeType.FANOUT, durable=True)
 
+EXCHANGES = {
+    "notifications": notifications_exchange,
+    "orders": orders_exchange,
+    "system": system_exchange,
+}
+
 # Очереди для уведомлений
 user_notifications_queue = RabbitQueue("user_notifications", durable=True)
 admin_notifications_queue = RabbitQueue("admin_notifications", durable=True)
@@ -128,7 +136,7 @@ def get_broker() -> RabbitBroker:
 
     broker = RabbitBroker(
         url=settings.RABBITMQ_URL,
-        max_consumers=10,
+        max_consumers=settings.RABBITMQ_PREFETCH_COUNT,
         graceful_timeout=30,
         logger=logger,
     )
@@ -177,12 +185,14 @@ class MessageClient:
         to ensure proper connection lifecycle management.
     """
 
-    def __init__(self, broker: RabbitBroker | None = None):
+    def __init__(self, broker: RabbitBroker | None = None, publish_transport: PublishTransport | None = None):
         """Initialize the message client.
 
         Args:
             broker (RabbitBroker | None): Custom broker instance.
                 If None, uses the default broker from get_broker()
+            publish_transport (PublishTransport | None): Transport for batched
+                publishing. If None, a confirm channel on the broker connection is used
 
         Example:
             With default broker::
@@ -196,6 +206,9 @@ class MessageClient:
         """
         self.broker = broker or get_broker()
         self._is_connected = False
+        self._publish_transport = publish_transport
+        self._publisher: BatchPublisher | None = None
+        self._publisher_lock = asyncio.Lock()
 
     async def connect(self) -> None:
         """Establish connection to the RabbitMQ broker.
@@ -235,6 +248,10 @@ class MessageClient:
             This method is idempotent - calling it multiple times
             or on a disconnected client has no effect.
         """
+        if self._publisher is not None:
+            await self._publisher.close()
+            self._publisher = None
+
         if self._is_connected:
             await self.broker.close()
             self._is_connected = False
@@ -540,14 +557,7 @@ class MessageClient:
         else:
             message_data = message
 
-        # Определяем exchange по имени
-        exchange_map = {
-            "notifications": notifications_exchange,
-            "orders": orders_exchange,
-            "system": system_exchange,
-        }
-
-        exchange = exchange_map.get(exchange_name)
+        exchange = EXCHANGES.get(exchange_name)
         if not exchange:
             raise CoreMessagingPublishError("rabbitmq", f"Неизвестный exchange: {exchange_name}")
 
@@ -557,6 +567,100 @@ class MessageClient:
             await self.broker.publish(message_data, exchange=exchange)
         logger.info(f"Отправлено произвольное сообщение в {exchange_name}")
 
+    async def get_batch_publisher(self) -> BatchPublisher:
+        """Get the client's batch publisher, starting it on first use.
+
+        The publisher buffers messages for up to ``RABBITMQ_PUBLISH_LINGER_MS``
+        or ``RABBITMQ_PUBLISH_BATCH_SIZE`` messages and pipelines publisher
+        confirms instead of waiting for each one in turn.
+
+        Returns:
+            BatchPublisher: Running publisher bound to this client
+        """
+        async with self._publisher_lock:
+            if self._publisher is None or not self._publisher.is_running:
+                settings = get_settings()
+                transport = self._publish_transport
+                if transport is None:
+                    await self.connect()
+                    transport = RabbitConfirmTransport(self.broker, EXCHANGES)
+
+                publisher = BatchPublisher(
+                    transport,
+                    max_batch_size=settings.RABBITMQ_PUBLISH_BATCH_SIZE,
+                    linger=settings.RABBITMQ_PUBLISH_LINGER_MS / 1000,
+                    max_unconfirmed=settings.RABBITMQ_MAX_UNCONFIRMED,
+                )
+                await publisher.start()
+                self._publisher = publisher
+            return self._publisher
+
+    async def publish_many(
+        self,
+        messages: Iterable[MessageModel | dict[str, Any]],
+        exchange_name: str = "notifications",
+        routing_key: str | None = None,
+    ) -> int:
+        """Publish many messages and wait until the broker confirms all of them.
+
+        Messages are sent in batches over a dedicated publisher-confirms
+        channel. The call blocks while more than ``RABBITMQ_MAX_UNCONFIRMED``
+        messages are awaiting confirmation, so memory stays bounded for
+        arbitrarily large inputs.
+
+        Args:
+            messages (Iterable[MessageModel | dict[str, Any]]): Messages to publish
+            exchange_name (str): Target exchange name ("notifications", "orders", "system")
+            routing_key (str | None): Optional routing key for directed delivery
+
+        Returns:
+            int: Number of confirmed messages
+
+        Raises:
+            CoreMessagingPublishError: If exchange_name is not recognized
+                or some messages were rejected by the broker
+
+        Example:
+            Bulk notifications::
+
+                async with client.session():
+                    messages = [
+                        UserNotificationMessage(
+                            source="api",
+                            payload=UserNotificationPayload(user_id=user_id, message="News!"),
+                        )
+                        for user_id in user_ids
+                    ]
+                    await client.publish_many(messages, routing_key="user.notification")
+        """
+        if exchange_name not in EXCHANGES:
+            raise CoreMessagingPublishError("rabbitmq", f"Неизвестный exchange: {exchange_name}")
+
+        publisher = await self.get_batch_publisher()
+        window = max(1, publisher.max_unconfirmed)
+        futures: list[asyncio.Future] = []
+        total = failed = 0
+
+        async def confirm() -> int:
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            futures.clear()
+            return sum(isinstance(result, BaseException) for result in results)
+
+        # Подтверждения ждем окнами по max_unconfirmed - future не копятся на весь вход
+        for message in messages:
+            futures.append(await publisher.publish(message, exchange_name, routing_key or ""))
+            total += 1
+            if len(futures) >= window:
+                failed += await confirm()
+        failed += await confirm()
+
+        if failed:
+            logger.error(f"Брокер не подтвердил {failed} из {total} сообщений в {exchange_name}")
+            raise CoreMessagingPublishError("rabbitmq", exchange_name)
+
+        logger.info(f"Отправлено {total} сообщений в {exchange_name}")
+        return total
+
     # Методы для получения сообщений (для тестирования и debugging)
 
     async def consume_user_notifications(
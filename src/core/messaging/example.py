@@ -5,7 +5,7 @@ import logging
 from typing import Any
 
 from .client import get_message_client
-from .models import MessageModel
+from .models import MessageModel, UserNotificationMessage, UserNotificationPayload
 
 logger = logging.getLogger(__name__)
 
@@ -98,18 +98,21 @@ async def batch_sending_example():
         # Отправка уведомлений нескольким пользователям
         user_ids = [123, 124, 125, 126, 127]
 
-        tasks = []
-        for user_id in user_ids:
-            task = client.send_user_notification(
-                user_id=user_id,
-                message=f"Привет, пользователь {user_id}! У нас есть новости для вас.",
-                notification_type="info",
+        messages = [
+            UserNotificationMessage(
+                source="api",
+                payload=UserNotificationPayload(
+                    user_id=user_id,
+                    message=f"Привет, пользователь {user_id}! У нас есть новости для вас.",
+                    notification_type="info",
+                ),
             )
-            tasks.append(task)
+            for user_id in user_ids
+        ]
 
-        # Отправляем все уведомления параллельно
-        await asyncio.gather(*tasks)
-        logger.info(f"Отправлено {len(tasks)} уведомлений")
+        # Отправляем пачкой с конвейерными подтверждениями брокера
+        sent = await client.publish_many(messages, exchange_name="notifications", routing_key="user.notification")
+        logger.info(f"Отправлено {sent} уведомлений")
 
 
 async def message_consumer_example():
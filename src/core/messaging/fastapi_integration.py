@@ -7,6 +7,8 @@ from typing import Any
 
 from fastapi import Depends, FastAPI
 
+from core.base.repo.outbox import MessagingOutboxSink, OutboxRelay, RealtimeOutboxSink
+from core.config import get_settings
 from core.exceptions import CoreMessagingAPIException
 from tools.pydantic import BaseModel
 
@@ -64,6 +66,21 @@ class MessageResponse(BaseModel):
     message_id: str | None = None
 
 
+def create_outbox_relay(client: MessageClient) -> OutboxRelay:
+    """Создать relay outbox с доставкой в RabbitMQ и realtime каналы."""
+    from core.database import AsyncSessionLocal
+    from core.realtime import connection_manager
+
+    settings = get_settings()
+    return OutboxRelay(
+        AsyncSessionLocal,
+        {"messaging": MessagingOutboxSink(client), "realtime": RealtimeOutboxSink(connection_manager)},
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        poll_interval=settings.OUTBOX_POLL_INTERVAL,
+        max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    )
+
+
 # Lifespan менеджер для FastAPI
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -71,6 +88,7 @@ async def lifespan(app: FastAPI):
     # Запуск
     broker = get_broker()
     client = get_message_client()
+    outbox_relay: OutboxRelay | None = None
 
     try:
         await broker.connect()
@@ -80,16 +98,31 @@ async def lifespan(app: FastAPI):
         faststream_app = create_faststream_app()
 
         # Импортируем обработчики, чтобы они зарегистрировались
-        from . import handlers  # noqa: F401
+        from .handlers import consumer_runtime
 
         # Запускаем брокер в фоновой задаче
         broker_task = asyncio.create_task(broker.start())
+        await consumer_runtime.start()
+
+        # Доставка событий из transactional outbox
+        if get_settings().OUTBOX_RELAY_ENABLED:
+            outbox_relay = create_outbox_relay(client)
+            outbox_relay.start()
 
-        yield {"broker": broker, "client": client, "broker_task": broker_task}
+        yield {
+            "broker": broker,
+            "client": client,
+            "broker_task": broker_task,
+            "consumers": consumer_runtime,
+            "outbox_relay": outbox_relay,
+        }
 
     finally:
         # Остановка
         try:
+            if outbox_relay is not None:
+                await outbox_relay.stop()
+            await consumer_runtime.stop()
             broker_task.cancel()
             await broker.close()
             logger.info("FastStream broker отключен")
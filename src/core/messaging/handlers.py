@@ -3,9 +3,6 @@
 import logging
 from typing import Any
 
-from faststream import Depends
-from faststream.rabbit import RabbitMessage
-
 from .broker import (
     admin_notifications_queue,
     get_broker,
@@ -14,122 +11,66 @@ from .broker import (
     system_events_queue,
     user_notifications_queue,
 )
+from .consumer import ConsumerRuntime
 from .models import OrderProcessingMessage, SystemEventMessage, UserNotificationMessage
 
 logger = logging.getLogger(__name__)
 
-# Создаем брокер для регистрации обработчиков
-broker = get_broker()
+# Среда выполнения потребителей: prefetch, параллелизм, пакетные подтверждения,
+# повторы с задержкой и DLQ настраиваются для каждой очереди
+consumer_runtime = ConsumerRuntime(get_broker())
 
 
-@broker.subscriber(user_notifications_queue)
-async def handle_user_notification(
-    message: dict[str, Any],
-    raw_message: RabbitMessage = Depends(),
-) -> None:
+@consumer_runtime.consumer(user_notifications_queue, UserNotificationMessage, concurrency=20)
+async def handle_user_notification(notification: UserNotificationMessage) -> None:
     """Обработчик уведомлений пользователей."""
-    try:
-        # Валидируем сообщение
-        notification = UserNotificationMessage(**message)
-
-        logger.info(
-            f"Получено уведомление для пользователя {notification.payload.user_id}: " f"{notification.payload.message}"
-        )
-
-        # Здесь можно добавить логику отправки уведомления
-        # Например, через email, push-уведомления, SMS и т.д.
-        await process_user_notification(notification)
+    logger.info(
+        f"Получено уведомление для пользователя {notification.payload.user_id}: " f"{notification.payload.message}"
+    )
 
-        # Подтверждаем обработку сообщения
-        await raw_message.ack()
+    # Здесь можно добавить логику отправки уведомления
+    # Например, через email, push-уведомления, SMS и т.д.
+    await process_user_notification(notification)
 
-    except Exception as e:
-        logger.error(f"Ошибка обработки уведомления пользователя: {e}")
-        await raw_message.nack(requeue=True)
 
-
-@broker.subscriber(admin_notifications_queue)
-async def handle_admin_notification(
-    message: dict[str, Any],
-    raw_message: RabbitMessage = Depends(),
-) -> None:
+@consumer_runtime.consumer(admin_notifications_queue, UserNotificationMessage, prefetch=10, concurrency=5)
+async def handle_admin_notification(notification: UserNotificationMessage) -> None:
     """Обработчик админских уведомлений."""
-    try:
-        notification = UserNotificationMessage(**message)
-
-        logger.info(f"Получено админское уведомление: {notification.payload.message}")
+    logger.info(f"Получено админское уведомление: {notification.payload.message}")
 
-        # Логика для админских уведомлений
-        await process_admin_notification(notification)
+    # Логика для админских уведомлений
+    await process_admin_notification(notification)
 
-        await raw_message.ack()
 
-    except Exception as e:
-        logger.error(f"Ошибка обработки админского уведомления: {e}")
-        await raw_message.nack(requeue=True)
-
-
-@broker.subscriber(order_processing_queue)
-async def handle_order_processing(
-    message: dict[str, Any],
-    raw_message: RabbitMessage = Depends(),
-) -> None:
+@consumer_runtime.consumer(order_processing_queue, OrderProcessingMessage)
+async def handle_order_processing(order_msg: OrderProcessingMessage) -> None:
     """Обработчик сообщений о заказах в процессе обработки."""
-    try:
-        order_msg = OrderProcessingMessage(**message)
-
-        logger.info(f"Получено сообщение о заказе {order_msg.payload.order_id}: " f"статус {order_msg.payload.status}")
-
-        # Логика обработки заказа
-        await process_order(order_msg)
+    logger.info(f"Получено сообщение о заказе {order_msg.payload.order_id}: " f"статус {order_msg.payload.status}")
 
-        await raw_message.ack()
+    # Логика обработки заказа
+    await process_order(order_msg)
 
-    except Exception as e:
-        logger.error(f"Ошибка обработки сообщения о заказе: {e}")
-        await raw_message.nack(requeue=True)
 
-
-@broker.subscriber(order_completed_queue)
-async def handle_order_completed(
-    message: dict[str, Any],
-    raw_message: RabbitMessage = Depends(),
-) -> None:
+@consumer_runtime.consumer(order_completed_queue, OrderProcessingMessage)
+async def handle_order_completed(order_msg: OrderProcessingMessage) -> None:
     """Обработчик завершенных заказов."""
-    try:
-        order_msg = OrderProcessingMessage(**message)
-
-        logger.info(f"Заказ {order_msg.payload.order_id} завершен со статусом {order_msg.payload.status}")
-
-        # Логика для завершенных заказов
-        await process_completed_order(order_msg)
-
-        await raw_message.ack()
+    logger.info(f"Заказ {order_msg.payload.order_id} завершен со статусом {order_msg.payload.status}")
 
-    except Exception as e:
-        logger.error(f"Ошибка обработки завершенного заказа: {e}")
-        await raw_message.nack(requeue=True)
+    # Логика для завершенных заказов
+    await process_completed_order(order_msg)
 
 
-@broker.subscriber(system_events_queue)
-async def handle_system_event(
-    message: dict[str, Any],
-    raw_message: RabbitMessage = Depends(),
-) -> None:
-    """Обработчик системных событий."""
-    try:
-        event = SystemEventMessage(**message)
-
-        logger.info(f"Получено системное событие {event.payload.event_name} " f"с уровнем {event.payload.severity}")
+@consumer_runtime.consumer(
+    system_events_queue, SystemEventMessage, prefetch=200, concurrency=2, batch_size=100, ack_batch_size=100
+)
+async def handle_system_events(events: list[SystemEventMessage]) -> None:
+    """Обработчик системных событий пачками (одна запись в БД на пачку)."""
+    logger.info(f"Получено {len(events)} системных событий")
 
-        # Логика обработки системных событий
+    for event in events:
         await process_system_event(event)
 
-        await raw_message.ack()
-
-    except Exception as e:
-        logger.error(f"Ошибка обработки системного события: {e}")
-        await raw_message.nack(requeue=True)
+    await save_system_events([(e.payload.event_name, e.payload.event_data, e.payload.severity) for e in events])
 
 
 # Бизнес-логика обработчиков
@@ -230,9 +171,6 @@ async def process_system_event(event: SystemEventMessage) -> None:
     else:  # info
         logger.info(f"Системное событие: {event_name}")
 
-    # Сохранение события в базу для аналитики
-    await save_system_event(event_name, event_data, severity)
-
 
 # Вспомогательные функции (заглушки для примера)
 
@@ -269,6 +207,6 @@ async def send_critical_alert(event_name: str, event_data: dict[str, Any]) -> No
     logger.debug(f"Отправлено критическое оповещение о событии: {event_name}")
 
 
-async def save_system_event(event_name: str, event_data: dict[str, Any], severity: str) -> None:
-    """Сохранение системного события."""
-    logger.debug(f"Сохранено системное событие: {event_name} ({severity})")
+async def save_system_events(events: list[tuple[str, dict[str, Any], str]]) -> None:
+    """Сохранение пачки системных событий одной вставкой."""
+    logger.debug(f"Сохранено системных событий: {len(events)}")
@@ -0,0 +1,276 @@
+"""Пакетная публикация сообщений с подтверждениями издателя.
+
+:class:`BatchPublisher` копит сообщения в буфере не дольше ``linger`` секунд
+или до ``max_batch_size`` штук и отправляет пачку целиком, не дожидаясь
+подтверждения каждого сообщения перед следующим: подтверждения от брокера
+собираются конвейером. Число неподтвержденных сообщений ограничено
+``max_unconfirmed`` - при превышении ``publish`` ждет, пока брокер подтвердит
+уже отправленные (backpressure).
+
+Транспорт отделен от логики пакетирования:
+
+- :class:`RabbitConfirmTransport` - выделенный канал aio-pika с publisher confirms;
+- :class:`InMemoryTransport` - замена брокера в памяти для тестов и бенчмарков.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+from faststream.rabbit import RabbitBroker, RabbitExchange
+
+from core.exceptions.core_base import CoreMessagingConnectionError, CoreMessagingPublishError
+
+from .models import MessageModel
+
+logger = logging.getLogger(__name__)
+
+
+class PublishTransport(Protocol):
+    """Транспорт публикации: ``publish`` завершается после подтверждения брокером."""
+
+    async def open(self) -> None: ...
+
+    async def publish(self, body: bytes, exchange: str, routing_key: str, message_id: str | None = None) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class RabbitConfirmTransport:
+    """Публикация через выделенный канал RabbitMQ с publisher confirms.
+
+    Канал открывается на соединении брокера FastStream, поэтому пакетная
+    публикация не конкурирует с обычными ``broker.publish`` за канал.
+    Конкурентные ``publish`` на одном канале отправляются сразу, а их
+    подтверждения приходят конвейером.
+
+    Args:
+        broker: Подключенный брокер FastStream
+        exchanges: Exchanges по имени
+    """
+
+    def __init__(self, broker: RabbitBroker, exchanges: dict[str, RabbitExchange]) -> None:
+        self.broker = broker
+        self.exchanges = exchanges
+        self._channel: Any = None
+        self._declared: dict[str, Any] = {}
+
+    async def open(self) -> None:
+        import aio_pika
+
+        connection = getattr(self.broker, "_connection", None)
+        if connection is None:
+            raise CoreMessagingConnectionError("rabbitmq")
+
+        self._channel = await connection.channel(publisher_confirms=True)
+        for name, exchange in self.exchanges.items():
+            self._declared[name] = await self._channel.declare_exchange(
+                name, type=aio_pika.ExchangeType(exchange.type.value), durable=exchange.durable
+            )
+
+    async def publish(self, body: bytes, exchange: str, routing_key: str, message_id: str | None = None) -> None:
+        import aio_pika
+
+        target = self._declared.get(exchange)
+        if target is None:
+            raise CoreMessagingPublishError("rabbitmq", exchange, len(body))
+
+        await target.publish(
+            aio_pika.Message(
+                body,
+                content_type="application/json",
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                message_id=message_id,
+            ),
+            routing_key=routing_key,
+        )
+
+    async def close(self) -> None:
+        if self._channel is not None and not self._channel.is_closed:
+            await self._channel.close()
+        self._channel = None
+        self._declared.clear()
+
+
+class InMemoryTransport:
+    """Транспорт в памяти вместо брокера.
+
+    Args:
+        confirm_latency: Задержка подтверждения (имитация RTT до брокера), сек
+        fail_routing_keys: Routing keys, публикация в которые отклоняется брокером
+    """
+
+    def __init__(self, confirm_latency: float = 0.0, fail_routing_keys: Iterable[str] = ()) -> None:
+        self.confirm_latency = confirm_latency
+        self.fail_routing_keys = set(fail_routing_keys)
+        self.messages: list[tuple[str, str, bytes]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.is_open = False
+
+    async def open(self) -> None:
+        self.is_open = True
+
+    async def publish(self, body: bytes, exchange: str, routing_key: str, message_id: str | None = None) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.confirm_latency:
+                await asyncio.sleep(self.confirm_latency)
+            if routing_key in self.fail_routing_keys:
+                raise CoreMessagingPublishError("memory", exchange, len(body))
+            self.messages.append((exchange, routing_key, body))
+        finally:
+            self.in_flight -= 1
+
+    async def close(self) -> None:
+        self.is_open = False
+
+    def decoded(self) -> list[dict[str, Any]]:
+        """Опубликованные сообщения в виде dict."""
+        return [json.loads(body) for _, _, body in self.messages]
+
+
+class BatchPublisher:
+    """Буферизованный издатель с конвейерными подтверждениями и backpressure.
+
+    Args:
+        transport: Транспорт публикации
+        max_batch_size: Максимальный размер пачки
+        linger: Сколько ждать добора пачки после первого сообщения, сек
+        max_unconfirmed: Лимит неподтвержденных сообщений, после которого ``publish`` ждет
+    """
+
+    def __init__(
+        self,
+        transport: PublishTransport,
+        max_batch_size: int = 100,
+        linger: float = 0.005,
+        max_unconfirmed: int = 1000,
+    ) -> None:
+        self.transport = transport
+        self.max_batch_size = max_batch_size
+        self.linger = linger
+        self.max_unconfirmed = max_unconfirmed
+
+        self.published = 0
+        self.confirmed = 0
+        self.failed = 0
+
+        self._buffer: list[tuple[bytes, str, str, str | None, asyncio.Future]] = []
+        self._capacity = asyncio.Semaphore(max_unconfirmed)
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._batches: set[asyncio.Task] = set()
+        self._runner: asyncio.Task | None = None
+        self._closing = False
+
+    @property
+    def unconfirmed(self) -> int:
+        """Сообщения в буфере и ожидающие подтверждения."""
+        return self.published - self.confirmed - self.failed
+
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    async def start(self) -> None:
+        """Открыть транспорт и запустить цикл отправки пачек."""
+        if self.is_running:
+            return
+        await self.transport.open()
+        self._closing = False
+        self._runner = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Отправить буфер, дождаться подтверждений и закрыть транспорт."""
+        if not self.is_running:
+            return
+        self._closing = True
+        self._pending.set()
+        self._full.set()
+        await self._runner
+        self._runner = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        await self.transport.close()
+
+    async def publish(
+        self, message: MessageModel | dict[str, Any], exchange: str, routing_key: str = ""
+    ) -> asyncio.Future:
+        """Поставить сообщение в очередь на отправку.
+
+        Ждет, если неподтвержденных сообщений больше ``max_unconfirmed``.
+
+        Returns:
+            Future, который завершается после подтверждения брокером
+            (или с ``CoreMessagingPublishError``)
+        """
+        if not self.is_running:
+            raise CoreMessagingPublishError("rabbitmq", exchange)
+
+        if isinstance(message, MessageModel):
+            body, message_id = message.model_dump_json().encode(), message.id
+        else:
+            body, message_id = json.dumps(message, default=str).encode(), message.get("id")
+
+        await self._capacity.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((body, exchange, routing_key, message_id, future))
+        self.published += 1
+
+        self._pending.set()
+        if len(self._buffer) >= self.max_batch_size:
+            self._full.set()
+        return future
+
+    async def flush(self) -> None:
+        """Отправить буфер и дождаться подтверждения всех отправленных сообщений."""
+        futures = [item[4] for item in self._buffer]
+        batches = list(self._batches)
+        self._full.set()
+        await asyncio.gather(*futures, *batches, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            await self._pending.wait()
+            if not self._closing and len(self._buffer) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.linger)
+                except TimeoutError:
+                    pass
+
+            self._pending.clear()
+            self._full.clear()
+            while self._buffer:
+                batch = self._buffer[: self.max_batch_size]
+                del self._buffer[: self.max_batch_size]
+                task = asyncio.create_task(self._send_batch(batch))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+
+            if self._closing:
+                return
+
+    async def _send_batch(self, batch: list[tuple[bytes, str, str, str | None, asyncio.Future]]) -> None:
+        results = await asyncio.gather(
+            *(self.transport.publish(body, exchange, key, message_id) for body, exchange, key, message_id, _ in batch),
+            return_exceptions=True,
+        )
+        for (body, exchange, _, _, future), result in zip(batch, results, strict=True):
+            self._capacity.release()
+            if isinstance(result, BaseException):
+                self.failed += 1
+                logger.error(f"Сообщение не подтверждено брокером ({exchange}): {result}")
+                if not future.done():
+                    future.set_exception(
+                        result
+                        if isinstance(result, CoreMessagingPublishError)
+                        else CoreMessagingPublishError("rabbitmq", exchange, len(body))
+                    )
+            else:
+                self.confirmed += 1
+                if not future.done():
+                    future.set_result(None)
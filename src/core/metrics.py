@@ -0,0 +1,680 @@
+"""Реестр метрик приложения и эндпоинт ``/metrics`` в формате Prometheus.
+
+Метрики живут в памяти процесса и не требуют коллектора OpenTelemetry:
+счетчики, gauge и гистограммы с фиксированными корзинами
+(:class:`~core.performance.LatencyHistogram`). На пути запроса нет блокировок
+и выделения памяти: дочерняя метрика для набора меток создается один раз и
+кэшируется, а запись - это инкремент поля объекта со ``__slots__``. Значения,
+которые дешевле прочитать, чем отслеживать (размер пула БД, число
+соединений, длина очередей), снимаются коллекторами в момент сбора.
+
+Несколько воркеров uvicorn: при заданном ``METRICS_MULTIPROC_DIR`` каждый
+воркер периодически сохраняет снимок своих метрик в ``<dir>/<pid>.json``, а
+``/metrics`` в любом воркере объединяет снимки всех воркеров. Счетчики и
+гистограммы суммируются (включая завершившиеся воркеры), gauge объединяются
+по ``multiprocess_mode`` живых воркеров. Снимок завершившегося воркера
+перенимает один из живых: его счетчики и гистограммы прибавляются к
+собственному снимку, а файл удаляется, так что каталог не растет с
+перезапусками воркеров.
+
+Эндпоинт выключен по умолчанию (``METRICS_ENABLED``); при заданном
+``METRICS_TOKEN`` он требует ``Authorization: Bearer <token>``.
+
+Example:
+    Метрика приложения::
+
+        from core.metrics import Counter
+
+        orders_created = Counter("orders_created_total", "Created orders", ["channel"])
+        orders_created.labels("web").inc()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.responses import Response
+
+from core.config import get_settings
+from core.performance import DEFAULT_LATENCY_BUCKETS, LatencyHistogram
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+MultiprocessMode = Literal["sum", "max", "min", "all"]
+
+
+class CounterValue:
+    """Значение счетчика для одного набора меток."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличить счетчик."""
+        self.value += amount
+
+
+class GaugeValue:
+    """Значение gauge для одного набора меток."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """Установить значение."""
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличить значение."""
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Уменьшить значение."""
+        self.value -= amount
+
+
+class HistogramValue(LatencyHistogram):
+    """Гистограмма для одного набора меток."""
+
+    __slots__ = ()
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Записать длительность блока, сек."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Metric(ABC):
+    """Базовая метрика: семейство значений по наборам меток.
+
+    Метрика без меток сама проксирует методы своего единственного значения
+    (``counter.inc()``), метрика с метками - через ``labels``.
+
+    Args:
+        name: Имя метрики
+        documentation: Описание (``# HELP``)
+        labelnames: Имена меток
+        registry: Реестр, ``None`` - не регистрировать
+    """
+
+    type_name = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+        if registry is not None:
+            registry.register(self)
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Новое значение для набора меток."""
+
+    def labels(self, *values: Any, **labels: Any) -> Any:
+        """Значение метрики для набора меток (создается при первом обращении).
+
+        Результат стоит сохранить, если метка известна заранее: повторный
+        вызов - это поиск в словаре по кортежу меток.
+        """
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {key}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def items(self) -> list[tuple[tuple[str, ...], Any]]:
+        """Пары (значения меток, значение)."""
+        return list(self._children.items())
+
+    def clear(self) -> None:
+        """Удалить все значения."""
+        self._children.clear()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def dump(self) -> dict[str, Any]:
+        """Снимок метрики для объединения между процессами."""
+        return {"type": self.type_name, "help": self.documentation, "labelnames": list(self.labelnames)}
+
+
+class Counter(Metric):
+    """Монотонный счетчик."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличить счетчик без меток."""
+        self._default.value += amount
+
+    @property
+    def value(self) -> float:
+        return self._default.value
+
+    def dump(self) -> dict[str, Any]:
+        return {**super().dump(), "samples": [[list(key), child.value] for key, child in self._children.items()]}
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться.
+
+    Args:
+        multiprocess_mode: Объединение значений воркеров: ``sum``, ``max``,
+            ``min`` или ``all`` (отдельная серия с меткой ``pid``)
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: MetricsRegistry | None = None,
+        multiprocess_mode: MultiprocessMode = "sum",
+    ) -> None:
+        self.multiprocess_mode = multiprocess_mode
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> GaugeValue:
+        return GaugeValue()
+
+    def set(self, value: float) -> None:
+        """Установить значение gauge без меток."""
+        self._default.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._default.value
+
+    def dump(self) -> dict[str, Any]:
+        return {
+            **super().dump(),
+            "mode": self.multiprocess_mode,
+            "samples": [[list(key), child.value] for key, child in self._children.items()],
+        }
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными корзинами.
+
+    Args:
+        buckets: Возрастающие верхние границы корзин
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: MetricsRegistry | None = None,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(float(bound) for bound in buckets if bound != float("inf"))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Записать значение гистограммы без меток."""
+        self._default.observe(value)
+
+    def time(self) -> Any:
+        """Записать длительность блока в гистограмму без меток."""
+        return self._default.time()
+
+    def dump(self) -> dict[str, Any]:
+        return {
+            **super().dump(),
+            "buckets": list(self.buckets),
+            "samples": [[list(key), [child.counts, child.sum]] for key, child in self._children.items()],
+        }
+
+
+Collector = Callable[[], Any]
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: Metric) -> None:
+        """Зарегистрировать метрику.
+
+        Raises:
+            ValueError: Метрика с таким именем уже зарегистрирована
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def unregister(self, metric: Metric) -> None:
+        """Удалить метрику из реестра."""
+        self._metrics.pop(metric.name, None)
+
+    def get(self, name: str) -> Metric | None:
+        """Метрика по имени."""
+        return self._metrics.get(name)
+
+    def add_collector(self, collector: Collector) -> Collector:
+        """Добавить коллектор - функцию (или корутину), обновляющую метрики перед сбором.
+
+        Можно использовать как декоратор.
+        """
+        self._collectors.append(collector)
+        return collector
+
+    async def collect(self) -> None:
+        """Запустить коллекторы. Ошибка коллектора не прерывает сбор."""
+        for collector in self._collectors:
+            try:
+                result = collector()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.debug(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+
+    def dump(self) -> dict[str, Any]:
+        """Снимок всех метрик процесса."""
+        return {"pid": os.getpid(), "metrics": {name: metric.dump() for name, metric in self._metrics.items()}}
+
+    def render(self) -> str:
+        """Метрики процесса в текстовом формате Prometheus."""
+        return render_snapshots([self.dump()])
+
+
+# Реестр метрик процесса
+REGISTRY = MetricsRegistry()
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: tuple[str, str] | None = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _parts(snapshot: dict[str, Any]) -> Iterator[tuple[dict[str, Any], bool]]:
+    """Метрики снимка и перенятые им метрики завершившихся воркеров (без gauge)."""
+    yield snapshot["metrics"], snapshot.get("alive", True)
+    if snapshot.get("retired"):
+        yield snapshot["retired"], False
+
+
+def _merge(snapshots: Sequence[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Объединить снимки процессов в одно семейство на метрику."""
+    merged: dict[str, dict[str, Any]] = {}
+    for snapshot in snapshots:
+        pid = snapshot["pid"]
+        for metrics, alive in _parts(snapshot):
+            _merge_metrics(merged, metrics, pid, alive)
+    return merged
+
+
+def _merge_metrics(merged: dict[str, dict[str, Any]], metrics: dict[str, Any], pid: int, alive: bool) -> None:
+    for name, data in metrics.items():
+        family = merged.setdefault(name, {**data, "samples": {}})
+        samples: dict[tuple[str, ...], Any] = family["samples"]
+
+        if data["type"] == "gauge":
+            if not alive:
+                continue
+            mode = data.get("mode", "sum")
+            if mode == "all":
+                family["labelnames"] = [*data["labelnames"], "pid"]
+            for labels, value in data["samples"]:
+                key = (*labels, str(pid)) if mode == "all" else tuple(labels)
+                if key not in samples or mode == "all":
+                    samples[key] = value
+                elif mode == "sum":
+                    samples[key] += value
+                elif mode == "max":
+                    samples[key] = max(samples[key], value)
+                elif mode == "min":
+                    samples[key] = min(samples[key], value)
+        elif data["type"] == "histogram":
+            for labels, (counts, total) in data["samples"]:
+                current = samples.get(tuple(labels))
+                if current is None:
+                    samples[tuple(labels)] = [list(counts), total]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], counts, strict=True)]
+                    current[1] += total
+        else:
+            for labels, value in data["samples"]:
+                samples[tuple(labels)] = samples.get(tuple(labels), 0.0) + value
+
+
+def _retire(retired: dict[str, Any], snapshot: dict[str, Any]) -> dict[str, Any]:
+    """Прибавить счетчики и гистограммы завершившегося воркера к перенятым ранее."""
+    merged = _merge([{"pid": 0, "alive": False, "metrics": retired}, {**snapshot, "alive": False}])
+    return {
+        name: {**family, "samples": [[list(labels), value] for labels, value in family["samples"].items()]}
+        for name, family in merged.items()
+        if family["type"] != "gauge"
+    }
+
+
+def render_snapshots(snapshots: Sequence[dict[str, Any]]) -> str:
+    """Объединить снимки процессов и вывести в текстовом формате Prometheus.
+
+    Args:
+        snapshots: Результаты :meth:`MetricsRegistry.dump`
+
+    Returns:
+        str: Текст для ответа ``/metrics``
+    """
+    lines: list[str] = []
+    for name, family in _merge(snapshots).items():
+        labelnames = family["labelnames"]
+        lines.append(f"# HELP {name} {_escape(family['help'])}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for labels, value in family["samples"].items():
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip((*family["buckets"], float("inf")), counts, strict=True):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, le)} {_format_value(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {_format_value(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+class MultiProcessMetrics:
+    """Обмен снимками метрик между воркерами через каталог.
+
+    Args:
+        directory: Общий каталог воркеров (очищается при деплое, как
+            ``PROMETHEUS_MULTIPROC_DIR``)
+        registry: Реестр процесса
+        interval: Интервал сохранения снимка, сек
+    """
+
+    def __init__(self, directory: str | Path, registry: MetricsRegistry = REGISTRY, interval: float = 5.0) -> None:
+        self.directory = Path(directory)
+        self.registry = registry
+        self.interval = interval
+        self._retired: dict[str, Any] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def path(self) -> Path:
+        """Файл снимка текущего процесса."""
+        return self.directory / f"{os.getpid()}.json"
+
+    def snapshot(self) -> dict[str, Any]:
+        """Снимок процесса вместе с перенятыми метриками завершившихся воркеров."""
+        snapshot = self.registry.dump()
+        if self._retired:
+            snapshot["retired"] = self._retired
+        return snapshot
+
+    def write(self) -> None:
+        """Сохранить снимок процесса (атомарно, через временный файл)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, self.path)
+
+    def read(self) -> list[dict[str, Any]]:
+        """Снимки живых воркеров; снимок текущего процесса берется из памяти.
+
+        Снимки завершившихся воркеров перенимаются текущим процессом и
+        удаляются из каталога.
+        """
+        current_pid = os.getpid()
+        snapshots: list[dict[str, Any]] = []
+        claimed: list[Path] = []
+        for path in self.directory.glob("*.json"):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping metrics snapshot {path}: {e}")
+                continue
+            if snapshot.get("pid") == current_pid:
+                continue
+            if _pid_alive(snapshot["pid"]):
+                snapshots.append(snapshot)
+                continue
+
+            # Переименование атомарно: снимок перенимает ровно один воркер
+            claim_path = path.with_suffix(f".{current_pid}.claimed")
+            try:
+                path.rename(claim_path)
+            except OSError:
+                continue
+            self._retired = _retire(self._retired, snapshot)
+            claimed.append(claim_path)
+
+        if claimed:
+            self.write()
+            for claim_path in claimed:
+                claim_path.unlink(missing_ok=True)
+        return [self.snapshot(), *snapshots]
+
+    async def render(self) -> str:
+        """Метрики всех воркеров в текстовом формате Prometheus."""
+        snapshots = await asyncio.to_thread(self.read)
+        return render_snapshots(snapshots)
+
+    def start(self) -> None:
+        """Запустить периодическое сохранение снимка."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.registry.collect()
+                await asyncio.to_thread(self.write)
+            except Exception as e:
+                logger.warning(f"Failed to write metrics snapshot: {e}")
+
+    async def stop(self) -> None:
+        """Остановить сохранение и записать финальный снимок."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.registry.collect()
+            await asyncio.to_thread(self.write)
+        except Exception as e:
+            logger.warning(f"Failed to write metrics snapshot: {e}")
+
+
+_multiprocess: MultiProcessMetrics | None = None
+
+
+def get_multiprocess_metrics() -> MultiProcessMetrics | None:
+    """Обмен метриками между воркерами, если задан ``METRICS_MULTIPROC_DIR``."""
+    global _multiprocess
+    if _multiprocess is None and settings.METRICS_MULTIPROC_DIR:
+        _multiprocess = MultiProcessMetrics(settings.METRICS_MULTIPROC_DIR, interval=settings.METRICS_FLUSH_INTERVAL)
+    return _multiprocess
+
+
+async def generate_latest(registry: MetricsRegistry = REGISTRY) -> str:
+    """Собрать метрики (всех воркеров в multi-process режиме).
+
+    Returns:
+        str: Текст в формате Prometheus
+    """
+    await registry.collect()
+    multiprocess = get_multiprocess_metrics() if registry is REGISTRY else None
+    if multiprocess is not None:
+        return await multiprocess.render()
+    return registry.render()
+
+
+# Встроенные метрики
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Database pool connections by state", ["state"], registry=REGISTRY
+)
+REPOSITORY_CALL_SECONDS = Histogram(
+    "repository_call_duration_seconds", "Repository method duration", ["model", "method"], registry=REGISTRY
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per HTTP request",
+    ["endpoint"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+    registry=REGISTRY,
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_THRESHOLD_MS", registry=REGISTRY
+)
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_total", "Requests repeating one statement above N_PLUS_ONE_THRESHOLD", registry=REGISTRY
+)
+CACHE_HITS = Counter("repository_cache_hits_total", "Repository cache hits", ["layer"], registry=REGISTRY)
+CACHE_MISSES = Counter("repository_cache_misses_total", "Repository cache misses", registry=REGISTRY)
+REALTIME_CONNECTIONS = Gauge(
+    "realtime_connections", "Open realtime connections", ["transport"], registry=REGISTRY
+)
+QUEUE_DEPTH = Gauge("queue_depth", "In-process queue depth", ["queue"], registry=REGISTRY)
+TASKIQ_QUEUE_DEPTH = Gauge(
+    "taskiq_queue_depth", "Tasks waiting in the TaskIQ broker", registry=REGISTRY, multiprocess_mode="max"
+)
+
+
+@REGISTRY.add_collector
+def collect_db_pool() -> None:
+    from core.database import engine
+
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    DB_POOL_CONNECTIONS.labels("size").set(pool.size())
+    DB_POOL_CONNECTIONS.labels("checked_out").set(pool.checkedout())
+    DB_POOL_CONNECTIONS.labels("checked_in").set(pool.checkedin())
+    DB_POOL_CONNECTIONS.labels("overflow").set(max(pool.overflow(), 0))
+
+
+@REGISTRY.add_collector
+def collect_realtime_connections() -> None:
+    try:
+        from core.realtime import connection_manager
+    except ImportError:
+        return
+    REALTIME_CONNECTIONS.labels("websocket").set(len(connection_manager.registry.websockets))
+    REALTIME_CONNECTIONS.labels("sse").set(len(connection_manager.registry.sse))
+
+
+@REGISTRY.add_collector
+def collect_queue_depths() -> None:
+    from core.base.repo.emitter import get_event_queue
+    from core.exceptions import notifications
+
+    QUEUE_DEPTH.labels("repository_events").set(get_event_queue().pending)
+    if notifications._notification_manager is not None:
+        QUEUE_DEPTH.labels("notifications").set(notifications._notification_manager.pending)
+
+
+@REGISTRY.add_collector
+async def collect_taskiq_queue_depth() -> None:
+    from core.taskiq_client import get_queue_depth
+
+    depth = await get_queue_depth()
+    if depth is not None:
+        TASKIQ_QUEUE_DEPTH.set(depth)
+
+
+def verify_metrics_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(HTTPBearer(auto_error=False)),
+) -> None:
+    """Проверить Bearer-токен скрейпера, если задан ``METRICS_TOKEN``."""
+    token = settings.METRICS_TOKEN
+    if token and (credentials is None or not secrets.compare_digest(credentials.credentials, token)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get(settings.METRICS_PATH, include_in_schema=False, dependencies=[Depends(verify_metrics_token)])
+async def metrics() -> Response:
+    """Метрики в текстовом формате Prometheus."""
+    return Response(await generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,189 @@
+"""Недорогая инструментация производительности запросов.
+
+На пути запроса не выполняются системные вызовы и не пишутся логи: задержка
+записывается в гистограмму с фиксированными корзинами (поиск корзины и
+инкремент счетчика), а память процесса снимает фоновый :class:`MemorySampler`
+раз в ``interval`` секунд. Подробный лог пишется только для выборки запросов
+(``sample_rate``) и для медленных запросов.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин задержки, сек (последняя корзина - +Inf)
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+
+class LatencyHistogram:
+    """Гистограмма с фиксированными корзинами.
+
+    ``observe`` не выделяет память: бинарный поиск корзины и инкремент
+    элемента заранее созданного списка.
+
+    Args:
+        buckets: Возрастающие верхние границы корзин
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Записать значение."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля: верхняя граница корзины, в которую он попадает.
+
+        Для значений выше последней границы возвращается последняя граница.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts, strict=False):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def reset(self) -> None:
+        """Обнулить гистограмму."""
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Состояние гистограммы: накопительные счетчики по границам, сумма и оценки квантилей."""
+        cumulative: dict[str, int] = {}
+        seen = 0
+        for bound, bucket_count in zip((*self.buckets, float("inf")), self.counts, strict=True):
+            seen += bucket_count
+            cumulative["+Inf" if bound == float("inf") else f"{bound:g}"] = seen
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": cumulative,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MemorySampler:
+    """Фоновый замер памяти процесса.
+
+    Значения обновляются задачей раз в ``interval`` секунд; запросы читают
+    последний замер без системных вызовов. Без psutil замер не выполняется.
+
+    Args:
+        interval: Интервал замера, сек
+        memory_threshold: Доля занятой памяти системы, выше которой пишется предупреждение
+    """
+
+    def __init__(self, interval: float = 10.0, memory_threshold: float = 0.85) -> None:
+        self.interval = interval
+        self.memory_threshold = memory_threshold
+        self.rss_mb = 0.0
+        self.memory_percent = 0.0
+        self.samples = 0
+        self._process: Any = psutil.Process() if PSUTIL_AVAILABLE else None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def sample(self) -> None:
+        """Снять память процесса и системы."""
+        if self._process is None:
+            return
+
+        self.rss_mb = self._process.memory_info().rss / 1024 / 1024
+        self.memory_percent = psutil.virtual_memory().percent / 100
+        self.samples += 1
+
+        if self.memory_percent > self.memory_threshold:
+            logger.warning(
+                f"High memory usage: {self.memory_percent:.1%}",
+                extra={
+                    "memory_percent": self.memory_percent,
+                    "rss_mb": self.rss_mb,
+                    "threshold": self.memory_threshold,
+                    "alert_type": "high_memory",
+                },
+            )
+
+    def ensure_started(self) -> None:
+        """Запустить фоновый замер в текущем event loop, если он еще не запущен."""
+        if self._process is None or self.is_running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"Memory sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        """Остановить фоновый замер."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Общий замер памяти процесса (один на процесс, а не на middleware)
+_memory_sampler: MemorySampler | None = None
+
+
+def get_memory_sampler(interval: float = 10.0, memory_threshold: float = 0.85) -> MemorySampler:
+    """Получить общий замер памяти процесса.
+
+    Параметры применяются при первом вызове.
+
+    Returns:
+        MemorySampler: Замер памяти
+    """
+    global _memory_sampler
+    if _memory_sampler is None:
+        _memory_sampler = MemorySampler(interval=interval, memory_threshold=memory_threshold)
+    return _memory_sampler
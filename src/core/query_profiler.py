@@ -0,0 +1,222 @@
+"""Профилировщик SQL: лог медленных запросов и детектор N+1.
+
+Профилировщик подписывается на ``before_cursor_execute`` и
+``after_cursor_execute`` всех движков SQLAlchemy. Запрос дольше порога
+пишется в лог вместе с формой параметров (типы, без значений - в параметрах
+бывают пароли и персональные данные).
+
+Внутри :meth:`QueryProfiler.track` (для HTTP запросов его открывает
+:class:`QueryProfilerMiddleware`) статистика копится в contextvar: число
+запросов, суммарное время и счетчик отпечатков. Отпечаток - текст запроса с
+литералами и списками плейсхолдеров, замененными на ``?``: запросы
+``WHERE id IN (?, ?)`` и ``WHERE id IN (?, ?, ?)`` совпадают. Если один
+отпечаток повторился больше ``N_PLUS_ONE_THRESHOLD`` раз, это N+1: ленивая
+загрузка связи в цикле или запрос на каждый элемент списка. По умолчанию
+пишется предупреждение, в тестах можно включить исключение.
+
+Example:
+    ```python
+    from core.query_profiler import get_query_profiler
+
+    with get_query_profiler().track("sync_profiles") as stats:
+        await sync_profiles()
+    logger.info(f"{stats.count} queries, {stats.total_time * 1000:.0f} ms")
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import get_settings
+from core.exceptions import CoreRepositoryNPlusOneError
+from core.metrics import DB_N_PLUS_ONE, DB_QUERIES_PER_REQUEST, DB_SLOW_QUERIES
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|\$\d+|%\(\w+\)s|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_VALUES_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Отпечаток запроса: литералы и списки плейсхолдеров заменены на ``?``."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?)", normalized)
+    return _VALUES_LIST.sub("(?)", normalized)
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """Форма параметров запроса: имена типов вместо значений."""
+    if isinstance(parameters, Mapping):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (Mapping, list, tuple)):
+            # executemany: форма первой строки и число строк
+            return {"rows": len(parameters), "shape": parameter_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Статистика SQL запросов одной области (HTTP запроса, задачи)."""
+
+    endpoint: str
+    count: int = 0
+    total_time: float = 0.0
+    fingerprints: Counter[str] = field(default_factory=Counter)
+    n_plus_one: set[str] = field(default_factory=set)
+
+    def most_common(self, n: int = 5) -> list[tuple[str, int]]:
+        """Самые частые отпечатки запросов."""
+        return self.fingerprints.most_common(n)
+
+
+class QueryProfiler:
+    """Слушатель событий движка: медленные запросы и N+1.
+
+    Args:
+        slow_threshold: Порог медленного запроса, сек
+        n_plus_one_threshold: Допустимое число повторов одного отпечатка в области
+        raise_on_n_plus_one: Бросать :class:`CoreRepositoryNPlusOneError` вместо предупреждения
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = 0.2,
+        n_plus_one_threshold: int = 10,
+        raise_on_n_plus_one: bool = False,
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.raise_on_n_plus_one = raise_on_n_plus_one
+        self._targets: list[Any] = []
+        # Ключ Connection.info со стеком времени начала запросов
+        self._start_key = f"query_profiler_start_{id(self)}"
+        self._stats: ContextVar[QueryStats | None] = ContextVar(f"query_stats_{id(self)}", default=None)
+
+    def install(self, target: Any = Engine) -> None:
+        """Подписаться на события движка (по умолчанию - всех движков). Повторный вызов ничего не делает."""
+        if target in self._targets:
+            return
+        event.listen(target, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(target, "after_cursor_execute", self._after_cursor_execute)
+        self._targets.append(target)
+
+    def uninstall(self) -> None:
+        """Отписаться от всех движков."""
+        for target in self._targets:
+            event.remove(target, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(target, "after_cursor_execute", self._after_cursor_execute)
+        self._targets.clear()
+
+    def current_stats(self) -> QueryStats | None:
+        """Статистика текущей области или ``None`` вне :meth:`track`."""
+        return self._stats.get()
+
+    @contextmanager
+    def track(self, endpoint: str = "<unknown>") -> Iterator[QueryStats]:
+        """Копить статистику запросов блока; при выходе записать число запросов в гистограмму.
+
+        ``stats.endpoint`` можно уточнить внутри блока - метка гистограммы берется при выходе.
+        """
+        stats = QueryStats(endpoint)
+        token = self._stats.set(stats)
+        try:
+            yield stats
+        finally:
+            self._stats.reset(token)
+            DB_QUERIES_PER_REQUEST.labels(stats.endpoint).observe(stats.count)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(self._start_key, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        starts = conn.info.get(self._start_key)
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+
+        if elapsed >= self.slow_threshold:
+            DB_SLOW_QUERIES.inc()
+            shape = parameter_shape(parameters)
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.0f} ms): {fingerprint(statement)[:1000]} | parameters: {shape}",
+                extra={"duration_ms": round(elapsed * 1000, 1), "parameters": shape},
+            )
+
+        stats = self._stats.get()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.total_time += elapsed
+        key = fingerprint(statement)
+        stats.fingerprints[key] += 1
+        if stats.fingerprints[key] > self.n_plus_one_threshold and key not in stats.n_plus_one:
+            stats.n_plus_one.add(key)
+            self._report_n_plus_one(stats, key)
+
+    def _report_n_plus_one(self, stats: QueryStats, key: str) -> None:
+        DB_N_PLUS_ONE.inc()
+        count = stats.fingerprints[key]
+        if self.raise_on_n_plus_one:
+            raise CoreRepositoryNPlusOneError(key, count, stats.endpoint)
+        logger.warning(
+            f"Possible N+1 in {stats.endpoint}: statement executed {count} times: {key[:500]}",
+            extra={"endpoint": stats.endpoint, "count": count},
+        )
+
+
+@lru_cache
+def get_query_profiler() -> QueryProfiler:
+    """Профилировщик с порогами из настроек."""
+    settings = get_settings()
+    return QueryProfiler(
+        slow_threshold=settings.SLOW_QUERY_THRESHOLD_MS / 1000,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+        raise_on_n_plus_one=settings.N_PLUS_ONE_RAISE,
+    )
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware: статистика SQL запросов на каждый HTTP запрос.
+
+    Метка гистограммы ``db_queries_per_request`` - ``"{method} {route}"`` по
+    шаблону маршрута, а не по фактическому пути, чтобы число серий не росло.
+    """
+
+    def __init__(self, app: Any, profiler: QueryProfiler | None = None) -> None:
+        self.app = app
+        self.profiler = profiler or get_query_profiler()
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "GET")
+        with self.profiler.track(f"{method} {scope.get('path', '')}") as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+                stats.endpoint = f"{method} {route}"
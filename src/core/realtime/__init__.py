@@ -23,6 +23,7 @@ from .models import (
 from .routes.sse_routes import router as sse_router
 from .routes.webrtc_routes import router as webrtc_router
 from .routes.ws_routes import router as ws_router
+from .webrtc_registry import WebRTCRegistry
 
 __all__ = [
     # Auth
@@ -34,6 +35,8 @@ __all__ = [
     # Connection Manager
     "ConnectionManager",
     "connection_manager",
+    # WebRTC
+    "WebRTCRegistry",
     # Models
     "WSMessage",
     "SSEMessage",
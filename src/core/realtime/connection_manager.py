@@ -2,140 +2,120 @@
 
 import asyncio
 import logging
+import time
 import uuid
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any
 
 from fastapi import WebSocket
+from pytz import utc
 
 from core.config import get_settings
 from core.exceptions.core_base import CoreRealtimeConnectionError
-from core.realtime.models import (
-    BroadcastMessage,
-    ChannelMessage,
-    ConnectionStatus,
-    MessageType,
-    NotificationMessage,
-    SSEMessage,
-    WSConnectionInfo,
-    WSMessage,
-)
-from core.streaming.ws_models import SSEConnectionStatus
+from core.realtime.models import MessageType, SSEMessage, WSMessage
+from core.streaming.codecs import get_codec, send_payload
+from core.streaming.registry import KIND_SSE, KIND_WEBSOCKET, ConnectionRecord, ConnectionRegistry
+from core.streaming.ws_models import WSConnectionInfo
 
 logger = logging.getLogger(__name__)
 
 
 class ConnectionManager:
-    """Менеджер WebSocket и SSE соединений."""
+    """Менеджер WebSocket и SSE соединений.
+
+    Состояние соединений хранится в :class:`ConnectionRegistry`: одна запись
+    со ``__slots__`` на соединение плюс индексы пользователей и каналов.
+    """
 
     def __init__(self):
         self.settings = get_settings()
 
-        # WebSocket соединения
-        self.ws_connections: dict[str, WebSocket] = {}
-        self.ws_connection_info: dict[str, WSConnectionInfo] = {}
-        self.ws_user_connections: dict[str, set[str]] = defaultdict(set)
-
-        # SSE соединения (очереди сообщений)
-        self.sse_connections: dict[str, asyncio.Queue] = {}
-        self.sse_connection_info: dict[str, WSConnectionInfo] = {}
-        self.sse_user_connections: dict[str, set[str]] = defaultdict(set)
-
-        # Подписки на каналы
-        self.channel_subscriptions: dict[str, set[str]] = defaultdict(set)
-        self.connection_channels: dict[str, set[str]] = defaultdict(set)
+        # Реестр соединений
+        self.registry = ConnectionRegistry()
 
         # Персистентные сообщения каналов
         self.channel_messages: dict[str, list[WSMessage]] = defaultdict(list)
 
-        # Задачи heartbeat
-        self.heartbeat_tasks: dict[str, asyncio.Task] = {}
-
         logger.info("Connection manager initialized")
 
+    @property
+    def ws_connections(self) -> dict[str, ConnectionRecord]:
+        """WebSocket соединения по ID."""
+        return self.registry.websockets
+
+    @property
+    def sse_connections(self) -> dict[str, ConnectionRecord]:
+        """SSE соединения по ID."""
+        return self.registry.sse
+
+    @property
+    def channel_subscriptions(self) -> dict[str, set[str]]:
+        """Подписчики каналов."""
+        return self.registry.channels
+
     # WebSocket методы
 
     async def connect_websocket(
-        self, websocket: WebSocket, connection_id: str, user_data: dict[str, Any]
-    ) -> WSConnectionInfo:
-        """Подключение WebSocket клиента."""
-        await websocket.accept()
+        self, websocket: WebSocket, connection_id: str, user_data: dict[str, Any], subprotocol: str | None = None
+    ) -> ConnectionRecord:
+        """Подключение WebSocket клиента.
+
+        Args:
+            websocket: WebSocket соединение
+            connection_id: ID соединения
+            user_data: Результат аутентификации
+            subprotocol: Согласованный подпротокол кодирования (``None`` - JSON)
+        """
+        await websocket.accept(subprotocol=subprotocol)
 
         # Проверяем лимит соединений
-        if len(self.ws_connections) >= self.settings.WEBSOCKET_MAX_CONNECTIONS:
+        if len(self.registry.websockets) >= self.settings.WEBSOCKET_MAX_CONNECTIONS:
             await websocket.close(code=1013, reason="Превышен лимит соединений")
             raise CoreRealtimeConnectionError("websocket", "Max connections limit exceeded")
 
-        # Создаем информацию о соединении
-        connection_info = WSConnectionInfo(
-            connection_id=connection_id,
-            user_id=user_data.get("user", {}).get("sub") if user_data.get("authenticated") else None,
-            status=ConnectionStatus.CONNECTED,
-            ip_address=websocket.client.host if websocket.client else None,
-            user_agent=websocket.headers.get("user-agent"),
-            metadata={"auth_data": user_data},
+        # Сохраняем только то, что нужно для маршрутизации, без полного JWT payload
+        record = self.registry.add(
+            ConnectionRecord(
+                connection_id=connection_id,
+                kind=KIND_WEBSOCKET,
+                transport=websocket,
+                user_id=_extract_user_id(user_data),
+                authenticated=bool(user_data.get("authenticated")),
+                ip_address=websocket.client.host if websocket.client else None,
+                user_agent=websocket.headers.get("user-agent"),
+                codec=get_codec(
+                    subprotocol,
+                    self.settings.WEBSOCKET_COMPRESSION_THRESHOLD,
+                    self.settings.WEBSOCKET_COMPRESSION_LEVEL,
+                ),
+            )
         )
 
-        # Сохраняем соединение
-        self.ws_connections[connection_id] = websocket
-        self.ws_connection_info[connection_id] = connection_info
-
-        # Связываем с пользователем
-        if connection_info.user_id:
-            self.ws_user_connections[connection_info.user_id].add(connection_id)
-
         # Запускаем heartbeat
         if self.settings.WEBSOCKET_HEARTBEAT_INTERVAL > 0:
-            task = asyncio.create_task(self._websocket_heartbeat(connection_id))
-            self.heartbeat_tasks[connection_id] = task
+            record.heartbeat_task = asyncio.create_task(self._websocket_heartbeat(connection_id))
 
-        logger.info(f"WebSocket connected: {connection_id}, user: {connection_info.user_id}")
-        return connection_info
+        logger.info(f"WebSocket connected: {connection_id}, user: {record.user_id}")
+        return record
 
     async def disconnect_websocket(self, connection_id: str):
         """Отключение WebSocket клиента."""
-        if connection_id not in self.ws_connections:
+        if connection_id not in self.registry.websockets:
             return
 
-        connection_info = self.ws_connection_info.get(connection_id)
-
-        # Убираем из подписок
-        channels = self.connection_channels.get(connection_id, set()).copy()
-        for channel in channels:
-            await self.unsubscribe_from_channel(connection_id, channel)
-
-        # Убираем из пользовательских соединений
-        if connection_info and connection_info.user_id:
-            self.ws_user_connections[connection_info.user_id].discard(connection_id)
-            if not self.ws_user_connections[connection_info.user_id]:
-                del self.ws_user_connections[connection_info.user_id]
-
-        # Останавливаем heartbeat
-        if connection_id in self.heartbeat_tasks:
-            self.heartbeat_tasks[connection_id].cancel()
-            del self.heartbeat_tasks[connection_id]
-
-        # Удаляем соединение
-        del self.ws_connections[connection_id]
-        if connection_id in self.ws_connection_info:
-            del self.ws_connection_info[connection_id]
-
+        self._drop(connection_id)
         logger.info(f"WebSocket disconnected: {connection_id}")
 
     async def send_to_websocket(self, connection_id: str, message: WSMessage) -> bool:
         """Отправка сообщения в WebSocket."""
-        if connection_id not in self.ws_connections:
+        record = self.registry.websockets.get(connection_id)
+        if record is None:
             return False
 
-        websocket = self.ws_connections[connection_id]
         try:
-            await websocket.send_json(message.dict())
-
-            # Обновляем последнюю активность
-            if connection_id in self.ws_connection_info:
-                self.ws_connection_info[connection_id].last_activity = datetime.now(tz=utc)()
-
+            await send_payload(record.transport, record.codec, message.model_dump(mode=record.codec.dump_mode))
+            record.last_activity = time.monotonic()
             return True
         except Exception as e:
             logger.error(f"Error sending WebSocket message to {connection_id}: {e}")
@@ -147,79 +127,46 @@ class ConnectionManager:
     async def connect_sse(self, connection_id: str, user_data: dict[str, Any]) -> asyncio.Queue:
         """Подключение SSE клиента."""
         # Проверяем лимит соединений
-        if len(self.sse_connections) >= self.settings.SSE_MAX_CONNECTIONS:
+        if len(self.registry.sse) >= self.settings.SSE_MAX_CONNECTIONS:
             raise CoreRealtimeConnectionError("sse", "Max SSE connections limit exceeded")
 
         # Создаем очередь сообщений
         message_queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=self.settings.WEBSOCKET_MESSAGE_QUEUE_SIZE)
 
-        # Создаем информацию о соединении
-        connection_info = WSConnectionInfo(
-            connection_id=connection_id,
-            user_id=user_data.get("user", {}).get("sub") if user_data.get("authenticated") else None,
-            status=ConnectionStatus.CONNECTED,
-            metadata={"auth_data": user_data},
+        record = self.registry.add(
+            ConnectionRecord(
+                connection_id=connection_id,
+                kind=KIND_SSE,
+                transport=message_queue,
+                user_id=_extract_user_id(user_data),
+                authenticated=bool(user_data.get("authenticated")),
+            )
         )
 
-        # Сохраняем соединение
-        self.sse_connections[connection_id] = message_queue
-        self.sse_connection_info[connection_id] = connection_info
-
-        # Связываем с пользователем
-        if connection_info.user_id:
-            self.sse_user_connections[connection_info.user_id].add(connection_id)
-
         # Запускаем heartbeat
         if self.settings.SSE_HEARTBEAT_INTERVAL > 0:
-            task = asyncio.create_task(self._sse_heartbeat(connection_id))
-            self.heartbeat_tasks[connection_id] = task
+            record.heartbeat_task = asyncio.create_task(self._sse_heartbeat(connection_id))
 
-        logger.info(f"SSE connected: {connection_id}, user: {connection_info.user_id}")
+        logger.info(f"SSE connected: {connection_id}, user: {record.user_id}")
         return message_queue
 
     async def disconnect_sse(self, connection_id: str):
         """Отключение SSE клиента."""
-        if connection_id not in self.sse_connections:
+        if connection_id not in self.registry.sse:
             return
 
-        connection_info = self.sse_connection_info.get(connection_id)
-
-        # Убираем из подписок
-        channels = self.connection_channels.get(connection_id, set()).copy()
-        for channel in channels:
-            await self.unsubscribe_from_channel(connection_id, channel)
-
-        # Убираем из пользовательских соединений
-        if connection_info and connection_info.user_id:
-            self.sse_user_connections[connection_info.user_id].discard(connection_id)
-            if not self.sse_user_connections[connection_info.user_id]:
-                del self.sse_user_connections[connection_info.user_id]
-
-        # Останавливаем heartbeat
-        if connection_id in self.heartbeat_tasks:
-            self.heartbeat_tasks[connection_id].cancel()
-            del self.heartbeat_tasks[connection_id]
-
-        # Удаляем соединение
-        del self.sse_connections[connection_id]
-        if connection_id in self.sse_connection_info:
-            del self.sse_connection_info[connection_id]
-
+        self._drop(connection_id)
         logger.info(f"SSE disconnected: {connection_id}")
 
     async def send_to_sse(self, connection_id: str, message: SSEMessage) -> bool:
         """Отправка SSE сообщения."""
-        if connection_id not in self.sse_connections:
+        record = self.registry.sse.get(connection_id)
+        if record is None:
             return False
 
-        queue = self.sse_connections[connection_id]
         try:
-            queue.put_nowait(message)
-
-            # Обновляем последнюю активность
-            if connection_id in self.sse_connection_info:
-                self.sse_connection_info[connection_id].last_activity = datetime.now(tz=utc)()
-
+            record.transport.put_nowait(message)
+            record.last_activity = time.monotonic()
             return True
         except asyncio.QueueFull:
             logger.warning(f"SSE queue full for connection {connection_id}")
@@ -229,32 +176,37 @@ class ConnectionManager:
             await self.disconnect_sse(connection_id)
             return False
 
+    def _drop(self, connection_id: str) -> None:
+        """Удалить соединение из реестра и остановить его heartbeat."""
+        record = self.registry.remove(connection_id)
+        if record is not None and record.heartbeat_task is not None:
+            # Не отменяем задачу изнутри нее самой
+            if record.heartbeat_task is not asyncio.current_task():
+                record.heartbeat_task.cancel()
+            record.heartbeat_task = None
+
     # Методы подписок на каналы
 
     async def subscribe_to_channel(self, connection_id: str, channel: str):
         """Подписка на канал."""
-        self.channel_subscriptions[channel].add(connection_id)
-        self.connection_channels[connection_id].add(channel)
+        if not self.registry.subscribe(connection_id, channel):
+            return
 
         # Отправляем персистентные сообщения канала
         if channel in self.channel_messages:
             for message in self.channel_messages[channel]:
-                if connection_id in self.ws_connections:
+                if connection_id in self.registry.websockets:
                     await self.send_to_websocket(connection_id, message)
-                elif connection_id in self.sse_connections:
-                    sse_message = SSEMessage(id=message.id, event="channel_message", data=message.dict())
+                elif connection_id in self.registry.sse:
+                    sse_message = SSEMessage(id=message.id, event="channel_message", data=message.model_dump(mode="json"))
                     await self.send_to_sse(connection_id, sse_message)
 
         logger.info(f"Connection {connection_id} subscribed to channel {channel}")
 
     async def unsubscribe_from_channel(self, connection_id: str, channel: str):
         """Отписка от канала."""
-        self.channel_subscriptions[channel].discard(connection_id)
-        self.connection_channels[connection_id].discard(channel)
-
-        # Удаляем канал если нет подписчиков
-        if not self.channel_subscriptions[channel]:
-            del self.channel_subscriptions[channel]
+        if not self.registry.unsubscribe(connection_id, channel):
+            return
 
         logger.info(f"Connection {connection_id} unsubscribed from channel {channel}")
 
@@ -268,13 +220,13 @@ class ConnectionManager:
             if len(self.channel_messages[channel]) > 100:
                 self.channel_messages[channel] = self.channel_messages[channel][-100:]
 
-        subscribers = self.channel_subscriptions.get(channel, set()).copy()
+        subscribers = self.registry.channel_subscribers(channel).copy()
 
         for connection_id in subscribers:
-            if connection_id in self.ws_connections:
+            if connection_id in self.registry.websockets:
                 await self.send_to_websocket(connection_id, message)
-            elif connection_id in self.sse_connections:
-                sse_message = SSEMessage(id=message.id, event="channel_message", data=message.dict())
+            elif connection_id in self.registry.sse:
+                sse_message = SSEMessage(id=message.id, event="channel_message", data=message.model_dump(mode="json"))
                 await self.send_to_sse(connection_id, sse_message)
 
         logger.info(f"Broadcasted message to channel {channel}, {len(subscribers)} recipients")
@@ -284,15 +236,15 @@ class ConnectionManager:
         sent_count = 0
 
         # WebSocket соединения
-        ws_connections = self.ws_user_connections.get(user_id, set()).copy()
+        ws_connections = self.registry.user_connections(user_id, KIND_WEBSOCKET)
         for connection_id in ws_connections:
             if await self.send_to_websocket(connection_id, message):
                 sent_count += 1
 
         # SSE соединения
-        sse_connections = self.sse_user_connections.get(user_id, set()).copy()
+        sse_connections = self.registry.user_connections(user_id, KIND_SSE)
         for connection_id in sse_connections:
-            sse_message = SSEMessage(id=message.id, event="user_message", data=message.dict())
+            sse_message = SSEMessage(id=message.id, event="user_message", data=message.model_dump(mode="json"))
             if await self.send_to_sse(connection_id, sse_message):
                 sent_count += 1
 
@@ -303,13 +255,13 @@ class ConnectionManager:
         exclude_set = set(exclude_connections or [])
 
         # WebSocket соединения
-        for connection_id in list(self.ws_connections.keys()):
+        for connection_id in list(self.registry.websockets):
             if connection_id not in exclude_set:
                 await self.send_to_websocket(connection_id, message)
 
         # SSE соединения
-        sse_message = SSEMessage(id=message.id, event="broadcast", data=message.dict())
-        for connection_id in list(self.sse_connections.keys()):
+        sse_message = SSEMessage(id=message.id, event="broadcast", data=message.model_dump(mode="json"))
+        for connection_id in list(self.registry.sse):
             if connection_id not in exclude_set:
                 await self.send_to_sse(connection_id, sse_message)
 
@@ -318,9 +270,11 @@ class ConnectionManager:
     async def _websocket_heartbeat(self, connection_id: str):
         """Отправка heartbeat сообщений для WebSocket."""
         try:
-            while connection_id in self.ws_connections:
+            while connection_id in self.registry.websockets:
                 heartbeat = WSMessage(
-                    id=str(uuid.uuid4()), type=MessageType.HEARTBEAT, content=HeartbeatMessage().dict()
+                    id=str(uuid.uuid4()),
+                    type=MessageType.HEARTBEAT,
+                    data={"timestamp": datetime.now(tz=utc).isoformat()},
                 )
 
                 if not await self.send_to_websocket(connection_id, heartbeat):
@@ -335,8 +289,13 @@ class ConnectionManager:
     async def _sse_heartbeat(self, connection_id: str):
         """Отправка heartbeat сообщений для SSE."""
         try:
-            while connection_id in self.sse_connections:
-                heartbeat = SSEMessage(id=str(uuid.uuid4()), event="heartbeat", data=HeartbeatMessage().dict())
+            while connection_id in self.registry.sse:
+                heartbeat = SSEMessage(
+                    id=str(uuid.uuid4()),
+                    type=MessageType.HEARTBEAT,
+                    event="heartbeat",
+                    data={"timestamp": datetime.now(tz=utc).isoformat()},
+                )
 
                 if not await self.send_to_sse(connection_id, heartbeat):
                     break
@@ -351,48 +310,51 @@ class ConnectionManager:
 
     def get_connection_info(self, connection_id: str) -> WSConnectionInfo | None:
         """Получение информации о соединении."""
-        return self.ws_connection_info.get(connection_id) or self.sse_connection_info.get(connection_id)
+        record = self.registry.get(connection_id)
+        return record.to_info() if record is not None else None
 
     def get_connections_stats(self) -> dict[str, Any]:
         """Получение статистики соединений."""
         return {
             "websocket": {
-                "total": len(self.ws_connections),
+                "total": len(self.registry.websockets),
                 "max": self.settings.WEBSOCKET_MAX_CONNECTIONS,
-                "users": len(self.ws_user_connections),
+                "users": self.registry.users_count(KIND_WEBSOCKET),
             },
             "sse": {
-                "total": len(self.sse_connections),
+                "total": len(self.registry.sse),
                 "max": self.settings.SSE_MAX_CONNECTIONS,
-                "users": len(self.sse_user_connections),
+                "users": self.registry.users_count(KIND_SSE),
             },
             "channels": {
-                "total": len(self.channel_subscriptions),
-                "subscriptions": sum(len(subs) for subs in self.channel_subscriptions.values()),
+                "total": len(self.registry.channels),
+                "subscriptions": self.registry.subscriptions_count(),
             },
-            "total_connections": len(self.ws_connections) + len(self.sse_connections),
+            "total_connections": len(self.registry),
         }
 
     async def cleanup_inactive_connections(self):
         """Очистка неактивных соединений."""
-        cutoff_time = datetime.now(tz=utc)() - timedelta(seconds=self.settings.WEBSOCKET_DISCONNECT_TIMEOUT)
+        timeout = self.settings.WEBSOCKET_DISCONNECT_TIMEOUT
 
         # Проверяем WebSocket соединения
-        inactive_ws = [conn_id for conn_id, info in self.ws_connection_info.items() if info.last_activity < cutoff_time]
-
-        for conn_id in inactive_ws:
+        for conn_id in self.registry.inactive(KIND_WEBSOCKET, timeout):
             logger.info(f"Cleaning up inactive WebSocket connection: {conn_id}")
             await self.disconnect_websocket(conn_id)
 
         # Проверяем SSE соединения
-        inactive_sse = [
-            conn_id for conn_id, info in self.sse_connection_info.items() if info.last_activity < cutoff_time
-        ]
-
-        for conn_id in inactive_sse:
+        for conn_id in self.registry.inactive(KIND_SSE, timeout):
             logger.info(f"Cleaning up inactive SSE connection: {conn_id}")
             await self.disconnect_sse(conn_id)
 
 
+def _extract_user_id(user_data: dict[str, Any]) -> str | None:
+    """ID пользователя из результата аутентификации."""
+    if not user_data.get("authenticated"):
+        return None
+    user_id = (user_data.get("user") or {}).get("sub")
+    return str(user_id) if user_id is not None else None
+
+
 # Глобальный экземпляр менеджера соединений
 connection_manager = ConnectionManager()
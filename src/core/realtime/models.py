@@ -6,10 +6,11 @@ from enum import Enum
 from typing import Any
 from uuid import uuid4
 
-from pydantic import Field, validator
+from pydantic import Field, field_serializer, field_validator, validator
 from pytz import utc
 
 from core.exceptions.core_base import CoreRealtimeMessageError
+from core.streaming.sse_writer import format_sse_event
 from tools.pydantic import BaseModel
 
 
@@ -51,56 +52,73 @@ class WebRTCSignalType(str, Enum):
     DATA_CHANNEL = "data-channel"
 
 
+def _decode_base64(value: Any, connection_type: str) -> Any:
+    """Принять бинарные данные как bytes или как base64 строку из JSON кадра."""
+    if value is None or isinstance(value, bytes | bytearray):
+        return value
+    try:
+        return base64.b64decode(value, validate=True)
+    except Exception:
+        raise CoreRealtimeMessageError(connection_type, "binary_data")
+
+
 class BaseMessage(BaseModel):
     """Базовая модель сообщения."""
 
     id: str = Field(default_factory=lambda: str(uuid4()))
     type: MessageType
-    timestamp: datetime = Field(default_factory=datetime.now(tz=utc))
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(tz=utc))
 
     class Config:
         json_encoders = {datetime: lambda v: v.isoformat()}
 
 
 class WSMessage(BaseMessage):
-    """Модель WebSocket сообщения."""
+    """Модель WebSocket сообщения.
+
+    ``binary_data`` хранится сырыми байтами: в msgpack кадрах они передаются как есть,
+    в base64 кодируются только при JSON сериализации.
+    """
 
     data: str | dict[str, Any] | bytes | None = None
-    binary_data: str | None = None  # Base64 encoded binary
+    binary_data: bytes | None = None
     channel: str | None = None
     user_id: str | None = None
     metadata: dict[str, Any] | None = None
 
-    @validator("binary_data")
+    @field_validator("binary_data", mode="before")
+    @classmethod
     def validate_binary_data(cls, v):
-        if v is not None:
-            try:
-                base64.b64decode(v)
-            except Exception:
-                raise CoreRealtimeMessageError("websocket", "binary_data")
-        return v
+        return _decode_base64(v, "websocket")
+
+    @field_serializer("binary_data", when_used="json-unless-none")
+    def serialize_binary_data(self, v: bytes) -> str:
+        return base64.b64encode(v).decode("ascii")
 
     def get_binary_data(self) -> bytes | None:
         """Получить бинарные данные как bytes."""
-        if self.binary_data:
-            return base64.b64decode(self.binary_data)
-        return None
+        return self.binary_data
 
     def set_binary_data(self, data: bytes) -> None:
         """Установить бинарные данные из bytes."""
-        self.binary_data = base64.b64encode(data).decode("utf-8")
+        self.binary_data = data
         self.type = MessageType.BINARY
 
 
 class SSEMessage(BaseMessage):
     """Модель SSE сообщения."""
 
+    type: MessageType = MessageType.JSON
     event: str | None = None
     data: str | dict[str, Any]
     retry: int | None = None
     channel: str | None = None
     user_id: str | None = None
 
+    def to_sse_format(self) -> str:
+        """Преобразование в формат SSE (событие завершается пустой строкой)."""
+        return format_sse_event(self.id, self.event, self.data, self.retry)
+
 
 class BinaryMessage(BaseMessage):
     """Модель для бинарных сообщений."""
@@ -165,17 +183,25 @@ class WSCommand(BaseModel):
     data: dict[str, Any] | None = None
     channel: str | None = None
     target_user: str | None = None
-    binary_data: str | None = None  # Base64 encoded
+    request_id: str | None = None
+    binary_data: bytes | None = None  # Сырые байты (base64 в JSON кадрах)
+
+    @field_validator("binary_data", mode="before")
+    @classmethod
+    def validate_binary_data(cls, v):
+        return _decode_base64(v, "websocket")
+
+    @field_serializer("binary_data", when_used="json-unless-none")
+    def serialize_binary_data(self, v: bytes) -> str:
+        return base64.b64encode(v).decode("ascii")
 
     def get_binary_data(self) -> bytes | None:
         """Получить бинарные данные как bytes."""
-        if self.binary_data:
-            return base64.b64decode(self.binary_data)
-        return None
+        return self.binary_data
 
     def set_binary_data(self, data: bytes) -> None:
         """Установить бинарные данные из bytes."""
-        self.binary_data = base64.b64encode(data).decode("utf-8")
+        self.binary_data = data
 
 
 class WSResponse(BaseModel):
@@ -185,7 +211,7 @@ class WSResponse(BaseModel):
     message: str | None = None
     data: dict[str, Any] | None = None
     error_code: str | None = None
-    timestamp: datetime = Field(default_factory=datetime.now(tz=utc))
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(tz=utc))
 
     class Config:
         json_encoders = {datetime: lambda v: v.isoformat()}
@@ -268,8 +294,8 @@ class WebRTCPeerConnection(BaseModel):
     ice_gathering_state: str = "new"
     ice_connection_state: str = "new"
     signaling_state: str = "stable"
-    created_at: datetime = Field(default_factory=datetime.now(tz=utc))
-    last_activity: datetime = Field(default_factory=datetime.now(tz=utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(tz=utc))
+    last_activity: datetime = Field(default_factory=lambda: datetime.now(tz=utc))
 
     class Config:
         json_encoders = {datetime: lambda v: v.isoformat()}
@@ -281,8 +307,8 @@ class WebRTCRoom(BaseModel):
     room_id: str
     name: str | None = None
     max_participants: int = 10
-    participants: list[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.now(tz=utc))
+    participants: set[str] = Field(default_factory=set)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(tz=utc))
     created_by: str | None = None
     settings: dict[str, Any] | None = None
 
@@ -1,17 +1,20 @@
 """Server-Sent Events роутеры."""
 
-import asyncio
 import logging
 import uuid
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, CoreRealtimeAPIException, Query, Request
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
+from pytz import utc
 
 from core.config import get_settings
+from core.exceptions import CoreRealtimeAPIException
 from core.realtime.auth import WSAuthenticator, WSAuthError, get_ws_auth, optional_auth
 from core.realtime.connection_manager import connection_manager
 from core.realtime.models import MessageType, NotificationMessage, SSEMessage, WSMessage
+from core.streaming.sse_writer import SSEStreamWriter
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/sse", tags=["Server-Sent Events"])
@@ -29,7 +32,7 @@ async def sse_endpoint(
 ):
     """SSE соединение."""
     if not settings.SSE_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="SSE отключен")
+        raise CoreRealtimeAPIException("sse", "SSE отключен", status_code=503)
 
     connection_id = str(uuid.uuid4())
 
@@ -61,36 +64,30 @@ async def sse_endpoint(
         await connection_manager.send_to_sse(connection_id, welcome_message)
 
         # Создаем генератор событий
+        def heartbeat() -> SSEMessage:
+            info = connection_manager.get_connection_info(connection_id)
+            timestamp = info.last_activity if info else datetime.now(tz=utc)
+            return SSEMessage(
+                id=str(uuid.uuid4()),
+                event="heartbeat",
+                data={"timestamp": timestamp.isoformat()},
+                retry=settings.SSE_RETRY_TIMEOUT,
+            )
+
+        # Сообщения, накопившиеся в очереди, отдаются одним chunk
+        writer = SSEStreamWriter(message_queue, heartbeat, settings.SSE_HEARTBEAT_INTERVAL)
+
         async def event_generator():
             try:
-                while True:
-                    try:
-                        # Ждем сообщение с таймаутом
-                        message = await asyncio.wait_for(message_queue.get(), timeout=settings.SSE_HEARTBEAT_INTERVAL)
-
-                        # Отправляем сообщение в SSE формате
-                        yield f"{message.to_sse_format()}\n"
-
-                    except TimeoutError:
-                        # Отправляем heartbeat если нет сообщений
-                        heartbeat = SSEMessage(
-                            id=str(uuid.uuid4()),
-                            event="heartbeat",
-                            data={
-                                "timestamp": connection_manager.get_connection_info(
-                                    connection_id
-                                ).last_activity.isoformat()
-                            },
-                            retry=settings.SSE_RETRY_TIMEOUT,
-                        )
-                        yield f"{heartbeat.to_sse_format()}\n"
+                async for chunk in writer.stream():
+                    yield chunk
 
             except Exception as e:
                 logger.error(f"SSE generator error for {connection_id}: {e}")
                 error_message = SSEMessage(
                     id=str(uuid.uuid4()), event="error", data={"error": "Ошибка потока", "details": str(e)}
                 )
-                yield f"{error_message.to_sse_format()}\n"
+                yield error_message.to_sse_format()
             finally:
                 await connection_manager.disconnect_sse(connection_id)
 
@@ -108,10 +105,10 @@ async def sse_endpoint(
         )
 
     except WSAuthError as e:
-        raise CoreRealtimeAPIException(status_code=401, detail=str(e))
+        raise CoreRealtimeAPIException("sse", str(e), status_code=401)
     except Exception as e:
         logger.error(f"SSE connection error: {e}")
-        raise CoreRealtimeAPIException(status_code=500, detail="Внутренняя ошибка сервера")
+        raise CoreRealtimeAPIException("sse", "Внутренняя ошибка сервера", status_code=500)
 
 
 @router.post("/send-to-channel")
@@ -125,7 +122,7 @@ async def send_sse_to_channel(
 ):
     """Отправка SSE сообщения в канал."""
     if not settings.SSE_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="SSE отключен")
+        raise CoreRealtimeAPIException("sse", "SSE отключен", status_code=503)
 
     # Создаем SSE сообщение
     sse_message = SSEMessage(
@@ -151,7 +148,7 @@ async def send_sse_to_user(
 ):
     """Отправка SSE сообщения пользователю."""
     if not settings.SSE_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="SSE отключен")
+        raise CoreRealtimeAPIException("sse", "SSE отключен", status_code=503)
 
     # Создаем сообщение
     ws_message = WSMessage(id=event_id or str(uuid.uuid4()), type=MessageType.JSON, data=data, user_id=user_id)
@@ -172,7 +169,7 @@ async def broadcast_sse(
 ):
     """Рассылка SSE события всем соединениям."""
     if not settings.SSE_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="SSE отключен")
+        raise CoreRealtimeAPIException("sse", "SSE отключен", status_code=503)
 
     # Создаем сообщение
     ws_message = WSMessage(id=event_id or str(uuid.uuid4()), type=MessageType.BROADCAST, data=data)
@@ -191,7 +188,7 @@ async def send_sse_notification(
 ):
     """Отправка уведомления через SSE."""
     if not settings.SSE_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="SSE отключен")
+        raise CoreRealtimeAPIException("sse", "SSE отключен", status_code=503)
 
     # Создаем сообщение уведомления
     ws_message = WSMessage(id=str(uuid.uuid4()), type=MessageType.NOTIFICATION, data=notification.dict())
@@ -211,7 +208,7 @@ async def send_sse_notification(
 async def get_sse_stats(user_data: dict[str, Any] = Depends(optional_auth)):
     """Получение статистики SSE соединений."""
     if not settings.SSE_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="SSE отключен")
+        raise CoreRealtimeAPIException("sse", "SSE отключен", status_code=503)
 
     stats = connection_manager.get_connections_stats()
     return {"sse": stats["sse"], "channels": stats["channels"]}
@@ -221,13 +218,13 @@ async def get_sse_stats(user_data: dict[str, Any] = Depends(optional_auth)):
 async def close_sse_connection(connection_id: str, user_data: dict[str, Any] = Depends(optional_auth)):
     """Закрытие SSE соединения."""
     if not settings.SSE_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="SSE отключен")
+        raise CoreRealtimeAPIException("sse", "SSE отключен", status_code=503)
 
     if connection_id in connection_manager.sse_connections:
         await connection_manager.disconnect_sse(connection_id)
         return {"success": True, "message": f"SSE соединение {connection_id} закрыто"}
     else:
-        raise CoreRealtimeAPIException(status_code=404, detail="SSE соединение не найдено")
+        raise CoreRealtimeAPIException("sse", "SSE соединение не найдено", status_code=404)
 
 
 @router.get("/test")
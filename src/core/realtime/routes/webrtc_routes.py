@@ -1,26 +1,28 @@
 """WebRTC специализированные роуты."""
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
 from pydantic import Field
+from pytz import utc
 
 from core.exceptions import CoreRealtimeAPIException
 from tools.pydantic import BaseModel
 
-from ..auth import optional_auth, require_auth
-from ..connection_manager import connection_manager
-from ..models import WebRTCMessage, WebRTCPeerConnection, WebRTCRoom, WebRTCSignalType
+from ..auth import WSAuthenticator, WSAuthError, get_ws_auth, optional_auth, require_auth
+from ..connection_manager import _extract_user_id, connection_manager
+from ..models import WebRTCMessage, WebRTCRoom, WebRTCSignalType
+from ..webrtc_registry import WebRTCRegistry
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/realtime/webrtc", tags=["WebRTC"])
 
-# Хранилище комнат и соединений
-webrtc_rooms: dict[str, WebRTCRoom] = {}
-peer_connections: dict[str, WebRTCPeerConnection] = {}
+# Реестр комнат и соединений
+webrtc_registry = WebRTCRegistry(connection_manager)
 
 
 # Pydantic модели
@@ -62,17 +64,31 @@ class UpdateRoomSettingsRequest(BaseModel):
 
 # WebRTC сигналинг через WebSocket
 @router.websocket("/signaling")
-async def webrtc_signaling_websocket(websocket: WebSocket, room_id: str | None = None, peer_id: str | None = None):
+async def webrtc_signaling_websocket(
+    websocket: WebSocket,
+    room_id: str | None = None,
+    token: str | None = Query(None, description="JWT токен для авторизации"),
+    api_key: str | None = Query(None, description="API ключ для авторизации"),
+    auth: WSAuthenticator = Depends(get_ws_auth),
+):
     """
     Специализированный WebSocket endpoint для WebRTC сигналинга.
+
+    ID пира назначает сервер: ID аутентифицированного пользователя, иначе
+    случайный ID сессии. Клиент не может занять чужой канал сигналинга.
     """
-    if not peer_id:
-        peer_id = f"peer_{uuid4()}"
+    try:
+        user_data = await auth.authenticate_websocket(token=token, api_key=api_key)
+    except WSAuthError as e:
+        await websocket.close(code=4001, reason=str(e))
+        return
 
+    peer_id = _peer_id(user_data)
     logger.info(f"WebRTC сигналинг подключение: peer_id={peer_id}, room_id={room_id}")
 
     try:
         await websocket.accept()
+        webrtc_registry.attach(peer_id, websocket)
 
         # Отправляем информацию о подключении
         await websocket.send_json(
@@ -80,7 +96,7 @@ async def webrtc_signaling_websocket(websocket: WebSocket, room_id: str | None =
                 "type": "connection_info",
                 "peer_id": peer_id,
                 "room_id": room_id,
-                "timestamp": datetime.now(tz=utc)().isoformat(),
+                "timestamp": _now(),
             }
         )
 
@@ -98,27 +114,37 @@ async def webrtc_signaling_websocket(websocket: WebSocket, room_id: str | None =
                 break
             except Exception as e:
                 logger.error(f"Ошибка обработки WebRTC сигнала: {e}")
-                await websocket.send_json(
-                    {
-                        "type": "error",
-                        "message": f"Ошибка обработки сигнала: {e!s}",
-                        "timestamp": datetime.now(tz=utc)().isoformat(),
-                    }
-                )
+                await _send_error(websocket, f"Ошибка обработки сигнала: {e!s}")
 
     except Exception as e:
         logger.error(f"Ошибка WebRTC сигналинг соединения: {e}")
     finally:
-        # Удаляем пира из всех комнат
-        await cleanup_peer(peer_id)
+        # Переподключившийся пир уже заменил этот сокет - его комнаты не трогаем
+        if webrtc_registry.detach(peer_id, websocket):
+            await cleanup_peer(peer_id)
         logger.info(f"WebRTC сигналинг отключен: peer_id={peer_id}")
 
 
+def _peer_id(user_data: dict[str, Any] | None) -> str:
+    """ID пира: аутентифицированный пользователь или новая анонимная сессия."""
+    return (_extract_user_id(user_data) if user_data else None) or f"peer_{uuid4()}"
+
+
+def _now() -> str:
+    return datetime.now(tz=utc).isoformat()
+
+
+def _room_info(room: WebRTCRoom) -> dict[str, Any]:
+    return room.model_dump(mode="json")
+
+
+async def _send_error(websocket: WebSocket, message: str):
+    await websocket.send_json({"type": "error", "message": message, "timestamp": _now()})
+
+
 async def handle_webrtc_signal_websocket(websocket: WebSocket, peer_id: str, data: dict[str, Any]):
     """Обработка WebRTC сигналов через WebSocket."""
     signal_type = data.get("signal_type")
-    target_peer_id = data.get("target_peer_id")
-    room_id = data.get("room_id")
 
     if signal_type == "join_room":
         await handle_join_room_websocket(websocket, peer_id, data.get("room_id"))
@@ -130,39 +156,22 @@ async def handle_webrtc_signal_websocket(websocket: WebSocket, peer_id: str, dat
         await handle_peer_signal_websocket(websocket, peer_id, data)
 
     else:
-        await websocket.send_json(
-            {
-                "type": "error",
-                "message": f"Неизвестный тип сигнала: {signal_type}",
-                "timestamp": datetime.now(tz=utc)().isoformat(),
-            }
-        )
+        await _send_error(websocket, f"Неизвестный тип сигнала: {signal_type}")
 
 
 async def handle_join_room_websocket(websocket: WebSocket, peer_id: str, room_id: str):
     """Обработка входа в комнату через WebSocket."""
     if not room_id:
-        await websocket.send_json(
-            {"type": "error", "message": "Не указан ID комнаты", "timestamp": datetime.now(tz=utc)().isoformat()}
-        )
+        await _send_error(websocket, "Не указан ID комнаты")
         return
 
-    # Создаем комнату если не существует
-    if room_id not in webrtc_rooms:
-        webrtc_rooms[room_id] = WebRTCRoom(room_id=room_id, name=f"Room {room_id}", created_by=peer_id)
-
-    room = webrtc_rooms[room_id]
-
-    # Проверяем лимит участников
-    if len(room.participants) >= room.max_participants:
-        await websocket.send_json(
-            {"type": "error", "message": "Комната переполнена", "timestamp": datetime.now(tz=utc)().isoformat()}
-        )
+    # Создает комнату, если ее нет, и проверяет лимит участников
+    room = webrtc_registry.join(room_id, peer_id)
+    if room is None:
+        await _send_error(websocket, "Комната переполнена")
         return
 
-    # Добавляем участника
-    if peer_id not in room.participants:
-        room.participants.append(peer_id)
+    participants = sorted(room.participants)
 
     # Отправляем подтверждение
     await websocket.send_json(
@@ -170,9 +179,9 @@ async def handle_join_room_websocket(websocket: WebSocket, peer_id: str, room_id
             "type": "room_joined",
             "room_id": room_id,
             "peer_id": peer_id,
-            "participants": room.participants,
-            "room_info": room.dict(),
-            "timestamp": datetime.now(tz=utc)().isoformat(),
+            "participants": participants,
+            "room_info": _room_info(room),
+            "timestamp": _now(),
         }
     )
 
@@ -183,8 +192,8 @@ async def handle_join_room_websocket(websocket: WebSocket, peer_id: str, room_id
             "type": "peer_joined",
             "peer_id": peer_id,
             "room_id": room_id,
-            "participants": room.participants,
-            "timestamp": datetime.now(tz=utc)().isoformat(),
+            "participants": participants,
+            "timestamp": _now(),
         },
         exclude_peer=peer_id,
     )
@@ -192,17 +201,13 @@ async def handle_join_room_websocket(websocket: WebSocket, peer_id: str, room_id
 
 async def handle_leave_room_websocket(websocket: WebSocket, peer_id: str, room_id: str):
     """Обработка выхода из комнаты через WebSocket."""
-    if room_id not in webrtc_rooms:
-        await websocket.send_json(
-            {"type": "error", "message": "Комната не найдена", "timestamp": datetime.now(tz=utc)().isoformat()}
-        )
+    # Пустая комната удаляется реестром
+    room = webrtc_registry.leave(room_id, peer_id)
+    if room is None:
+        await _send_error(websocket, "Комната не найдена")
         return
 
-    room = webrtc_rooms[room_id]
-
-    # Удаляем участника
-    if peer_id in room.participants:
-        room.participants.remove(peer_id)
+    participants = sorted(room.participants)
 
     # Отправляем подтверждение
     await websocket.send_json(
@@ -210,8 +215,8 @@ async def handle_leave_room_websocket(websocket: WebSocket, peer_id: str, room_i
             "type": "room_left",
             "room_id": room_id,
             "peer_id": peer_id,
-            "participants": room.participants,
-            "timestamp": datetime.now(tz=utc)().isoformat(),
+            "participants": participants,
+            "timestamp": _now(),
         }
     )
 
@@ -222,36 +227,22 @@ async def handle_leave_room_websocket(websocket: WebSocket, peer_id: str, room_i
             "type": "peer_left",
             "peer_id": peer_id,
             "room_id": room_id,
-            "participants": room.participants,
-            "timestamp": datetime.now(tz=utc)().isoformat(),
+            "participants": participants,
+            "timestamp": _now(),
         },
         exclude_peer=peer_id,
     )
 
-    # Удаляем пустую комнату
-    if not room.participants:
-        del webrtc_rooms[room_id]
-
 
 async def handle_peer_signal_websocket(websocket: WebSocket, peer_id: str, data: dict[str, Any]):
     """Обработка peer-to-peer сигналов через WebSocket."""
     target_peer_id = data.get("target_peer_id")
     if not target_peer_id:
-        await websocket.send_json(
-            {"type": "error", "message": "Не указан целевой пир", "timestamp": datetime.now(tz=utc)().isoformat()}
-        )
+        await _send_error(websocket, "Не указан целевой пир")
         return
 
-    # Создаем запись о соединении между пирами
-    connection_key = f"{peer_id}_{target_peer_id}"
-    if connection_key not in peer_connections:
-        peer_connections[connection_key] = WebRTCPeerConnection(
-            peer_id=peer_id, target_peer_id=target_peer_id, room_id=data.get("room_id")
-        )
-
-    # Обновляем состояние соединения
-    connection = peer_connections[connection_key]
-    connection.last_activity = datetime.now(tz=utc)()
+    # Создаем или обновляем запись о соединении между пирами
+    connection = webrtc_registry.link(peer_id, target_peer_id, data.get("room_id"))
 
     if data.get("connection_state"):
         connection.connection_state = data["connection_state"]
@@ -270,116 +261,78 @@ async def handle_peer_signal_websocket(websocket: WebSocket, peer_id: str, data:
         "connection_state": data.get("connection_state"),
         "gathering_state": data.get("gathering_state"),
         "metadata": data.get("metadata"),
-        "timestamp": datetime.now(tz=utc)().isoformat(),
+        "timestamp": _now(),
     }
 
-    # Находим целевого пира и отправляем сигнал
-    target_connections = await connection_manager.get_user_connections(target_peer_id)
-    if target_connections:
-        for conn_id in target_connections:
-            await connection_manager.send_to_connection(conn_id, signal_message)
-
+    if await webrtc_registry.send_to_peer(target_peer_id, signal_message):
         # Отправляем подтверждение отправителю
         await websocket.send_json(
             {
                 "type": "signal_delivered",
                 "signal_type": data["signal_type"],
                 "target_peer_id": target_peer_id,
-                "timestamp": datetime.now(tz=utc)().isoformat(),
+                "timestamp": _now(),
             }
         )
     else:
-        await websocket.send_json(
-            {
-                "type": "error",
-                "message": f"Пир {target_peer_id} не найден",
-                "timestamp": datetime.now(tz=utc)().isoformat(),
-            }
-        )
+        await _send_error(websocket, f"Пир {target_peer_id} не найден")
 
 
-async def broadcast_to_room(room_id: str, message: dict[str, Any], exclude_peer: str | None = None):
+async def broadcast_to_room(room_id: str, message: dict[str, Any], exclude_peer: str | None = None) -> int:
     """Широковещательная отправка сообщения в комнату."""
-    if room_id not in webrtc_rooms:
-        return
-
-    room = webrtc_rooms[room_id]
-
-    for participant_id in room.participants:
-        if exclude_peer and participant_id == exclude_peer:
-            continue
-
-        participant_connections = await connection_manager.get_user_connections(participant_id)
-        for conn_id in participant_connections:
-            await connection_manager.send_to_connection(conn_id, message)
+    return await webrtc_registry.broadcast(room_id, message, exclude_peer=exclude_peer)
 
 
 async def cleanup_peer(peer_id: str):
     """Очистка данных пира."""
-    # Удаляем из всех комнат
-    rooms_to_delete = []
-    for room_id, room in webrtc_rooms.items():
-        if peer_id in room.participants:
-            room.participants.remove(peer_id)
-
-            # Уведомляем других участников
-            await broadcast_to_room(
-                room_id,
+    rooms = webrtc_registry.remove_peer(peer_id)
+
+    # Уведомляем оставшихся участников
+    await asyncio.gather(
+        *(
+            broadcast_to_room(
+                room.room_id,
                 {
                     "type": "peer_disconnected",
                     "peer_id": peer_id,
-                    "room_id": room_id,
-                    "participants": room.participants,
-                    "timestamp": datetime.now(tz=utc)().isoformat(),
+                    "room_id": room.room_id,
+                    "participants": sorted(room.participants),
+                    "timestamp": _now(),
                 },
-                exclude_peer=peer_id,
             )
+            for room in rooms
+            if room.participants
+        )
+    )
 
-            # Помечаем пустые комнаты для удаления
-            if not room.participants:
-                rooms_to_delete.append(room_id)
-
-    # Удаляем пустые комнаты
-    for room_id in rooms_to_delete:
-        del webrtc_rooms[room_id]
-
-    # Удаляем peer connections
-    connections_to_delete = []
-    for conn_key, connection in peer_connections.items():
-        if connection.peer_id == peer_id or connection.target_peer_id == peer_id:
-            connections_to_delete.append(conn_key)
 
-    for conn_key in connections_to_delete:
-        del peer_connections[conn_key]
+# HTTP API endpoints
 
 
-# HTTP API endpoints
+def _get_room(room_id: str) -> WebRTCRoom:
+    room = webrtc_registry.rooms.get(room_id)
+    if room is None:
+        raise CoreRealtimeAPIException("webrtc", "Комната не найдена", status_code=404)
+    return room
 
 
 @router.post("/rooms", dependencies=[Depends(require_auth)])
 async def create_webrtc_room(request: CreateRoomRequest, auth_data=Depends(optional_auth)):
     """Создать WebRTC комнату."""
-    try:
-        room_id = request.room_id or f"room_{uuid4()}"
-
-        if room_id in webrtc_rooms:
-            raise CoreRealtimeAPIException(status_code=409, detail="Комната уже существует")
-
-        room = WebRTCRoom(
-            room_id=room_id,
-            name=request.name or f"Room {room_id}",
-            max_participants=request.max_participants,
-            created_by=auth_data.get("user_id") if auth_data else None,
-            settings=request.settings,
-        )
-
-        webrtc_rooms[room_id] = room
+    room_id = request.room_id or f"room_{uuid4()}"
+
+    room = WebRTCRoom(
+        room_id=room_id,
+        name=request.name or f"Room {room_id}",
+        max_participants=request.max_participants,
+        created_by=auth_data.get("user_id") if auth_data else None,
+        settings=request.settings,
+    )
 
-        return {"success": True, "message": f"Комната {room_id} создана", "room": room.dict()}
+    if not webrtc_registry.add_room(room):
+        raise CoreRealtimeAPIException("webrtc", "Комната уже существует", status_code=409)
 
-    except Exception as e:
-        logger.error(f"Ошибка создания WebRTC комнаты: {e}")
-        raise CoreRealtimeAPIException(status_code=500, detail=str(e))
+    return {"success": True, "message": f"Комната {room_id} создана", "room": _room_info(room)}
 
 
 @router.get("/rooms")
@@ -387,47 +340,36 @@ async def list_webrtc_rooms():
     """Получить список WebRTC комнат."""
     return {
         "rooms": [
-            {
-                **room.dict(),
-                "active_connections": len(
-                    [
-                        conn_key
-                        for conn_key, conn in peer_connections.items()
-                        if any(participant in [conn.peer_id, conn.target_peer_id] for participant in room.participants)
-                    ]
-                ),
-            }
-            for room in webrtc_rooms.values()
+            {**_room_info(room), "active_connections": len(webrtc_registry.room_connections(room.room_id))}
+            for room in webrtc_registry.rooms.values()
         ],
-        "total": len(webrtc_rooms),
+        "total": len(webrtc_registry.rooms),
     }
 
 
 @router.get("/rooms/{room_id}")
 async def get_webrtc_room(room_id: str):
     """Получить информацию о WebRTC комнате."""
-    if room_id not in webrtc_rooms:
-        raise CoreRealtimeAPIException(status_code=404, detail="Комната не найдена")
-
-    room = webrtc_rooms[room_id]
+    room = _get_room(room_id)
 
     # Получаем активные соединения в комнате
-    active_connections = [conn.dict() for conn in peer_connections.values() if conn.room_id == room_id]
+    active_connections = [conn.model_dump(mode="json") for conn in webrtc_registry.room_connections(room_id)]
 
-    return {"room": room.dict(), "active_connections": active_connections, "connection_count": len(active_connections)}
+    return {
+        "room": _room_info(room),
+        "active_connections": active_connections,
+        "connection_count": len(active_connections),
+    }
 
 
 @router.put("/rooms/{room_id}", dependencies=[Depends(require_auth)])
 async def update_webrtc_room(room_id: str, request: UpdateRoomSettingsRequest, auth_data=Depends(optional_auth)):
     """Обновить настройки WebRTC комнаты."""
-    if room_id not in webrtc_rooms:
-        raise CoreRealtimeAPIException(status_code=404, detail="Комната не найдена")
-
-    room = webrtc_rooms[room_id]
+    room = _get_room(room_id)
 
     # Проверяем права (только создатель может изменять)
     if auth_data and room.created_by and room.created_by != auth_data.get("user_id"):
-        raise CoreRealtimeAPIException(status_code=403, detail="Недостаточно прав")
+        raise CoreRealtimeAPIException("webrtc", "Недостаточно прав", status_code=403)
 
     # Обновляем настройки
     if request.name is not None:
@@ -443,38 +385,28 @@ async def update_webrtc_room(room_id: str, request: UpdateRoomSettingsRequest, a
         {
             "type": "room_updated",
             "room_id": room_id,
-            "room_info": room.dict(),
-            "timestamp": datetime.now(tz=utc)().isoformat(),
+            "room_info": _room_info(room),
+            "timestamp": _now(),
         },
     )
 
-    return {"success": True, "message": f"Комната {room_id} обновлена", "room": room.dict()}
+    return {"success": True, "message": f"Комната {room_id} обновлена", "room": _room_info(room)}
 
 
 @router.delete("/rooms/{room_id}", dependencies=[Depends(require_auth)])
 async def delete_webrtc_room(room_id: str, auth_data=Depends(optional_auth)):
     """Удалить WebRTC комнату."""
-    if room_id not in webrtc_rooms:
-        raise CoreRealtimeAPIException(status_code=404, detail="Комната не найдена")
-
-    room = webrtc_rooms[room_id]
+    room = _get_room(room_id)
 
     # Проверяем права (только создатель может удалить)
     if auth_data and room.created_by and room.created_by != auth_data.get("user_id"):
-        raise CoreRealtimeAPIException(status_code=403, detail="Недостаточно прав")
+        raise CoreRealtimeAPIException("webrtc", "Недостаточно прав", status_code=403)
 
     # Уведомляем участников
-    await broadcast_to_room(
-        room_id, {"type": "room_deleted", "room_id": room_id, "timestamp": datetime.now(tz=utc)().isoformat()}
-    )
-
-    # Удаляем связанные peer connections
-    connections_to_delete = [conn_key for conn_key, conn in peer_connections.items() if conn.room_id == room_id]
+    await broadcast_to_room(room_id, {"type": "room_deleted", "room_id": room_id, "timestamp": _now()})
 
-    for conn_key in connections_to_delete:
-        del peer_connections[conn_key]
-
-    del webrtc_rooms[room_id]
+    # Удаляет комнату вместе со связанными peer connections
+    webrtc_registry.delete_room(room_id)
 
     return {"success": True, "message": f"Комната {room_id} удалена"}
 
@@ -482,53 +414,44 @@ async def delete_webrtc_room(room_id: str, auth_data=Depends(optional_auth)):
 @router.post("/signal", dependencies=[Depends(require_auth)])
 async def send_webrtc_signal(request: WebRTCSignalRequest, auth_data=Depends(optional_auth)):
     """Отправить WebRTC сигнал."""
-    try:
-        peer_id = auth_data.get("user_id") if auth_data else f"anonymous_{uuid4()}"
-
-        webrtc_message = WebRTCMessage(
-            signal_type=request.signal_type,
-            peer_id=peer_id,
-            target_peer_id=request.target_peer_id,
-            room_id=request.room_id,
-            sdp=request.sdp,
-            ice_candidate=request.ice_candidate,
-            connection_state=request.connection_state,
-            gathering_state=request.gathering_state,
-            metadata=request.metadata,
-        )
+    peer_id = _peer_id(auth_data)
+
+    webrtc_message = WebRTCMessage(
+        signal_type=request.signal_type,
+        peer_id=peer_id,
+        target_peer_id=request.target_peer_id,
+        room_id=request.room_id,
+        sdp=request.sdp,
+        ice_candidate=request.ice_candidate,
+        connection_state=request.connection_state,
+        gathering_state=request.gathering_state,
+        metadata=request.metadata,
+    )
 
-        # Отправляем сигнал целевому пиру
-        target_connections = await connection_manager.get_user_connections(request.target_peer_id)
-        if not target_connections:
-            raise CoreRealtimeAPIException(status_code=404, detail="Целевой пир не найден")
-
-        sent_count = 0
-        for connection_id in target_connections:
-            await connection_manager.send_to_connection(connection_id, webrtc_message.dict())
-            sent_count += 1
-
-        return {
-            "success": True,
-            "message": f"WebRTC сигнал отправлен пиру {request.target_peer_id}",
-            "message_id": webrtc_message.id,
-            "signal_type": request.signal_type,
-            "recipients_count": sent_count,
-        }
+    # Отправляем сигнал целевому пиру
+    signal = webrtc_message.model_dump(mode="json")
+    recipients_count = await webrtc_registry.send_to_peer(request.target_peer_id, signal)
+    if not recipients_count:
+        raise CoreRealtimeAPIException("webrtc", "Целевой пир не найден", status_code=404)
 
-    except Exception as e:
-        logger.error(f"Ошибка отправки WebRTC сигнала: {e}")
-        raise CoreRealtimeAPIException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "message": f"WebRTC сигнал отправлен пиру {request.target_peer_id}",
+        "message_id": webrtc_message.id,
+        "signal_type": request.signal_type,
+        "recipients_count": recipients_count,
+    }
 
 
 @router.get("/connections")
 async def get_webrtc_connections():
     """Получить информацию о WebRTC соединениях."""
     return {
-        "connections": [conn.dict() for conn in peer_connections.values()],
-        "total": len(peer_connections),
+        "connections": [conn.model_dump(mode="json") for conn in webrtc_registry.connections.values()],
+        "total": len(webrtc_registry.connections),
         "by_room": {
-            room_id: [conn.dict() for conn in peer_connections.values() if conn.room_id == room_id]
-            for room_id in webrtc_rooms.keys()
+            room_id: [conn.model_dump(mode="json") for conn in webrtc_registry.room_connections(room_id)]
+            for room_id in webrtc_registry.rooms
         },
     }
 
@@ -547,8 +470,6 @@ async def webrtc_health():
     return {
         "status": "healthy",
         "service": "webrtc",
-        "rooms_count": len(webrtc_rooms),
-        "connections_count": len(peer_connections),
-        "total_participants": sum(len(room.participants) for room in webrtc_rooms.values()),
-        "timestamp": datetime.now(tz=utc)().isoformat(),
+        **webrtc_registry.get_stats(),
+        "timestamp": _now(),
     }
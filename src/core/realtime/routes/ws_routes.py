@@ -1,14 +1,16 @@
 """WebSocket роутеры."""
 
-import json
 import logging
 import uuid
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, CoreRealtimeAPIException, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
+from pytz import utc
 
 from core.config import get_settings
+from core.exceptions import CoreRealtimeAPIException
 from core.exceptions.core_base import CoreRealtimeMessageError
 from core.realtime.auth import WSAuthenticator, WSAuthError, get_ws_auth
 from core.realtime.connection_manager import connection_manager
@@ -21,6 +23,7 @@ from core.realtime.models import (
     WSMessage,
     WSResponse,
 )
+from core.streaming.codecs import get_codec, negotiate_subprotocol, receive_payload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
@@ -43,12 +46,16 @@ async def websocket_endpoint(
 
     connection_id = str(uuid.uuid4())
 
+    # Согласуем кодирование кадров (JSON или msgpack)
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols"))
+    codec = get_codec(subprotocol, settings.WEBSOCKET_COMPRESSION_THRESHOLD, settings.WEBSOCKET_COMPRESSION_LEVEL)
+
     try:
         # Аутентификация
         user_data = await auth.authenticate_websocket(token=token, api_key=api_key)
 
         # Подключение
-        connection_info = await connection_manager.connect_websocket(websocket, connection_id, user_data)
+        await connection_manager.connect_websocket(websocket, connection_id, user_data, subprotocol=subprotocol)
 
         # Подписка на каналы
         if channels:
@@ -58,13 +65,13 @@ async def websocket_endpoint(
 
         # Отправляем приветственное сообщение
         welcome_message = WSMessage(
-            id=str(uuid.uuid4()),
-            type=MessageType.SYSTEM,
-            content={
+            type=MessageType.NOTIFICATION,
+            data={
                 "message": "Подключение установлено",
                 "connection_id": connection_id,
                 "authenticated": user_data["authenticated"],
-                "server_time": connection_info.connected_at.isoformat(),
+                "subprotocol": codec.subprotocol,
+                "server_time": datetime.now(tz=utc).isoformat(),
             },
         )
         await connection_manager.send_to_websocket(connection_id, welcome_message)
@@ -72,16 +79,15 @@ async def websocket_endpoint(
         # Основной цикл обработки сообщений
         while True:
             try:
-                data = await websocket.receive_text()
+                data = await receive_payload(websocket, codec)
                 await handle_websocket_message(connection_id, data, user_data)
             except WebSocketDisconnect:
                 break
             except Exception as e:
                 logger.error(f"Error handling WebSocket message from {connection_id}: {e}")
                 error_message = WSMessage(
-                    id=str(uuid.uuid4()),
                     type=MessageType.ERROR,
-                    content={"error": "Ошибка обработки сообщения", "details": str(e)},
+                    data={"error": "Ошибка обработки сообщения", "details": str(e)},
                 )
                 await connection_manager.send_to_websocket(connection_id, error_message)
 
@@ -96,15 +102,11 @@ async def websocket_endpoint(
         await connection_manager.disconnect_websocket(connection_id)
 
 
-async def handle_websocket_message(connection_id: str, data: str, user_data: dict[str, Any]):
-    """Обработка сообщения от WebSocket клиента."""
+async def handle_websocket_message(connection_id: str, data: Any, user_data: dict[str, Any]):
+    """Обработка декодированного кадра от WebSocket клиента."""
     try:
-        # Парсим JSON
-        try:
-            message_data = json.loads(data)
-        except json.JSONDecodeError:
-            # Если не JSON, обрабатываем как текст
-            message_data = {"action": "message", "data": {"content": data}}
+        # Если не объект команды, обрабатываем как текст
+        message_data = data if isinstance(data, dict) else {"action": "message", "data": {"content": data}}
 
         # Создаем команду
         command = WSCommand(**message_data)
@@ -114,7 +116,10 @@ async def handle_websocket_message(connection_id: str, data: str, user_data: dic
 
         # Отправляем ответ если есть request_id
         if command.request_id and response:
-            response_message = WSMessage(id=str(uuid.uuid4()), type=MessageType.JSON, content=response.dict())
+            response_message = WSMessage(
+                type=MessageType.RESPONSE,
+                data={"request_id": command.request_id, **response.model_dump(mode="json")},
+            )
             await connection_manager.send_to_websocket(connection_id, response_message)
 
     except Exception as e:
@@ -126,47 +131,40 @@ async def process_websocket_command(
 ) -> WSResponse | None:
     """Обработка команды WebSocket."""
     action = command.action.lower()
+    data = command.data or {}
 
     try:
         if action == "ping":
-            return WSResponse(
-                request_id=command.request_id or str(uuid.uuid4()), success=True, data={"message": "pong"}
-            )
+            return WSResponse(success=True, data={"message": "pong"})
 
-        elif action == "subscribe":
-            channel = command.data.get("channel")
+        elif action in ("subscribe", "unsubscribe"):
+            channel = data.get("channel") or command.channel
             if not channel:
                 raise CoreRealtimeMessageError("websocket", "channel")
 
-            await connection_manager.subscribe_to_channel(connection_id, channel)
-            return WSResponse(
-                request_id=command.request_id or str(uuid.uuid4()),
-                success=True,
-                data={"message": f"Подписка на канал {channel} оформлена"},
-            )
+            if action == "subscribe":
+                await connection_manager.subscribe_to_channel(connection_id, channel)
+                return WSResponse(success=True, message=f"Подписка на канал {channel} оформлена")
+
+            await connection_manager.unsubscribe_from_channel(connection_id, channel)
+            return WSResponse(success=True, message=f"Подписка на канал {channel} отменена")
 
         elif action == "message":
             # Простое текстовое сообщение
-            content = command.data.get("content", "")
+            content = data.get("content", "")
 
-            # Эхо сообщение
-            echo_message = WSMessage(
-                id=str(uuid.uuid4()), type=MessageType.TEXT, content=f"Эхо: {content}", sender_id="server"
-            )
+            # Эхо сообщение, бинарное вложение возвращается без перекодирования
+            echo_message = WSMessage(type=MessageType.TEXT, data=f"Эхо: {content}", binary_data=command.binary_data)
             await connection_manager.send_to_websocket(connection_id, echo_message)
 
-            return WSResponse(
-                request_id=command.request_id or str(uuid.uuid4()),
-                success=True,
-                data={"message": "Сообщение обработано"},
-            )
+            return WSResponse(success=True, message="Сообщение обработано")
 
         else:
             raise CoreRealtimeMessageError("websocket", action)
 
     except Exception as e:
         logger.error(f"Error processing command {action}: {e}")
-        return WSResponse(request_id=command.request_id or str(uuid.uuid4()), success=False, error=str(e))
+        return WSResponse(success=False, message=str(e))
 
 
 @router.get("/stats")
@@ -185,7 +183,7 @@ async def broadcast_message(
 ):
     """Рассылка сообщения всем WebSocket соединениям."""
     if not settings.WEBSOCKET_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="WebSocket отключен")
+        raise CoreRealtimeAPIException("websocket", "WebSocket отключен", status_code=503)
 
     await connection_manager.broadcast_to_all(message.message, exclude_connections=message.exclude_connections)
 
@@ -198,11 +196,16 @@ async def send_to_channel(
 ):
     """Отправка сообщения в канал."""
     if not settings.WEBSOCKET_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="WebSocket отключен")
-
-    await connection_manager.broadcast_to_channel(
-        channel_message.channel, channel_message.message, persist=channel_message.persist
+        raise CoreRealtimeAPIException("websocket", "WebSocket отключен", status_code=503)
+
+    message = WSMessage(
+        id=channel_message.id,
+        type=MessageType.CHANNEL,
+        channel=channel_message.channel,
+        data=channel_message.data,
+        user_id=channel_message.sender_id,
     )
+    await connection_manager.broadcast_to_channel(channel_message.channel, message, persist=channel_message.persistent)
 
     return {"success": True, "message": f"Сообщение отправлено в канал {channel_message.channel}"}
 
@@ -213,7 +216,7 @@ async def send_to_user(
 ):
     """Отправка сообщения конкретному пользователю."""
     if not settings.WEBSOCKET_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="WebSocket отключен")
+        raise CoreRealtimeAPIException("websocket", "WebSocket отключен", status_code=503)
 
     sent_count = await connection_manager.send_to_user(user_id, message)
 
@@ -229,7 +232,7 @@ async def send_notification(
 ):
     """Отправка уведомления в канал или пользователю."""
     if not settings.WEBSOCKET_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="WebSocket отключен")
+        raise CoreRealtimeAPIException("websocket", "WebSocket отключен", status_code=503)
 
     message = WSMessage(id=str(uuid.uuid4()), type=MessageType.NOTIFICATION, content=notification.dict())
 
@@ -248,7 +251,7 @@ async def send_notification(
 async def get_active_connections(auth_data: dict[str, Any] = Depends(lambda: {"authenticated": True})):
     """Получение списка активных соединений."""
     if not settings.WEBSOCKET_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="WebSocket отключен")
+        raise CoreRealtimeAPIException("websocket", "WebSocket отключен", status_code=503)
 
     return {
         "websocket_connections": list(connection_manager.ws_connections.keys()),
@@ -261,7 +264,7 @@ async def get_active_connections(auth_data: dict[str, Any] = Depends(lambda: {"a
 async def close_connection(connection_id: str, auth_data: dict[str, Any] = Depends(lambda: {"authenticated": True})):
     """Принудительное закрытие соединения."""
     if not settings.WEBSOCKET_ENABLED:
-        raise CoreRealtimeAPIException(status_code=503, detail="WebSocket отключен")
+        raise CoreRealtimeAPIException("websocket", "WebSocket отключен", status_code=503)
 
     # Закрываем WebSocket соединение
     if connection_id in connection_manager.ws_connections:
@@ -273,7 +276,7 @@ async def close_connection(connection_id: str, auth_data: dict[str, Any] = Depen
         await connection_manager.disconnect_sse(connection_id)
         return {"success": True, "message": f"SSE соединение {connection_id} закрыто"}
 
-    raise CoreRealtimeAPIException(status_code=404, detail="Соединение не найдено")
+    raise CoreRealtimeAPIException("websocket", "Соединение не найдено", status_code=404)
 
 
 @router.get("/test-page", response_class=HTMLResponse, summary="Тестовая страница WebSocket")
@@ -0,0 +1,246 @@
+"""Реестр WebRTC комнат и соединений между пирами для сигналинга.
+
+Помимо комнат и соединений реестр держит обратные индексы пир → комнаты и
+пир → соединения, поэтому очистка отключившегося пира стоит O(число его связей),
+а не полный проход по всем комнатам и соединениям. Рассылка в комнату
+выполняется конкурентно.
+
+Состояние хранится в памяти процесса: сигналы доставляются только пирам,
+подключенным к этому воркеру. Сокеты сигналинга ключуются аутентифицированным
+ID пира, который назначает сервер, а не клиент.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from fastapi import WebSocket
+from pytz import utc
+
+from .connection_manager import ConnectionManager
+from .models import MessageType, WebRTCPeerConnection, WebRTCRoom, WSMessage
+
+logger = logging.getLogger(__name__)
+
+PeerLink = tuple[str, str]
+
+
+class WebRTCRegistry:
+    """Реестр комнат, пиров и соединений между пирами.
+
+    Attributes:
+        rooms: Комнаты по ID
+        connections: Соединения по паре (пир, целевой пир)
+    """
+
+    __slots__ = (
+        "_manager",
+        "_peer_links",
+        "_peer_rooms",
+        "_room_links",
+        "_sockets",
+        "connections",
+        "rooms",
+    )
+
+    def __init__(self, manager: ConnectionManager) -> None:
+        self._manager = manager
+        self.rooms: dict[str, WebRTCRoom] = {}
+        self.connections: dict[PeerLink, WebRTCPeerConnection] = {}
+        self._peer_rooms: dict[str, set[str]] = {}
+        self._peer_links: dict[str, set[PeerLink]] = {}
+        self._room_links: dict[str, set[PeerLink]] = {}
+        self._sockets: dict[str, WebSocket] = {}
+
+    # Сокеты сигналинга
+
+    def attach(self, peer_id: str, websocket: WebSocket) -> WebSocket | None:
+        """Зарегистрировать сокет сигналинга пира.
+
+        Повторное подключение того же пира заменяет прежний сокет.
+
+        Returns:
+            Замененный сокет или None
+        """
+        previous = self._sockets.get(peer_id)
+        self._sockets[peer_id] = websocket
+        return previous if previous is not websocket else None
+
+    def detach(self, peer_id: str, websocket: WebSocket) -> bool:
+        """Снять сокет сигналинга пира, если он все еще текущий.
+
+        Поздний disconnect старого сокета не снимает сокет переподключившегося пира.
+
+        Returns:
+            True, если сокет был текущим и снят
+        """
+        if self._sockets.get(peer_id) is not websocket:
+            return False
+        del self._sockets[peer_id]
+        return True
+
+    def is_local(self, peer_id: str) -> bool:
+        """Подключен ли пир к этому воркеру."""
+        return peer_id in self._sockets or bool(self._manager.registry.user_connections(peer_id))
+
+    # Комнаты
+
+    def add_room(self, room: WebRTCRoom) -> bool:
+        """Добавить комнату. False, если комната с таким ID уже есть."""
+        if room.room_id in self.rooms:
+            return False
+        self.rooms[room.room_id] = room
+        for peer_id in room.participants:
+            self._peer_rooms.setdefault(peer_id, set()).add(room.room_id)
+        return True
+
+    def join(self, room_id: str, peer_id: str) -> WebRTCRoom | None:
+        """Добавить пира в комнату, создав ее при необходимости.
+
+        Returns:
+            Комнату или None, если комната переполнена
+        """
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = WebRTCRoom(room_id=room_id, name=f"Room {room_id}", created_by=peer_id)
+            self.rooms[room_id] = room
+
+        if peer_id not in room.participants:
+            if len(room.participants) >= room.max_participants:
+                return None
+            room.participants.add(peer_id)
+            self._peer_rooms.setdefault(peer_id, set()).add(room_id)
+        return room
+
+    def leave(self, room_id: str, peer_id: str) -> WebRTCRoom | None:
+        """Убрать пира из комнаты. Пустая комната удаляется."""
+        room = self.rooms.get(room_id)
+        if room is None:
+            return None
+
+        room.participants.discard(peer_id)
+        _discard(self._peer_rooms, peer_id, room_id)
+        if not room.participants:
+            self.delete_room(room_id)
+        return room
+
+    def delete_room(self, room_id: str) -> WebRTCRoom | None:
+        """Удалить комнату вместе с ее соединениями."""
+        room = self.rooms.pop(room_id, None)
+        if room is None:
+            return None
+
+        for peer_id in room.participants:
+            _discard(self._peer_rooms, peer_id, room_id)
+        for link in list(self._room_links.get(room_id, ())):
+            self._unlink(link)
+        return room
+
+    def peer_rooms(self, peer_id: str) -> set[str]:
+        """ID комнат, в которых состоит пир."""
+        return self._peer_rooms.get(peer_id, set())
+
+    # Соединения между пирами
+
+    def link(self, peer_id: str, target_peer_id: str, room_id: str | None = None) -> WebRTCPeerConnection:
+        """Получить или создать запись о соединении пира с целевым пиром."""
+        key = (peer_id, target_peer_id)
+        connection = self.connections.get(key)
+        if connection is None:
+            connection = WebRTCPeerConnection(peer_id=peer_id, target_peer_id=target_peer_id, room_id=room_id)
+            self.connections[key] = connection
+            self._peer_links.setdefault(peer_id, set()).add(key)
+            self._peer_links.setdefault(target_peer_id, set()).add(key)
+            if room_id:
+                self._room_links.setdefault(room_id, set()).add(key)
+        else:
+            connection.last_activity = datetime.now(tz=utc)
+        return connection
+
+    def room_connections(self, room_id: str) -> list[WebRTCPeerConnection]:
+        """Соединения между пирами в комнате."""
+        return [self.connections[key] for key in self._room_links.get(room_id, ())]
+
+    def _unlink(self, key: PeerLink) -> None:
+        connection = self.connections.pop(key, None)
+        if connection is None:
+            return
+        _discard(self._peer_links, connection.peer_id, key)
+        _discard(self._peer_links, connection.target_peer_id, key)
+        if connection.room_id:
+            _discard(self._room_links, connection.room_id, key)
+
+    def remove_peer(self, peer_id: str) -> list[WebRTCRoom]:
+        """Удалить все данные пира.
+
+        Returns:
+            Комнаты, которые покинул пир (включая удаленные опустевшие)
+        """
+        self._sockets.pop(peer_id, None)
+
+        for key in list(self._peer_links.get(peer_id, ())):
+            self._unlink(key)
+
+        return [room for room_id in list(self.peer_rooms(peer_id)) if (room := self.leave(room_id, peer_id))]
+
+    # Доставка
+
+    async def send_to_peer(self, peer_id: str, message: dict[str, Any]) -> int:
+        """Отправить сообщение пиру.
+
+        Сначала через сокет сигналинга пира, иначе во все соединения пира в
+        менеджере соединений.
+
+        Returns:
+            Количество соединений, в которые сообщение доставлено (0 - пир не найден)
+        """
+        websocket = self._sockets.get(peer_id)
+        if websocket is not None:
+            try:
+                await websocket.send_json(message)
+                return 1
+            except Exception as e:
+                logger.warning(f"Ошибка отправки сигнала пиру {peer_id}: {e}")
+                self.detach(peer_id, websocket)
+
+        if self._manager.registry.user_connections(peer_id):
+            return await self._manager.send_to_user(peer_id, WSMessage(type=MessageType.WEBRTC, data=message))
+        return 0
+
+    async def broadcast(self, room_id: str, message: dict[str, Any], exclude_peer: str | None = None) -> int:
+        """Конкурентно разослать сообщение участникам комнаты.
+
+        Returns:
+            Количество пиров, которым сообщение доставлено
+        """
+        room = self.rooms.get(room_id)
+        if room is None:
+            return 0
+
+        recipients = [peer_id for peer_id in room.participants if peer_id != exclude_peer]
+        results = await asyncio.gather(
+            *(self.send_to_peer(peer_id, message) for peer_id in recipients), return_exceptions=True
+        )
+        for peer_id, result in zip(recipients, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(f"Ошибка рассылки в комнату {room_id} пиру {peer_id}: {result}")
+        return sum(isinstance(result, int) and result > 0 for result in results)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Статистика реестра."""
+        return {
+            "rooms_count": len(self.rooms),
+            "connections_count": len(self.connections),
+            "total_participants": sum(len(room.participants) for room in self.rooms.values()),
+            "local_peers": len(self._sockets),
+        }
+
+
+def _discard(index: dict[str, set], key: str, value: Any) -> None:
+    members = index.get(key)
+    if members is None:
+        return
+    members.discard(value)
+    if not members:
+        del index[key]
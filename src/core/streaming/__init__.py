@@ -3,6 +3,8 @@
 # WebSocket и SSE компоненты
 from .auth import WSAuthenticator, authenticator, get_ws_auth, optional_auth, require_auth
 from .connection_manager import ConnectionManager, connection_manager
+from .export import encode_csv, encode_ndjson, export_response
+from .registry import ConnectionRecord, ConnectionRegistry
 from .sse_routes import router as sse_router
 from .ws_models import (
     BroadcastMessage,
@@ -28,6 +30,12 @@ __all__ = [
     # Connection Manager
     "ConnectionManager",
     "connection_manager",
+    "ConnectionRecord",
+    "ConnectionRegistry",
+    # Export
+    "export_response",
+    "encode_ndjson",
+    "encode_csv",
     # Models
     "WSMessage",
     "SSEMessage",
@@ -0,0 +1,215 @@
+"""Кодеки кадров WebSocket и согласование подпротоколов.
+
+Клиент перечисляет поддерживаемые кодировки в заголовке ``Sec-WebSocket-Protocol``,
+сервер выбирает первую известную ему. По умолчанию используется JSON в текстовых
+кадрах; с подпротоколом ``msgpack`` сообщения передаются бинарными кадрами без
+base64, а крупные сообщения сжимаются zlib.
+
+Формат бинарного кадра ``msgpack``: один байт флагов, затем тело. Флаг
+``FLAG_COMPRESSED`` означает, что тело сжато zlib. Для JSON сжатие обеспечивает
+транспортное расширение permessage-deflate (uvicorn и websockets включают его
+по умолчанию).
+
+Подпротокол ``msgpack`` доступен при установленном extra ``realtime``
+(``uv sync --extra realtime``); без него сервер согласует только JSON.
+"""
+
+import base64
+import json
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from core.exceptions.core_base import CoreStreamingValueError
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+SUBPROTOCOL_JSON = "json"
+SUBPROTOCOL_MSGPACK = "msgpack"
+
+FLAG_COMPRESSED = 0x01
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+def _default(value: Any) -> Any:
+    """Приведение значений, которые не сериализуются напрямую."""
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, set | frozenset):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, bytes | bytearray | memoryview):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return _default(value)
+
+
+class WSCodec(ABC):
+    """Базовый кодек кадров WebSocket.
+
+    Attributes:
+        subprotocol: Имя подпротокола
+        binary: Передаются ли кадры как бинарные
+        dump_mode: Режим ``model_dump`` для Pydantic сообщений
+    """
+
+    subprotocol: str = ""
+    binary: bool = False
+    dump_mode: str = "json"
+
+    @abstractmethod
+    def encode(self, payload: Any) -> str | bytes:
+        """Закодировать payload в кадр."""
+
+    @abstractmethod
+    def decode(self, frame: str | bytes) -> Any:
+        """Декодировать кадр в payload."""
+
+
+class JSONCodec(WSCodec):
+    """JSON в текстовых кадрах, бинарные данные кодируются base64."""
+
+    subprotocol = SUBPROTOCOL_JSON
+    binary = False
+    dump_mode = "json"
+
+    def encode(self, payload: Any) -> str:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+    def decode(self, frame: str | bytes) -> Any:
+        return json.loads(frame)
+
+
+class MsgPackCodec(WSCodec):
+    """msgpack в бинарных кадрах со сжатием крупных сообщений.
+
+    Args:
+        compression_threshold: Размер тела в байтах, начиная с которого оно сжимается.
+            ``0`` отключает сжатие.
+        compression_level: Уровень сжатия zlib
+    """
+
+    subprotocol = SUBPROTOCOL_MSGPACK
+    binary = True
+    dump_mode = "python"
+
+    def __init__(
+        self,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    ) -> None:
+        if not MSGPACK_AVAILABLE:
+            raise CoreStreamingValueError("websocket", "subprotocol", f"{SUBPROTOCOL_MSGPACK} (msgpack not installed)")
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+
+    def encode(self, payload: Any) -> bytes:
+        body = msgpack.packb(payload, default=_default, use_bin_type=True, datetime=False)
+        if self.compression_threshold and len(body) >= self.compression_threshold:
+            return bytes((FLAG_COMPRESSED,)) + zlib.compress(body, self.compression_level)
+        return b"\x00" + body
+
+    def decode(self, frame: str | bytes) -> Any:
+        if isinstance(frame, str):
+            return json.loads(frame)
+        if not frame:
+            raise CoreStreamingValueError("websocket", "frame", "empty binary frame")
+        body = memoryview(frame)[1:]
+        if frame[0] & FLAG_COMPRESSED:
+            body = zlib.decompress(body)
+        return msgpack.unpackb(body, raw=False)
+
+
+JSON_CODEC = JSONCodec()
+
+
+def supported_subprotocols() -> list[str]:
+    """Подпротоколы, которые может обслужить сервер, в порядке предпочтения."""
+    if MSGPACK_AVAILABLE:
+        return [SUBPROTOCOL_MSGPACK, SUBPROTOCOL_JSON]
+    return [SUBPROTOCOL_JSON]
+
+
+@lru_cache(maxsize=16)
+def get_codec(
+    subprotocol: str | None,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> WSCodec:
+    """Получить кодек для подпротокола (JSON, если подпротокол не указан).
+
+    Кодеки не хранят состояния, поэтому экземпляры переиспользуются всеми соединениями.
+    """
+    if subprotocol == SUBPROTOCOL_MSGPACK:
+        return MsgPackCodec(compression_threshold=compression_threshold, compression_level=compression_level)
+    if subprotocol in (None, "", SUBPROTOCOL_JSON):
+        return JSON_CODEC
+    raise CoreStreamingValueError("websocket", "subprotocol", subprotocol)
+
+
+def negotiate_subprotocol(offered: list[str] | None) -> str | None:
+    """Выбрать подпротокол из предложенных клиентом.
+
+    Сохраняется порядок предпочтения клиента. ``None`` означает, что клиент
+    не запросил известный подпротокол и общение идет в JSON без подпротокола.
+    """
+    supported = supported_subprotocols()
+    for subprotocol in offered or []:
+        if subprotocol in supported:
+            return subprotocol
+    return None
+
+
+def decode_frame(codec: WSCodec, frame: str | bytes) -> Any:
+    """Декодировать входящий кадр.
+
+    Текстовые кадры всегда разбираются как JSON, бинарные - текущим кодеком.
+    Текст, который не является JSON, возвращается как есть.
+    """
+    if isinstance(frame, str):
+        try:
+            return json.loads(frame)
+        except json.JSONDecodeError:
+            return frame
+    return codec.decode(frame)
+
+
+async def send_payload(websocket: WebSocket, codec: WSCodec, payload: Any) -> None:
+    """Отправить payload в WebSocket кодеком соединения."""
+    frame = codec.encode(payload)
+    if codec.binary:
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
+
+async def receive_payload(websocket: WebSocket, codec: WSCodec) -> Any:
+    """Получить и декодировать следующий кадр (текстовый или бинарный)."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+
+    if message.get("bytes") is not None:
+        return decode_frame(codec, message["bytes"])
+    return decode_frame(codec, message.get("text") or "")
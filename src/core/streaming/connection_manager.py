@@ -2,131 +2,120 @@
 
 import asyncio
 import logging
+import time
 import uuid
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any
 
 from fastapi import WebSocket
+from pytz import utc
 
 from core.config import get_settings
 from core.exceptions.core_base import CoreStreamingConnectionError
 
-from .ws_models import HeartbeatMessage, MessageType, SSEConnectionStatus, SSEMessage, WSConnectionInfo, WSMessage
+from .codecs import get_codec, send_payload
+from .registry import KIND_SSE, KIND_WEBSOCKET, ConnectionRecord, ConnectionRegistry
+from .ws_models import MessageType, SSEMessage, WSConnectionInfo, WSMessage
 
 logger = logging.getLogger(__name__)
 
 
 class ConnectionManager:
-    """Менеджер WebSocket и SSE соединений."""
+    """Менеджер WebSocket и SSE соединений.
+
+    Состояние соединений хранится в :class:`ConnectionRegistry`: одна запись
+    со ``__slots__`` на соединение плюс индексы пользователей и каналов.
+    """
 
     def __init__(self):
         self.settings = get_settings()
 
-        # WebSocket соединения
-        self.ws_connections: dict[str, WebSocket] = {}
-        self.ws_connection_info: dict[str, WSConnectionInfo] = {}
-        self.ws_user_connections: dict[str, set[str]] = defaultdict(set)
-
-        # SSE соединения (очереди сообщений)
-        self.sse_connections: dict[str, asyncio.Queue] = {}
-        self.sse_connection_info: dict[str, WSConnectionInfo] = {}
-        self.sse_user_connections: dict[str, set[str]] = defaultdict(set)
-
-        # Подписки на каналы
-        self.channel_subscriptions: dict[str, set[str]] = defaultdict(set)
-        self.connection_channels: dict[str, set[str]] = defaultdict(set)
+        # Реестр соединений
+        self.registry = ConnectionRegistry()
 
         # Персистентные сообщения каналов
         self.channel_messages: dict[str, list[WSMessage]] = defaultdict(list)
 
-        # Задачи heartbeat
-        self.heartbeat_tasks: dict[str, asyncio.Task] = {}
-
         logger.info("Connection manager initialized")
 
+    @property
+    def ws_connections(self) -> dict[str, ConnectionRecord]:
+        """WebSocket соединения по ID."""
+        return self.registry.websockets
+
+    @property
+    def sse_connections(self) -> dict[str, ConnectionRecord]:
+        """SSE соединения по ID."""
+        return self.registry.sse
+
+    @property
+    def channel_subscriptions(self) -> dict[str, set[str]]:
+        """Подписчики каналов."""
+        return self.registry.channels
+
     # WebSocket методы
 
     async def connect_websocket(
-        self, websocket: WebSocket, connection_id: str, user_data: dict[str, Any]
-    ) -> WSConnectionInfo:
-        """Подключение WebSocket клиента."""
-        await websocket.accept()
+        self, websocket: WebSocket, connection_id: str, user_data: dict[str, Any], subprotocol: str | None = None
+    ) -> ConnectionRecord:
+        """Подключение WebSocket клиента.
+
+        Args:
+            websocket: WebSocket соединение
+            connection_id: ID соединения
+            user_data: Результат аутентификации
+            subprotocol: Согласованный подпротокол кодирования (``None`` - JSON)
+        """
+        await websocket.accept(subprotocol=subprotocol)
 
         # Проверяем лимит соединений
-        if len(self.ws_connections) >= self.settings.WEBSOCKET_MAX_CONNECTIONS:
+        if len(self.registry.websockets) >= self.settings.WEBSOCKET_MAX_CONNECTIONS:
             await websocket.close(code=1013, reason="Превышен лимит соединений")
             raise CoreStreamingConnectionError("websocket", "Max WebSocket connections limit exceeded")
 
-        # Создаем информацию о соединении
-        connection_info = WSConnectionInfo(
-            connection_id=connection_id,
-            user_id=user_data.get("user", {}).get("sub") if user_data.get("authenticated") else None,
-            status=SSEConnectionStatus.CONNECTED,
-            ip_address=websocket.client.host if websocket.client else None,
-            user_agent=websocket.headers.get("user-agent"),
-            metadata={"auth_data": user_data},
+        # Сохраняем только то, что нужно для маршрутизации, без полного JWT payload
+        record = self.registry.add(
+            ConnectionRecord(
+                connection_id=connection_id,
+                kind=KIND_WEBSOCKET,
+                transport=websocket,
+                user_id=_extract_user_id(user_data),
+                authenticated=bool(user_data.get("authenticated")),
+                ip_address=websocket.client.host if websocket.client else None,
+                user_agent=websocket.headers.get("user-agent"),
+                codec=get_codec(
+                    subprotocol,
+                    self.settings.WEBSOCKET_COMPRESSION_THRESHOLD,
+                    self.settings.WEBSOCKET_COMPRESSION_LEVEL,
+                ),
+            )
         )
 
-        # Сохраняем соединение
-        self.ws_connections[connection_id] = websocket
-        self.ws_connection_info[connection_id] = connection_info
-
-        # Связываем с пользователем
-        if connection_info.user_id:
-            self.ws_user_connections[connection_info.user_id].add(connection_id)
-
         # Запускаем heartbeat
         if self.settings.WEBSOCKET_HEARTBEAT_INTERVAL > 0:
-            task = asyncio.create_task(self._websocket_heartbeat(connection_id))
-            self.heartbeat_tasks[connection_id] = task
+            record.heartbeat_task = asyncio.create_task(self._websocket_heartbeat(connection_id))
 
-        logger.info(f"WebSocket connected: {connection_id}, user: {connection_info.user_id}")
-        return connection_info
+        logger.info(f"WebSocket connected: {connection_id}, user: {record.user_id}")
+        return record
 
     async def disconnect_websocket(self, connection_id: str) -> None:
         """Отключение WebSocket клиента."""
-        if connection_id not in self.ws_connections:
+        if connection_id not in self.registry.websockets:
             return
 
-        connection_info = self.ws_connection_info.get(connection_id)
-
-        # Убираем из подписок
-        channels = self.connection_channels.get(connection_id, set()).copy()
-        for channel in channels:
-            await self.unsubscribe_from_channel(connection_id, channel)
-
-        # Убираем из пользовательских соединений
-        if connection_info and connection_info.user_id:
-            self.ws_user_connections[connection_info.user_id].discard(connection_id)
-            if not self.ws_user_connections[connection_info.user_id]:
-                del self.ws_user_connections[connection_info.user_id]
-
-        # Останавливаем heartbeat
-        if connection_id in self.heartbeat_tasks:
-            self.heartbeat_tasks[connection_id].cancel()
-            del self.heartbeat_tasks[connection_id]
-
-        # Удаляем соединение
-        del self.ws_connections[connection_id]
-        if connection_id in self.ws_connection_info:
-            del self.ws_connection_info[connection_id]
-
+        self._drop(connection_id)
         logger.info(f"WebSocket disconnected: {connection_id}")
 
     async def send_to_websocket(self, connection_id: str, message: WSMessage) -> bool:
         """Отправка сообщения в WebSocket."""
-        if connection_id not in self.ws_connections:
+        record = self.registry.websockets.get(connection_id)
+        if record is None:
             return False
 
-        websocket = self.ws_connections[connection_id]
         try:
-            await websocket.send_json(message.dict())
-
-            # Обновляем последнюю активность
-            if connection_id in self.ws_connection_info:
-                self.ws_connection_info[connection_id].last_activity = datetime.now(tz=utc)()
-
+            await send_payload(record.transport, record.codec, message.model_dump(mode=record.codec.dump_mode))
+            record.last_activity = time.monotonic()
             return True
         except Exception as e:
             logger.error(f"Error sending WebSocket message to {connection_id}: {e}")
@@ -138,79 +127,46 @@ class ConnectionManager:
     async def connect_sse(self, connection_id: str, user_data: dict[str, Any]) -> asyncio.Queue[SSEMessage]:
         """Подключение SSE клиента."""
         # Проверяем лимит соединений
-        if len(self.sse_connections) >= self.settings.SSE_MAX_CONNECTIONS:
+        if len(self.registry.sse) >= self.settings.SSE_MAX_CONNECTIONS:
             raise CoreStreamingConnectionError("sse", "Max SSE connections limit exceeded")
 
         # Создаем очередь сообщений
         message_queue: asyncio.Queue[SSEMessage] = asyncio.Queue(maxsize=self.settings.WEBSOCKET_MESSAGE_QUEUE_SIZE)
 
-        # Создаем информацию о соединении
-        connection_info = WSConnectionInfo(
-            connection_id=connection_id,
-            user_id=user_data.get("user", {}).get("sub") if user_data.get("authenticated") else None,
-            status=SSEConnectionStatus.CONNECTED,
-            metadata={"auth_data": user_data},
+        record = self.registry.add(
+            ConnectionRecord(
+                connection_id=connection_id,
+                kind=KIND_SSE,
+                transport=message_queue,
+                user_id=_extract_user_id(user_data),
+                authenticated=bool(user_data.get("authenticated")),
+            )
         )
 
-        # Сохраняем соединение
-        self.sse_connections[connection_id] = message_queue
-        self.sse_connection_info[connection_id] = connection_info
-
-        # Связываем с пользователем
-        if connection_info.user_id:
-            self.sse_user_connections[connection_info.user_id].add(connection_id)
-
         # Запускаем heartbeat
         if self.settings.SSE_HEARTBEAT_INTERVAL > 0:
-            task = asyncio.create_task(self._sse_heartbeat(connection_id))
-            self.heartbeat_tasks[connection_id] = task
+            record.heartbeat_task = asyncio.create_task(self._sse_heartbeat(connection_id))
 
-        logger.info(f"SSE connected: {connection_id}, user: {connection_info.user_id}")
+        logger.info(f"SSE connected: {connection_id}, user: {record.user_id}")
         return message_queue
 
     async def disconnect_sse(self, connection_id: str) -> None:
         """Отключение SSE клиента."""
-        if connection_id not in self.sse_connections:
+        if connection_id not in self.registry.sse:
             return
 
-        connection_info = self.sse_connection_info.get(connection_id)
-
-        # Убираем из подписок
-        channels = self.connection_channels.get(connection_id, set()).copy()
-        for channel in channels:
-            await self.unsubscribe_from_channel(connection_id, channel)
-
-        # Убираем из пользовательских соединений
-        if connection_info and connection_info.user_id:
-            self.sse_user_connections[connection_info.user_id].discard(connection_id)
-            if not self.sse_user_connections[connection_info.user_id]:
-                del self.sse_user_connections[connection_info.user_id]
-
-        # Останавливаем heartbeat
-        if connection_id in self.heartbeat_tasks:
-            self.heartbeat_tasks[connection_id].cancel()
-            del self.heartbeat_tasks[connection_id]
-
-        # Удаляем соединение
-        del self.sse_connections[connection_id]
-        if connection_id in self.sse_connection_info:
-            del self.sse_connection_info[connection_id]
-
+        self._drop(connection_id)
         logger.info(f"SSE disconnected: {connection_id}")
 
     async def send_to_sse(self, connection_id: str, message: SSEMessage) -> bool:
         """Отправка SSE сообщения."""
-        if connection_id not in self.sse_connections:
+        record = self.registry.sse.get(connection_id)
+        if record is None:
             return False
 
-        queue = self.sse_connections[connection_id]
         try:
-            queue.put_nowait(message)
-
-            # Обновляем последнюю активность
-            if connection_id in self.sse_connection_info:
-                self.sse_connection_info[connection_id].last_activity = datetime.now(tz=utc)()
-
+            record.transport.put_nowait(message)
+            record.last_activity = time.monotonic()
             return True
         except asyncio.QueueFull:
             logger.warning(f"SSE queue full for connection {connection_id}")
@@ -220,13 +176,21 @@ class ConnectionManager:
             await self.disconnect_sse(connection_id)
             return False
 
+    def _drop(self, connection_id: str) -> None:
+        """Удалить соединение из реестра и остановить его heartbeat."""
+        record = self.registry.remove(connection_id)
+        if record is not None and record.heartbeat_task is not None:
+            # Не отменяем задачу изнутри нее самой
+            if record.heartbeat_task is not asyncio.current_task():
+                record.heartbeat_task.cancel()
+            record.heartbeat_task = None
+
     # Методы подписок на каналы
 
     async def subscribe_to_channel(self, connection_id: str, channel: str) -> bool:
         """Подписка соединения на канал."""
-        # Добавляем в подписки канала
-        self.channel_subscriptions[channel].add(connection_id)
-        self.connection_channels[connection_id].add(channel)
+        if not self.registry.subscribe(connection_id, channel):
+            return False
 
         # Отправляем персистентные сообщения канала
         persistent_messages = self.channel_messages.get(channel, [])
@@ -238,12 +202,8 @@ class ConnectionManager:
 
     async def unsubscribe_from_channel(self, connection_id: str, channel: str) -> bool:
         """Отписка соединения от канала."""
-        self.channel_subscriptions[channel].discard(connection_id)
-        self.connection_channels[connection_id].discard(channel)
-
-        # Удаляем пустые каналы
-        if not self.channel_subscriptions[channel]:
-            del self.channel_subscriptions[channel]
+        if not self.registry.unsubscribe(connection_id, channel):
+            return False
 
         logger.info(f"Connection {connection_id} unsubscribed from channel {channel}")
         return True
@@ -252,7 +212,7 @@ class ConnectionManager:
 
     async def broadcast_to_channel(self, channel: str, message: WSMessage, persist: bool = False) -> int:
         """Широковещательная отправка в канал."""
-        connection_ids = self.channel_subscriptions.get(channel, set())
+        connection_ids = self.registry.channel_subscribers(channel)
         sent_count = 0
 
         # Сохраняем персистентное сообщение
@@ -275,9 +235,7 @@ class ConnectionManager:
     async def send_to_user(self, user_id: str, message: WSMessage) -> int:
         """Отправка сообщения пользователю."""
         # Получаем все соединения пользователя
-        ws_connections = self.ws_user_connections.get(user_id, set())
-        sse_connections = self.sse_user_connections.get(user_id, set())
-        all_connections = ws_connections | sse_connections
+        all_connections = self.registry.user_connections(user_id)
 
         sent_count = 0
         for connection_id in all_connections.copy():
@@ -290,11 +248,10 @@ class ConnectionManager:
     async def broadcast_to_all(self, message: WSMessage, exclude_connections: list[str] | None = None) -> int:
         """Широковещательная отправка всем соединениям."""
         exclude_set = set(exclude_connections or [])
-        all_connections = set(self.ws_connections.keys()) | set(self.sse_connections.keys())
-        target_connections = all_connections - exclude_set
+        target_connections = (self.registry.websockets.keys() | self.registry.sse.keys()) - exclude_set
 
         sent_count = 0
-        for connection_id in target_connections.copy():
+        for connection_id in target_connections:
             if await self._send_to_connection(connection_id, message):
                 sent_count += 1
 
@@ -313,8 +270,9 @@ class ConnectionManager:
                     break
 
                 heartbeat_message = WSMessage(
+                    id=str(uuid.uuid4()),
                     type=MessageType.HEARTBEAT,
-                    data={"timestamp": datetime.now(tz=utc)().isoformat()},
+                    content={"timestamp": datetime.now(tz=utc).isoformat()},
                 )
 
                 success = await self.send_to_websocket(connection_id, heartbeat_message)
@@ -338,8 +296,9 @@ class ConnectionManager:
                     break
 
                 heartbeat_message = SSEMessage(
+                    id=str(uuid.uuid4()),
                     event="heartbeat",
-                    data={"timestamp": datetime.now(tz=utc)().isoformat()},
+                    data={"timestamp": datetime.now(tz=utc).isoformat()},
                 )
 
                 success = await self.send_to_sse(connection_id, heartbeat_message)
@@ -357,53 +316,54 @@ class ConnectionManager:
 
     def get_connection_info(self, connection_id: str) -> WSConnectionInfo | None:
         """Получить информацию о соединении."""
-        return self.ws_connection_info.get(connection_id) or self.sse_connection_info.get(connection_id)
+        record = self.registry.get(connection_id)
+        return record.to_info() if record is not None else None
 
     def get_connections_stats(self) -> dict[str, Any]:
         """Получить статистику соединений."""
         return {
             "websocket": {
-                "total": len(self.ws_connections),
-                "users": len(self.ws_user_connections),
-                "channels": len(self.channel_subscriptions),
+                "total": len(self.registry.websockets),
+                "users": self.registry.users_count(KIND_WEBSOCKET),
+                "channels": len(self.registry.channels),
             },
             "sse": {
-                "total": len(self.sse_connections),
-                "users": len(self.sse_user_connections),
+                "total": len(self.registry.sse),
+                "users": self.registry.users_count(KIND_SSE),
+            },
+            "channels": {
+                "total": len(self.registry.channels),
+                "subscriptions": self.registry.subscriptions_count(),
             },
             "limits": {
                 "websocket_max": self.settings.WEBSOCKET_MAX_CONNECTIONS,
                 "sse_max": self.settings.SSE_MAX_CONNECTIONS,
             },
-            "heartbeat_tasks": len(self.heartbeat_tasks),
+            "heartbeat_tasks": sum(
+                1
+                for bucket in (self.registry.websockets, self.registry.sse)
+                for record in bucket.values()
+                if record.heartbeat_task is not None
+            ),
         }
 
     async def cleanup_inactive_connections(self) -> int:
         """Очистка неактивных соединений."""
-        current_time = datetime.now(tz=utc)()
-        inactive_connections = []
-
-        # Проверяем WebSocket соединения
-        for connection_id, info in self.ws_connection_info.items():
-            if (current_time - info.last_activity).total_seconds() > self.settings.WEBSOCKET_TIMEOUT:
-                inactive_connections.append(connection_id)
-
-        # Проверяем SSE соединения
-        for connection_id, info in self.sse_connection_info.items():
-            if (current_time - info.last_activity).total_seconds() > self.settings.SSE_TIMEOUT:
-                inactive_connections.append(connection_id)
+        timeout = self.settings.WEBSOCKET_DISCONNECT_TIMEOUT
+        inactive_ws = self.registry.inactive(KIND_WEBSOCKET, timeout)
+        inactive_sse = self.registry.inactive(KIND_SSE, timeout)
 
         # Отключаем неактивные соединения
-        for connection_id in inactive_connections:
-            if connection_id in self.ws_connections:
-                await self.disconnect_websocket(connection_id)
-            elif connection_id in self.sse_connections:
-                await self.disconnect_sse(connection_id)
+        for connection_id in inactive_ws:
+            await self.disconnect_websocket(connection_id)
+        for connection_id in inactive_sse:
+            await self.disconnect_sse(connection_id)
 
-        if inactive_connections:
-            logger.info(f"Cleaned up {len(inactive_connections)} inactive connections")
+        total = len(inactive_ws) + len(inactive_sse)
+        if total:
+            logger.info(f"Cleaned up {total} inactive connections")
 
-        return len(inactive_connections)
+        return total
 
     async def _send_to_connection(self, connection_id: str, message: WSMessage) -> bool:
         """Отправить сообщение в соединение (WebSocket или SSE).
@@ -416,19 +376,28 @@ class ConnectionManager:
             bool: True если отправлено успешно
         """
         # Попробуем WebSocket
-        if connection_id in self.ws_connections:
+        if connection_id in self.registry.websockets:
             return await self.send_to_websocket(connection_id, message)
 
         # Попробуем SSE
-        if connection_id in self.sse_connections:
+        if connection_id in self.registry.sse:
             sse_message = SSEMessage(
+                id=message.id,
                 event="message",
-                data=message.model_dump(),
+                data=message.model_dump(mode="json"),
             )
             return await self.send_to_sse(connection_id, sse_message)
 
         return False
 
 
+def _extract_user_id(user_data: dict[str, Any]) -> str | None:
+    """ID пользователя из результата аутентификации."""
+    if not user_data.get("authenticated"):
+        return None
+    user_id = (user_data.get("user") or {}).get("sub")
+    return str(user_id) if user_id is not None else None
+
+
 # Глобальный экземпляр менеджера соединений
 connection_manager = ConnectionManager()
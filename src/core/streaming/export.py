@@ -0,0 +1,138 @@
+"""Потоковый экспорт больших выборок в NDJSON и CSV.
+
+Строки кодируются по мере чтения из асинхронного источника (например,
+``repository.stream()``) и копятся в буфере до ``chunk_bytes``, после чего
+буфер отдается одним chunk. ``StreamingResponse`` запрашивает следующий chunk
+только после отправки предыдущего, а сервер ждет освобождения буфера сокета:
+медленный клиент притормаживает чтение курсора, и память не зависит от
+количества строк.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from typing import Any, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import inspect as sa_inspect
+
+from core.exceptions.core_base import CoreStreamingValueError
+
+from .sse_writer import dumps_json
+
+DEFAULT_EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def row_to_dict(row: Any) -> dict[str, Any]:
+    """Привести строку экспорта (dict, Pydantic, ORM объект, Row) к словарю."""
+    if isinstance(row, dict):
+        return row
+    if hasattr(row, "model_dump"):
+        return row.model_dump(mode="json")
+    if hasattr(row, "__table__"):
+        return {attr.key: getattr(row, attr.key) for attr in sa_inspect(row).mapper.column_attrs}
+    if hasattr(row, "_asdict"):
+        return row._asdict()
+    raise CoreStreamingValueError("export", "row", type(row).__name__)
+
+
+async def encode_ndjson(
+    rows: AsyncIterable[Any], chunk_bytes: int = DEFAULT_EXPORT_CHUNK_BYTES
+) -> AsyncIterator[bytes]:
+    """Кодировать строки в NDJSON chunks размером около ``chunk_bytes``."""
+    lines: list[str] = []
+    size = 0
+    async for row in rows:
+        line = dumps_json(row_to_dict(row)) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(lines).encode()
+            lines.clear()
+            size = 0
+    if lines:
+        yield "".join(lines).encode()
+
+
+async def encode_csv(
+    rows: AsyncIterable[Any],
+    columns: Sequence[str] | None = None,
+    chunk_bytes: int = DEFAULT_EXPORT_CHUNK_BYTES,
+) -> AsyncIterator[bytes]:
+    """Кодировать строки в CSV chunks размером около ``chunk_bytes``.
+
+    Без ``columns`` заголовок берется из ключей первой строки; ключи, которых
+    нет в заголовке, отбрасываются.
+    """
+    buffer = io.StringIO()
+    writer: csv.DictWriter | None = None
+    async for row in rows:
+        data = row_to_dict(row)
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(columns or data), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(data)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if writer is None and columns:
+        csv.writer(buffer).writerow(columns)
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    rows: AsyncIterable[Any],
+    format: ExportFormat = "ndjson",
+    *,
+    columns: Sequence[str] | None = None,
+    filename: str | None = None,
+    chunk_bytes: int = DEFAULT_EXPORT_CHUNK_BYTES,
+) -> StreamingResponse:
+    """Потоковый HTTP ответ с экспортом строк в NDJSON или CSV.
+
+    Сессия, из которой читаются строки, должна жить до конца отправки ответа,
+    поэтому ее открывают внутри генератора строк. Сессию из зависимости
+    ``get_db`` использовать нельзя: до FastAPI 0.118 зависимости с ``yield``
+    закрываются до отправки тела ``StreamingResponse``.
+
+    Args:
+        rows: Асинхронный источник строк, например ``repository.stream()``
+        format: ``"ndjson"`` или ``"csv"``
+        columns: Колонки CSV (и их порядок)
+        filename: Имя файла для ``Content-Disposition: attachment``
+        chunk_bytes: Размер буфера перед отправкой chunk
+
+    Returns:
+        StreamingResponse с кодированным потоком
+
+    Raises:
+        CoreStreamingValueError: Неизвестный формат
+
+    Example:
+        ```python
+        async def active_users():
+            async with AsyncSessionLocal() as session:
+                async for user in UserRepository(session).stream({"is_active": True}):
+                    yield user
+
+        @router.get("/users/export")
+        async def export_users():
+            return export_response(active_users(), "csv", filename="users.csv")
+        ```
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise CoreStreamingValueError("export", "format", format)
+
+    body = encode_csv(rows, columns, chunk_bytes) if format == "csv" else encode_ndjson(rows, chunk_bytes)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
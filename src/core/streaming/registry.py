@@ -0,0 +1,229 @@
+"""Компактный реестр WebSocket и SSE соединений.
+
+Каждое соединение хранится одной записью со ``__slots__`` вместо Pydantic модели,
+а пользователи и каналы индексируются интернированными строками. Временные метки
+берутся из монотонных часов, поэтому обновление активности - это одно присваивание
+float без валидации и аллокаций.
+"""
+
+import sys
+import time
+from datetime import datetime
+from typing import Any
+
+from pytz import utc
+
+from .ws_models import SSEConnectionStatus, WSConnectionInfo
+
+# Виды транспорта (интернированные константы)
+KIND_WEBSOCKET = sys.intern("websocket")
+KIND_SSE = sys.intern("sse")
+
+
+class ConnectionRecord:
+    """Запись о соединении.
+
+    Attributes:
+        connection_id: ID соединения
+        kind: Вид транспорта (``KIND_WEBSOCKET`` или ``KIND_SSE``)
+        transport: WebSocket объект или очередь SSE сообщений
+        user_id: Интернированный ID пользователя
+        authenticated: Прошло ли соединение аутентификацию
+        channels: Подписанные каналы (создается при первой подписке)
+        connected_at: Время подключения по монотонным часам
+        last_activity: Последняя активность по монотонным часам
+        ip_address: IP адрес клиента
+        user_agent: User agent клиента
+        heartbeat_task: Задача heartbeat
+        codec: Кодек кадров WebSocket, согласованный при подключении
+    """
+
+    __slots__ = (
+        "authenticated",
+        "channels",
+        "codec",
+        "connected_at",
+        "connection_id",
+        "heartbeat_task",
+        "ip_address",
+        "kind",
+        "last_activity",
+        "transport",
+        "user_agent",
+        "user_id",
+    )
+
+    def __init__(
+        self,
+        connection_id: str,
+        kind: str,
+        transport: Any,
+        user_id: str | None = None,
+        authenticated: bool = False,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        codec: Any = None,
+    ) -> None:
+        now = time.monotonic()
+        self.connection_id = connection_id
+        self.kind = kind
+        self.transport = transport
+        self.user_id = sys.intern(user_id) if user_id else None
+        self.authenticated = authenticated
+        self.channels: set[str] | None = None
+        self.connected_at = now
+        self.last_activity = now
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        self.heartbeat_task: Any = None
+        self.codec = codec
+
+    def touch(self) -> None:
+        """Отметить активность соединения."""
+        self.last_activity = time.monotonic()
+
+    def idle_seconds(self, now: float | None = None) -> float:
+        """Сколько секунд соединение неактивно."""
+        return (now if now is not None else time.monotonic()) - self.last_activity
+
+    def to_info(self) -> WSConnectionInfo:
+        """Собрать Pydantic представление записи для API ответов."""
+        offset = time.time() - time.monotonic()
+        return WSConnectionInfo(
+            connection_id=self.connection_id,
+            user_id=self.user_id,
+            status=SSEConnectionStatus.CONNECTED,
+            connected_at=_to_datetime(self.connected_at + offset),
+            last_activity=_to_datetime(self.last_activity + offset),
+            channels=sorted(self.channels) if self.channels else [],
+            metadata={"kind": self.kind, "authenticated": self.authenticated},
+            ip_address=self.ip_address,
+            user_agent=self.user_agent,
+        )
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=utc)
+
+
+class ConnectionRegistry:
+    """Реестр соединений с индексами по пользователям и каналам.
+
+    Соединение хранится ровно в одном словаре своего транспорта; индексы
+    пользователей и каналов содержат только ID соединений.
+    """
+
+    __slots__ = ("_channels", "_users", "sse", "websockets")
+
+    def __init__(self) -> None:
+        self.websockets: dict[str, ConnectionRecord] = {}
+        self.sse: dict[str, ConnectionRecord] = {}
+        self._users: dict[str, set[str]] = {}
+        self._channels: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.websockets) + len(self.sse)
+
+    def __contains__(self, connection_id: str) -> bool:
+        return connection_id in self.websockets or connection_id in self.sse
+
+    def _bucket(self, kind: str) -> dict[str, ConnectionRecord]:
+        return self.websockets if kind == KIND_WEBSOCKET else self.sse
+
+    def get(self, connection_id: str) -> ConnectionRecord | None:
+        """Получить запись соединения."""
+        return self.websockets.get(connection_id) or self.sse.get(connection_id)
+
+    def add(self, record: ConnectionRecord) -> ConnectionRecord:
+        """Зарегистрировать соединение."""
+        self._bucket(record.kind)[record.connection_id] = record
+        if record.user_id:
+            self._users.setdefault(record.user_id, set()).add(record.connection_id)
+        return record
+
+    def remove(self, connection_id: str) -> ConnectionRecord | None:
+        """Удалить соединение из реестра и всех индексов."""
+        record = self.websockets.pop(connection_id, None) or self.sse.pop(connection_id, None)
+        if record is None:
+            return None
+
+        if record.channels:
+            for channel in record.channels:
+                self._discard(self._channels, channel, connection_id)
+            record.channels = None
+
+        if record.user_id:
+            self._discard(self._users, record.user_id, connection_id)
+
+        return record
+
+    def subscribe(self, connection_id: str, channel: str) -> bool:
+        """Подписать соединение на канал."""
+        record = self.get(connection_id)
+        if record is None:
+            return False
+
+        channel = sys.intern(channel)
+        if record.channels is None:
+            record.channels = set()
+        record.channels.add(channel)
+        self._channels.setdefault(channel, set()).add(connection_id)
+        return True
+
+    def unsubscribe(self, connection_id: str, channel: str) -> bool:
+        """Отписать соединение от канала."""
+        record = self.get(connection_id)
+        if record is None or not record.channels or channel not in record.channels:
+            return False
+
+        record.channels.discard(channel)
+        self._discard(self._channels, channel, connection_id)
+        return True
+
+    def channel_subscribers(self, channel: str) -> set[str]:
+        """ID соединений, подписанных на канал."""
+        return self._channels.get(channel, set())
+
+    def user_connections(self, user_id: str, kind: str | None = None) -> set[str]:
+        """ID соединений пользователя, опционально только одного транспорта."""
+        connection_ids = self._users.get(user_id, set())
+        if kind is None:
+            return connection_ids
+        bucket = self._bucket(kind)
+        return {connection_id for connection_id in connection_ids if connection_id in bucket}
+
+    def subscriptions_count(self) -> int:
+        """Суммарное количество подписок."""
+        return sum(len(subscribers) for subscribers in self._channels.values())
+
+    @property
+    def channels(self) -> dict[str, set[str]]:
+        """Индекс подписок каналов."""
+        return self._channels
+
+    @property
+    def users(self) -> dict[str, set[str]]:
+        """Индекс соединений пользователей."""
+        return self._users
+
+    def users_count(self, kind: str) -> int:
+        """Количество пользователей, у которых есть соединения указанного транспорта."""
+        return len({record.user_id for record in self._bucket(kind).values() if record.user_id})
+
+    def inactive(self, kind: str, timeout: float) -> list[str]:
+        """ID соединений транспорта, неактивных дольше ``timeout`` секунд."""
+        threshold = time.monotonic() - timeout
+        return [
+            connection_id
+            for connection_id, record in self._bucket(kind).items()
+            if record.last_activity < threshold
+        ]
+
+    @staticmethod
+    def _discard(index: dict[str, set[str]], key: str, connection_id: str) -> None:
+        members = index.get(key)
+        if members is None:
+            return
+        members.discard(connection_id)
+        if not members:
+            del index[key]
@@ -1,18 +1,20 @@
 """Server-Sent Events роутеры."""
 
-import asyncio
 import logging
 import uuid
+from datetime import datetime
 from typing import Any
 
 from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
+from pytz import utc
 
 from core.config import get_settings
 from core.exceptions import CoreStreamingAPIException
 
 from .auth import WSAuthenticator, WSAuthError, get_ws_auth, optional_auth
 from .connection_manager import connection_manager
+from .sse_writer import SSEStreamWriter
 from .ws_models import MessageType, NotificationMessage, SSEMessage, WSMessage
 
 logger = logging.getLogger(__name__)
@@ -63,36 +65,30 @@ async def sse_endpoint(
         await connection_manager.send_to_sse(connection_id, welcome_message)
 
         # Создаем генератор событий
+        def heartbeat() -> SSEMessage:
+            info = connection_manager.get_connection_info(connection_id)
+            timestamp = info.last_activity if info else datetime.now(tz=utc)
+            return SSEMessage(
+                id=str(uuid.uuid4()),
+                event="heartbeat",
+                data={"timestamp": timestamp.isoformat()},
+                retry=settings.SSE_RETRY_TIMEOUT,
+            )
+
+        # Сообщения, накопившиеся в очереди, отдаются одним chunk
+        writer = SSEStreamWriter(message_queue, heartbeat, settings.SSE_HEARTBEAT_INTERVAL)
+
         async def event_generator():
             try:
-                while True:
-                    try:
-                        # Ждем сообщение с таймаутом
-                        message = await asyncio.wait_for(message_queue.get(), timeout=settings.SSE_HEARTBEAT_INTERVAL)
-
-                        # Отправляем сообщение в SSE формате
-                        yield f"{message.to_sse_format()}\n"
-
-                    except TimeoutError:
-                        # Отправляем heartbeat если нет сообщений
-                        heartbeat = SSEMessage(
-                            id=str(uuid.uuid4()),
-                            event="heartbeat",
-                            data={
-                                "timestamp": connection_manager.get_connection_info(
-                                    connection_id
-                                ).last_activity.isoformat()
-                            },
-                            retry=settings.SSE_RETRY_TIMEOUT,
-                        )
-                        yield f"{heartbeat.to_sse_format()}\n"
+                async for chunk in writer.stream():
+                    yield chunk
 
             except Exception as e:
                 logger.error(f"SSE generator error for {connection_id}: {e}")
                 error_message = SSEMessage(
                     id=str(uuid.uuid4()), event="error", data={"error": "Ошибка потока", "details": str(e)}
                 )
-                yield f"{error_message.to_sse_format()}\n"
+                yield error_message.to_sse_format()
             finally:
                 await connection_manager.disconnect_sse(connection_id)
 
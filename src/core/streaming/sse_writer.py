@@ -0,0 +1,149 @@
+"""Потоковая запись SSE событий с объединением сообщений в один chunk.
+
+Писатель забирает из очереди все уже доступные сообщения (в пределах бюджета
+по байтам и количеству) и отдает их одной строкой, поэтому при всплеске
+сообщений в канале на каждое событие не приходится отдельная отправка в сокет.
+
+Heartbeat отправляется по одному переиспользуемому таймеру простоя: таймер
+не пересоздается на каждое сообщение, а при срабатывании сверяется со временем
+последней активности и при необходимости переносится на новый дедлайн.
+
+С extra ``realtime`` (``uv sync --extra realtime``) данные событий
+сериализуются через orjson, без него - стандартным ``json``.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+DEFAULT_MAX_BATCH_BYTES = 64 * 1024
+DEFAULT_MAX_BATCH_EVENTS = 256
+
+# Маркер, который таймер простоя кладет в очередь вместо сообщения
+_IDLE = object()
+
+
+def dumps_json(data: Any) -> str:
+    """Компактная JSON сериализация (orjson, если установлен)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def format_sse_event(event_id: str | None, event: str | None, data: Any, retry: int | None = None) -> str:
+    """Собрать одно SSE событие, завершенное пустой строкой."""
+    head = ""
+    if event_id:
+        head += f"id: {event_id}\n"
+    if event:
+        head += f"event: {event}\n"
+    if retry:
+        head += f"retry: {retry}\n"
+
+    data_str = dumps_json(data) if isinstance(data, dict | list) else str(data)
+    if "\n" in data_str:
+        data_str = data_str.replace("\n", "\ndata: ")
+    return f"{head}data: {data_str}\n\n"
+
+
+class SSEStreamWriter:
+    """Генератор SSE потока поверх очереди сообщений соединения.
+
+    Args:
+        queue: Очередь сообщений соединения (элементы с ``to_sse_format()`` или готовые строки)
+        heartbeat: Фабрика heartbeat сообщения
+        heartbeat_interval: Интервал простоя перед heartbeat (сек)
+        max_batch_bytes: Размер одного chunk в байтах UTF-8, по достижении которого он отправляется
+        max_batch_events: Максимальное количество событий в одном chunk
+    """
+
+    __slots__ = (
+        "_deadline",
+        "_loop",
+        "_timer",
+        "heartbeat",
+        "heartbeat_interval",
+        "max_batch_bytes",
+        "max_batch_events",
+        "queue",
+    )
+
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        heartbeat: Callable[[], Any],
+        heartbeat_interval: float,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_batch_events: int = DEFAULT_MAX_BATCH_EVENTS,
+    ) -> None:
+        self.queue = queue
+        self.heartbeat = heartbeat
+        self.heartbeat_interval = heartbeat_interval
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_events = max_batch_events
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._deadline = 0.0
+
+    @staticmethod
+    def encode(message: Any) -> str:
+        """Преобразовать сообщение очереди в SSE событие."""
+        return message if isinstance(message, str) else message.to_sse_format()
+
+    def _on_idle(self) -> None:
+        now = self._loop.time()
+        if now < self._deadline:
+            # Была активность - переносим тот же таймер на новый дедлайн
+            self._timer = self._loop.call_at(self._deadline, self._on_idle)
+            return
+
+        try:
+            self.queue.put_nowait(_IDLE)
+        except asyncio.QueueFull:
+            pass
+        self._deadline = now + self.heartbeat_interval
+        self._timer = self._loop.call_at(self._deadline, self._on_idle)
+
+    def close(self) -> None:
+        """Остановить таймер простоя."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Отдавать SSE chunks до отмены генератора."""
+        self._loop = asyncio.get_running_loop()
+        self._deadline = self._loop.time() + self.heartbeat_interval
+        if self.heartbeat_interval > 0:
+            self._timer = self._loop.call_at(self._deadline, self._on_idle)
+
+        queue = self.queue
+        try:
+            while True:
+                message = queue.get_nowait() if not queue.empty() else await queue.get()
+                chunks: list[str] = []
+                size = 0
+                while True:
+                    if message is not _IDLE:
+                        chunk = self.encode(message)
+                        chunks.append(chunk)
+                        size += len(chunk) if chunk.isascii() else len(chunk.encode())
+                    if size >= self.max_batch_bytes or len(chunks) >= self.max_batch_events or queue.empty():
+                        break
+                    message = queue.get_nowait()
+
+                if chunks:
+                    self._deadline = self._loop.time() + self.heartbeat_interval
+                    yield "".join(chunks)
+                else:
+                    yield self.encode(self.heartbeat())
+        finally:
+            self.close()
@@ -9,6 +9,8 @@ from pytz import utc
 
 from tools.pydantic import BaseModel
 
+from .sse_writer import format_sse_event
+
 
 class MessageType(str, Enum):
     """Типы сообщений."""
@@ -39,7 +41,7 @@ class WSMessage(BaseModel):
     id: str = Field(..., description="Уникальный ID сообщения")
     type: MessageType = Field(default=MessageType.TEXT, description="Тип сообщения")
     content: str | dict[str, Any] = Field(..., description="Содержимое сообщения")
-    timestamp: datetime = Field(default_factory=datetime.now(tz=utc), description="Время создания")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(tz=utc), description="Время создания")
     sender_id: str | None = Field(None, description="ID отправителя")
     recipient_id: str | None = Field(None, description="ID получателя")
     channel: str | None = Field(None, description="Канал сообщения")
@@ -56,35 +58,11 @@ class SSEMessage(BaseModel):
     event: str = Field(default="message", description="Тип события")
     data: str | dict[str, Any] = Field(..., description="Данные события")
     retry: int | None = Field(None, description="Время повтора в миллисекундах")
-    timestamp: datetime = Field(default_factory=datetime.now(tz=utc), description="Время создания")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(tz=utc), description="Время создания")
 
     def to_sse_format(self) -> str:
-        """Преобразование в формат SSE."""
-        lines = []
-
-        if self.id:
-            lines.append(f"id: {self.id}")
-
-        if self.event:
-            lines.append(f"event: {self.event}")
-
-        if self.retry:
-            lines.append(f"retry: {self.retry}")
-
-        # Обрабатываем данные
-        if isinstance(self.data, dict):
-            import json
-
-            data_str = json.dumps(self.data, ensure_ascii=False)
-        else:
-            data_str = str(self.data)
-
-        # Разбиваем данные на строки для SSE формата
-        for line in data_str.split("\n"):
-            lines.append(f"data: {line}")
-
-        lines.append("")  # Пустая строка в конце
-        return "\n".join(lines)
+        """Преобразование в формат SSE (событие завершается пустой строкой)."""
+        return format_sse_event(self.id, self.event, self.data, self.retry)
 
     class Config:
         json_encoders = {datetime: lambda v: v.isoformat()}
@@ -96,8 +74,8 @@ class WSConnectionInfo(BaseModel):
     connection_id: str = Field(..., description="ID соединения")
     user_id: str | None = Field(None, description="ID пользователя")
     status: SSEConnectionStatus = Field(default=SSEConnectionStatus.CONNECTING, description="Статус соединения")
-    connected_at: datetime = Field(default_factory=datetime.now(tz=utc), description="Время подключения")
-    last_activity: datetime = Field(default_factory=datetime.now(tz=utc), description="Последняя активность")
+    connected_at: datetime = Field(default_factory=lambda: datetime.now(tz=utc), description="Время подключения")
+    last_activity: datetime = Field(default_factory=lambda: datetime.now(tz=utc), description="Последняя активность")
     channels: list[str] = Field(default_factory=list, description="Подписанные каналы")
     metadata: dict[str, Any] = Field(default_factory=dict, description="Метаданные соединения")
     ip_address: str | None = Field(None, description="IP адрес клиента")
@@ -110,7 +88,7 @@ class WSSubscription(BaseModel):
     connection_id: str = Field(..., description="ID соединения")
     channel: str = Field(..., description="Название канала")
     filters: dict[str, Any] = Field(default_factory=dict, description="Фильтры сообщений")
-    created_at: datetime = Field(default_factory=datetime.now(tz=utc), description="Время создания подписки")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(tz=utc), description="Время создания подписки")
 
 
 class WSCommand(BaseModel):
@@ -162,8 +140,8 @@ class NotificationMessage(BaseModel):
 class HeartbeatMessage(BaseModel):
     """Сообщение heartbeat."""
 
-    timestamp: datetime = Field(default_factory=datetime.now(tz=utc), description="Время отправки")
-    server_time: str = Field(default_factory=lambda: datetime.now(tz=utc)().isoformat(), description="Время сервера")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(tz=utc), description="Время отправки")
+    server_time: str = Field(default_factory=lambda: datetime.now(tz=utc).isoformat(), description="Время сервера")
 
 
 class SystemMessage(BaseModel):
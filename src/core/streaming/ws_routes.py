@@ -1,18 +1,20 @@
 """WebSocket роутеры."""
 
-import json
 import logging
 import uuid
+from datetime import datetime
 from typing import Any
 
 from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
+from pytz import utc
 
 from core.config import get_settings
 from core.exceptions import CoreStreamingAPIException
 from core.exceptions.core_base import CoreStreamingValueError
 
 from .auth import WSAuthenticator, WSAuthError, get_ws_auth
+from .codecs import get_codec, negotiate_subprotocol, receive_payload
 from .connection_manager import connection_manager
 from .ws_models import (
     BroadcastMessage,
@@ -45,12 +47,16 @@ async def websocket_endpoint(
 
     connection_id = str(uuid.uuid4())
 
+    # Согласуем кодирование кадров (JSON или msgpack)
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols"))
+    codec = get_codec(subprotocol, settings.WEBSOCKET_COMPRESSION_THRESHOLD, settings.WEBSOCKET_COMPRESSION_LEVEL)
+
     try:
         # Аутентификация
         user_data = await auth.authenticate_websocket(token=token, api_key=api_key)
 
         # Подключение
-        connection_info = await connection_manager.connect_websocket(websocket, connection_id, user_data)
+        await connection_manager.connect_websocket(websocket, connection_id, user_data, subprotocol=subprotocol)
 
         # Подписка на каналы
         if channels:
@@ -66,7 +72,7 @@ async def websocket_endpoint(
                 "message": "Подключение установлено",
                 "connection_id": connection_id,
                 "authenticated": user_data["authenticated"],
-                "server_time": connection_info.connected_at.isoformat(),
+                "server_time": datetime.now(tz=utc).isoformat(),
             },
         )
         await connection_manager.send_to_websocket(connection_id, welcome_message)
@@ -74,7 +80,7 @@ async def websocket_endpoint(
         # Основной цикл обработки сообщений
         while True:
             try:
-                data = await websocket.receive_text()
+                data = await receive_payload(websocket, codec)
                 await handle_websocket_message(connection_id, data, user_data)
             except WebSocketDisconnect:
                 break
@@ -98,15 +104,11 @@ async def websocket_endpoint(
         await connection_manager.disconnect_websocket(connection_id)
 
 
-async def handle_websocket_message(connection_id: str, data: str, user_data: dict[str, Any]):
-    """Обработка сообщения от WebSocket клиента."""
+async def handle_websocket_message(connection_id: str, data: Any, user_data: dict[str, Any]):
+    """Обработка декодированного кадра от WebSocket клиента."""
     try:
-        # Парсим JSON
-        try:
-            message_data = json.loads(data)
-        except json.JSONDecodeError:
-            # Если не JSON, обрабатываем как текст
-            message_data = {"action": "message", "data": {"content": data}}
+        # Если не объект команды, обрабатываем как текст
+        message_data = data if isinstance(data, dict) else {"action": "message", "data": {"content": data}}
 
         # Создаем команду
         command = WSCommand(**message_data)
@@ -116,7 +118,7 @@ async def handle_websocket_message(connection_id: str, data: str, user_data: dic
 
         # Отправляем ответ если есть request_id
         if command.request_id and response:
-            response_message = WSMessage(id=str(uuid.uuid4()), type=MessageType.JSON, content=response.dict())
+            response_message = WSMessage(id=str(uuid.uuid4()), type=MessageType.JSON, content=response.model_dump())
             await connection_manager.send_to_websocket(connection_id, response_message)
 
     except Exception as e:
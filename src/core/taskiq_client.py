@@ -6,9 +6,13 @@ event handlers, and task result management.
 
 Features:
     - Redis-based task queue with async result backend
+    - Redis list or Redis stream (consumer group, at-least-once) broker
+    - Bulk task submission with kiq_many()
+    - Result expiry and result size limit
     - Automatic fallback to in-memory broker for development
     - Event handlers for worker and client lifecycle
     - Task result and status retrieval utilities
+    - Broker queue depth for metrics
     - Connection pool management
 
 Example:
@@ -46,28 +50,95 @@ Note:
     falls back to InMemoryBroker if Redis is not available.
 """
 
+import json
 import logging
+from collections.abc import Iterable, Mapping, Sequence
+from importlib.metadata import version
+from itertools import groupby
 from typing import Any
 
-from taskiq import InMemoryBroker, TaskiqEvents
-from taskiq_redis import ListQueueBroker, RedisAsyncResultBackend
+from redis.asyncio import Redis
+from taskiq import (
+    AsyncBroker,
+    AsyncTaskiqDecoratedTask,
+    AsyncTaskiqTask,
+    BrokerMessage,
+    InMemoryBroker,
+    TaskiqEvents,
+    TaskiqMessage,
+    TaskiqMiddleware,
+    TaskiqResult,
+)
+from taskiq.exceptions import SendTaskError
+from taskiq.kicker import AsyncKicker
+from taskiq.utils import maybe_awaitable
+from taskiq_redis import ListQueueBroker, RedisAsyncResultBackend, RedisStreamBroker
 
 from core.config import get_settings
-from core.exceptions import CoreTaskiqBrokerError, CoreTaskiqValidationError
+from core.exceptions import CoreTaskiqBrokerError, CoreTaskiqResultSizeError, CoreTaskiqValidationError
+from core.scheduler import PeriodicJobMetricsMiddleware
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-def create_broker() -> ListQueueBroker | InMemoryBroker:
+class ResultSizeLimitMiddleware(TaskiqMiddleware):
+    """Reject task results larger than a size limit.
+
+    Runs after task execution and before the result is stored. An oversized
+    return value is replaced with ``CoreTaskiqResultSizeError``, so a single
+    task cannot flood the result backend.
+
+    Args:
+        max_size (int): Maximum serialized result size in bytes (0 disables the check)
+    """
+
+    def __init__(self, max_size: int) -> None:
+        super().__init__()
+        self.max_size = max_size
+
+    def _result_size(self, value: Any) -> int:
+        serializer = getattr(self.broker.result_backend, "serializer", None)
+        if serializer is not None:
+            return len(serializer.dumpb(value))
+        return len(json.dumps(value, default=str).encode())
+
+    def post_execute(self, message: TaskiqMessage, result: TaskiqResult[Any]) -> None:
+        if not self.max_size or result.is_err or result.return_value is None:
+            return
+
+        try:
+            size = self._result_size(result.return_value)
+        except Exception as e:
+            logger.warning(f"Can't measure result size of task {message.task_name}: {e}")
+            return
+
+        if size > self.max_size:
+            logger.error(f"Result of task {message.task_name} ({message.task_id}) is too large: {size} bytes")
+            result.is_err = True
+            result.return_value = None
+            result.error = CoreTaskiqResultSizeError(task_name=message.task_name, size=size, limit=self.max_size)
+
+
+def create_broker() -> ListQueueBroker | RedisStreamBroker | InMemoryBroker:
     """Create and configure TaskIQ broker with Redis backend.
 
     Creates a Redis-based TaskIQ broker with result backend support.
-    Falls back to InMemoryBroker if Redis configuration is missing
-    or connection fails.
+    ``TASKIQ_BROKER_TYPE`` selects the queue implementation:
+
+    - ``"list"``: Redis list (``LPUSH``/``BRPOP``), a message is removed
+      from the queue as soon as a worker takes it (at-most-once)
+    - ``"stream"``: Redis stream with a consumer group, a message is
+      acknowledged after the task finishes and redelivered to another worker
+      if it stays unacknowledged longer than ``TASKIQ_STREAM_IDLE_TIMEOUT_MS``
+      (at-least-once, tasks should be idempotent)
+
+    Results expire after ``TASKIQ_RESULT_TTL`` seconds and are limited to
+    ``TASKIQ_RESULT_MAX_SIZE`` bytes. Falls back to InMemoryBroker if Redis
+    configuration is missing or connection fails.
 
     Returns:
-        ListQueueBroker | InMemoryBroker: Configured TaskIQ broker
+        ListQueueBroker | RedisStreamBroker | InMemoryBroker: Configured TaskIQ broker
 
     Example:
         Manual broker creation::
@@ -82,10 +153,10 @@ def create_broker() -> ListQueueBroker | InMemoryBroker:
         Checking broker type::
 
             broker = create_broker()
-            if isinstance(broker, ListQueueBroker):
-                print("Using Redis broker")
-            else:
+            if isinstance(broker, InMemoryBroker):
                 print("Using in-memory broker")
+            else:
+                print("Using Redis broker")
 
     Raises:
         ValueError: If TaskIQ URLs are not properly configured
@@ -94,29 +165,47 @@ def create_broker() -> ListQueueBroker | InMemoryBroker:
         Redis broker is preferred for production, while InMemoryBroker
         is suitable for development and testing.
     """
+    middlewares = (ResultSizeLimitMiddleware(settings.TASKIQ_RESULT_MAX_SIZE), PeriodicJobMetricsMiddleware())
+
     try:
         if not settings.TASKIQ_BROKER_URL or not settings.TASKIQ_RESULT_BACKEND_URL:
             raise CoreTaskiqValidationError(task_name="broker_creation", validation_error="TaskIQ URLs not configured")
 
         # Create Redis broker
-        broker = ListQueueBroker(
-            url=settings.TASKIQ_BROKER_URL,
-            max_connection_pool_size=settings.DB_POOL_SIZE,
-        )
+        broker: ListQueueBroker | RedisStreamBroker
+        if settings.TASKIQ_BROKER_TYPE == "stream":
+            broker = RedisStreamBroker(
+                url=settings.TASKIQ_BROKER_URL,
+                queue_name=settings.TASKIQ_QUEUE_NAME,
+                max_connection_pool_size=settings.TASKIQ_MAX_CONNECTIONS,
+                # Group reads the stream from the start: tasks sent before the
+                # first worker started are not skipped
+                consumer_id="0",
+                maxlen=settings.TASKIQ_STREAM_MAXLEN,
+                idle_timeout=settings.TASKIQ_STREAM_IDLE_TIMEOUT_MS,
+            )
+        else:
+            broker = ListQueueBroker(
+                url=settings.TASKIQ_BROKER_URL,
+                queue_name=settings.TASKIQ_QUEUE_NAME,
+                max_connection_pool_size=settings.TASKIQ_MAX_CONNECTIONS,
+            )
 
         # Add result backend
         result_backend: RedisAsyncResultBackend = RedisAsyncResultBackend(
             redis_url=settings.TASKIQ_RESULT_BACKEND_URL,
+            result_ex_time=settings.TASKIQ_RESULT_TTL or None,
+            max_connection_pool_size=settings.TASKIQ_MAX_CONNECTIONS,
         )
-        broker = broker.with_result_backend(result_backend)
+        broker = broker.with_result_backend(result_backend).with_middlewares(*middlewares)
 
-        logger.info(f"TaskIQ Redis broker initialized: {settings.TASKIQ_BROKER_URL}")
+        logger.info(f"TaskIQ Redis {settings.TASKIQ_BROKER_TYPE} broker initialized: {settings.TASKIQ_BROKER_URL}")
         return broker
 
     except Exception as e:
         logger.warning(f"Failed to initialize Redis broker: {e}. Using InMemoryBroker.")
         # Fallback to InMemoryBroker for development
-        return InMemoryBroker()
+        return InMemoryBroker().with_middlewares(*middlewares)
 
 
 # Create global broker instance
@@ -329,3 +418,143 @@ async def get_task_status(task_id: str) -> dict[str, Any]:
         return {"status": "pending", "message": "Task is still running"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+async def get_queue_depth(target: AsyncBroker | None = None) -> int | None:
+    """Get the number of tasks waiting in the broker queue.
+
+    For the stream broker this is the consumer group lag: entries that were
+    added to the stream but not yet delivered to any worker.
+
+    Args:
+        target (AsyncBroker | None): Broker, the global broker by default
+
+    Returns:
+        int | None: Queue depth, or None if the broker has no shared queue
+    """
+    target = broker if target is None else target
+    if isinstance(target, ListQueueBroker):
+        async with Redis(connection_pool=target.connection_pool) as redis_conn:
+            return await redis_conn.llen(target.queue_name)
+    if isinstance(target, RedisStreamBroker):
+        async with Redis(connection_pool=target.connection_pool) as redis_conn:
+            for group in await redis_conn.xinfo_groups(target.queue_name):
+                name = group.get("name")
+                if name in (target.consumer_group_name, target.consumer_group_name.encode()):
+                    return group.get("lag")
+    return None
+
+
+# kiq_many builds messages with the private AsyncKicker._prepare_message so that
+# they match kiq() exactly. It is only used on taskiq releases it was verified
+# against; on any other version kiq_many falls back to sequential kiq().
+_TASKIQ_VERSION = tuple(int(part) for part in version("taskiq").split(".")[:2] if part.isdigit())
+_PREPARE_MESSAGE_SUPPORTED = (0, 11) <= _TASKIQ_VERSION < (0, 14) and hasattr(AsyncKicker, "_prepare_message")
+
+
+def _prepare_message(kicker: AsyncKicker[Any, Any], call: Sequence[Any] | Mapping[str, Any]) -> TaskiqMessage:
+    """Build the message ``kicker.kiq(*call)`` would send, without sending it."""
+    if isinstance(call, Mapping):
+        return kicker._prepare_message(**call)
+    return kicker._prepare_message(*call)
+
+
+async def _kick_many(target: AsyncBroker, messages: list[BrokerMessage]) -> None:
+    """Send prepared messages to the broker in as few round trips as possible."""
+    if isinstance(target, ListQueueBroker):
+        async with Redis(connection_pool=target.connection_pool) as redis_conn:
+            # One LPUSH per queue: consumers BRPOP from the other end, order is kept
+            for queue_name, group in groupby(messages, key=lambda m: m.labels.get("queue_name") or target.queue_name):
+                await redis_conn.lpush(queue_name, *(message.message for message in group))
+    elif isinstance(target, RedisStreamBroker):
+        async with Redis(connection_pool=target.connection_pool) as redis_conn:
+            pipeline = redis_conn.pipeline(transaction=False)
+            for message in messages:
+                pipeline.xadd(
+                    message.labels.get("queue_name") or target.queue_name,
+                    {b"data": message.message},
+                    maxlen=target.maxlen,
+                    approximate=target.approximate,
+                )
+            await pipeline.execute()
+    else:
+        for message in messages:
+            await target.kick(message)
+
+
+async def kiq_many(
+    task: AsyncTaskiqDecoratedTask[Any, Any] | AsyncKicker[Any, Any],
+    calls: Iterable[Sequence[Any] | Mapping[str, Any]],
+    chunk_size: int | None = None,
+) -> list[AsyncTaskiqTask[Any]]:
+    """Send many calls of one task to the broker in bulk.
+
+    Instead of one Redis round trip per ``kiq()``, messages are sent in
+    chunks: a single ``LPUSH`` with many values for the list broker and a
+    pipelined batch of ``XADD`` for the stream broker. Other brokers fall
+    back to sequential ``kick``. Middlewares ``pre_send``/``post_send`` hooks
+    run for every message, the same as with ``kiq()``. On taskiq versions
+    outside the verified range every call is sent with plain ``kiq()``.
+
+    Args:
+        task: Decorated task or kicker (``task.kicker().with_labels(...)``)
+        calls: Task arguments, a sequence for positional or a mapping for keyword arguments
+        chunk_size (int | None): Messages per round trip (``TASKIQ_KIQ_MANY_CHUNK_SIZE`` by default)
+
+    Returns:
+        list[AsyncTaskiqTask[Any]]: Task handles in the order of ``calls``
+
+    Raises:
+        SendTaskError: If the broker rejected a chunk. Chunks sent before the
+            failing one stay in the queue.
+
+    Example:
+        Queue a batch of tasks::
+
+            from core.taskiq_client import kiq_many
+            from core.tasks import example_task
+
+            tasks = await kiq_many(example_task, [(i, i) for i in range(1000)])
+            results = [await task.wait_result() for task in tasks[:10]]
+    """
+    kicker = task.kicker() if isinstance(task, AsyncTaskiqDecoratedTask) else task
+    if not _PREPARE_MESSAGE_SUPPORTED:
+        return [await (kicker.kiq(**call) if isinstance(call, Mapping) else kicker.kiq(*call)) for call in calls]
+
+    target = kicker.broker
+    chunk_size = chunk_size or settings.TASKIQ_KIQ_MANY_CHUNK_SIZE
+    pre_send = [m for m in target.middlewares if m.__class__.pre_send != TaskiqMiddleware.pre_send]
+    post_send = [m for m in reversed(target.middlewares) if m.__class__.post_send != TaskiqMiddleware.post_send]
+
+    tasks: list[AsyncTaskiqTask[Any]] = []
+    chunk: list[TaskiqMessage] = []
+
+    async def send_chunk() -> None:
+        try:
+            await _kick_many(target, [target.formatter.dumps(message) for message in chunk])
+        except Exception as exc:
+            raise SendTaskError from exc
+
+        for message in chunk:
+            for middleware in post_send:
+                await maybe_awaitable(middleware.post_send(message))
+            tasks.append(
+                AsyncTaskiqTask(
+                    task_id=message.task_id, result_backend=target.result_backend, return_type=kicker.return_type
+                )
+            )
+        chunk.clear()
+
+    for call in calls:
+        message = _prepare_message(kicker, call)
+        for middleware in pre_send:
+            message = await maybe_awaitable(middleware.pre_send(message))
+        chunk.append(message)
+        if len(chunk) >= chunk_size:
+            await send_chunk()
+
+    if chunk:
+        await send_chunk()
+
+    logger.debug(f"Sent {len(tasks)} {kicker.task_name} tasks in bulk")
+    return tasks
@@ -6,6 +6,13 @@ by worker processes.
 
 Available tasks:
     - example_task: Simple arithmetic task for demonstration
+    - cleanup_expired_tokens: Periodic removal of expired refresh and orbital tokens
+    - cleanup_expired_sessions: Periodic removal of expired user sessions
+    - cleanup_incomplete_profiles: Periodic removal of profiles without a user
+    - cleanup_old_backups: Periodic removal of old migration backups
+
+Periodic tasks are declared with ``core.scheduler.periodic`` and sent to
+the broker by the scheduler process (``python -m cli scheduler``).
 
 Example:
     Calling a task directly::
@@ -53,6 +60,8 @@ from datetime import datetime
 import httpx
 
 from core.config import get_settings
+from core.database import AsyncSessionLocal
+from core.scheduler import periodic
 from core.taskiq_client import broker
 
 logger = logging.getLogger(__name__)
@@ -119,3 +128,69 @@ async def example_task(a: int, b: int) -> dict[str, int | str]:
     result = a + b
 
     return {"a": a, "b": b, "result": result, "operation": "addition", "calculated_at": datetime.now().isoformat()}
+
+
+@periodic(cron="*/15 * * * *", jitter=60)
+async def cleanup_expired_tokens() -> dict[str, int]:
+    """Remove expired refresh and orbital tokens.
+
+    Returns:
+        dict[str, int]: Number of removed tokens by type
+    """
+    from apps.auth.repo.orbital_token_repo import OrbitalTokenRepository
+    from apps.auth.repo.refresh_token_repo import RefreshTokenRepository
+
+    async with AsyncSessionLocal() as session:
+        refresh_tokens = await RefreshTokenRepository(session).cleanup_expired_tokens()
+        orbital_tokens = await OrbitalTokenRepository(session).cleanup_expired_tokens()
+
+    logger.info(f"Cleaned up {refresh_tokens} refresh and {orbital_tokens} orbital tokens")
+    return {"refresh_tokens": refresh_tokens, "orbital_tokens": orbital_tokens}
+
+
+@periodic(cron="*/10 * * * *", jitter=60)
+async def cleanup_expired_sessions() -> int:
+    """Remove expired user sessions.
+
+    Returns:
+        int: Number of removed sessions
+    """
+    from apps.auth.repo.user_session_repo import UserSessionRepository
+
+    async with AsyncSessionLocal() as session:
+        count = await UserSessionRepository(session).cleanup_expired_sessions()
+
+    logger.info(f"Cleaned up {count} expired sessions")
+    return count
+
+
+@periodic(cron="30 3 * * *", jitter=300)
+async def cleanup_incomplete_profiles() -> int:
+    """Remove user profiles without a related user.
+
+    Returns:
+        int: Number of removed profiles
+    """
+    from apps.users.repo.profile_repo import ProfileRepository
+
+    async with AsyncSessionLocal() as session:
+        count = await ProfileRepository(session).cleanup_incomplete_profiles()
+
+    logger.info(f"Cleaned up {count} incomplete profiles")
+    return count
+
+
+@periodic(cron="0 4 * * *", jitter=300)
+async def cleanup_old_backups(keep_count: int = 10) -> int:
+    """Remove old migration backups, keeping the latest ``keep_count``.
+
+    Args:
+        keep_count (int): Number of backups to keep
+
+    Returns:
+        int: Number of removed backups
+    """
+    from tools.migrations.backup import MigrationBackup
+
+    # File operations are blocking, run them outside the event loop
+    return await asyncio.to_thread(MigrationBackup().cleanup_old_backups, keep_count)
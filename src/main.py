@@ -7,7 +7,12 @@ from typing import Any
 
 from fastapi import FastAPI
 
+from core.base.repo import get_event_queue
 from core.config import get_settings
+from core.database import replica_router
+from core.exceptions import close_notification_manager
+from core.metrics import get_multiprocess_metrics, metrics_router
+from core.query_profiler import QueryProfilerMiddleware
 from core.taskiq_client import broker
 from core.telemetry import instrument_fastapi_app, setup_telemetry
 
@@ -75,6 +80,15 @@ async def lifespan(app: FastAPI):
     # Startup
     await broker.startup()
 
+    # Share metrics with other uvicorn workers
+    multiprocess_metrics = get_multiprocess_metrics() if settings.METRICS_ENABLED else None
+    if multiprocess_metrics is not None:
+        multiprocess_metrics.start()
+
+    # Track read replica lag so lagging replicas fall back to the primary
+    if replica_router is not None:
+        replica_router.start()
+
     # Initialize Telegram bots
     if TELEGRAM_AVAILABLE and settings.TELEGRAM_BOTS_ENABLED:
         try:
@@ -105,6 +119,19 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             print(f"Error stopping Telegram bots: {e}")
 
+    # Send pending error notifications
+    await close_notification_manager()
+
+    # Emit repository events still waiting in the queue and stop its worker
+    await get_event_queue().close()
+
+    # Keep counters of this worker after it exits
+    if multiprocess_metrics is not None:
+        await multiprocess_metrics.stop()
+
+    if replica_router is not None:
+        await replica_router.stop()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -113,6 +140,10 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# SQL statements per request, N+1 detection
+if settings.QUERY_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+
 # Instrument FastAPI for OpenTelemetry
 instrument_fastapi_app(app)
 
@@ -121,6 +152,10 @@ from apps.api_router import api_router
 
 app.include_router(api_router)
 
+# Prometheus metrics endpoint
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
+
 # Connect Realtime routers (WebSocket, SSE, WebRTC)
 if REALTIME_AVAILABLE:
     if settings.WEBSOCKET_ENABLED:
@@ -172,6 +207,9 @@ async def root() -> dict[str, Any]:
         "endpoints": {"tasks": "/tasks", "docs": "/docs", "redoc": "/redoc"},
     }
 
+    if settings.METRICS_ENABLED:
+        response["endpoints"]["metrics"] = settings.METRICS_PATH
+
     # Add Realtime endpoints
     if REALTIME_AVAILABLE:
         if settings.WEBSOCKET_ENABLED:
@@ -1,7 +1,6 @@
 """WebSocket клиент для подключения к серверу."""
 
 import asyncio
-import json
 import logging
 import uuid
 from collections.abc import Callable
@@ -10,10 +9,19 @@ from enum import Enum
 from typing import Any
 
 import websockets
+from pytz import utc
 from websockets.exceptions import ConnectionClosed
 
 from core.exceptions import CoreToolsConnectionError
 from core.realtime.models import ConnectionStatus, MessageType, WSCommand, WSMessage, WSResponse
+from core.streaming.codecs import (
+    DEFAULT_COMPRESSION_THRESHOLD,
+    JSON_CODEC,
+    SUBPROTOCOL_JSON,
+    WSCodec,
+    decode_frame,
+    get_codec,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +49,8 @@ class WSClient:
         max_reconnect_attempts: int = 10,
         ping_interval: int = 30,
         ping_timeout: int = 10,
+        encoding: str = SUBPROTOCOL_JSON,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
     ):
         """
         Инициализация WebSocket клиента.
@@ -56,6 +66,8 @@ class WSClient:
             max_reconnect_attempts: Максимальное количество попыток переподключения
             ping_interval: Интервал ping сообщений (сек)
             ping_timeout: Таймаут ping сообщений (сек)
+            encoding: Предпочитаемый подпротокол кодирования (``json`` или ``msgpack``)
+            compression_threshold: Размер msgpack кадра, начиная с которого он сжимается
         """
         self.uri = uri
         self.token = token
@@ -67,6 +79,8 @@ class WSClient:
         self.max_reconnect_attempts = max_reconnect_attempts
         self.ping_interval = ping_interval
         self.ping_timeout = ping_timeout
+        self.encoding = encoding
+        self.compression_threshold = compression_threshold
 
         # Состояние соединения
         self.websocket: websockets.WebSocketClientProtocol | None = None
@@ -75,6 +89,7 @@ class WSClient:
         self.last_ping: datetime | None = None
         self.reconnect_attempts = 0
         self.is_closing = False
+        self.codec: WSCodec = JSON_CODEC
 
         # Подписки и обработчики
         self.subscribed_channels: set[str] = set()
@@ -116,9 +131,16 @@ class WSClient:
             uri = self._build_uri()
             logger.info(f"Connecting to WebSocket: {uri}")
 
+            binary = self.encoding != SUBPROTOCOL_JSON
             self.websocket = await websockets.connect(
-                uri, ping_interval=self.ping_interval, ping_timeout=self.ping_timeout
+                uri,
+                ping_interval=self.ping_interval,
+                ping_timeout=self.ping_timeout,
+                subprotocols=[self.encoding, SUBPROTOCOL_JSON] if binary else [SUBPROTOCOL_JSON],
+                # msgpack кадры сжимаются кодеком, JSON - расширением permessage-deflate
+                compression=None if binary else "deflate",
             )
+            self.codec = get_codec(self.websocket.subprotocol, self.compression_threshold)
 
             self.status = ConnectionStatus.CONNECTED
             self.reconnect_attempts = 0
@@ -179,7 +201,7 @@ class WSClient:
 
         try:
             if self.websocket is not None:
-                await self.websocket.send(json.dumps(message.dict()))
+                await self._send(message.model_dump(mode=self.codec.dump_mode))
                 return message.id
             else:
                 raise CoreToolsConnectionError("ws_client", "WebSocket соединение не установлено")
@@ -187,13 +209,26 @@ class WSClient:
             logger.error(f"Error sending message: {e}")
             raise
 
-    async def send_command(self, action: str, data: dict[str, Any] | None = None, timeout: int = 10) -> WSResponse:
+    async def send_binary(self, data: bytes, content: Any = None, timeout: int = 10) -> WSResponse:
+        """Отправка бинарного вложения.
+
+        С подпротоколом msgpack байты передаются как есть, в JSON - base64.
+        """
+        return await self.send_command("message", {"content": content or ""}, timeout=timeout, binary_data=data)
+
+    async def send_command(
+        self,
+        action: str,
+        data: dict[str, Any] | None = None,
+        timeout: int = 10,
+        binary_data: bytes | None = None,
+    ) -> WSResponse:
         """Отправка команды с ожиданием ответа."""
         if not self.is_connected():
             raise CoreToolsConnectionError("ws_client", "WebSocket не подключен")
 
         request_id = str(uuid.uuid4())
-        command = WSCommand(action=action, data=data or {})
+        command = WSCommand(action=action, data=data or {}, request_id=request_id, binary_data=binary_data)
 
         # Создаем Future для ответа
         response_future: asyncio.Future[dict[str, Any]] = asyncio.Future()
@@ -202,7 +237,7 @@ class WSClient:
         try:
             # Отправляем команду
             if self.websocket is not None:
-                await self.websocket.send(json.dumps(command.dict()))
+                await self._send(command.model_dump(mode=self.codec.dump_mode, exclude_none=True))
             else:
                 raise CoreToolsConnectionError("ws_client", "WebSocket соединение не установлено")
 
@@ -222,7 +257,7 @@ class WSClient:
         """Отправка ping команды."""
         try:
             response = await self.send_command("ping", timeout=5)
-            self.last_ping = datetime.now(tz=utc)()
+            self.last_ping = datetime.now(tz=utc)
             return response.success
         except Exception as e:
             logger.error(f"Ping failed: {e}")
@@ -300,6 +335,7 @@ class WSClient:
         return {
             "status": self.status.value,
             "connection_id": self.connection_id,
+            "subprotocol": self.codec.subprotocol,
             "reconnect_attempts": self.reconnect_attempts,
             "subscribed_channels": list(self.subscribed_channels),
             "last_ping": self.last_ping.isoformat() if self.last_ping else None,
@@ -311,10 +347,11 @@ class WSClient:
         try:
             async for message in self.websocket:
                 try:
-                    data = json.loads(message)
+                    data = decode_frame(self.codec, message)
+                    if not isinstance(data, dict):
+                        logger.error(f"Invalid frame received: {message!r}")
+                        continue
                     await self._handle_message(data)
-                except json.JSONDecodeError:
-                    logger.error(f"Invalid JSON received: {message}")
                 except Exception as e:
                     logger.error(f"Error handling message: {e}")
 
@@ -335,18 +372,18 @@ class WSClient:
     async def _handle_message(self, data: dict[str, Any]):
         """Обработка полученного сообщения."""
         try:
+            content = data.get("data") or data.get("content")
+
             # Проверяем, является ли сообщение ответом на команду
-            if "request_id" in data.get("content", {}):
-                request_id = data["content"]["request_id"]
+            if isinstance(content, dict):
+                request_id = content.get("request_id")
                 if request_id in self.command_responses:
                     future = self.command_responses[request_id]
                     if not future.done():
-                        future.set_result(data["content"])
+                        future.set_result(content)
                     return
 
-            # Извлекаем информацию о соединении из системных сообщений
-            if data.get("type") == "system":
-                content = data.get("content", {})
+                # Извлекаем информацию о соединении из приветственного сообщения
                 if "connection_id" in content:
                     self.connection_id = content["connection_id"]
 
@@ -357,6 +394,10 @@ class WSClient:
         except Exception as e:
             logger.error(f"Error processing message: {e}")
 
+    async def _send(self, payload: dict[str, Any]) -> None:
+        """Закодировать и отправить кадр согласованным кодеком."""
+        await self.websocket.send(self.codec.encode(payload))
+
     async def _call_handlers(self, message_type: str, data: dict[str, Any]):
         """Вызов обработчиков сообщений."""
         handlers = self.message_handlers.get(message_type, [])
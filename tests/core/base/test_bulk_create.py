@@ -0,0 +1,107 @@
+"""
+Тесты массового создания через INSERT ... RETURNING.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import Integer, String, event, func, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base.repo import EnterpriseRepository
+from core.exceptions import CoreRepositoryValueError
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class ImportRow(_Base):
+    __tablename__ = "import_rows"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="new")
+
+
+class Counter(_Base):
+    __tablename__ = "counters"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+
+
+def _slugify(context):
+    return context.get_current_parameters()["name"].lower()
+
+
+class Tag(_Base):
+    __tablename__ = "tags"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    slug: Mapped[str] = mapped_column(String(50), nullable=False, default=_slugify)
+
+
+@pytest.fixture
+def statements(engine):
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement.split()[0].upper())
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def test_bulk_create_returns_objects_without_refresh(session_factory, statements):
+    async with session_factory() as session:
+        repo = EnterpriseRepository(ImportRow, session)
+        created = await repo.bulk_create([{"name": f"row-{i}"} for i in range(250)], batch_size=100)
+
+    assert [row.name for row in created] == [f"row-{i}" for i in range(250)]
+    assert all(isinstance(row.id, uuid.UUID) and row.status == "new" for row in created)
+    # Ни одного SELECT на объект: один INSERT ... RETURNING на батч из 100 строк
+    assert statements == ["INSERT"] * 3
+
+
+async def test_bulk_create_without_objects_returns_count(session_factory, statements):
+    async with session_factory() as session:
+        repo = EnterpriseRepository(ImportRow, session)
+        count = await repo.bulk_create(
+            [{"name": f"row-{i}", "status": "imported"} for i in range(120)], batch_size=50, return_objects=False
+        )
+        # COPY доступен только на PostgreSQL, на SQLite используется INSERT
+        copied = await repo.bulk_create([{"name": "copied"}], return_objects=False, use_copy=True)
+
+        total = await session.scalar(select(func.count()).select_from(ImportRow))
+
+    assert count == 120
+    assert copied == 1
+    # Три executemany по 50 строк и один INSERT вместо COPY
+    assert statements.count("INSERT") == 4
+    assert total == 121
+    assert await repo.bulk_create([], return_objects=False) == 0
+
+
+async def test_failed_batch_is_rolled_back(session_factory):
+    async with session_factory() as session:
+        repo = EnterpriseRepository(ImportRow, session)
+        with pytest.raises(CoreRepositoryValueError) as exc_info:
+            await repo.bulk_create([{"name": "same"}, {"name": "same"}])
+        assert exc_info.value.operation == "bulk_create"
+
+        assert await session.scalar(select(func.count()).select_from(ImportRow)) == 0
+
+
+async def test_copy_batch_defers_to_insert_when_database_fills_values(session_factory):
+    async with session_factory() as session:
+        rows = [{"name": "A"}, {"name": "B"}]
+
+        # ID генерирует база: без RETURNING их не узнать
+        counters = EnterpriseRepository(Counter, session)
+        assert await counters._copy_batch(rows, with_ids=True) is None
+        # Default с контекстом выполнения COPY не вычислит
+        tags = EnterpriseRepository(Tag, session)
+        assert await tags._copy_batch(rows, with_ids=False) is None
@@ -0,0 +1,150 @@
+"""
+Тесты массовых событий и асинхронной очереди эмиссии.
+"""
+
+import logging
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import MetaData, String, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base.repo import EventDrivenRepository
+from core.base.repo.emitter import EventEmissionQueue, get_event_queue
+from core.base.repo.events import BulkEvent, CreateEvent
+from core.base.repo.outbox import OutboxEvent
+from core.exceptions import CoreRepositoryValueError
+
+logger = logging.getLogger("test_session")
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class BulkItem(_Base):
+    __tablename__ = "bulk_items"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    note: Mapped[str | None] = mapped_column(String(200), nullable=True)
+
+
+class ItemRepository(EventDrivenRepository):
+    _bulk_event_chunk_size = 100
+
+
+class OutboxItemRepository(ItemRepository):
+    _event_outbox = True
+    _bulk_event_fields = ("name",)
+
+
+@pytest.fixture
+def metadata():
+    # Таблица outbox объявлена на metadata приложения - создаем ее вместе с моделями модуля
+    metadata = MetaData()
+    for table in (*_Base.metadata.tables.values(), OutboxEvent.__table__):
+        table.to_metadata(metadata)
+    return metadata
+
+
+def test_bulk_event_chunks_and_compact_payload():
+    rows = [{"id": uuid.uuid4(), "name": f"n{i}", "note": "x", "created_at": None} for i in range(250)]
+
+    events = BulkEvent.from_objects(rows, entity_type="BulkItem", chunk_size=100)
+    assert [len(event.entity_ids) for event in events] == [100, 100, 50]
+    assert [(event.chunk_index, event.chunk_count) for event in events][-1] == (2, 3)
+    assert "created_at" not in events[0].items[0]
+
+    compact = BulkEvent.from_objects(rows[:1], entity_type="BulkItem", fields=("name",))[0]
+    assert compact.items == [{"id": rows[0]["id"], "name": "n0"}]
+    assert compact.get_entity_id() == str(rows[0]["id"])
+    assert compact.model_dump(mode="json")["items"][0]["id"] == str(rows[0]["id"])
+
+
+async def test_emission_queue_emits_in_background():
+    queue = EventEmissionQueue()
+    event = CreateEvent(entity_data={"id": "1"})
+
+    with patch.object(CreateEvent, "emit") as emit:
+        queue.submit(event)
+        assert emit.call_count == 0
+        await queue.flush()
+        assert emit.call_count == 1
+
+    await queue.close()
+    assert queue.emitted == 1
+
+
+async def test_emission_queue_overflow_emits_inline():
+    queue = EventEmissionQueue(maxsize=1)
+    with patch.object(CreateEvent, "emit") as emit:
+        queue.submit(CreateEvent(entity_data={"id": "1"}))
+        queue.submit(CreateEvent(entity_data={"id": "2"}))
+        assert emit.call_count == 1
+        await queue.close()
+    assert queue.inline == 1
+
+
+async def test_bulk_create_queues_one_event_per_chunk(session_factory):
+    async with session_factory() as session:
+        repo = ItemRepository(BulkItem, session)
+        with patch("core.base.repo.events.tracer.start_as_current_span") as span:
+            created = await repo.bulk_create_with_events([{"name": f"item-{i}"} for i in range(250)])
+            await get_event_queue().flush()
+
+    assert len(created) == 250
+    assert span.call_count == 3
+    span.assert_called_with("event.entity.bulk_created")
+
+
+async def test_bulk_create_with_outbox_stages_chunks(session_factory):
+    async with session_factory() as session:
+        repo = OutboxItemRepository(BulkItem, session)
+        created = await repo.bulk_create_with_events([{"name": f"item-{i}"} for i in range(150)])
+
+        rows = list((await session.execute(select(OutboxEvent).order_by(OutboxEvent.seq))).scalars())
+
+    assert [row.event_type for row in rows] == ["entity.bulk_created", "entity.bulk_created"]
+    assert [len(row.payload["entity_ids"]) for row in rows] == [100, 50]
+    assert rows[0].payload["entity_ids"][0] == str(created[0].id)
+    assert set(rows[0].payload["items"][0]) == {"id", "name"}
+
+
+async def test_bulk_create_fallback_error_keeps_cause(session_factory):
+    async with session_factory() as session:
+        repo = ItemRepository(BulkItem, session)
+        with pytest.raises(CoreRepositoryValueError) as exc_info:
+            await repo.bulk_create_with_events([{"name": None}, {"name": "ok"}])
+
+    assert exc_info.value.context["field"] == "data_list"
+    assert "NOT NULL" in str(exc_info.value.__cause__)
+
+
+@pytest.mark.performance
+def test_bulk_event_emission_cost():
+    """Бенчмарк: события на строку против событий на чанк для импорта 10k строк."""
+    rows = [{"id": uuid.uuid4(), "name": f"item-{i}", "note": "x" * 50} for i in range(10_000)]
+
+    with patch("core.base.repo.events.tracer.start_as_current_span") as span:
+        start = time.perf_counter()
+        for row in rows:
+            CreateEvent(entity_data=row, metadata={"bulk_operation": True}).emit()
+        per_row = time.perf_counter() - start
+        per_row_spans = span.call_count
+
+    with patch("core.base.repo.events.tracer.start_as_current_span") as span:
+        start = time.perf_counter()
+        for event in BulkEvent.from_objects(rows, entity_type="BulkItem", chunk_size=500):
+            event.emit()
+        per_chunk = time.perf_counter() - start
+        per_chunk_spans = span.call_count
+
+    logger.info(
+        f"📊 Массовые события: по строке {per_row * 1000:.1f} мс ({per_row_spans} spans), "
+        f"по чанку {per_chunk * 1000:.1f} мс ({per_chunk_spans} spans)"
+    )
+    assert per_chunk_spans == 20
+    assert per_chunk < per_row
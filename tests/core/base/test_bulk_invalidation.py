@@ -0,0 +1,176 @@
+"""
+Тесты массовых изменений с RETURNING id: точечная инвалидация кэша и одно событие на операцию.
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Boolean, DateTime, Integer, String, func
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base.repo import CacheManager, EnterpriseRepository, cache_result, entity_cache_key
+from core.base.repo.mixins import enterprise
+from core.exceptions import CoreRepositoryQueryError, CoreRepositoryValueError
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Account(_Base):
+    __tablename__ = "accounts"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    karma: Mapped[int] = mapped_column(Integer, default=0)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class AccountRepository(EnterpriseRepository[Account, dict, dict]):
+    @cache_result(ttl=300, scope="entity")
+    async def get_snapshot(self, id: uuid.UUID, include_deleted: bool = False) -> dict | None:
+        account = await self.get(id, include_deleted)
+        return None if account is None else {"username": account.username, "karma": account.karma}
+
+    @cache_result(ttl=300, scope="entity")
+    async def get_username(self, id: uuid.UUID) -> str | None:
+        account = await self.get(id)
+        return None if account is None else account.username
+
+    @cache_result(ttl=300)
+    async def count_active(self) -> int:
+        return await self.count(is_active=True)
+
+
+class _Queue:
+    def __init__(self):
+        self.events = []
+
+    def submit(self, event):
+        self.events.append(event)
+
+
+@pytest_asyncio.fixture
+async def repository(engine, session_factory):
+    async with engine.begin() as conn:
+        await conn.execute(
+            Account.__table__.insert(),
+            [{"id": uuid.uuid4(), "username": f"account{i}", "karma": i, "is_active": True} for i in range(10)],
+        )
+
+    async with session_factory() as session:
+        cache_manager = CacheManager(use_redis=False, key_prefix=f"test-{uuid.uuid4().hex}:")
+        yield AccountRepository(Account, session, cache_manager)
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = _Queue()
+    monkeypatch.setattr(enterprise, "get_event_queue", lambda: queue)
+    return queue
+
+
+async def test_soft_delete_invalidates_only_affected_entities(repository, queue):
+    accounts = await repository.list(limit=10, order_by="karma")
+    for account in accounts:
+        await repository.get_snapshot(account.id)
+    assert await repository.count_active() == 10
+
+    deleted_ids = await repository.bulk_delete({"karma__lt": 3}, return_ids=True)
+
+    assert sorted(deleted_ids) == sorted(account.id for account in accounts if account.karma < 3)
+    # Удалены только токены версий затронутых сущностей
+    manager = repository._cache_manager
+    for account in accounts:
+        token = await manager.get(entity_cache_key("Account", account.id))
+        assert (token is None) == (account.id in deleted_ids)
+
+    # Поколение запросов сменилось - count пересчитывается
+    assert await repository.count_active() == 7
+
+    [event] = queue.events
+    assert event.event_type == "entity.bulk_deleted"
+    assert sorted(event.entity_ids) == sorted(str(id) for id in deleted_ids)
+    assert event.metadata["soft_delete"] is True
+
+    # Повторный soft delete не затрагивает уже удаленные строки и не публикует событие
+    assert await repository.bulk_delete({"karma__lt": 3}) == 0
+    assert len(queue.events) == 1
+
+
+async def test_entity_results_are_keyed_by_method_and_arguments(repository):
+    [account] = await repository.list(karma=0)
+    await repository.bulk_delete({"karma": 0})
+
+    assert await repository.get_snapshot(account.id, include_deleted=True) == {"username": "account0", "karma": 0}
+    assert await repository.get_snapshot(account.id) is None
+    assert await repository.get_username(account.id) is None
+
+    await repository.bulk_restore({"karma": 0})
+    assert await repository.get_snapshot(account.id) == {"username": "account0", "karma": 0}
+    assert await repository.get_username(account.id) == "account0"
+
+
+async def test_unit_of_work_defers_invalidation_and_events_until_commit(repository, queue):
+    [account] = await repository.list(karma=0)
+    account_id = account.id
+    await repository.get_snapshot(account_id)
+    token_key = entity_cache_key("Account", account_id)
+    token = await repository._cache_manager.get(token_key)
+
+    with pytest.raises(RuntimeError):
+        async with repository.unit_of_work():
+            await repository.bulk_update({"karma": 0}, {"username": "renamed"})
+            raise RuntimeError("service step failed")
+
+    # Откат: кэш не тронут, событие не отправлено
+    assert await repository._cache_manager.get(token_key) == token
+    assert queue.events == []
+
+    async with repository.unit_of_work():
+        await repository.bulk_update({"karma": 0}, {"username": "renamed"})
+        # До коммита другие сессии видят старые данные - кэш и события ждут коммита
+        assert await repository._cache_manager.get(token_key) == token
+        assert queue.events == []
+
+    assert await repository._cache_manager.get(token_key) is None
+    assert [event.event_type for event in queue.events] == ["entity.bulk_updated"]
+    assert await repository.get_snapshot(account_id) == {"username": "renamed", "karma": 0}
+
+
+async def test_restore_and_update_return_ids(repository, queue):
+    deleted_ids = await repository.bulk_delete({"karma__gte": 8}, return_ids=True)
+
+    restored_ids = await repository.bulk_restore({"karma": 9}, return_ids=True)
+    assert len(restored_ids) == 1 and restored_ids[0] in deleted_ids
+    assert await repository.count() == 9
+
+    assert await repository.bulk_update({"karma__lt": 2}, {"is_active": False}, emit_events=False) == 2
+    assert await repository.count(is_active=False) == 2
+
+    assert [event.event_type for event in queue.events] == ["entity.bulk_deleted", "entity.bulk_restored"]
+    assert queue.events[1].entity_ids == [str(restored_ids[0])]
+
+
+async def test_return_ids_requires_returning_support(repository, monkeypatch):
+    monkeypatch.setattr(repository._db.bind.dialect, "update_returning", False)
+
+    with pytest.raises(CoreRepositoryQueryError):
+        await repository.bulk_delete({"karma": 1}, return_ids=True)
+
+    # Без RETURNING - количество строк и прежний сброс кэша
+    assert await repository.bulk_delete({"karma": 1}) == 1
+
+
+async def test_failed_bulk_write_reports_operation_and_filters(repository, queue):
+    with pytest.raises(CoreRepositoryValueError) as exc_info:
+        await repository.bulk_update({"karma__lt": 3}, {"no_such_column": 1})
+
+    assert exc_info.value.operation == "bulk_update"
+    assert exc_info.value.context == {"field": "filters", "value": "{'karma__lt': 3}"}
+    assert await repository.count() == 10
+    assert queue.events == []
@@ -0,0 +1,104 @@
+"""
+Тесты массового upsert через INSERT ... ON CONFLICT.
+"""
+
+import pytest
+from sqlalchemy import Boolean, Integer, String, event, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base.repo import EnterpriseRepository
+from core.exceptions import CoreRepositoryQueryError
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Profile(_Base):
+    __tablename__ = "profiles"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    external_id: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    resynced: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, onupdate=True)
+
+
+async def load(session) -> dict[str, Profile]:
+    session.expunge_all()
+    return {profile.external_id: profile for profile in await session.scalars(select(Profile))}
+
+
+async def test_bulk_upsert_counts_inserts_and_updates(session_factory):
+    async with session_factory() as session:
+        repo = EnterpriseRepository(Profile, session)
+        first = await repo.bulk_upsert(
+            [{"external_id": "a", "name": "Alice"}, {"external_id": "b", "name": "Bob"}],
+            conflict_columns=["external_id"],
+        )
+        second = await repo.bulk_upsert(
+            [
+                {"external_id": "b", "name": "Bobby"},
+                {"external_id": "c", "name": "Carol"},
+                # Повтор ключа во входных данных: остается последняя строка
+                {"external_id": "c", "name": "Caroline"},
+            ],
+            conflict_columns=["external_id"],
+        )
+        profiles = await load(session)
+
+    assert first == {"inserted": 2, "updated": 0}
+    assert second == {"inserted": 1, "updated": 1}
+    assert {key: profile.name for key, profile in profiles.items()} == {"a": "Alice", "b": "Bobby", "c": "Caroline"}
+    # onupdate колонки применяется и в ON CONFLICT DO UPDATE
+    assert [profiles[key].resynced for key in "abc"] == [False, True, False]
+
+
+async def test_bulk_upsert_where_and_do_nothing(session_factory):
+    async with session_factory() as session:
+        repo = EnterpriseRepository(Profile, session)
+        await repo.bulk_upsert(
+            [{"external_id": "a", "name": "v2", "version": 2}, {"external_id": "b", "name": "v2", "version": 2}],
+            conflict_columns=["external_id"],
+        )
+        stats = await repo.bulk_upsert(
+            [{"external_id": "a", "name": "v1", "version": 1}, {"external_id": "b", "name": "v3", "version": 3}],
+            conflict_columns=["external_id"],
+            update_columns=["name", "version"],
+            where=lambda excluded: Profile.version < excluded.version,
+        )
+        ignored = await repo.bulk_upsert(
+            [{"external_id": "b", "name": "ignored"}, {"external_id": "d", "name": "Dave"}],
+            conflict_columns=["external_id"],
+            update_columns=[],
+        )
+        with pytest.raises(CoreRepositoryQueryError):
+            await repo.bulk_upsert([{"name": "no key"}], conflict_columns=["external_id"])
+
+        profiles = await load(session)
+
+    assert stats == {"inserted": 0, "updated": 1}
+    assert ignored == {"inserted": 1, "updated": 0}
+    assert (profiles["a"].name, profiles["b"].name, profiles["d"].name) == ("v2", "v3", "Dave")
+
+
+async def test_bulk_upsert_batches_by_bind_parameter_limit(engine, session_factory):
+    inserts: list[int] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            inserts.append(len(parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with session_factory() as session:
+            repo = EnterpriseRepository(Profile, session)
+            rows = [{"external_id": f"ext-{i}", "name": f"Profile {i}"} for i in range(1000)]
+            stats = await repo.bulk_upsert(rows, conflict_columns=["external_id"])
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert stats == {"inserted": 1000, "updated": 0}
+    # 4 параметра на строку (external_id, name и два Python default) при лимите SQLite 999
+    assert len(inserts) == 5
+    assert max(inserts) <= 999
@@ -0,0 +1,143 @@
+"""
+Тесты проекций репозитория (list_columns, get_columns) и их аллокаций против ORM объектов.
+"""
+
+import logging
+import tracemalloc
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import Boolean, DateTime, Integer, String, Text, event, func
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base.repo import SimpleRepository
+from core.exceptions import CoreRepositoryValueError
+
+logger = logging.getLogger("test_session")
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Member(_Base):
+    __tablename__ = "members"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    email: Mapped[str] = mapped_column(String(100), nullable=False)
+    bio: Mapped[str | None] = mapped_column(Text)
+    location: Mapped[str | None] = mapped_column(String(100))
+    website: Mapped[str | None] = mapped_column(String(200))
+    karma: Mapped[int] = mapped_column(Integer, default=0)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class MemberListItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    username: str
+    karma: int
+    display_name: str | None = None  # не колонка - в SELECT не попадает
+
+
+@pytest_asyncio.fixture
+async def sessionmaker(engine, session_factory):
+    async with engine.begin() as conn:
+        await conn.execute(
+            Member.__table__.insert(),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "username": f"member{i}",
+                    "email": f"member{i}@example.com",
+                    "bio": "bio " * 50,
+                    "location": "Moscow",
+                    "website": f"https://example.com/{i}",
+                    "karma": i,
+                    "is_active": i % 2 == 0,
+                }
+                for i in range(1000)
+            ],
+        )
+    return engine, session_factory
+
+
+async def test_list_columns_selects_only_schema_columns(sessionmaker):
+    engine, factory = sessionmaker
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    async with factory() as session:
+        repository = SimpleRepository(Member, session)
+        rows = await repository.list_columns(MemberListItem, {"is_active": True, "karma__gte": 990}, limit=3)
+        assert not session.identity_map
+
+    select_list = statements[0].split("FROM")[0]
+    assert "members.username" in select_list and "members.karma" in select_list
+    assert "bio" not in select_list and "email" not in select_list
+
+    items = [MemberListItem.model_validate(row) for row in rows]
+    assert len(items) == 3
+    assert all(item.karma >= 990 and item.karma % 2 == 0 for item in items)
+
+
+async def test_dict_rows_get_columns_and_validation(sessionmaker):
+    _, factory = sessionmaker
+
+    async with factory() as session:
+        repository = SimpleRepository(Member, session)
+        rows = await repository.list_columns(["id", "email"], {"karma": 7}, as_dict=True)
+        assert rows == [{"id": rows[0]["id"], "email": "member7@example.com"}]
+
+        member = await repository.get_columns(rows[0]["id"], ["username", "karma"])
+        assert (member.username, member.karma) == ("member7", 7)
+        assert await repository.get_columns(rows[0]["id"], ["karma"], as_dict=True) == {"karma": 7}
+        assert await repository.get_columns(uuid.uuid4(), MemberListItem) is None
+
+        with pytest.raises(CoreRepositoryValueError):
+            await repository.list_columns(["id", "password"])
+
+
+async def test_list_columns_skips_identity_map_and_allocates_less(sessionmaker):
+    """Страница 1000 строк в схему ответа: проекция не наполняет identity map и аллоцирует меньше ORM объектов."""
+    _, factory = sessionmaker
+
+    async def entities(session):
+        rows = await SimpleRepository(Member, session).list(limit=1000)
+        return rows, [MemberListItem.model_validate(row) for row in rows]
+
+    async def projection(session):
+        rows = await SimpleRepository(Member, session).list_columns(MemberListItem, limit=1000)
+        return rows, [MemberListItem.model_validate(row) for row in rows]
+
+    results = {}
+    for name, load_page in (("entities", entities), ("projection", projection)):
+        async with factory() as session:
+            _, items = await load_page(session)  # прогрев
+            assert len(items) == 1000
+
+        async with factory() as session:
+            tracemalloc.start()
+            rows, _ = await load_page(session)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Identity map держит объекты слабыми ссылками - считаем, пока строки страницы живы
+            results[name] = (len(session.identity_map), peak / 1024 / 1024)
+            del rows
+
+    logger.info(
+        "📊 Страница 1000 строк: "
+        + ", ".join(f"{name} identity map {size}, пик {peak:.1f} MB" for name, (size, peak) in results.items())
+    )
+
+    assert results["entities"][0] == 1000
+    assert results["projection"][0] == 0
+    assert results["projection"][1] < results["entities"][1]
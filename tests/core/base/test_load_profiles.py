@@ -0,0 +1,130 @@
+"""
+Тесты профилей загрузки связей: стратегия по направлению связи, raiseload для остальных.
+"""
+
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import ForeignKey, String, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
+from core.base.repo import LoadProfile, SimpleRepository
+from core.exceptions import CoreRepositoryValueError
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Publisher(_Base):
+    __tablename__ = "publishers"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    authors: Mapped[list["Author"]] = relationship(back_populates="publisher")
+
+
+class Author(_Base):
+    __tablename__ = "authors"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    publisher_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("publishers.id"), nullable=False)
+    publisher: Mapped[Publisher] = relationship(back_populates="authors")
+    books: Mapped[list["Book"]] = relationship(back_populates="author")
+
+
+class Book(_Base):
+    __tablename__ = "books"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    title: Mapped[str] = mapped_column(String(50), nullable=False)
+    author_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("authors.id"), nullable=False)
+    author: Mapped[Author] = relationship(back_populates="books")
+    reviews: Mapped[list["Review"]] = relationship()
+
+
+class Review(_Base):
+    __tablename__ = "reviews"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    book_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("books.id"), nullable=False)
+
+
+class AuthorRepository(SimpleRepository[Author, dict, dict]):
+    load_profiles = {
+        "list_card": ["publisher"],
+        "detail": LoadProfile("publisher", "books__reviews"),
+        "joined_books": LoadProfile("books", strategies={"books": "joined"}),
+        "lazy": LoadProfile("publisher", raise_unlisted=False),
+    }
+
+
+@pytest_asyncio.fixture
+async def sessionmaker(engine, session_factory):
+    async with session_factory() as session:
+        publisher = Publisher(name="press")
+        for i in range(3):
+            author = Author(name=f"author{i}", publisher=publisher)
+            author.books = [Book(title=f"book{i}{j}", reviews=[Review(), Review()]) for j in range(2)]
+            session.add(author)
+        await session.commit()
+
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    yield session_factory, statements
+
+
+async def test_strategy_follows_relationship_direction(sessionmaker):
+    factory, statements = sessionmaker
+
+    async with factory() as session:
+        authors = await AuthorRepository(Author, session).list(load_profile="detail")
+
+    # many-to-one через JOIN в основном запросе, каждая коллекция - один SELECT ... IN
+    assert len(statements) == 3
+    assert "JOIN publishers" in statements[0]
+    assert [statement.split("FROM ")[1].split()[0] for statement in statements[1:]] == ["books", "reviews"]
+    assert len(authors) == 3
+    assert {author.publisher.name for author in authors} == {"press"}
+    assert sum(len(book.reviews) for author in authors for book in author.books) == 12
+
+
+async def test_unlisted_relations_raise_instead_of_lazy_loading(sessionmaker):
+    factory, statements = sessionmaker
+
+    async with factory() as session:
+        repository = AuthorRepository(Author, session)
+        authors = await repository.list(load_profile="list_card")
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            authors[0].books
+
+        detail = await repository.get(authors[0].id, load_profile="detail")
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            detail.books[0].author.publisher.authors
+
+        # Связь из identity map отдается без запроса и без ошибки
+        assert detail.books[0].author is detail
+
+        joined = await repository.get_by(name="author1", load_profile="joined_books")
+        assert {book.title for book in joined.books} == {"book10", "book11"}
+        assert "JOIN books" in statements[-1]
+
+
+def test_profiles_compile_once_and_validate():
+    profile = AuthorRepository.load_profiles["list_card"]
+
+    assert isinstance(profile, LoadProfile)
+    assert profile.options(Author) is profile.options(Author)
+    assert len(AuthorRepository.load_profiles["lazy"].options(Author)) == 1
+    assert AuthorRepository.load_profiles["joined_books"].requires_unique(Author)
+    assert not AuthorRepository.load_profiles["detail"].requires_unique(Author)
+
+    with pytest.raises(CoreRepositoryValueError):
+        LoadProfile("name").options(Author)
+    with pytest.raises(CoreRepositoryValueError):
+        LoadProfile("books", strategies={"books": "subquery"})
+    with pytest.raises(CoreRepositoryValueError):
+        AuthorRepository(Author, None)._load_options("unknown")
@@ -0,0 +1,139 @@
+"""
+Тесты transactional outbox: запись событий в транзакции сущности и доставка relay.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import MetaData, String, func, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base.repo import EventDrivenRepository
+from core.base.repo.outbox import MessagingOutboxSink, OutboxEvent, OutboxRelay
+from core.messaging.core import MessageClient
+from core.messaging.publisher import InMemoryTransport
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class OutboxNote(_Base):
+    __tablename__ = "outbox_notes"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    title: Mapped[str] = mapped_column(String(50), nullable=False)
+    deleted_at: Mapped[str | None] = mapped_column(nullable=True, default=None)
+
+
+class NoteRepository(EventDrivenRepository):
+    _event_outbox = True
+
+
+class _Sink:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.received: list[list[str]] = []
+
+    async def send(self, events):
+        if self.fail:
+            raise ConnectionError("broker down")
+        self.received.append([event.event_type for event in events])
+
+
+@pytest.fixture
+def metadata():
+    # Таблица outbox объявлена на metadata приложения - создаем ее вместе с моделями модуля
+    metadata = MetaData()
+    for table in (*_Base.metadata.tables.values(), OutboxEvent.__table__):
+        table.to_metadata(metadata)
+    return metadata
+
+
+async def _outbox(session_factory) -> list[OutboxEvent]:
+    async with session_factory() as session:
+        return list((await session.execute(select(OutboxEvent).order_by(OutboxEvent.seq))).scalars())
+
+
+async def test_events_are_written_with_entity(session_factory):
+    async with session_factory() as session:
+        repo = NoteRepository(OutboxNote, session)
+        note = await repo.create_with_event({"title": "first"})
+        await repo.update_with_event(note, {"title": "second"})
+        await repo.update_with_event(note, {"title": "second"})  # без изменений - без события
+        await repo.remove_with_event(note.id, soft_delete=False)
+
+    rows = await _outbox(session_factory)
+    assert [row.event_type for row in rows] == ["entity.created", "entity.updated", "entity.deleted"]
+    assert {row.aggregate_id for row in rows} == {str(note.id)}
+    assert rows[0].routing_key == "outbox_notes.entity.created"
+    assert rows[1].payload["changed_fields"] == ["title"]
+    assert all(row.published_at is None for row in rows)
+
+
+async def test_failed_write_leaves_no_event(session_factory):
+    async with session_factory() as session:
+        repo = NoteRepository(OutboxNote, session)
+        with pytest.raises(Exception):
+            await repo.create_with_event({"title": None})
+
+    assert await _outbox(session_factory) == []
+
+
+async def test_relay_delivers_in_order_and_marks_published(session_factory):
+    async with session_factory() as session:
+        repo = NoteRepository(OutboxNote, session)
+        for i in range(5):
+            await repo.create_with_event({"title": f"note-{i}"})
+
+    sink = _Sink()
+    relay = OutboxRelay(session_factory, {"messaging": sink}, batch_size=3)
+
+    assert await relay.relay_once() == 3
+    assert await relay.relay_once() == 2
+    assert await relay.relay_once() == 0
+
+    rows = await _outbox(session_factory)
+    assert [len(batch) for batch in sink.received] == [3, 2]
+    assert all(row.published_at is not None for row in rows)
+    assert relay.get_stats()["published"] == 5
+    assert relay.get_stats()["batches"] == 2
+
+
+async def test_relay_failure_keeps_events_pending(session_factory):
+    async with session_factory() as session:
+        repo = NoteRepository(OutboxNote, session)
+        await repo.create_with_event({"title": "note"})
+
+    relay = OutboxRelay(session_factory, {"messaging": _Sink(fail=True)}, max_attempts=2)
+    assert await relay.relay_once() == 0
+    assert await relay.relay_once() == 0
+    # Лимит попыток исчерпан - событие больше не выбирается
+    assert await relay.relay_once() == 0
+
+    row = (await _outbox(session_factory))[0]
+    assert row.published_at is None
+    assert row.attempts == 2
+    assert "broker down" in row.last_error
+    assert relay.stats.failed == 2
+
+
+async def test_messaging_sink_uses_event_id_as_message_id(session_factory):
+    async with session_factory() as session:
+        repo = NoteRepository(OutboxNote, session)
+        await repo.create_with_event({"title": "note"})
+
+    transport = InMemoryTransport()
+    client = MessageClient(broker=object(), publish_transport=transport)
+    relay = OutboxRelay(session_factory, {"messaging": MessagingOutboxSink(client)})
+
+    assert await relay.relay_once() == 1
+    await client.disconnect()
+
+    row = (await _outbox(session_factory))[0]
+    message = transport.decoded()[0]
+    assert message["id"] == str(row.id)
+    assert message["payload"]["entity_data"]["title"] == "note"
+
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(OutboxEvent)) == 1
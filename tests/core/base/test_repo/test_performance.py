@@ -21,9 +21,11 @@ from typing import Any
 import pytest
 from pytz import utc
 from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from core.base.repo import CacheManager, cache_result
 from core.base.repo.repository import BaseRepository
+from core.database import DB_POOL_MODES, create_engine_for
 from tests.utils_test.isolation_decorators import database_reset_test
 
 from .conftest import post_repo, tag_repo, user_repo
@@ -98,6 +100,110 @@ async def test_bulk_create_large_dataset(setup_test_models, user_repo):
     assert creation_time < 30, f"Создание 1000 пользователей заняло слишком много времени: {creation_time:.2f}с"
 
 
+@pytest.mark.performance
+@database_reset_test(verbose=True)
+async def test_bulk_create_strategies_throughput(setup_test_models, user_repo):
+    """
+    Бенчмарк bulk_create: записей в секунду для ORM вставки с refresh каждого
+    объекта, INSERT ... RETURNING и COPY (только PostgreSQL + asyncpg).
+    """
+    rows_count = 5000
+    session = setup_test_models
+
+    def make_rows(prefix: str) -> list[dict[str, Any]]:
+        return [
+            {
+                "username": f"{prefix}_{i}_{uuid.uuid4().hex[:8]}",
+                "email": f"{prefix}_{i}_{uuid.uuid4().hex[:8]}@example.com",
+                "full_name": f"Bulk User {i}",
+                "hashed_password": "test_password_hash",
+                "is_active": True,
+            }
+            for i in range(rows_count)
+        ]
+
+    # Прежняя реализация: add_all, коммит батча и refresh каждого объекта
+    rows = make_rows("orm")
+    start_time = time.perf_counter()
+    for i in range(0, rows_count, 1000):
+        batch = [TestUser(**row) for row in rows[i : i + 1000]]
+        session.add_all(batch)
+        await session.commit()
+        for obj in batch:
+            await session.refresh(obj)
+    rates = {"orm_refresh": rows_count / (time.perf_counter() - start_time)}
+
+    start_time = time.perf_counter()
+    created_users = await user_repo.bulk_create(make_rows("returning"), batch_size=1000)
+    rates["insert_returning"] = rows_count / (time.perf_counter() - start_time)
+    assert len(created_users) == rows_count
+    assert all(user.id is not None and user.created_at is not None for user in created_users)
+
+    if session.bind.dialect.driver == "asyncpg":
+        start_time = time.perf_counter()
+        copied = await user_repo.bulk_create(
+            make_rows("copy"), batch_size=rows_count, return_objects=False, use_copy=True
+        )
+        rates["copy"] = rows_count / (time.perf_counter() - start_time)
+        assert copied == rows_count
+
+    total = await session.scalar(select(func.count()).select_from(TestUser))
+    assert total == rows_count * len(rates)
+
+    logger.info("📊 bulk_create, записей/сек: " + ", ".join(f"{name} {rate:.0f}" for name, rate in rates.items()))
+
+    assert rates["insert_returning"] > rates["orm_refresh"]
+    if "copy" in rates:
+        assert rates["copy"] > rates["orm_refresh"]
+
+
+@pytest.mark.performance
+@database_reset_test(verbose=True)
+async def test_pool_modes_get_list_throughput(setup_test_models, user_repo):
+    """
+    Бенчмарк режимов пула DB_POOL_MODE: операций в секунду для типичных
+    get и list репозитория. Без PgBouncer режим pgbouncer_transaction показывает
+    цену отказа от кэша prepared statements, nullpool - цену нового соединения.
+    """
+    session = setup_test_models
+    if session.bind.dialect.name != "postgresql":
+        pytest.skip("Pool modes only differ on PostgreSQL")
+
+    users = await user_repo.bulk_create(
+        [
+            {
+                "username": f"pool_user_{i}_{uuid.uuid4().hex[:8]}",
+                "email": f"pool_{i}_{uuid.uuid4().hex[:8]}@example.com",
+                "full_name": f"Pool User {i}",
+                "hashed_password": "test_password_hash",
+            }
+            for i in range(200)
+        ],
+    )
+    uri = session.bind.url.render_as_string(hide_password=False)
+    gets, lists = 500, 100
+
+    rates = {}
+    for mode in DB_POOL_MODES:
+        engine = create_engine_for(uri, mode)
+        try:
+            factory = async_sessionmaker(engine, expire_on_commit=False)
+            start_time = time.perf_counter()
+            for i in range(gets):
+                async with factory() as mode_session:
+                    assert await BaseRepository(TestUser, mode_session).get(users[i % len(users)].id) is not None
+            for _ in range(lists):
+                async with factory() as mode_session:
+                    assert len(await BaseRepository(TestUser, mode_session).list(is_active=True, limit=20)) == 20
+            rates[mode] = (gets + lists) / (time.perf_counter() - start_time)
+        finally:
+            await engine.dispose()
+
+    logger.info("📊 get/list по режимам пула, операций/сек: " + ", ".join(f"{m} {r:.0f}" for m, r in rates.items()))
+
+    assert set(rates) == set(DB_POOL_MODES)
+
+
 @pytest.mark.performance
 @database_reset_test(verbose=True)
 async def test_complex_filtering_performance(
@@ -334,6 +440,69 @@ async def test_bulk_operations_performance(setup_test_models, user_repo):
     assert large_bulk_create_time < 10.0, f"Большой bulk create слишком медленный: {large_bulk_create_time:.3f}с"
 
 
+class CachedUserRepository(BaseRepository):
+    """Репозиторий пользователей с кэшируемыми чтениями для бенчмарка кэша."""
+
+    @cache_result(ttl=300, scope="entity")
+    async def get_snapshot(self, id: uuid.UUID) -> dict[str, Any] | None:
+        user = await self.get(id)
+        return None if user is None else {"username": user.username, "is_active": user.is_active}
+
+    @cache_result(ttl=300)
+    async def count_active(self) -> int:
+        return await self.count(is_active=True)
+
+
+@pytest.mark.performance
+@database_reset_test(verbose=True)
+async def test_bulk_delete_cache_hit_ratio(setup_test_models, user_repo):
+    """
+    Бенчмарк доли попаданий в кэш при чтениях между массовыми soft delete:
+    прежний сброс всего кэша модели (invalidate_cache("*")) против точечной
+    инвалидации ключей сущностей по ID из RETURNING и смены поколения list/count.
+    """
+    users = await user_repo.bulk_create(
+        [
+            {
+                "username": f"cache_user_{i}_{uuid.uuid4().hex[:8]}",
+                "email": f"cache_{i}_{uuid.uuid4().hex[:8]}@example.com",
+                "hashed_password": "test_password_hash",
+            }
+            for i in range(200)
+        ],
+    )
+    ids = [user.id for user in users]
+    rounds, batch = 5, 10
+
+    async def read_all(repository: CachedUserRepository) -> None:
+        for id in ids:
+            await repository.get_snapshot(id)
+        await repository.count_active()
+
+    ratios = {}
+    for strategy in ("full_flush", "targeted"):
+        cache_manager = CacheManager(use_redis=False, key_prefix=f"hit_ratio_{strategy}:")
+        repository = CachedUserRepository(TestUser, setup_test_models, cache_manager)
+        await read_all(repository)  # прогрев
+        cache_manager.hits = cache_manager.misses = 0
+
+        for i in range(rounds):
+            await repository.bulk_delete({"id__in": ids[i * batch : (i + 1) * batch]}, emit_events=False)
+            if strategy == "full_flush":
+                await repository.invalidate_cache("*")
+            await read_all(repository)
+
+        ratios[strategy] = (await cache_manager.get_stats())["hit_ratio"]
+        assert await repository.bulk_restore({"id__in": ids}, emit_events=False) == rounds * batch
+
+    logger.info(
+        f"📊 Hit ratio кэша между {rounds} bulk soft delete по {batch} строк: "
+        + ", ".join(f"{strategy} {ratio:.1%}" for strategy, ratio in ratios.items())
+    )
+
+    assert ratios["targeted"] > ratios["full_flush"]
+
+
 @pytest.mark.performance
 @database_reset_test(verbose=True)
 async def test_concurrent_operations_performance(setup_test_models, user_repo):
@@ -0,0 +1,141 @@
+"""
+Тесты unit of work: один коммит на несколько операций репозиториев.
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import DateTime, ForeignKey, String, event, func, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
+from core.base.repo import SimpleRepository, UnitOfWork
+from core.exceptions import CoreRepositoryValueError
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Account(_Base):
+    __tablename__ = "accounts"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    email: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class Nickname(_Base):
+    __tablename__ = "nicknames"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    account_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    value: Mapped[str] = mapped_column(String(50), nullable=False)
+
+    account: Mapped[Account] = relationship()
+
+
+@pytest.fixture
+def recorded(engine):
+    log = {"commits": 0, "statements": []}
+
+    def on_commit(conn):
+        log["commits"] += 1
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        log["statements"].append(statement.split()[0].upper())
+
+    event.listen(engine.sync_engine, "commit", on_commit)
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    yield log
+    event.remove(engine.sync_engine, "commit", on_commit)
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+async def test_repository_commits_per_operation_by_default(session_factory, recorded):
+    async with session_factory() as session:
+        accounts = SimpleRepository(Account, session)
+        account = await accounts.create({"email": "a@example.com"})
+        await accounts.update(account, {"email": "b@example.com"})
+
+    assert recorded["commits"] == 2
+    assert account.email == "b@example.com"
+
+
+async def test_unit_of_work_commits_once_with_returning(session_factory, recorded):
+    async with session_factory() as session:
+        accounts = SimpleRepository(Account, session)
+        nicknames = SimpleRepository(Nickname, session)
+
+        async with accounts.unit_of_work():
+            account = await accounts.create({"email": "a@example.com"})
+            nickname = await nicknames.create({"account_id": account.id, "value": "alpha"})
+            account = await accounts.update(account, {"email": "b@example.com"})
+            await accounts.remove(account.id)
+
+        stored = await session.scalar(select(Account.email).where(Account.id == account.id))
+
+    assert recorded["commits"] == 1
+    # Server default и onupdate пришли из RETURNING: SELECT только поиск в remove и проверка
+    assert recorded["statements"] == ["INSERT", "INSERT", "UPDATE", "SELECT", "UPDATE", "SELECT"]
+    assert isinstance(account.created_at, datetime) and isinstance(account.updated_at, datetime)
+    assert account.deleted_at is not None
+    assert nickname.account_id == account.id
+    assert stored == "b@example.com"
+
+
+async def test_unit_of_work_rolls_back_everything_on_error(session_factory, recorded):
+    async with session_factory() as session:
+        accounts = SimpleRepository(Account, session)
+        nicknames = SimpleRepository(Nickname, session)
+
+        with pytest.raises(RuntimeError):
+            async with UnitOfWork(session, returning=False):
+                account = await accounts.create({"email": "a@example.com"})
+                # Вложенный unit of work присоединяется к внешнему
+                async with nicknames.unit_of_work():
+                    await nicknames.create({"account_id": account.id, "value": "alpha"})
+                assert isinstance(account.created_at, datetime)
+                raise RuntimeError("service step failed")
+
+        assert await session.scalar(select(func.count()).select_from(Account)) == 0
+        assert await session.scalar(select(func.count()).select_from(Nickname)) == 0
+
+    assert recorded["commits"] == 0
+
+
+async def test_create_with_non_column_attribute_uses_model_constructor(session_factory, recorded):
+    async with session_factory() as session:
+        accounts = SimpleRepository(Account, session)
+        nicknames = SimpleRepository(Nickname, session)
+
+        async with accounts.unit_of_work():
+            account = await accounts.create({"email": "a@example.com"})
+            # relationship не колонка: INSERT ... RETURNING с ней невозможен
+            nickname = await nicknames.create({"account": account, "value": "alpha"})
+
+        stored = await session.scalar(select(Nickname.account_id).where(Nickname.id == nickname.id))
+
+    assert recorded["commits"] == 1
+    assert stored == account.id
+
+
+async def test_failed_savepoint_keeps_unit_of_work_usable(session_factory, recorded):
+    async with session_factory() as session:
+        accounts = SimpleRepository(Account, session)
+
+        async with accounts.unit_of_work() as uow:
+            await accounts.create({"email": "a@example.com"})
+            with pytest.raises(CoreRepositoryValueError):
+                async with uow.savepoint():
+                    await accounts.create({"email": "a@example.com"})
+            await accounts.create({"email": "b@example.com"})
+
+        emails = (await session.scalars(select(Account.email).order_by(Account.email))).all()
+
+    assert recorded["commits"] == 1
+    assert emails == ["a@example.com", "b@example.com"]
@@ -0,0 +1,37 @@
+"""
+Общие фикстуры тестов core: in-memory SQLite с таблицами моделей тестового модуля.
+
+Модуль объявляет модели на собственном ``_Base`` (отдельные metadata не дают
+одноименным тестовым таблицам разных модулей конфликтовать) либо
+переопределяет фикстуру ``metadata``.
+"""
+
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def metadata(request) -> MetaData:
+    """Metadata таблиц тестового модуля (``_Base.metadata``)."""
+    return request.module._Base.metadata
+
+
+@pytest_asyncio.fixture
+async def engine(metadata: MetaData) -> AsyncGenerator[AsyncEngine, None]:
+    """In-memory SQLite с созданными таблицами; StaticPool - одна база на все соединения теста."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Фабрика сессий поверх ``engine`` без expire после коммита."""
+    return async_sessionmaker(engine, expire_on_commit=False)
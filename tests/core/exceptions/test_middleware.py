@@ -0,0 +1,221 @@
+"""
+Тесты ASGI middleware обработки исключений и бенчмарк стека middleware.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from core.exceptions.middleware import (
+    ExceptionHandlingMiddleware,
+    ExceptionLoggingMiddleware,
+    RequestContextMiddleware,
+)
+from core.exceptions.notifications import BaseNotifier, NotificationManager
+
+logger = logging.getLogger("test_session")
+
+APPS_DIR = Path(__file__).resolve().parents[3] / "src" / "apps"
+
+
+class RecordingNotifier(BaseNotifier):
+    def __init__(self):
+        super().__init__(enabled=True)
+        self.sent: list[str] = []
+
+    async def send_notification(self, title, message, context=None, severity="error") -> bool:
+        self.sent.append(title)
+        return True
+
+
+async def state_endpoint(request: Request) -> JSONResponse:
+    return JSONResponse({"trace_id": request.state.trace_id, "user_id": request.state.user_id})
+
+
+async def echo_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(await request.body())
+
+
+async def failing_endpoint(request: Request) -> PlainTextResponse:
+    raise RuntimeError("boom")
+
+
+def _routes(stream_gate: asyncio.Event | None = None) -> list[Route]:
+    async def stream_endpoint(request: Request) -> StreamingResponse:
+        async def chunks():
+            yield b"data: first\n\n"
+            await stream_gate.wait()
+            yield b"data: second\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return [
+        Route("/state", state_endpoint),
+        Route("/echo", echo_endpoint, methods=["POST"]),
+        Route("/fail", failing_endpoint),
+        Route("/stream", stream_endpoint),
+    ]
+
+
+def _stack(app, notification_manager: NotificationManager | None = None):
+    app = ExceptionHandlingMiddleware(
+        ExceptionLoggingMiddleware(RequestContextMiddleware(app), log_requests=False, log_responses=False),
+        enable_notifications=notification_manager is not None,
+    )
+    app.notification_manager = notification_manager
+    return app
+
+
+def _load_generated(module: str):
+    path = APPS_DIR / "test_modern_syntax" / "middleware" / f"{module}.py"
+    spec = importlib.util.spec_from_file_location(f"generated_{module}", path)
+    loaded = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(loaded)
+    return loaded
+
+
+async def test_stack_sets_trace_headers_and_state():
+    app = _stack(Starlette(routes=_routes()))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/state", headers={"X-User-ID": "u1"})
+
+    assert response.status_code == 200
+    assert response.json() == {"trace_id": response.headers["X-Trace-ID"], "user_id": "u1"}
+    assert float(response.headers["X-Process-Time"]) >= 0
+
+
+async def test_unhandled_exception_is_reported_and_reraised():
+    notifier = RecordingNotifier()
+    manager = NotificationManager(notifiers=[notifier])
+    app = _stack(Starlette(routes=_routes()), manager)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=True)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        with pytest.raises(RuntimeError, match="boom"):
+            await client.get("/fail")
+
+    await manager.flush()
+    assert notifier.sent == ["Middleware Exception"]
+    await manager.close()
+
+
+async def test_streaming_response_is_not_buffered():
+    gate = asyncio.Event()
+    app = _stack(Starlette(routes=_routes(gate)))
+    messages: list[dict] = []
+
+    async def receive():
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message.get("body") == b"data: first\n\n":
+            # Первое событие дошло до клиента раньше, чем сгенерировано второе
+            gate.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    assert gate.is_set()
+    headers = dict(messages[0]["headers"])
+    assert b"x-trace-id" in headers
+    assert [m.get("body") for m in messages[1:] if m.get("body")] == [b"data: first\n\n", b"data: second\n\n"]
+
+
+async def test_generated_logging_middleware_replays_request_body():
+    module = _load_generated("test_modern_syntax_middleware")
+    app = module.TestModernSyntaxLoggingMiddleware(Starlette(routes=_routes()), log_responses=True, log_body=True)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/echo", content=b"payload")
+
+    assert response.text == "payload"
+    uuid.UUID(response.headers["X-Request-ID"])
+    assert response.headers["X-Response-Time"].endswith("ms")
+
+
+# Прежняя реализация стека на BaseHTTPMiddleware (для сравнения)
+class LegacyRequestContext(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request.state.trace_id = str(uuid.uuid4())
+        request.state.start_time = time.time()
+        request.state.user_id = request.headers.get("X-User-ID")
+        return await call_next(request)
+
+
+class LegacyLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        response.headers["X-Trace-ID"] = request.state.trace_id
+        return response
+
+
+class LegacyExceptionHandling(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            raise
+
+
+@pytest.mark.performance
+async def test_middleware_stack_throughput():
+    """Бенчмарк: запросов в секунду и p99 для стека BaseHTTPMiddleware и ASGI."""
+    requests_count = 1000
+
+    legacy = Starlette(routes=_routes())
+    legacy.add_middleware(LegacyRequestContext)
+    legacy.add_middleware(LegacyLogging)
+    legacy.add_middleware(LegacyExceptionHandling)
+    current = _stack(Starlette(routes=_routes()))
+
+    async def measure(app) -> tuple[float, float]:
+        latencies = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/state")
+            start = time.perf_counter()
+            for _ in range(requests_count):
+                request_start = time.perf_counter()
+                response = await client.get("/state")
+                latencies.append(time.perf_counter() - request_start)
+                assert response.status_code == 200
+            elapsed = time.perf_counter() - start
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        return requests_count / elapsed, p99 * 1000
+
+    legacy_rps, legacy_p99 = await measure(legacy)
+    current_rps, current_p99 = await measure(current)
+
+    logger.info(
+        f"📊 Middleware stack: BaseHTTPMiddleware {legacy_rps:.0f} rps (p99 {legacy_p99:.2f} ms), "
+        f"ASGI {current_rps:.0f} rps (p99 {current_p99:.2f} ms)"
+    )
+
+    assert current_rps > legacy_rps
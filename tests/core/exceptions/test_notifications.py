@@ -0,0 +1,106 @@
+"""
+Тесты очереди уведомлений об ошибках: неблокирующая отправка, дайджест
+повторов и ограничение кэша rate limit.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from core.exceptions.notifications import (
+    BaseNotifier,
+    NotificationManager,
+    TelegramNotifier,
+    close_http_client,
+    get_http_client,
+)
+
+
+class RecordingNotifier(BaseNotifier):
+    def __init__(self, latency: float = 0.0):
+        super().__init__(enabled=True)
+        self.latency = latency
+        self.sent: list[tuple[str, str]] = []
+
+    async def send_notification(self, title, message, context=None, severity="error") -> bool:
+        await asyncio.sleep(self.latency)
+        self.sent.append((title, message))
+        return True
+
+
+async def test_notify_does_not_wait_for_delivery():
+    notifier = RecordingNotifier(latency=0.3)
+    manager = NotificationManager(notifiers=[notifier])
+
+    start = time.perf_counter()
+    await manager.notify_critical_error("DB down", "connection refused")
+    assert time.perf_counter() - start < 0.05
+    assert notifier.sent == []
+
+    await manager.flush()
+    assert notifier.sent == [("DB down", "connection refused")]
+    await manager.close()
+
+
+async def test_repeated_errors_are_digested():
+    notifier = RecordingNotifier()
+    manager = NotificationManager(notifiers=[notifier], digest_window=0.1)
+
+    for _ in range(10):
+        await manager.notify_critical_error("Unhandled Exception", "ValueError: boom")
+    await manager.flush()
+    assert len(notifier.sent) == 1
+    assert manager.suppressed == 9
+
+    await asyncio.sleep(0.2)
+    assert len(notifier.sent) == 2
+    title, message = notifier.sent[1]
+    assert title == "Unhandled Exception (repeated)"
+    assert "Repeated 9 more times" in message
+    await manager.close()
+
+
+async def test_rate_limit_cache_is_bounded():
+    notifier = RecordingNotifier()
+    manager = NotificationManager(notifiers=[notifier], max_tracked_errors=3)
+
+    for i in range(10):
+        await manager.notify_critical_error("Error", f"error {i}")
+    await manager.flush()
+
+    assert len(notifier.sent) == 10
+    assert list(manager._notification_cache) == [f"Error:error {i}" for i in range(7, 10)]
+    await manager.close()
+
+
+async def test_full_queue_drops_notifications():
+    manager = NotificationManager(notifiers=[RecordingNotifier()], queue_size=2)
+
+    for i in range(10):
+        await manager.notify_critical_error("Error", f"error {i}")
+
+    assert manager.dropped == 8
+    await manager.close()
+
+
+async def test_notifiers_share_keep_alive_client():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    notifier = TelegramNotifier(bot_token="token", chat_id="42", client=client)
+
+    assert await notifier.send_notification("Title", "Message")
+    assert await notifier.send_notification("Title", "Message")
+    assert len(requests) == 2
+    assert requests[0].url.path == "/bottoken/sendMessage"
+    await client.aclose()
+
+    shared = get_http_client()
+    assert TelegramNotifier(bot_token="token", chat_id="42").http_client is shared
+    await close_http_client()
+    assert shared.is_closed
@@ -0,0 +1,202 @@
+"""
+Тесты среды выполнения потребителей: пакетные подтверждения, повторы и DLQ.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+import pytest
+from faststream.rabbit import RabbitQueue
+
+from core.messaging.consumer import RETRY_HEADER, AckBatcher, ConsumerSpec, QueueConsumer
+from core.messaging.models import SystemEventMessage, SystemEventPayload
+
+logger = logging.getLogger("test_session")
+
+
+class _Message:
+    """Входящее сообщение с записью подтверждений в общий журнал."""
+
+    def __init__(self, tag: int, body: bytes, journal: list, headers: dict | None = None) -> None:
+        self.delivery_tag = tag
+        self.body = body
+        self.headers = headers or {}
+        self.journal = journal
+
+    async def ack(self, multiple: bool = False) -> None:
+        self.journal.append(("ack", self.delivery_tag, multiple))
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None:
+        self.journal.append(("nack", self.delivery_tag, requeue))
+
+
+def _event(i: int) -> bytes:
+    return SystemEventMessage(
+        source="test", payload=SystemEventPayload(event_name=f"event-{i}", event_data={"seq": i})
+    ).model_dump_json().encode()
+
+
+class _Republisher:
+    def __init__(self) -> None:
+        self.published: list[tuple[str, bytes, dict]] = []
+
+    async def __call__(self, queue_name: str, body: bytes, headers: dict) -> None:
+        self.published.append((queue_name, body, headers))
+
+
+def _consumer(handler, **options) -> tuple[QueueConsumer, _Republisher]:
+    republish = _Republisher()
+    spec = ConsumerSpec(queue=RabbitQueue("events"), handler=handler, model=SystemEventMessage, **options)
+    return QueueConsumer(spec, republish), republish
+
+
+async def _feed(consumer: QueueConsumer, bodies: list[bytes], journal: list, headers: dict | None = None) -> None:
+    consumer.start()
+    for tag, body in enumerate(bodies, start=1):
+        await consumer.on_message(_Message(tag, body, journal, headers))
+    await consumer.stop()
+
+
+def test_retry_delays_grow_exponentially():
+    spec = ConsumerSpec(
+        queue=RabbitQueue("q"), handler=None, max_retries=5, retry_base_delay=100, retry_max_delay=1000
+    )
+    assert spec.retry_delays() == [100, 200, 400, 800, 1000]
+    assert spec.retry_queue_name(400) == "q.retry.400"
+
+
+async def test_ack_batcher_acks_contiguous_prefix():
+    journal: list = []
+    batcher = AckBatcher(batch_size=3, interval=10, prefetch=10)
+    messages = [_Message(tag, b"", journal) for tag in range(1, 6)]
+    for message in messages:
+        batcher.track(message)
+
+    # 2 и 3 завершены, но 1 еще в работе - подтверждать нечего
+    batcher.done(messages[1])
+    batcher.done(messages[2])
+    assert batcher.pending == 0
+
+    batcher.done(messages[0])
+    await asyncio.sleep(0)
+    assert journal == [("ack", 3, True)]
+
+    batcher.done(messages[4])
+    batcher.done(messages[3], settled=True)
+    await batcher.close()
+    assert journal == [("ack", 3, True), ("ack", 5, True)]
+
+
+async def test_ack_batcher_flushes_on_interval():
+    journal: list = []
+    batcher = AckBatcher(batch_size=100, interval=0.01, prefetch=1000)
+    message = _Message(1, b"", journal)
+    batcher.track(message)
+    batcher.done(message)
+
+    await asyncio.sleep(0.05)
+    assert journal == [("ack", 1, True)]
+
+
+async def test_batch_handler_receives_lists():
+    batches = []
+
+    async def handler(events):
+        batches.append([e.payload.event_data["seq"] for e in events])
+
+    journal: list = []
+    consumer, _ = _consumer(handler, prefetch=100, concurrency=1, batch_size=10, ack_batch_size=50)
+    await _feed(consumer, [_event(i) for i in range(25)], journal)
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert sum(batches, []) == list(range(25))
+    assert consumer.processed == 25
+    assert [entry for entry in journal if entry[0] == "ack"][-1] == ("ack", 25, True)
+    assert len(journal) < 25
+
+
+async def test_failure_goes_to_retry_queue_then_dlq():
+    async def handler(event):
+        raise RuntimeError("boom")
+
+    journal: list = []
+    consumer, republish = _consumer(handler, max_retries=2, retry_base_delay=100)
+    await _feed(consumer, [_event(1)], journal)
+
+    queue_name, _, headers = republish.published[0]
+    assert queue_name == "events.retry.100"
+    assert headers[RETRY_HEADER] == 1
+
+    # Последняя попытка исчерпана - сообщение уходит в DLQ
+    consumer, republish = _consumer(handler, max_retries=2, retry_base_delay=100)
+    await _feed(consumer, [_event(1)], journal, headers={RETRY_HEADER: 2})
+    assert republish.published[0][0] == "events.dlq"
+    assert not any(entry[0] == "nack" for entry in journal)
+
+
+async def test_invalid_message_goes_straight_to_dlq():
+    handled = []
+
+    async def handler(event):
+        handled.append(event)
+
+    journal: list = []
+    consumer, republish = _consumer(handler)
+    await _feed(consumer, [b"not json", json.dumps({"type": "x"}).encode(), _event(1)], journal)
+
+    assert [name for name, _, _ in republish.published] == ["events.dlq", "events.dlq"]
+    assert len(handled) == 1
+    assert consumer.dead_lettered == 2
+    assert journal[-1] == ("ack", 3, True)
+
+
+async def test_republish_failure_requeues():
+    async def handler(event):
+        raise RuntimeError("boom")
+
+    async def broken(queue_name, body, headers):
+        raise ConnectionError("down")
+
+    journal: list = []
+    spec = ConsumerSpec(queue=RabbitQueue("events"), handler=handler, model=SystemEventMessage)
+    consumer = QueueConsumer(spec, broken)
+    await _feed(consumer, [_event(1)], journal)
+
+    assert journal == [("nack", 1, True)]
+
+
+@pytest.mark.performance
+async def test_concurrent_consumer_throughput():
+    """Бенчмарк: сообщений в секунду при обработке по одному и конкурентно пачками."""
+    count = 500
+    bodies = [_event(i) for i in range(count)]
+    io_delay = 0.002
+
+    async def single(event):
+        await asyncio.sleep(io_delay)
+
+    async def bulk(events):
+        await asyncio.sleep(io_delay)
+
+    journal: list = []
+    consumer, _ = _consumer(single, prefetch=1, concurrency=1, ack_batch_size=1)
+    start = time.perf_counter()
+    await _feed(consumer, bodies, journal)
+    sequential_rate = count / (time.perf_counter() - start)
+    sequential_acks = len(journal)
+
+    journal = []
+    consumer, _ = _consumer(bulk, prefetch=200, concurrency=4, batch_size=50, ack_batch_size=100)
+    start = time.perf_counter()
+    await _feed(consumer, bodies, journal)
+    batched_rate = count / (time.perf_counter() - start)
+
+    logger.info(
+        f"📊 Потребитель: по одному {sequential_rate:.0f} msg/s ({sequential_acks} ack), "
+        f"пачками {batched_rate:.0f} msg/s ({len(journal)} ack)"
+    )
+    assert consumer.processed == count
+    assert batched_rate > sequential_rate * 5
+    assert len(journal) < sequential_acks / 10
@@ -0,0 +1,161 @@
+"""
+Тесты пакетного издателя RabbitMQ и бенчмарк сообщений в секунду.
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from core.exceptions.core_base import CoreMessagingPublishError
+from core.messaging.core import MessageClient
+from core.messaging.publisher import BatchPublisher, InMemoryTransport
+
+logger = logging.getLogger("test_session")
+
+
+class _CountingTransport(InMemoryTransport):
+    """Транспорт, запоминающий размеры отправленных пачек по времени вызова."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.calls: list[float] = []
+
+    async def publish(self, body, exchange, routing_key, message_id=None):
+        self.calls.append(time.perf_counter())
+        await super().publish(body, exchange, routing_key, message_id)
+
+
+async def test_batches_by_size():
+    transport = InMemoryTransport()
+    publisher = BatchPublisher(transport, max_batch_size=10, linger=10)
+    await publisher.start()
+
+    futures = [await publisher.publish({"seq": i}, "notifications") for i in range(20)]
+    await asyncio.wait_for(asyncio.gather(*futures), timeout=1)
+
+    assert [m["seq"] for m in transport.decoded()] == list(range(20))
+    assert publisher.confirmed == 20
+    assert publisher.unconfirmed == 0
+    await publisher.close()
+    assert not transport.is_open
+
+
+async def test_batches_by_linger():
+    transport = InMemoryTransport()
+    publisher = BatchPublisher(transport, max_batch_size=100, linger=0.02)
+    await publisher.start()
+
+    start = time.perf_counter()
+    future = await publisher.publish({"seq": 1}, "notifications")
+    await asyncio.wait_for(future, timeout=1)
+
+    assert time.perf_counter() - start >= 0.015
+    await publisher.close()
+
+
+async def test_close_flushes_buffer():
+    transport = InMemoryTransport()
+    publisher = BatchPublisher(transport, max_batch_size=100, linger=10)
+    await publisher.start()
+
+    for i in range(5):
+        await publisher.publish({"seq": i}, "notifications")
+    await publisher.close()
+
+    assert len(transport.messages) == 5
+
+
+async def test_backpressure_limits_unconfirmed():
+    transport = InMemoryTransport(confirm_latency=0.01)
+    publisher = BatchPublisher(transport, max_batch_size=5, linger=0.001, max_unconfirmed=8)
+    await publisher.start()
+
+    futures = []
+    for i in range(40):
+        futures.append(await publisher.publish({"seq": i}, "notifications"))
+        assert publisher.unconfirmed <= 8
+    await asyncio.gather(*futures)
+
+    assert transport.max_in_flight <= 8
+    assert len(transport.messages) == 40
+    await publisher.close()
+
+
+async def test_failed_confirm_propagates():
+    transport = InMemoryTransport(fail_routing_keys={"bad"})
+    publisher = BatchPublisher(transport, max_batch_size=10, linger=0.001)
+    await publisher.start()
+
+    ok = await publisher.publish({"seq": 1}, "notifications", "good")
+    bad = await publisher.publish({"seq": 2}, "notifications", "bad")
+
+    await ok
+    with pytest.raises(CoreMessagingPublishError):
+        await bad
+    assert (publisher.confirmed, publisher.failed) == (1, 1)
+    await publisher.close()
+
+
+async def test_publish_requires_start():
+    publisher = BatchPublisher(InMemoryTransport())
+    with pytest.raises(CoreMessagingPublishError):
+        await publisher.publish({"seq": 1}, "notifications")
+
+
+async def test_message_client_publish_many():
+    transport = InMemoryTransport(fail_routing_keys={"bad"})
+    client = MessageClient(broker=object(), publish_transport=transport)
+
+    sent = await client.publish_many(({"seq": i} for i in range(50)), routing_key="user.notification")
+    assert sent == 50
+    assert {exchange for exchange, _, _ in transport.messages} == {"notifications"}
+
+    with pytest.raises(CoreMessagingPublishError):
+        await client.publish_many([{"seq": 1}], routing_key="bad")
+    with pytest.raises(CoreMessagingPublishError):
+        await client.publish_many([{"seq": 1}], exchange_name="unknown")
+
+    await client.disconnect()
+    assert not transport.is_open
+
+
+async def test_publish_many_confirms_in_windows():
+    transport = InMemoryTransport(confirm_latency=0.001)
+    client = MessageClient(broker=object(), publish_transport=transport)
+    client._publisher = BatchPublisher(transport, max_batch_size=4, max_unconfirmed=8)
+    await client._publisher.start()
+
+    assert await client.publish_many({"seq": i} for i in range(100)) == 100
+    assert transport.max_in_flight <= 8
+    assert [message["seq"] for message in transport.decoded()] == list(range(100))
+
+    await client.disconnect()
+
+
+@pytest.mark.performance
+async def test_batched_publish_throughput():
+    """Бенчмарк: сообщений в секунду при последовательных и пакетных подтверждениях."""
+    latency = 0.001
+    count = 300
+    messages = [{"seq": i, "payload": "x" * 64} for i in range(count)]
+
+    sequential = InMemoryTransport(confirm_latency=latency)
+    start = time.perf_counter()
+    for message in messages:
+        await sequential.publish(str(message).encode(), "notifications", "")
+    sequential_rate = count / (time.perf_counter() - start)
+
+    transport = InMemoryTransport(confirm_latency=latency)
+    publisher = BatchPublisher(transport, max_batch_size=100, linger=0.005, max_unconfirmed=1000)
+    await publisher.start()
+    start = time.perf_counter()
+    futures = [await publisher.publish(message, "notifications") for message in messages]
+    await asyncio.gather(*futures)
+    batched_rate = count / (time.perf_counter() - start)
+    await publisher.close()
+
+    logger.info(f"📊 Публикация: последовательно {sequential_rate:.0f} msg/s, пачками {batched_rate:.0f} msg/s")
+    assert len(transport.messages) == count
+    assert batched_rate > sequential_rate * 2
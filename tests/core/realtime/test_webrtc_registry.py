@@ -0,0 +1,158 @@
+"""
+Тесты реестра WebRTC комнат и пиров.
+"""
+
+import asyncio
+import logging
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.realtime.connection_manager import ConnectionManager
+from core.realtime.models import WebRTCRoom
+from core.realtime.routes import webrtc_routes
+from core.realtime.webrtc_registry import WebRTCRegistry
+
+logger = logging.getLogger("test_session")
+
+
+def _registry() -> WebRTCRegistry:
+    return WebRTCRegistry(ConnectionManager())
+
+
+def _socket(delay: float = 0) -> MagicMock:
+    websocket = MagicMock()
+
+    async def send_json(message):
+        await asyncio.sleep(delay)
+
+    websocket.send_json = AsyncMock(side_effect=send_json)
+    return websocket
+
+
+def test_join_leave_and_limits():
+    registry = _registry()
+    registry.add_room(WebRTCRoom(room_id="r1", max_participants=2))
+
+    assert registry.join("r1", "a") is not None
+    assert registry.join("r1", "b") is not None
+    assert registry.join("r1", "c") is None
+    assert registry.join("r1", "a").participants == {"a", "b"}
+    assert registry.peer_rooms("a") == {"r1"}
+
+    registry.leave("r1", "a")
+    registry.leave("r1", "b")
+    assert "r1" not in registry.rooms
+    assert registry.peer_rooms("b") == set()
+
+
+def test_remove_peer_cleans_indexes():
+    registry = _registry()
+    registry.join("r1", "a")
+    registry.join("r1", "b")
+    registry.join("r2", "a")
+    registry.link("a", "b", "r1")
+    registry.link("b", "a", "r1")
+    registry.link("c", "d", "r3")
+
+    rooms = registry.remove_peer("a")
+
+    assert {room.room_id for room in rooms} == {"r1", "r2"}
+    assert set(registry.rooms) == {"r1"}
+    assert registry.rooms["r1"].participants == {"b"}
+    assert list(registry.connections) == [("c", "d")]
+    assert registry.room_connections("r1") == []
+    assert registry.peer_rooms("a") == set()
+
+
+def test_delete_room_drops_connections():
+    registry = _registry()
+    registry.join("r1", "a")
+    registry.join("r1", "b")
+    registry.link("a", "b", "r1")
+
+    registry.delete_room("r1")
+
+    assert registry.connections == {}
+    assert registry.peer_rooms("a") == set()
+
+
+async def test_broadcast_is_concurrent():
+    registry = _registry()
+    delay = 0.05
+    for i in range(10):
+        peer_id = f"peer-{i}"
+        registry.attach(peer_id, _socket(delay))
+        registry.join("r1", peer_id)
+
+    start = time.perf_counter()
+    delivered = await registry.broadcast("r1", {"type": "ping"}, exclude_peer="peer-0")
+    elapsed = time.perf_counter() - start
+
+    assert delivered == 9
+    assert elapsed < delay * 5
+
+
+async def test_send_to_peer_reports_delivery_count():
+    registry = _registry()
+
+    broken = _socket()
+    broken.send_json.side_effect = RuntimeError("closed")
+    registry.attach("a", broken)
+
+    assert await registry.send_to_peer("a", {"type": "ping"}) == 0
+    assert not registry.is_local("a")
+
+    registry.attach("a", _socket())
+    assert await registry.send_to_peer("a", {"type": "ping"}) == 1
+    assert await registry.send_to_peer("missing", {}) == 0
+
+
+def test_late_detach_keeps_reconnected_socket():
+    registry = _registry()
+    old, new = _socket(), _socket()
+
+    registry.attach("a", old)
+    assert registry.attach("a", new) is old
+
+    # Поздний disconnect старого сокета не снимает новый
+    assert registry.detach("a", old) is False
+    assert registry.is_local("a")
+    assert registry.detach("a", new) is True
+    assert not registry.is_local("a")
+
+
+def test_signaling_peer_id_is_assigned_by_server():
+    app = FastAPI()
+    app.include_router(webrtc_routes.router)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/realtime/webrtc/signaling?peer_id=victim") as websocket:
+            info = websocket.receive_json()
+            assert info["peer_id"] != "victim"
+            assert not webrtc_routes.webrtc_registry.is_local("victim")
+    assert not webrtc_routes.webrtc_registry.is_local(info["peer_id"])
+
+
+@pytest.mark.performance
+def test_cleanup_cost_independent_of_registry_size():
+    """Бенчмарк: очистка пира не зависит от числа чужих комнат и соединений."""
+    timings = {}
+    for rooms in (100, 10_000):
+        registry = _registry()
+        for i in range(rooms):
+            registry.join(f"room-{i}", f"peer-{i}-a")
+            registry.join(f"room-{i}", f"peer-{i}-b")
+            registry.link(f"peer-{i}-a", f"peer-{i}-b", f"room-{i}")
+        registry.join("room-0", "target")
+        registry.link("target", "peer-0-a", "room-0")
+
+        start = time.perf_counter()
+        registry.remove_peer("target")
+        timings[rooms] = time.perf_counter() - start
+
+    logger.info(f"📊 Очистка пира: {timings}")
+    assert timings[10_000] < max(timings[100] * 20, 0.001)
@@ -0,0 +1,139 @@
+"""
+Тесты кодеков WebSocket кадров и бенчмарк пропускной способности кодирования.
+"""
+
+import json
+import logging
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from core.exceptions.core_base import CoreStreamingValueError
+from core.realtime.models import MessageType, WSMessage
+from core.streaming.codecs import (
+    FLAG_COMPRESSED,
+    JSON_CODEC,
+    SUBPROTOCOL_JSON,
+    SUBPROTOCOL_MSGPACK,
+    WSCodec,
+    decode_frame,
+    get_codec,
+    negotiate_subprotocol,
+    receive_payload,
+    send_payload,
+)
+
+logger = logging.getLogger("test_session")
+
+
+def _message(size: int = 16) -> WSMessage:
+    return WSMessage(
+        type=MessageType.BINARY,
+        data={"text": "x" * size, "items": list(range(10))},
+        binary_data=bytes(range(256)) * (size // 256 + 1),
+    )
+
+
+def test_json_codec_roundtrip_base64():
+    message = _message()
+    frame = JSON_CODEC.encode(message.model_dump(mode=JSON_CODEC.dump_mode))
+
+    assert isinstance(frame, str)
+    restored = WSMessage.model_validate(JSON_CODEC.decode(frame))
+    assert restored.binary_data == message.binary_data
+    assert restored.data == message.data
+
+
+def test_msgpack_codec_roundtrip_raw_bytes():
+    pytest.importorskip("msgpack")
+    codec = get_codec(SUBPROTOCOL_MSGPACK, 0)
+    message = _message()
+    frame = codec.encode(message.model_dump(mode=codec.dump_mode))
+
+    assert isinstance(frame, bytes)
+    assert frame[0] == 0
+    payload = codec.decode(frame)
+    assert isinstance(payload["binary_data"], bytes)
+    assert WSMessage.model_validate(payload).binary_data == message.binary_data
+
+
+def test_msgpack_codec_compresses_large_frames():
+    pytest.importorskip("msgpack")
+    codec = get_codec(SUBPROTOCOL_MSGPACK, 512)
+    small = codec.encode({"text": "x" * 10})
+    large = codec.encode({"text": "x" * 4096})
+
+    assert not small[0] & FLAG_COMPRESSED
+    assert large[0] & FLAG_COMPRESSED
+    assert len(large) < 4096
+    assert codec.decode(large) == {"text": "x" * 4096}
+
+
+def test_negotiate_subprotocol_keeps_client_order():
+    pytest.importorskip("msgpack")
+    assert negotiate_subprotocol([SUBPROTOCOL_MSGPACK, SUBPROTOCOL_JSON]) == SUBPROTOCOL_MSGPACK
+    assert negotiate_subprotocol([SUBPROTOCOL_JSON, SUBPROTOCOL_MSGPACK]) == SUBPROTOCOL_JSON
+    assert negotiate_subprotocol(["graphql-ws"]) is None
+    assert negotiate_subprotocol(None) is None
+
+
+def test_get_codec_defaults_and_unknown():
+    assert get_codec(None) is JSON_CODEC
+    assert get_codec(SUBPROTOCOL_JSON) is JSON_CODEC
+    with pytest.raises(CoreStreamingValueError):
+        get_codec("protobuf")
+    with pytest.raises(TypeError):
+        WSCodec()
+
+
+def test_decode_frame_plain_text():
+    assert decode_frame(JSON_CODEC, "ping") == "ping"
+    assert decode_frame(JSON_CODEC, '{"type": "ping"}') == {"type": "ping"}
+
+
+@pytest.mark.asyncio
+async def test_send_and_receive_payload():
+    pytest.importorskip("msgpack")
+    codec = get_codec(SUBPROTOCOL_MSGPACK)
+    websocket = AsyncMock()
+
+    await send_payload(websocket, codec, {"a": 1})
+    frame = websocket.send_bytes.await_args.args[0]
+
+    websocket.receive.return_value = {"type": "websocket.receive", "bytes": frame}
+    assert await receive_payload(websocket, codec) == {"a": 1}
+
+    websocket.receive.return_value = {"type": "websocket.disconnect", "code": 1001}
+    with pytest.raises(WebSocketDisconnect):
+        await receive_payload(websocket, codec)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", [64, 4096])
+def test_encoding_throughput(size):
+    """Бенчмарк: сообщений в секунду и байт на кадр для JSON, msgpack и msgpack+zlib."""
+    pytest.importorskip("msgpack")
+    message = _message(size)
+    count = 5000
+    codecs = {
+        "json": JSON_CODEC,
+        "msgpack": get_codec(SUBPROTOCOL_MSGPACK, 0),
+        "msgpack+zlib": get_codec(SUBPROTOCOL_MSGPACK, 256),
+    }
+
+    results = {}
+    for name, codec in codecs.items():
+        start = time.perf_counter()
+        for _ in range(count):
+            frame = codec.encode(message.model_dump(mode=codec.dump_mode))
+            codec.decode(frame)
+        elapsed = time.perf_counter() - start
+        frame_size = len(frame.encode() if isinstance(frame, str) else frame)
+        results[name] = {"msg_per_sec": round(count / elapsed), "frame_bytes": frame_size}
+
+    logger.info(f"📊 Кодирование, payload {size} B: {json.dumps(results)}")
+
+    assert results["msgpack"]["frame_bytes"] < results["json"]["frame_bytes"]
+    assert results["msgpack+zlib"]["frame_bytes"] <= results["msgpack"]["frame_bytes"]
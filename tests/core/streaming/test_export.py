@@ -0,0 +1,146 @@
+"""
+Тесты потокового чтения репозитория и экспорта в NDJSON/CSV, бенчмарк памяти.
+"""
+
+import csv
+import io
+import json
+import logging
+import sqlite3
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import Integer, String
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base.repo import SimpleRepository
+from core.exceptions.core_base import CoreStreamingValueError
+from core.performance import PSUTIL_AVAILABLE
+from core.streaming.export import encode_ndjson, export_response
+
+logger = logging.getLogger("test_session")
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class ExportRow(_Base):
+    __tablename__ = "export_rows"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    email: Mapped[str] = mapped_column(String(100), nullable=False)
+
+
+def fill(path, count: int) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO export_rows (id, seq, email) VALUES (?, ?, ?)",
+            ((i, i, f"user{i}@example.com") for i in range(1, count + 1)),
+        )
+
+
+@pytest_asyncio.fixture
+async def sessionmaker(tmp_path):
+    path = tmp_path / "export.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(_Base.metadata.create_all)
+    yield path, async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_repository_stream_applies_filters_and_order(sessionmaker):
+    path, factory = sessionmaker
+    fill(path, 250)
+
+    async with factory() as session:
+        repo = SimpleRepository(ExportRow, session)
+        rows = [row.seq async for row in repo.stream({"seq__gt": 50}, order_by="seq", chunk_size=32)]
+
+    assert rows == list(range(250, 50, -1))
+
+
+async def test_export_response_encodes_ndjson_and_csv(sessionmaker):
+    path, factory = sessionmaker
+    fill(path, 500)
+    app = FastAPI()
+
+    async def rows():
+        async with factory() as session:
+            async for row in SimpleRepository(ExportRow, session).stream(order_by="seq"):
+                yield row
+
+    @app.get("/export/{format}")
+    async def export(format: str):
+        return export_response(rows(), format, columns=["seq", "email"], filename=f"rows.{format}", chunk_bytes=1024)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        ndjson = await client.get("/export/ndjson")
+        exported_csv = await client.get("/export/csv")
+
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert ndjson.headers["content-disposition"] == 'attachment; filename="rows.ndjson"'
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert len(lines) == 500
+    assert lines[0] == {"id": 500, "seq": 500, "email": "user500@example.com"}
+
+    assert exported_csv.headers["content-type"] == "text/csv; charset=utf-8"
+    records = list(csv.DictReader(io.StringIO(exported_csv.text)))
+    assert len(records) == 500
+    assert records[-1] == {"seq": "1", "email": "user1@example.com"}
+
+    with pytest.raises(CoreStreamingValueError):
+        export_response(rows(), "xml")
+
+
+async def test_encoder_yields_bounded_chunks():
+    async def rows():
+        for i in range(1000):
+            yield {"seq": i, "payload": "x" * 50}
+
+    chunks = [chunk async for chunk in encode_ndjson(rows(), chunk_bytes=4096)]
+
+    assert len(chunks) > 10
+    assert all(len(chunk) < 4096 + 100 for chunk in chunks)
+    assert sum(chunk.count(b"\n") for chunk in chunks) == 1000
+
+
+@pytest.mark.performance
+@pytest.mark.skipif(not PSUTIL_AVAILABLE, reason="psutil is required for RSS sampling")
+async def test_export_million_rows_constant_memory(sessionmaker):
+    """Бенчмарк: экспорт 1M строк в NDJSON с замером пикового RSS."""
+    import psutil
+
+    rows_count = 1_000_000
+    path, factory = sessionmaker
+    fill(path, rows_count)
+
+    process = psutil.Process()
+    baseline_mb = peak_mb = process.memory_info().rss / 1024 / 1024
+    exported_bytes = 0
+    chunks = 0
+
+    start = time.perf_counter()
+    async with factory() as session:
+        rows = SimpleRepository(ExportRow, session).stream(order_by="id", chunk_size=5000)
+        async for chunk in export_response(rows, "ndjson").body_iterator:
+            exported_bytes += len(chunk)
+            chunks += 1
+            if chunks % 50 == 0:
+                peak_mb = max(peak_mb, process.memory_info().rss / 1024 / 1024)
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        f"📊 Export {rows_count} rows: {elapsed:.1f}s, {rows_count / elapsed:.0f} rows/s, "
+        f"{exported_bytes / 1024 / 1024:.0f} MB, RSS {baseline_mb:.0f} -> peak {peak_mb:.0f} MB"
+    )
+
+    assert chunks > 500
+    # Полная материализация 1M ORM объектов заняла бы сотни МБ
+    assert peak_mb - baseline_mb < 100
@@ -0,0 +1,181 @@
+"""
+Тесты компактного реестра соединений и бенчмарк памяти на соединение.
+"""
+
+import asyncio
+import gc
+import logging
+import sys
+import tracemalloc
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytz import utc
+
+from core.streaming.connection_manager import ConnectionManager
+from core.streaming.registry import KIND_SSE, KIND_WEBSOCKET, ConnectionRecord, ConnectionRegistry
+from core.streaming.ws_models import SSEConnectionStatus, WSConnectionInfo, WSMessage
+
+logger = logging.getLogger("test_session")
+
+
+def _fill_registry(count: int, users: int = 1000, channels: int = 50) -> ConnectionRegistry:
+    registry = ConnectionRegistry()
+    for i in range(count):
+        connection_id = f"conn-{i:08d}"
+        registry.add(ConnectionRecord(connection_id, KIND_WEBSOCKET, None, user_id=f"user-{i % users}"))
+        registry.subscribe(connection_id, f"channel-{i % channels}")
+    return registry
+
+
+def _fill_legacy(count: int, users: int = 1000, channels: int = 50) -> tuple:
+    """Прежняя раскладка: Pydantic модель + отдельные словари на соединение."""
+    connections: dict = {}
+    info: dict = {}
+    user_connections: dict = {}
+    channel_subscriptions: dict = {}
+    connection_channels: dict = {}
+    for i in range(count):
+        connection_id = f"conn-{i:08d}"
+        user_id = f"user-{i % users}"
+        channel = f"channel-{i % channels}"
+        connections[connection_id] = None
+        info[connection_id] = WSConnectionInfo(
+            connection_id=connection_id,
+            user_id=user_id,
+            status=SSEConnectionStatus.CONNECTED,
+            metadata={"auth_data": {"authenticated": True, "user": {"sub": user_id, "exp": 0, "iat": 0}}},
+        )
+        user_connections.setdefault(user_id, set()).add(connection_id)
+        channel_subscriptions.setdefault(channel, set()).add(connection_id)
+        connection_channels.setdefault(connection_id, set()).add(channel)
+    return connections, info, user_connections, channel_subscriptions, connection_channels
+
+
+def _bytes_per_connection(factory, count: int) -> tuple[float, object]:
+    gc.collect()
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    state = factory(count)
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, "filename"))
+    return allocated / count, state
+
+
+def test_record_uses_slots():
+    """Запись соединения не имеет __dict__ и интернирует user_id."""
+    record = ConnectionRecord("conn-1", KIND_WEBSOCKET, None, user_id="".join(["user", "-42"]))
+
+    assert not hasattr(record, "__dict__")
+    assert record.user_id is sys.intern("user-42")
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_registry_indexes():
+    """Индексы пользователей и каналов поддерживаются при добавлении и удалении."""
+    registry = ConnectionRegistry()
+    registry.add(ConnectionRecord("ws-1", KIND_WEBSOCKET, None, user_id="u1"))
+    registry.add(ConnectionRecord("sse-1", KIND_SSE, None, user_id="u1"))
+
+    assert registry.subscribe("ws-1", "news")
+    assert registry.subscribe("sse-1", "news")
+    assert not registry.subscribe("missing", "news")
+
+    assert registry.user_connections("u1") == {"ws-1", "sse-1"}
+    assert registry.user_connections("u1", KIND_SSE) == {"sse-1"}
+    assert registry.channel_subscribers("news") == {"ws-1", "sse-1"}
+    assert registry.subscriptions_count() == 2
+
+    assert registry.unsubscribe("ws-1", "news")
+    assert not registry.unsubscribe("ws-1", "news")
+
+    record = registry.remove("sse-1")
+    assert record is not None and record.channels is None
+    assert "news" not in registry.channels
+    assert registry.user_connections("u1") == {"ws-1"}
+    assert registry.remove("sse-1") is None
+    assert len(registry) == 1
+
+
+def test_inactive_uses_monotonic_clock():
+    """Неактивные соединения определяются по монотонным часам."""
+    registry = ConnectionRegistry()
+    stale = registry.add(ConnectionRecord("stale", KIND_SSE, None))
+    registry.add(ConnectionRecord("fresh", KIND_SSE, None))
+    stale.last_activity -= 120
+
+    assert registry.inactive(KIND_SSE, 60) == ["stale"]
+    assert registry.inactive(KIND_WEBSOCKET, 60) == []
+
+
+def test_record_to_info():
+    """Pydantic представление собирается только по запросу."""
+    record = ConnectionRecord("conn-1", KIND_SSE, None, user_id="u1", authenticated=True)
+    record.channels = {"b", "a"}
+
+    info = record.to_info()
+
+    assert info.connection_id == "conn-1"
+    assert info.channels == ["a", "b"]
+    assert info.metadata == {"kind": KIND_SSE, "authenticated": True}
+    assert abs((datetime.now(tz=utc) - info.last_activity).total_seconds()) < 5
+
+
+async def test_connection_manager_lifecycle():
+    """Менеджер хранит соединения в реестре и не держит JWT payload."""
+    manager = ConnectionManager()
+    manager.settings = MagicMock(
+        WEBSOCKET_MAX_CONNECTIONS=10,
+        WEBSOCKET_HEARTBEAT_INTERVAL=0,
+        SSE_MAX_CONNECTIONS=10,
+        SSE_HEARTBEAT_INTERVAL=0,
+        WEBSOCKET_MESSAGE_QUEUE_SIZE=10,
+    )
+    websocket = MagicMock()
+    websocket.accept = AsyncMock()
+    websocket.send_text = AsyncMock()
+    websocket.client.host = "127.0.0.1"
+    websocket.headers = {"user-agent": "pytest"}
+    user_data = {"authenticated": True, "user": {"sub": "u1", "roles": ["admin"]}}
+
+    record = await manager.connect_websocket(websocket, "ws-1", user_data)
+    queue = await manager.connect_sse("sse-1", user_data)
+    await manager.subscribe_to_channel("ws-1", "news")
+    await manager.subscribe_to_channel("sse-1", "news")
+
+    assert record.user_id == "u1"
+    assert manager.ws_connections["ws-1"] is record
+    assert "sse-1" in manager.sse_connections
+
+    message = WSMessage(id="m1", content={"text": "hi"})
+    assert await manager.broadcast_to_channel("news", message) == 2
+    assert await manager.send_to_user("u1", message) == 2
+    websocket.send_text.assert_awaited()
+    assert queue.qsize() == 2
+
+    stats = manager.get_connections_stats()
+    assert stats["websocket"]["users"] == 1
+    assert stats["channels"]["subscriptions"] == 2
+
+    await manager.disconnect_websocket("ws-1")
+    await manager.disconnect_sse("sse-1")
+    assert len(manager.registry) == 0
+    assert manager.channel_subscriptions == {}
+    await asyncio.sleep(0)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("count", [10_000, pytest.param(100_000, marks=pytest.mark.slow)])
+def test_registry_memory_per_connection(count):
+    """Бенчмарк: байт на соединение для реестра и прежней раскладки."""
+    registry_bytes, registry = _bytes_per_connection(_fill_registry, count)
+    legacy_bytes, legacy = _bytes_per_connection(_fill_legacy, count)
+
+    logger.info(f"📊 {count} соединений: реестр {registry_bytes:.0f} B/conn, Pydantic {legacy_bytes:.0f} B/conn")
+
+    assert len(registry) == count
+    assert len(legacy[1]) == count
+    assert registry_bytes < legacy_bytes
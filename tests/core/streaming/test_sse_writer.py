@@ -0,0 +1,128 @@
+"""
+Тесты пакетного SSE писателя и бенчмарк событий в секунду.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+import pytest
+
+from core.streaming.sse_writer import SSEStreamWriter, format_sse_event
+from core.streaming.ws_models import SSEMessage
+
+logger = logging.getLogger("test_session")
+
+
+def _message(i: int) -> SSEMessage:
+    return SSEMessage(id=f"m{i}", event="channel_message", data={"seq": i, "text": "привет"})
+
+
+def _legacy_format(message: SSEMessage) -> str:
+    """Прежняя реализация to_sse_format + перевод строки из роута."""
+    lines = [f"id: {message.id}", f"event: {message.event}"]
+    data_str = json.dumps(message.data, ensure_ascii=False)
+    for line in data_str.split("\n"):
+        lines.append(f"data: {line}")
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _parse(stream: str) -> list[dict]:
+    events = []
+    for block in stream.split("\n\n"):
+        if not block:
+            continue
+        event = {}
+        for line in block.split("\n"):
+            key, _, value = line.partition(": ")
+            event[key] = f"{event[key]}\n{value}" if key in event else value
+        events.append(event)
+    return events
+
+
+def test_format_sse_event():
+    assert format_sse_event("1", "ping", "a\nb", retry=3000) == "id: 1\nevent: ping\nretry: 3000\ndata: a\ndata: b\n\n"
+
+    event = _parse(_message(1).to_sse_format())[0]
+    assert event["id"] == "m1"
+    assert json.loads(event["data"]) == {"seq": 1, "text": "привет"}
+
+
+async def test_writer_coalesces_available_messages():
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(10):
+        queue.put_nowait(_message(i))
+
+    writer = SSEStreamWriter(queue, heartbeat=lambda: _message(-1), heartbeat_interval=30, max_batch_events=4)
+    stream = writer.stream()
+    chunks = [await anext(stream) for _ in range(3)]
+    await stream.aclose()
+
+    assert [len(_parse(chunk)) for chunk in chunks] == [4, 4, 2]
+    assert [event["id"] for event in _parse("".join(chunks))] == [f"m{i}" for i in range(10)]
+
+
+async def test_writer_respects_byte_budget():
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(5):
+        queue.put_nowait(_message(i))
+
+    size = len(_message(0).to_sse_format())
+    writer = SSEStreamWriter(queue, heartbeat=lambda: _message(-1), heartbeat_interval=30, max_batch_bytes=size * 2)
+    stream = writer.stream()
+    first = await anext(stream)
+    await stream.aclose()
+
+    assert len(_parse(first)) == 2
+
+
+async def test_writer_byte_budget_counts_utf8_bytes():
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(4):
+        queue.put_nowait(SSEMessage(id=f"m{i}", event="message", data={"text": "ж" * 100}))
+
+    size = len(queue._queue[0].to_sse_format())
+    writer = SSEStreamWriter(queue, heartbeat=lambda: _message(-1), heartbeat_interval=30, max_batch_bytes=size * 3)
+    stream = writer.stream()
+    first = await anext(stream)
+    await stream.aclose()
+
+    # Кириллица - два байта на символ: по символам в лимит вошло бы 3 события, по байтам - 2
+    assert len(_parse(first)) == 2
+
+
+async def test_writer_sends_heartbeat_when_idle():
+    queue: asyncio.Queue = asyncio.Queue()
+    heartbeat = SSEMessage(id="hb", event="heartbeat", data={"ok": True})
+    writer = SSEStreamWriter(queue, heartbeat=lambda: heartbeat, heartbeat_interval=0.05)
+    stream = writer.stream()
+
+    chunk = await asyncio.wait_for(anext(stream), timeout=1)
+    assert _parse(chunk)[0]["event"] == "heartbeat"
+
+    queue.put_nowait(_message(1))
+    assert _parse(await anext(stream))[0]["id"] == "m1"
+
+    await stream.aclose()
+    assert writer._timer is None
+
+
+@pytest.mark.performance
+def test_sse_encoding_throughput():
+    """Бенчмарк: событий в секунду для прежнего и пакетного форматирования."""
+    messages = [_message(i) for i in range(20_000)]
+
+    start = time.perf_counter()
+    legacy = [_legacy_format(message) for message in messages]
+    legacy_rate = len(messages) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    batched = "".join(SSEStreamWriter.encode(message) for message in messages)
+    batched_rate = len(messages) / (time.perf_counter() - start)
+
+    logger.info(f"📊 SSE: прежний {legacy_rate:.0f} ev/s, пакетный {batched_rate:.0f} ev/s")
+
+    assert len(_parse(batched)) == len(legacy)
+    assert [json.loads(e["data"]) for e in _parse(batched)[:3]] == [m.data for m in messages[:3]]
@@ -0,0 +1,136 @@
+"""
+Тесты периодического планировщика: leader lock, джиттер и метрики задач.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+from sqlalchemy import func, select
+from taskiq import InMemoryBroker
+from taskiq.exceptions import ScheduledTaskCancelledError
+
+from apps.auth.models.auth_models import OrbitalToken
+from core import tasks
+from core.base.models import BaseModel
+from core.scheduler import (
+    SCHEDULED_AT_LABEL,
+    LocalLeaderLock,
+    PeriodicJob,
+    PeriodicJobMetricsMiddleware,
+    PeriodicScheduleSource,
+    RedisLeaderLock,
+    create_scheduler,
+    job_metrics,
+    periodic,
+    periodic_jobs,
+)
+
+
+@pytest.fixture
+def metadata():
+    return BaseModel.metadata
+
+
+@pytest.fixture
+def redis_lock():
+    lock = RedisLeaderLock("redis://localhost")
+    lock.redis = fakeredis.FakeAsyncRedis()
+    return lock
+
+
+async def test_only_one_node_sends_cron_run(redis_lock):
+    job = PeriodicJob(task_name="nightly_report", cron="0 3 * * *")
+    nodes = [PeriodicScheduleSource({job.task_name: job}, redis_lock) for _ in range(3)]
+    job_metrics.pop(job.task_name, None)
+
+    outcomes = []
+    for node in nodes:
+        task = (await node.get_schedules())[0]
+        try:
+            await node.pre_send(task)
+            outcomes.append(task.labels[SCHEDULED_AT_LABEL])
+        except ScheduledTaskCancelledError:
+            outcomes.append(None)
+
+    assert sum(outcome is not None for outcome in outcomes) == 1
+    assert job_metrics[job.task_name].sent == 1
+    assert job_metrics[job.task_name].skipped == 2
+
+
+async def test_interval_lock_expires_before_next_run():
+    lock = LocalLeaderLock()
+    job = PeriodicJob(task_name="refresh", interval=1, lock_ttl=0.05)
+
+    assert await lock.acquire(job.lock_key(0), job.get_lock_ttl())
+    assert not await lock.acquire(job.lock_key(0), job.get_lock_ttl())
+    await asyncio.sleep(0.06)
+    assert await lock.acquire(job.lock_key(0), job.get_lock_ttl())
+    assert PeriodicJob(task_name="refresh", interval=100).get_lock_ttl() == 90
+
+
+async def test_scheduled_run_records_metrics():
+    broker = InMemoryBroker().with_middlewares(PeriodicJobMetricsMiddleware())
+    done = asyncio.Event()
+
+    @periodic(interval=60, jitter=0.01, task_name="test_periodic_job", broker=broker)
+    async def job() -> int:
+        done.set()
+        return 1
+
+    try:
+        jobs = {"test_periodic_job": periodic_jobs["test_periodic_job"]}
+        scheduler = create_scheduler(broker, jobs=jobs, lock=LocalLeaderLock())
+        source = scheduler.sources[0]
+        task = (await source.get_schedules())[0]
+        await scheduler.on_ready(source, task)
+        await asyncio.wait_for(done.wait(), timeout=5)
+        await broker.wait_all()
+
+        metrics = job_metrics["test_periodic_job"]
+        assert metrics.sent == 1
+        assert metrics.runs == 1
+        assert metrics.failures == 0
+        assert 0 <= metrics.last_lag < 5
+    finally:
+        periodic_jobs.pop("test_periodic_job", None)
+        job_metrics.pop("test_periodic_job", None)
+        await broker.shutdown()
+
+
+def test_periodic_requires_single_schedule():
+    broker = InMemoryBroker()
+
+    with pytest.raises(Exception, match="Set either cron or interval"):
+        periodic(broker=broker)(lambda: None)
+    with pytest.raises(Exception, match="Set either cron or interval"):
+        periodic(cron="* * * * *", interval=5, broker=broker)(lambda: None)
+
+
+async def test_each_periodic_job_runs_against_sqlite(session_factory, monkeypatch, tmp_path):
+    monkeypatch.setattr(tasks, "AsyncSessionLocal", session_factory)
+    monkeypatch.chdir(tmp_path)
+
+    async with session_factory() as session:
+        for hours in (-1, 1):
+            session.add(
+                OrbitalToken(
+                    user_id=uuid.uuid4(),
+                    token_hash=f"hash{hours}",
+                    token_type="password_reset",
+                    purpose="reset",
+                    expires_at=datetime.utcnow() + timedelta(hours=hours),
+                    token_metadata={},
+                )
+            )
+        await session.commit()
+
+    jobs = [name for name in periodic_jobs if tasks.broker.find_task(name).original_func.__module__ == tasks.__name__]
+    results = {name: await tasks.broker.find_task(name)() for name in jobs}
+
+    assert set(jobs) >= {"cleanup_expired_tokens", "cleanup_expired_sessions", "cleanup_incomplete_profiles"}
+    assert results["cleanup_expired_tokens"] == {"refresh_tokens": 0, "orbital_tokens": 1}
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(OrbitalToken)) == 1
@@ -0,0 +1,162 @@
+"""
+Тесты пакетной отправки задач TaskIQ, лимита размера результата и бенчмарк.
+"""
+
+import asyncio
+import logging
+import time
+
+import fakeredis
+import pytest
+from fakeredis.aioredis import FakeConnection
+from redis.asyncio import ConnectionPool, Redis
+from taskiq import InMemoryBroker
+from taskiq_redis import ListQueueBroker, RedisStreamBroker
+
+from core import taskiq_client
+from core.taskiq_client import ResultSizeLimitMiddleware, kiq_many
+
+logger = logging.getLogger("test_session")
+
+
+def _fake_redis(broker):
+    broker.connection_pool = ConnectionPool(connection_class=FakeConnection, server=fakeredis.FakeServer())
+    return broker
+
+
+def _register(broker):
+    @broker.task(task_name="add")
+    async def add(a: int, b: int = 0) -> int:
+        return a + b
+
+    return add
+
+
+async def test_kiq_many_in_memory_results():
+    broker = InMemoryBroker()
+    add = _register(broker)
+
+    tasks = await kiq_many(add, [(1, 2), {"a": 3, "b": 4}, (5,)], chunk_size=2)
+    results = [await task.wait_result(timeout=5) for task in tasks]
+
+    assert [result.return_value for result in results] == [3, 7, 5]
+    await broker.shutdown()
+
+
+async def test_kiq_many_falls_back_to_kiq_on_unverified_taskiq(monkeypatch):
+    monkeypatch.setattr(taskiq_client, "_PREPARE_MESSAGE_SUPPORTED", False)
+    broker = _fake_redis(ListQueueBroker(url="redis://localhost"))
+    add = _register(broker)
+
+    tasks = await kiq_many(add, [(1, 2), {"a": 3}])
+
+    redis = Redis(connection_pool=broker.connection_pool)
+    received = [broker.formatter.loads(await redis.rpop("taskiq")) for _ in range(2)]
+    assert [message.task_id for message in received] == [task.task_id for task in tasks]
+    assert [(message.args, message.kwargs) for message in received] == [([1, 2], {}), ([], {"a": 3})]
+
+
+async def test_kiq_many_list_broker_keeps_order():
+    broker = _fake_redis(ListQueueBroker(url="redis://localhost"))
+    add = _register(broker)
+
+    tasks = await kiq_many(add.kicker().with_labels(queue_name="bulk"), [(i,) for i in range(7)], chunk_size=3)
+
+    redis = Redis(connection_pool=broker.connection_pool)
+    assert await redis.llen("bulk") == 7
+    # Воркер забирает BRPOP с правого конца
+    received = [broker.formatter.loads(await redis.rpop("bulk")) for _ in range(7)]
+    assert [message.task_id for message in received] == [task.task_id for task in tasks]
+    assert [message.args for message in received] == [[i] for i in range(7)]
+
+
+async def test_kiq_many_stream_broker_redelivers_until_ack():
+    broker = _fake_redis(
+        RedisStreamBroker(url="redis://localhost", consumer_id="0", xread_block=100, idle_timeout=50)
+    )
+    add = _register(broker)
+
+    await kiq_many(add, [(i, i) for i in range(5)])
+    broker.is_worker_process = True
+    await broker.startup()
+    listener = broker.listen()
+
+    async def receive(count: int) -> list:
+        return [await anext(listener) for _ in range(count)]
+
+    def task_ids(messages: list) -> list[str]:
+        return [broker.formatter.loads(message.data).task_id for message in messages]
+
+    received = await receive(5)
+    for message in received[:3]:
+        await message.ack()
+    unacked = task_ids(received[3:])
+
+    # Неподтвержденные дольше idle_timeout забираются повторно вместе с очередным чтением
+    await asyncio.sleep(0.1)
+    (fresh,) = await kiq_many(add, [(5, 5)])
+    batch = await receive(3)
+    assert sorted(task_ids(batch)) == sorted([*unacked, fresh.task_id])
+    for message, task_id in zip(batch, task_ids(batch)):
+        if task_id != unacked[1]:
+            await message.ack()
+
+    # Повторно доставляется только то, что так и не подтверждено
+    await asyncio.sleep(0.1)
+    (fresh,) = await kiq_many(add, [(6, 6)])
+    batch = await receive(2)
+    assert sorted(task_ids(batch)) == sorted([unacked[1], fresh.task_id])
+    for message in batch:
+        await message.ack()
+
+    redis = Redis(connection_pool=broker.connection_pool)
+    assert (await redis.xpending("taskiq", "taskiq"))["pending"] == 0
+    await listener.aclose()
+
+
+async def test_result_size_limit():
+    broker = InMemoryBroker().with_middlewares(ResultSizeLimitMiddleware(max_size=100))
+
+    @broker.task(task_name="payload")
+    async def payload(size: int) -> str:
+        return "x" * size
+
+    small = await (await payload.kiq(10)).wait_result(timeout=5)
+    large = await (await payload.kiq(1000)).wait_result(timeout=5)
+
+    assert small.return_value == "x" * 10
+    assert large.is_err
+    assert large.return_value is None
+    assert "limit is 100 bytes" in str(large.error)
+    await broker.shutdown()
+
+
+@pytest.mark.performance
+async def test_kiq_many_throughput():
+    """Бенчмарк: задач в секунду для kiq() и kiq_many(), базовая линия - InMemoryBroker."""
+    count = 2000
+
+    async def measure(broker, bulk: bool) -> float:
+        add = _register(broker)
+        start = time.perf_counter()
+        if bulk:
+            await kiq_many(add, [(i, i) for i in range(count)])
+        else:
+            for i in range(count):
+                await add.kiq(i, i)
+        return count / (time.perf_counter() - start)
+
+    baseline = await measure(InMemoryBroker(await_inplace=True), bulk=False)
+    list_single = await measure(_fake_redis(ListQueueBroker(url="redis://localhost")), bulk=False)
+    list_bulk = await measure(_fake_redis(ListQueueBroker(url="redis://localhost")), bulk=True)
+    stream_single = await measure(_fake_redis(RedisStreamBroker(url="redis://localhost")), bulk=False)
+    stream_bulk = await measure(_fake_redis(RedisStreamBroker(url="redis://localhost")), bulk=True)
+
+    logger.info(
+        f"📊 TaskIQ: in-memory {baseline:.0f} tasks/s, "
+        f"list kiq {list_single:.0f} / kiq_many {list_bulk:.0f}, "
+        f"stream kiq {stream_single:.0f} / kiq_many {stream_bulk:.0f}"
+    )
+
+    assert list_bulk > list_single
+    assert stream_bulk > stream_single
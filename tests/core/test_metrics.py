@@ -0,0 +1,207 @@
+"""
+Тесты реестра метрик, объединения метрик воркеров и эндпоинта /metrics.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from core.base.repo.cache import CacheManager
+from core.base.repo.metrics import instrument_repository
+from core.metrics import (
+    CACHE_HITS,
+    CACHE_MISSES,
+    QUEUE_DEPTH,
+    REPOSITORY_CALL_SECONDS,
+    Counter,
+    Gauge,
+    Histogram,
+    Metric,
+    MetricsRegistry,
+    MultiProcessMetrics,
+    metrics_router,
+)
+from core.metrics import settings as metrics_settings
+
+logger = logging.getLogger("test_session")
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = Counter("requests_total", "Requests", ["method"], registry=registry)
+    in_flight = Gauge("in_flight", "In flight requests", registry=registry)
+    latency = Histogram("latency_seconds", "Latency", ["route"], registry=registry, buckets=(0.1, 1.0))
+
+    requests.labels("GET").inc()
+    requests.labels(method="GET").inc(2)
+    requests.labels("POST").inc()
+    in_flight.set(3)
+    in_flight.dec()
+    route = latency.labels('/items/"{id}"')
+    route.observe(0.05)
+    route.observe(0.5)
+    route.observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{method="GET"} 3.0' in text
+    assert 'requests_total{method="POST"} 1.0' in text
+    assert "in_flight 2.0" in text
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{route="/items/\\"{id}\\"",le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{route="/items/\\"{id}\\"",le="1.0"} 2.0' in text
+    assert 'latency_seconds_bucket{route="/items/\\"{id}\\"",le="+Inf"} 3.0' in text
+    assert 'latency_seconds_count{route="/items/\\"{id}\\""} 3.0' in text
+    assert 'latency_seconds_sum{route="/items/\\"{id}\\""} 5.55' in text
+
+    with pytest.raises(ValueError):
+        Counter("requests_total", "Duplicate", registry=registry)
+    with pytest.raises(ValueError):
+        requests.labels("GET", "extra")
+
+
+async def test_multiprocess_snapshots_are_merged(tmp_path):
+    registry = MetricsRegistry()
+    requests = Counter("requests_total", "Requests", registry=registry)
+    connections = Gauge("connections", "Connections", registry=registry)
+    depth = Gauge("depth", "Shared queue depth", registry=registry, multiprocess_mode="max")
+    latency = Histogram("latency_seconds", "Latency", registry=registry, buckets=(1.0,))
+    requests.inc(2)
+    connections.set(5)
+    depth.set(7)
+    latency.observe(0.5)
+
+    # Снимки другого живого воркера и завершившегося воркера
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    for pid in (os.getppid(), exited.pid):
+        snapshot = registry.dump()
+        snapshot["pid"] = pid
+        (tmp_path / f"{pid}.json").write_text(json.dumps(snapshot))
+
+    multiprocess = MultiProcessMetrics(tmp_path, registry=registry)
+    multiprocess.write()
+    text = await multiprocess.render()
+
+    # Счетчики и гистограммы всех воркеров суммируются, gauge - только живых
+    assert "requests_total 6.0" in text
+    assert 'latency_seconds_bucket{le="1.0"} 3.0' in text
+    assert "connections 10.0" in text
+    assert "depth 7.0" in text
+
+    # Снимок завершившегося воркера перенят текущим процессом и удален
+    assert {path.name for path in tmp_path.iterdir()} == {f"{os.getppid()}.json", f"{os.getpid()}.json"}
+    assert json.loads(multiprocess.path.read_text())["retired"]["requests_total"]["samples"] == [[[], 2.0]]
+    assert "requests_total 6.0" in await multiprocess.render()
+
+    # Другой воркер видит перенятые счетчики в снимке текущего процесса
+    other = MultiProcessMetrics(tmp_path, registry=MetricsRegistry())
+    snapshot = json.loads(multiprocess.path.read_text())
+    snapshot["pid"] = os.getppid()
+    (tmp_path / f"{os.getppid()}.json").unlink()
+    (tmp_path / f"{os.getpid()}.json").write_text(json.dumps(snapshot))
+    assert "requests_total 4.0" in await other.render()
+
+
+def test_metric_requires_child_factory():
+    class Untyped(Metric):
+        pass
+
+    with pytest.raises(TypeError):
+        Untyped("untyped", "No value type")
+
+
+async def test_repository_calls_and_cache_lookups_are_recorded():
+    class Item:
+        pass
+
+    @instrument_repository
+    class ItemRepository:
+        _model = Item
+
+        async def get(self, id):
+            return id
+
+        async def _internal(self):
+            return None
+
+    repository = ItemRepository()
+    for i in range(3):
+        assert await repository.get(i) == i
+    await repository._internal()
+
+    assert REPOSITORY_CALL_SECONDS.labels("Item", "get").count == 3
+    assert ("Item", "_internal") not in dict(REPOSITORY_CALL_SECONDS.items())
+
+    cache = CacheManager(use_redis=False, key_prefix="test-metrics:")
+    hits = CACHE_HITS.labels("memory").value
+    misses = CACHE_MISSES.value
+    await cache.set("key", {"value": 1})
+    assert await cache.get("key") == {"value": 1}
+    assert await cache.get("missing") is None
+    await cache.delete("key")
+
+    assert CACHE_HITS.labels("memory").value == hits + 1
+    assert CACHE_MISSES.value == misses + 1
+
+
+async def test_metrics_endpoint_runs_collectors():
+    app = FastAPI()
+    app.include_router(metrics_router)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'realtime_connections{transport="websocket"}' in response.text
+    assert 'queue_depth{queue="repository_events"} 0.0' in response.text
+    assert QUEUE_DEPTH.labels("repository_events").value == 0
+
+
+async def test_metrics_endpoint_requires_token(monkeypatch):
+    monkeypatch.setattr(metrics_settings, "METRICS_TOKEN", "scrape-secret")
+    app = FastAPI()
+    app.include_router(metrics_router)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        missing = await client.get("/metrics")
+        wrong = await client.get("/metrics", headers={"Authorization": "Bearer nope"})
+        allowed = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert missing.status_code == wrong.status_code == 401
+    assert allowed.status_code == 200
+
+
+@pytest.mark.performance
+def test_hot_path_overhead():
+    """Бенчмарк: стоимость инкремента счетчика и записи в гистограмму."""
+    registry = MetricsRegistry()
+    counter = Counter("bench_total", "Bench", ["model"], registry=registry).labels("Item")
+    histogram = Histogram("bench_seconds", "Bench", ["model"], registry=registry).labels("Item")
+    iterations = 100_000
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        counter.inc()
+    inc_us = (time.perf_counter() - start) / iterations * 1_000_000
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        histogram.observe((i % 100) / 1000)
+    observe_us = (time.perf_counter() - start) / iterations * 1_000_000
+
+    logger.info(f"📊 Metrics hot path: counter.inc {inc_us:.3f} µs, histogram.observe {observe_us:.3f} µs")
+
+    assert counter.value == iterations
+    assert histogram.count == iterations
+    assert inc_us < 10
+    assert observe_us < 20
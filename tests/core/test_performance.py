@@ -0,0 +1,128 @@
+"""
+Тесты гистограмм задержки, фонового замера памяти и performance middleware.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from core import performance
+from core.performance import PSUTIL_AVAILABLE, LatencyHistogram, MemorySampler
+
+logger = logging.getLogger("test_session")
+
+APPS_DIR = Path(__file__).resolve().parents[2] / "src" / "apps"
+
+
+async def item_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(request.path_params["item_id"])
+
+
+def _load_performance_middleware():
+    path = APPS_DIR / "test_modern_syntax" / "middleware" / "test_modern_syntax_performance_middleware.py"
+    spec = importlib.util.spec_from_file_location("generated_performance_middleware", path)
+    loaded = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(loaded)
+    return loaded.TestModernSyntaxPerformanceMiddleware
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 0.05, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 6
+    assert snapshot["sum"] == pytest.approx(3.615)
+    # Границы включительные, счетчики накопительные
+    assert snapshot["buckets"] == {"0.01": 2, "0.1": 4, "1": 5, "+Inf": 6}
+    assert snapshot["p50"] == 0.1
+    assert snapshot["p99"] == 1.0
+
+    histogram.reset()
+    assert histogram.snapshot()["count"] == 0
+    assert histogram.quantile(0.5) == 0.0
+
+
+@pytest.mark.skipif(not PSUTIL_AVAILABLE, reason="psutil is not installed")
+async def test_memory_sampler_runs_in_background():
+    sampler = MemorySampler(interval=0.01)
+    sampler.ensure_started()
+    sampler.ensure_started()
+    assert sampler.is_running
+
+    await asyncio.sleep(0.05)
+    await sampler.stop()
+
+    assert not sampler.is_running
+    assert sampler.samples >= 2
+    assert sampler.rss_mb > 0
+
+
+async def test_generated_middleware_records_route_histograms(monkeypatch):
+    monkeypatch.setattr(performance, "_memory_sampler", MemorySampler(interval=60))
+    middleware_class = _load_performance_middleware()
+    app = middleware_class(Starlette(routes=[Route("/items/{item_id}", item_endpoint)]), sample_rate=0)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        responses = [await client.get(f"/items/{i}") for i in range(5)]
+        missing = await client.get("/missing")
+
+    assert [response.text for response in responses] == ["0", "1", "2", "3", "4"]
+    assert responses[0].headers["X-Performance-Time"].endswith("s")
+    assert responses[0].headers["X-Memory-Usage"].endswith("MB")
+    assert missing.status_code == 404
+
+    stats = app.get_performance_stats()
+    # Одна гистограмма на шаблон маршрута, а не на URL
+    assert stats["routes"]["GET /items/{item_id}"]["count"] == 5
+    assert stats["routes"]["GET <unmatched>"]["count"] == 1
+    await app.memory_sampler.stop()
+
+
+async def test_generated_middleware_logs_only_sampled_and_slow_requests(monkeypatch, caplog):
+    monkeypatch.setattr(performance, "_memory_sampler", MemorySampler(interval=60))
+    middleware_class = _load_performance_middleware()
+    routes = [Route("/items/{item_id}", item_endpoint)]
+    quiet = middleware_class(Starlette(routes=routes), sample_rate=0)
+    slow = middleware_class(Starlette(routes=routes), sample_rate=0, response_time_threshold=0)
+
+    logging.disable(logging.NOTSET)
+    try:
+        with caplog.at_level(logging.INFO, logger="performance.test_modern_syntax"):
+            for app in (quiet, slow):
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    for i in range(3):
+                        await client.get(f"/items/{i}")
+    finally:
+        logging.disable(logging.INFO)
+
+    assert [record.levelname for record in caplog.records] == ["WARNING"] * 3
+    assert all(record.alert_type == "slow_request" for record in caplog.records)
+    await quiet.memory_sampler.stop()
+
+
+@pytest.mark.performance
+def test_histogram_observe_overhead():
+    """Бенчмарк: стоимость записи задержки в гистограмму."""
+    histogram = LatencyHistogram()
+    iterations = 100_000
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        histogram.observe((i % 1000) / 100)
+    per_call_us = (time.perf_counter() - start) / iterations * 1_000_000
+
+    logger.info(f"📊 LatencyHistogram.observe: {per_call_us:.3f} µs per call")
+
+    assert histogram.count == iterations
+    assert per_call_us < 20
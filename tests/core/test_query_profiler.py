@@ -0,0 +1,116 @@
+"""
+Тесты профилировщика SQL: отпечатки запросов, лог медленных запросов, детектор N+1.
+"""
+
+import logging
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import ForeignKey, String, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.exceptions import CoreRepositoryNPlusOneError
+from core.metrics import DB_QUERIES_PER_REQUEST
+from core.query_profiler import QueryProfiler, QueryProfilerMiddleware, fingerprint, parameter_shape
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Author(_Base):
+    __tablename__ = "authors"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+
+
+class Book(_Base):
+    __tablename__ = "books"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    author_id: Mapped[int] = mapped_column(ForeignKey("authors.id"), nullable=False)
+
+
+@pytest_asyncio.fixture
+async def books(engine):
+    async with engine.begin() as conn:
+        await conn.execute(Author.__table__.insert(), [{"id": i, "name": f"author{i}"} for i in range(1, 21)])
+        await conn.execute(Book.__table__.insert(), [{"id": i, "author_id": i} for i in range(1, 21)])
+
+
+@pytest.fixture
+def profiler(engine, books):
+    # Устанавливается после наполнения таблиц - вставки не попадают в статистику
+    profiler = QueryProfiler(slow_threshold=10.0, n_plus_one_threshold=5, raise_on_n_plus_one=True)
+    profiler.install(engine.sync_engine)
+    yield profiler
+    profiler.uninstall()
+
+
+async def load_authors_one_by_one(session) -> list[str]:
+    books = (await session.scalars(select(Book))).all()
+    return [await session.scalar(select(Author.name).where(Author.id == book.author_id)) for book in books]
+
+
+def test_fingerprint_normalizes_literals_and_placeholder_lists():
+    assert fingerprint("SELECT *  FROM t\n WHERE id IN (?, ?, ?) AND name = 'x'") == (
+        "SELECT * FROM t WHERE id IN (?) AND name = ?"
+    )
+    assert fingerprint("SELECT * FROM t WHERE id IN ($1, $2) LIMIT 10") == "SELECT * FROM t WHERE id IN (?) LIMIT ?"
+    assert fingerprint("INSERT INTO t (a) VALUES (?), (?), (?)") == fingerprint("INSERT INTO t (a) VALUES (?)")
+    # Значения параметров в лог не попадают, только типы
+    assert parameter_shape({"email": "a@example.com", "id": 1}) == {"email": "str", "id": "int"}
+    assert parameter_shape([(1, "a"), (2, "b")]) == {"rows": 2, "shape": ["int", "str"]}
+
+
+async def test_n_plus_one_raises_and_batched_query_passes(session_factory, profiler):
+    async with session_factory() as session:
+        with pytest.raises(CoreRepositoryNPlusOneError) as exc_info:
+            with profiler.track("GET /books"):
+                await load_authors_one_by_one(session)
+    assert exc_info.value.context["count"] == 6
+
+    async with session_factory() as session:
+        with profiler.track("GET /books") as stats:
+            books = (await session.scalars(select(Book))).all()
+            await session.scalars(select(Author).where(Author.id.in_([book.author_id for book in books])))
+
+    assert stats.count == 2
+    assert not stats.n_plus_one
+
+
+async def test_slow_queries_are_logged_with_parameter_shapes(session_factory, profiler, caplog):
+    profiler.slow_threshold = 0.0
+
+    with caplog.at_level(logging.WARNING, logger="core.query_profiler"):
+        async with session_factory() as session:
+            await session.scalar(select(Author.name).where(Author.name == "secret-value"))
+
+    record = next(record for record in caplog.records if record.message.startswith("Slow query"))
+    assert record.parameters == ["str"]
+    assert "secret-value" not in record.message
+
+
+async def test_middleware_records_queries_per_endpoint(session_factory, profiler, caplog):
+    profiler.raise_on_n_plus_one = False
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware, profiler=profiler)
+
+    @app.get("/books/{book_id}/authors")
+    async def authors(book_id: int):
+        async with session_factory() as session:
+            return await load_authors_one_by_one(session)
+
+    histogram = DB_QUERIES_PER_REQUEST.labels("GET /books/{book_id}/authors")
+    before = histogram.count
+
+    with caplog.at_level(logging.WARNING, logger="core.query_profiler"):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/books/1/authors")
+
+    assert response.status_code == 200
+    assert histogram.count == before + 1
+    assert any("Possible N+1 in GET /books/1/authors" in record.message for record in caplog.records)
@@ -0,0 +1,495 @@
+"""
+Нагрузочный и soak бенчмарк realtime эндпоинтов (WebSocket и SSE).
+
+Открывает N WebSocket и SSE клиентов штатными ``WSClient`` и ``SSEClient``,
+публикует сообщения в каналы и отдельным пользователям через HTTP API
+с заданной частотой и измеряет:
+
+- скорость подключения (соединений в секунду);
+- перцентили сквозной задержки доставки;
+- потерянные сообщения (ожидаемые доставки минус полученные);
+- RSS на соединение;
+- задержку event loop;
+- временной ряд RSS/задержек для soak прогонов.
+
+Результаты пишутся в JSON файл, который можно сравнить с предыдущим прогоном
+через ``--baseline``.
+
+Запуск против приложения в том же процессе (поднимается uvicorn на свободном порту)::
+
+    uv run python tests/performance/realtime_load.py --ws 2000 --sse 500 --duration 60
+
+Запуск против локального uvicorn::
+
+    uv run python tests/performance/realtime_load.py --url http://127.0.0.1:8000 --server-pid 12345
+
+Для тысяч соединений поднимите лимит файловых дескрипторов (``ulimit -n``).
+В режиме одного процесса RSS включает и клиентские объекты; для чистого RSS
+сервера используйте ``--url`` вместе с ``--server-pid``. Во внешнем режиме
+сервер должен требовать JWT аутентификацию (``WEBSOCKET_AUTH_REQUIRED`` и
+``SSE_AUTH_REQUIRED``) с тем же ``WS_JWT_SECRET_KEY``, иначе сообщения
+пользователям не доставляются.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+from pytz import utc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from core.config import get_settings  # noqa: E402
+from core.realtime.auth import WSAuthenticator  # noqa: E402
+from core.streaming.codecs import SUBPROTOCOL_JSON  # noqa: E402
+from tools.clients.sse_client import SSEClient  # noqa: E402
+from tools.clients.ws_client import WSClient  # noqa: E402
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger("realtime_load")
+
+# Ключевые метрики для сравнения с baseline: имя -> больше значит лучше
+COMPARED_METRICS = {
+    "connect_rate": True,
+    "delivery_rate": True,
+    "latency_ms.p50": False,
+    "latency_ms.p99": False,
+    "dropped": False,
+    "rss_per_connection_bytes": False,
+    "loop_lag_ms.p99": False,
+}
+
+
+@dataclass
+class LoadScenario:
+    """Параметры прогона."""
+
+    ws_clients: int = 200
+    sse_clients: int = 50
+    users: int = 0  # 0 - по пользователю на соединение
+    channels: int = 10
+    broadcast_rate: float = 20.0  # сообщений в канал в секунду
+    direct_rate: float = 50.0  # сообщений пользователям в секунду
+    duration: float = 10.0
+    drain: float = 2.0
+    connect_concurrency: int = 200
+    sample_interval: float = 5.0
+    payload_size: int = 64
+    encoding: str = SUBPROTOCOL_JSON
+    url: str | None = None
+    server_pid: int | None = None
+    seed_channel: str = "load"
+
+    @property
+    def total_clients(self) -> int:
+        return self.ws_clients + self.sse_clients
+
+    @property
+    def users_count(self) -> int:
+        return self.users or self.total_clients
+
+
+class DeliveryProbe:
+    """Счетчик полученных сообщений и задержек доставки."""
+
+    __slots__ = ("latencies", "received")
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.received = 0
+
+    def record(self, payload: Any) -> None:
+        if isinstance(payload, dict) and "sent_at" in payload:
+            self.received += 1
+            self.latencies.append(time.time() - payload["sent_at"])
+
+
+class LoopLagMonitor:
+    """Измеряет запаздывание event loop относительно запланированного пробуждения."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+
+def percentiles(values: list[float], scale: float = 1.0) -> dict[str, float]:
+    """p50/p90/p99/max по выборке."""
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+
+    def pick(q: float) -> float:
+        return round(ordered[min(last, int(q * len(ordered)))] * scale, 3)
+
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(ordered[last] * scale, 3)}
+
+
+def rss_bytes(pid: int | None = None) -> int:
+    """Текущий RSS процесса (пиковый, если psutil недоступен)."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process(pid).memory_info().rss
+    if pid is not None:
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+async def start_inprocess_server(scenario: LoadScenario) -> tuple[Any, asyncio.Task, str]:
+    """Поднять realtime роуты на uvicorn в текущем event loop."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from core.realtime.routes.sse_routes import router as sse_router
+    from core.realtime.routes.ws_routes import router as ws_router
+
+    settings = get_settings()
+    settings.WEBSOCKET_AUTH_REQUIRED = True
+    settings.SSE_AUTH_REQUIRED = True
+    settings.WEBSOCKET_MAX_CONNECTIONS = max(settings.WEBSOCKET_MAX_CONNECTIONS, scenario.ws_clients)
+    settings.SSE_MAX_CONNECTIONS = max(settings.SSE_MAX_CONNECTIONS, scenario.sse_clients)
+
+    app = FastAPI()
+    app.include_router(ws_router)
+    app.include_router(sse_router)
+
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=0, log_level="warning", lifespan="off", backlog=scenario.total_clients
+    )
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+class RealtimeLoadRunner:
+    """Прогон одного сценария."""
+
+    def __init__(self, scenario: LoadScenario) -> None:
+        self.scenario = scenario
+        self.probe = DeliveryProbe()
+        self.lag = LoopLagMonitor()
+        self.authenticator = WSAuthenticator()
+        self.ws_clients: list[WSClient] = []
+        self.sse_clients: list[SSEClient] = []
+        self.channel_members: Counter[str] = Counter()
+        self.user_members: Counter[str] = Counter()
+        self.expected = 0
+        self.published = 0
+        self.publish_errors = 0
+        self.connect_errors = 0
+        self.timeline: list[dict[str, Any]] = []
+        self._pending: set[asyncio.Task] = set()
+
+    def _assignment(self, index: int) -> tuple[str, str]:
+        user_id = f"load-user-{index % self.scenario.users_count}"
+        return user_id, f"{self.scenario.seed_channel}-{index % self.scenario.channels}"
+
+    def _token(self, user_id: str) -> str:
+        return self.authenticator.create_access_token({"sub": user_id})
+
+    async def _open_ws(self, base_url: str, index: int, semaphore: asyncio.Semaphore) -> None:
+        user_id, channel = self._assignment(index)
+        client = WSClient(
+            base_url.replace("http", "ws", 1) + "/ws/connect",
+            token=self._token(user_id),
+            auto_reconnect=False,
+            encoding=self.scenario.encoding,
+        )
+        client.subscribed_channels.add(channel)
+        for message_type in ("channel", "json"):
+            client.add_message_handler(message_type, lambda data: self.probe.record(data.get("data")))
+
+        async with semaphore:
+            if await client.connect():
+                self.ws_clients.append(client)
+                self.channel_members[channel] += 1
+                self.user_members[user_id] += 1
+            else:
+                self.connect_errors += 1
+
+    async def _open_sse(self, base_url: str, index: int, semaphore: asyncio.Semaphore) -> None:
+        user_id, channel = self._assignment(self.scenario.ws_clients + index)
+        client = SSEClient(base_url + "/sse/connect", token=self._token(user_id), auto_reconnect=False)
+        client.subscribed_channels.add(channel)
+        connected = asyncio.Event()
+        client.add_event_handler("connected", lambda data: connected.set())
+        for event in ("channel_message", "user_message"):
+            client.add_event_handler(event, lambda data: self.probe.record((data.get("data") or {}).get("data")))
+
+        async with semaphore:
+            await client.connect()
+            try:
+                await asyncio.wait_for(connected.wait(), timeout=client.timeout)
+            except TimeoutError:
+                self.connect_errors += 1
+                await client.disconnect()
+                return
+
+        self.sse_clients.append(client)
+        self.channel_members[channel] += 1
+        self.user_members[user_id] += 1
+
+    async def connect_all(self, base_url: str) -> float:
+        """Открыть все соединения, вернуть длительность в секундах."""
+        semaphore = asyncio.Semaphore(self.scenario.connect_concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(self._open_ws(base_url, i, semaphore) for i in range(self.scenario.ws_clients)),
+            *(self._open_sse(base_url, i, semaphore) for i in range(self.scenario.sse_clients)),
+        )
+        return time.perf_counter() - start
+
+    def _payload(self, kind: str, seq: int) -> dict[str, Any]:
+        return {"kind": kind, "seq": seq, "sent_at": time.time(), "pad": "x" * self.scenario.payload_size}
+
+    async def _post(self, http: httpx.AsyncClient, path: str, body: dict[str, Any], expected: int) -> None:
+        try:
+            response = await http.post(path, json=body)
+            response.raise_for_status()
+            self.published += 1
+            self.expected += expected
+        except Exception as e:
+            self.publish_errors += 1
+            logger.debug(f"Publish error {path}: {e}")
+
+    async def _publish_loop(self, http: httpx.AsyncClient, kind: str, rate: float, deadline: float) -> None:
+        if rate <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / rate
+        next_at = loop.time()
+        seq = 0
+        channels = sorted(self.channel_members)
+        users = sorted(self.user_members)
+        while loop.time() < deadline and (channels if kind == "broadcast" else users):
+            if kind == "broadcast":
+                channel = channels[seq % len(channels)]
+                body = {"channel": channel, "data": self._payload(kind, seq)}
+                coro = self._post(http, "/ws/send-to-channel", body, self.channel_members[channel])
+            else:
+                user_id = users[seq % len(users)]
+                body = {"type": "json", "data": self._payload(kind, seq)}
+                coro = self._post(http, f"/ws/send-to-user/{user_id}", body, self.user_members[user_id])
+
+            task = asyncio.create_task(coro)
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+            seq += 1
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+
+    async def _sample_loop(self, started: float) -> None:
+        while True:
+            await asyncio.sleep(self.scenario.sample_interval)
+            self.timeline.append(
+                {
+                    "elapsed": round(time.perf_counter() - started, 1),
+                    "rss_bytes": rss_bytes(self.scenario.server_pid),
+                    "loop_lag_ms_p99": percentiles(self.lag.samples[-200:], 1000)["p99"],
+                    "expected": self.expected,
+                    "received": self.probe.received,
+                }
+            )
+
+    async def run(self) -> dict[str, Any]:
+        """Выполнить сценарий и вернуть результаты."""
+        scenario = self.scenario
+        server = server_task = None
+        base_url = scenario.url
+        if base_url is None:
+            server, server_task, base_url = await start_inprocess_server(scenario)
+
+        self.lag.start()
+        rss_before = rss_bytes(scenario.server_pid)
+        try:
+            connect_seconds = await self.connect_all(base_url)
+            connections = len(self.ws_clients) + len(self.sse_clients)
+            rss_connected = rss_bytes(scenario.server_pid)
+            logger.info(f"Подключено {connections}/{scenario.total_clients} за {connect_seconds:.2f}s")
+
+            started = time.perf_counter()
+            sampler = asyncio.create_task(self._sample_loop(started))
+            limits = httpx.Limits(max_connections=100, max_keepalive_connections=100)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+                deadline = asyncio.get_running_loop().time() + scenario.duration
+                await asyncio.gather(
+                    self._publish_loop(http, "broadcast", scenario.broadcast_rate, deadline),
+                    self._publish_loop(http, "direct", scenario.direct_rate, deadline),
+                )
+                if self._pending:
+                    await asyncio.gather(*self._pending, return_exceptions=True)
+            await asyncio.sleep(scenario.drain)
+            elapsed = time.perf_counter() - started
+            sampler.cancel()
+        finally:
+            await self.lag.stop()
+            await asyncio.gather(
+                *(client.disconnect() for client in [*self.ws_clients, *self.sse_clients]), return_exceptions=True
+            )
+            if server is not None:
+                server.should_exit = True
+                await asyncio.gather(server_task, return_exceptions=True)
+
+        return {
+            "connections": connections,
+            "connect_errors": self.connect_errors,
+            "connect_seconds": round(connect_seconds, 3),
+            "connect_rate": round(connections / connect_seconds, 1) if connect_seconds else 0.0,
+            "published": self.published,
+            "publish_errors": self.publish_errors,
+            "expected": self.expected,
+            "received": self.probe.received,
+            "dropped": max(0, self.expected - self.probe.received),
+            "delivery_rate": round(self.probe.received / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": percentiles(self.probe.latencies, 1000),
+            "rss_per_connection_bytes": round((rss_connected - rss_before) / connections) if connections else 0,
+            "rss_bytes": rss_connected,
+            "loop_lag_ms": percentiles(self.lag.samples, 1000),
+        }
+
+
+def _metric(results: dict[str, Any], name: str) -> float | None:
+    value: Any = results
+    for part in name.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Относительное изменение ключевых метрик против baseline."""
+    report = {}
+    for name, higher_is_better in COMPARED_METRICS.items():
+        current, previous = _metric(results, name), _metric(baseline, name)
+        if current is None or previous is None:
+            continue
+        change = (current - previous) / previous * 100 if previous else 0.0
+        report[name] = {
+            "baseline": previous,
+            "current": current,
+            "change_pct": round(change, 1),
+            "regressed": change < 0 if higher_is_better else change > 0,
+        }
+    return report
+
+
+async def run_scenario(scenario: LoadScenario, output: Path | None = None) -> dict[str, Any]:
+    """Выполнить сценарий и записать отчет в JSON."""
+    runner = RealtimeLoadRunner(scenario)
+    results = await runner.run()
+    report = {
+        "benchmark": "realtime_load",
+        "started_at": datetime.now(tz=utc).isoformat(),
+        "mode": "external" if scenario.url else "in-process",
+        "python": platform.python_version(),
+        "scenario": asdict(scenario),
+        "results": results,
+        "timeline": runner.timeline,
+    }
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    return report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк WebSocket/SSE")
+    parser.add_argument("--ws", type=int, default=LoadScenario.ws_clients, help="Количество WebSocket клиентов")
+    parser.add_argument("--sse", type=int, default=LoadScenario.sse_clients, help="Количество SSE клиентов")
+    parser.add_argument("--users", type=int, default=LoadScenario.users, help="Количество пользователей")
+    parser.add_argument("--channels", type=int, default=LoadScenario.channels, help="Количество каналов")
+    parser.add_argument("--broadcast-rate", type=float, default=LoadScenario.broadcast_rate, help="В каналы, msg/s")
+    parser.add_argument("--direct-rate", type=float, default=LoadScenario.direct_rate, help="Пользователям, msg/s")
+    parser.add_argument("--duration", type=float, default=LoadScenario.duration, help="Длительность публикации (с)")
+    parser.add_argument("--drain", type=float, default=LoadScenario.drain, help="Ожидание доставки (с)")
+    parser.add_argument("--payload-size", type=int, default=LoadScenario.payload_size, help="Размер payload (байт)")
+    parser.add_argument("--encoding", default=LoadScenario.encoding, help="Подпротокол WebSocket (json/msgpack)")
+    parser.add_argument("--connect-concurrency", type=int, default=LoadScenario.connect_concurrency)
+    parser.add_argument("--sample-interval", type=float, default=LoadScenario.sample_interval)
+    parser.add_argument("--url", default=None, help="Базовый URL запущенного сервера (иначе in-process)")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID сервера для замера RSS")
+    parser.add_argument("--output", type=Path, default=None, help="Файл отчета JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="Отчет для сравнения")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+    logging.getLogger("tools.clients").setLevel(logging.WARNING)
+    logging.getLogger("core.realtime").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    scenario = LoadScenario(
+        ws_clients=args.ws,
+        sse_clients=args.sse,
+        users=args.users,
+        channels=args.channels,
+        broadcast_rate=args.broadcast_rate,
+        direct_rate=args.direct_rate,
+        duration=args.duration,
+        drain=args.drain,
+        connect_concurrency=args.connect_concurrency,
+        sample_interval=args.sample_interval,
+        payload_size=args.payload_size,
+        encoding=args.encoding,
+        url=args.url,
+        server_pid=args.server_pid,
+    )
+    output = args.output or Path("reports/benchmarks") / f"realtime_load_{datetime.now(tz=utc):%Y%m%d_%H%M%S}.json"
+    report = asyncio.run(run_scenario(scenario, output))
+
+    print(json.dumps(report["results"], ensure_ascii=False, indent=2))
+    print(f"📊 Отчет: {output}")
+
+    if args.baseline:
+        comparison = compare(report["results"], json.loads(args.baseline.read_text())["results"])
+        print(json.dumps(comparison, ensure_ascii=False, indent=2))
+        if any(item["regressed"] and abs(item["change_pct"]) > 10 for item in comparison.values()):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
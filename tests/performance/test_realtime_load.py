@@ -0,0 +1,41 @@
+"""
+Короткий прогон нагрузочного бенчмарка realtime эндпоинтов.
+"""
+
+import json
+import logging
+
+import pytest
+
+from .realtime_load import LoadScenario, compare, percentiles, run_scenario
+
+logger = logging.getLogger("test_session")
+
+
+def test_percentiles_and_compare():
+    assert percentiles([]) == {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    assert percentiles([0.001, 0.002, 0.003, 0.004], scale=1000)["max"] == 4.0
+
+    current = {"connect_rate": 90.0, "latency_ms": {"p99": 12.0}}
+    baseline = {"connect_rate": 100.0, "latency_ms": {"p99": 10.0}}
+    report = compare(current, baseline)
+    assert report["connect_rate"]["regressed"] is True
+    assert report["latency_ms.p99"]["change_pct"] == 20.0
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+async def test_realtime_load_smoke(tmp_path):
+    """Бенчмарк: небольшой in-process прогон WS/SSE без потерь сообщений."""
+    output = tmp_path / "realtime_load.json"
+    scenario = LoadScenario(ws_clients=40, sse_clients=10, channels=4, broadcast_rate=10, direct_rate=20, duration=2)
+
+    report = await run_scenario(scenario, output)
+    results = report["results"]
+
+    logger.info(f"📊 Realtime load: {json.dumps(results)}")
+
+    assert json.loads(output.read_text())["results"] == results
+    assert results["connections"] == 50
+    assert results["publish_errors"] == 0
+    assert results["dropped"] == 0